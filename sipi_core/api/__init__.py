@@ -0,0 +1,55 @@
+# api/__init__.py
+"""
+Capa GraphQL (strawberry) sobre los modelos SIPI.
+
+Los tipos y resolvers de la API viven en la aplicación; aquí están las
+piezas comunes que necesitan conocer los mappers de SQLAlchemy.
+"""
+
+from .cargadores import (
+    RelacionCargable,
+    FabricaCargadores,
+    Cargadores,
+    FABRICA_CARGADORES,
+    contexto_graphql,
+    cargadores_de,
+    resolver,
+)
+from .planificacion import (
+    LimiteCoste,
+    coste_consulta,
+    opciones_carga,
+    proyectar,
+)
+from .persistidas import (
+    RegistroConsultas,
+    ConsultaPersistida,
+    ErrorConsultaPersistida,
+)
+from .cache_respuestas import (
+    CacheRespuestas,
+    MemoriaCache,
+    RedisCache,
+    etiquetar,
+)
+
+__all__ = [
+    "RelacionCargable",
+    "FabricaCargadores",
+    "Cargadores",
+    "FABRICA_CARGADORES",
+    "contexto_graphql",
+    "cargadores_de",
+    "resolver",
+    "LimiteCoste",
+    "coste_consulta",
+    "opciones_carga",
+    "proyectar",
+    "RegistroConsultas",
+    "ConsultaPersistida",
+    "ErrorConsultaPersistida",
+    "CacheRespuestas",
+    "MemoriaCache",
+    "RedisCache",
+    "etiquetar",
+]
@@ -0,0 +1,311 @@
+# api/cache_respuestas.py
+"""
+Caché de respuestas de operaciones GraphQL de solo lectura.
+
+El mapa público repite unas pocas consultas (inmueble por id, inmuebles
+de un municipio, figuras de protección) millones de veces. CacheRespuestas
+ejecuta la petición (resuelta con api.persistidas) y, si es una query sin
+errores, guarda la respuesta con clave hash de la operación + nombre +
+variables (+ variacion, p. ej. el idioma o el rol).
+
+ETIQUETAS E INVALIDACIÓN:
+    Mientras se ejecuta la operación, un listener do_orm_execute anota
+    las tablas de cada SELECT (también los de los cargadores y las cargas
+    de relaciones) como etiquetas de la respuesta, junto con la versión de
+    cada etiqueta en ese momento. Los servicios con SQL en text() añaden
+    las suyas con etiquetar("app.inmuebles", ...).
+
+    Cada etiqueta tiene un contador de versión en el backend. Al hacer
+    flush de inserciones, cambios o borrados (ORM o update()/delete()
+    masivos) sobre una tabla se incrementa su versión, y otra vez en el
+    commit, igual que CATALOG_CACHE: una respuesta es válida solo si las
+    versiones de todas sus etiquetas siguen siendo las anotadas. Una
+    lectura que empezó antes del commit queda invalidada al terminar.
+
+BACKENDS:
+    MemoriaCache:  en el proceso, LRU con TTL (por defecto).
+    RedisCache:    compartido entre workers; recibe un cliente compatible
+                   con redis-py (get/set/mget/incr), sin importar redis aquí.
+    Cualquier objeto con la interfaz BackendCache sirve.
+
+USO:
+    CACHE = CacheRespuestas(registro=REGISTRO, backend=RedisCache(redis.Redis(...)), ttl=600)
+    CACHE.listen()
+
+    async def graphql(peticion: dict):
+        async with manager.session(solo_lectura=True) as session:
+            return await CACHE.ejecutar(schema, peticion, contexto_graphql(session))
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Iterable, Iterator, Mapping, Optional, Protocol
+
+from graphql import GraphQLSyntaxError, OperationType
+from sqlalchemy import event
+from sqlalchemy.orm import ORMExecuteState, Session
+from sqlalchemy.sql.util import find_tables
+
+from api.persistidas import ErrorConsultaPersistida, RegistroConsultas
+
+TTL = 300
+MAX_ENTRADAS = 10_000
+
+_INFO_ETIQUETAS = "cache_respuestas_etiquetas"
+
+
+# ----------------------------------------------------------------------
+# Backends
+# ----------------------------------------------------------------------
+
+class BackendCache(Protocol):
+    def get(self, clave: str) -> Optional[dict]: ...
+    def set(self, clave: str, entrada: dict, ttl: int) -> None: ...
+    def versiones(self, etiquetas: Iterable[str]) -> dict[str, int]: ...
+    def incrementar(self, etiquetas: Iterable[str]) -> None: ...
+
+
+class MemoriaCache:
+    """Backend en memoria del proceso: LRU con caducidad por entrada"""
+
+    def __init__(self, max_entradas: int = MAX_ENTRADAS):
+        self.max_entradas = max_entradas
+        self._lock = threading.Lock()
+        self._entradas: OrderedDict[str, tuple[float, dict]] = OrderedDict()
+        self._versiones: dict[str, int] = {}
+
+    def get(self, clave: str) -> Optional[dict]:
+        with self._lock:
+            guardada = self._entradas.get(clave)
+            if guardada is None:
+                return None
+            caduca, entrada = guardada
+            if caduca < time.monotonic():
+                del self._entradas[clave]
+                return None
+            self._entradas.move_to_end(clave)
+            return entrada
+
+    def set(self, clave: str, entrada: dict, ttl: int) -> None:
+        with self._lock:
+            self._entradas[clave] = (time.monotonic() + ttl, entrada)
+            self._entradas.move_to_end(clave)
+            while len(self._entradas) > self.max_entradas:
+                self._entradas.popitem(last=False)
+
+    def versiones(self, etiquetas: Iterable[str]) -> dict[str, int]:
+        return {etiqueta: self._versiones.get(etiqueta, 0) for etiqueta in etiquetas}
+
+    def incrementar(self, etiquetas: Iterable[str]) -> None:
+        with self._lock:
+            for etiqueta in etiquetas:
+                self._versiones[etiqueta] = self._versiones.get(etiqueta, 0) + 1
+
+    def vaciar(self) -> None:
+        with self._lock:
+            self._entradas.clear()
+
+
+class RedisCache:
+    """Backend compartido sobre un cliente redis-py (o compatible)"""
+
+    def __init__(self, cliente: Any, prefijo: str = "sipi:graphql:"):
+        self.cliente = cliente
+        self.prefijo = prefijo
+
+    def get(self, clave: str) -> Optional[dict]:
+        valor = self.cliente.get(f"{self.prefijo}r:{clave}")
+        return None if valor is None else json.loads(valor)
+
+    def set(self, clave: str, entrada: dict, ttl: int) -> None:
+        self.cliente.set(f"{self.prefijo}r:{clave}", json.dumps(entrada, default=str), ex=ttl)
+
+    def versiones(self, etiquetas: Iterable[str]) -> dict[str, int]:
+        etiquetas = list(etiquetas)
+        if not etiquetas:
+            return {}
+        valores = self.cliente.mget([f"{self.prefijo}v:{e}" for e in etiquetas])
+        return {e: int(v or 0) for e, v in zip(etiquetas, valores)}
+
+    def incrementar(self, etiquetas: Iterable[str]) -> None:
+        for etiqueta in etiquetas:
+            self.cliente.incr(f"{self.prefijo}v:{etiqueta}")
+
+
+# ----------------------------------------------------------------------
+# Etiquetas de la operación en curso
+# ----------------------------------------------------------------------
+
+@dataclass(slots=True)
+class _Recolector:
+    backend: BackendCache
+    versiones: dict[str, int] = field(default_factory=dict)
+
+    def anotar(self, etiquetas: Iterable[str]) -> None:
+        nuevas = [e for e in etiquetas if e not in self.versiones]
+        if nuevas:
+            self.versiones.update(self.backend.versiones(nuevas))
+
+
+_RECOLECTOR: ContextVar[Optional[_Recolector]] = ContextVar("cache_respuestas", default=None)
+
+
+def etiquetar(*etiquetas: str) -> None:
+    """Añade etiquetas (tablas con schema) a la respuesta en curso, si se está cacheando"""
+    recolector = _RECOLECTOR.get()
+    if recolector is not None:
+        recolector.anotar(etiquetas)
+
+
+def _tablas(estado: ORMExecuteState) -> set[str]:
+    tablas = {tabla.fullname for mapper in estado.all_mappers for tabla in mapper.tables}
+    tablas.update(t.fullname for t in find_tables(estado.statement) if hasattr(t, "fullname"))
+    return tablas
+
+
+def _tablas_objeto(objeto: Any) -> list[str]:
+    mapper = getattr(type(objeto), "__mapper__", None)
+    return [] if mapper is None else [tabla.fullname for tabla in mapper.tables]
+
+
+# ----------------------------------------------------------------------
+# Caché
+# ----------------------------------------------------------------------
+
+class CacheRespuestas:
+    """Ejecuta peticiones GraphQL con consultas persistidas y caché de respuestas"""
+
+    def __init__(
+        self,
+        registro: Optional[RegistroConsultas] = None,
+        backend: Optional[BackendCache] = None,
+        ttl: int = TTL,
+    ):
+        self.registro = registro if registro is not None else RegistroConsultas()
+        self.backend = backend if backend is not None else MemoriaCache()
+        self.ttl = ttl
+        self.aciertos = 0
+        self.fallos = 0
+
+    # ------------------------------------------------------------------
+    # Invalidación
+    # ------------------------------------------------------------------
+
+    def invalidar(self, *etiquetas: str) -> None:
+        """Invalida las respuestas que leyeron alguna de las tablas"""
+        self.backend.incrementar(etiquetas)
+
+    def _anotar_escritura(self, session: Session, tablas: Iterable[str]) -> None:
+        tablas = set(tablas)
+        if tablas:
+            session.info.setdefault(_INFO_ETIQUETAS, set()).update(tablas)
+            self.invalidar(*tablas)
+
+    def _do_orm_execute(self, estado: ORMExecuteState) -> None:
+        if estado.is_select:
+            recolector = _RECOLECTOR.get()
+            if recolector is not None:
+                recolector.anotar(_tablas(estado))
+        elif estado.is_insert or estado.is_update or estado.is_delete:
+            self._anotar_escritura(estado.session, _tablas(estado))
+
+    def _after_flush(self, session: Session, flush_context) -> None:
+        objetos = (*session.new, *session.dirty, *session.deleted)
+        self._anotar_escritura(session, (t for objeto in objetos for t in _tablas_objeto(objeto)))
+
+    def _after_commit(self, session: Session) -> None:
+        etiquetas = session.info.pop(_INFO_ETIQUETAS, None)
+        if etiquetas:
+            self.invalidar(*etiquetas)
+
+    def _after_rollback(self, session: Session) -> None:
+        session.info.pop(_INFO_ETIQUETAS, None)
+
+    def listen(self, session_cls: type = Session) -> None:
+        """Engancha los listeners de etiquetas e invalidación a una clase de Session"""
+        event.listen(session_cls, "do_orm_execute", self._do_orm_execute)
+        event.listen(session_cls, "after_flush", self._after_flush)
+        event.listen(session_cls, "after_commit", self._after_commit)
+        event.listen(session_cls, "after_rollback", self._after_rollback)
+
+    # ------------------------------------------------------------------
+    # Ejecución
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def clave(hash: str, operacion: Optional[str], variables: Optional[Mapping], variacion: str = "") -> str:
+        variables_json = json.dumps(variables or {}, sort_keys=True, separators=(",", ":"), default=str)
+        return hashlib.sha256(f"{hash}\0{operacion or ''}\0{variables_json}\0{variacion}".encode()).hexdigest()
+
+    def _vigente(self, entrada: Optional[dict]) -> bool:
+        if entrada is None:
+            return False
+        versiones = entrada["versiones"]
+        return self.backend.versiones(versiones) == versiones
+
+    @contextmanager
+    def _recoger(self) -> Iterator[_Recolector]:
+        recolector = _Recolector(self.backend)
+        token = _RECOLECTOR.set(recolector)
+        try:
+            yield recolector
+        finally:
+            _RECOLECTOR.reset(token)
+
+    async def ejecutar(
+        self,
+        schema: Any,
+        peticion: Mapping[str, Any],
+        context_value: Any = None,
+        root_value: Any = None,
+        ttl: Optional[int] = None,
+        variacion: str = "",
+    ) -> dict[str, Any]:
+        """
+        Ejecuta la petición (query/id/extensions.persistedQuery, variables,
+        operationName) y devuelve el cuerpo de la respuesta GraphQL.
+        """
+        try:
+            consulta = self.registro.resolver(peticion)
+        except ErrorConsultaPersistida as error:
+            return error.respuesta()
+        except GraphQLSyntaxError as error:
+            # Documento mal formado: sin data, como los errores de validación
+            return {"errors": [error.formatted]}
+        variables = peticion.get("variables")
+        operacion = peticion.get("operationName")
+
+        if consulta.operacion(operacion) is not OperationType.QUERY:
+            resultado = await schema.execute(consulta.documento, variables, context_value, root_value, operacion)
+            return _cuerpo(resultado)
+
+        clave = self.clave(consulta.hash, operacion, variables, variacion)
+        entrada = self.backend.get(clave)
+        if self._vigente(entrada):
+            self.aciertos += 1
+            return entrada["respuesta"]
+        self.fallos += 1
+
+        with self._recoger() as recolector:
+            resultado = await schema.execute(consulta.documento, variables, context_value, root_value, operacion)
+        respuesta = _cuerpo(resultado)
+        if not resultado.errors:
+            self.backend.set(clave, {"respuesta": respuesta, "versiones": recolector.versiones}, ttl or self.ttl)
+        return respuesta
+
+
+def _cuerpo(resultado: Any) -> dict[str, Any]:
+    cuerpo: dict[str, Any] = {"data": resultado.data}
+    if resultado.errors:
+        cuerpo["errors"] = [error.formatted for error in resultado.errors]
+    if getattr(resultado, "extensions", None):
+        cuerpo["extensions"] = resultado.extensions
+    return cuerpo
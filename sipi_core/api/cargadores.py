@@ -0,0 +1,248 @@
+# api/cargadores.py
+"""
+DataLoaders de strawberry generados desde los mappers de SQLAlchemy.
+
+Resolver cada relación con su carga perezosa cuesta una consulta por
+objeto: una página de 100 inmuebles con municipio, diócesis, documentos,
+transmisiones... son cientos de consultas (y con AsyncSession, un
+MissingGreenlet). Los cargadores agrupan en una consulta con IN las
+claves pedidas en el mismo tick del event loop:
+
+    - muchos a uno (Inmueble.municipio):   WHERE municipios.id IN (...)
+    - uno a muchos (Inmueble.documentos):  WHERE inmuebles_documentos.inmueble_id IN (...),
+                                           agrupado por la FK
+    - uno a uno (Inmueble.osm_ext, titular_actual): como uno a muchos, primer resultado
+
+de modo que la misma página cuesta 1 consulta más una por campo anidado.
+
+La fábrica recorre las relaciones de todos los modelos de models.__all__
+y genera un descriptor por relación con join simple (una pareja de
+columnas, más condiciones opcionales sobre la tabla destino, como
+fecha_fin IS NULL en titular_actual). Las muchos a muchos (secondary) y
+los joins compuestos se quedan con la carga normal. El filtro de borrado
+lógico de db.borrado_logico se aplica a las consultas de los cargadores
+como a cualquier otra.
+
+Los cargadores son por petición (caché de DataLoader = identity map de la
+petición): se crean en el context_getter de strawberry.
+
+USO:
+    async def contexto():
+        async with manager.session(solo_lectura=True) as session:
+            yield contexto_graphql(session)
+
+    @strawberry.type
+    class InmuebleGQL:
+        municipio: Optional[MunicipioGQL] = strawberry.field(resolver=resolver(Inmueble, "municipio"))
+        documentos: list[InmuebleDocumentoGQL] = strawberry.field(resolver=resolver(Inmueble, "documentos"))
+
+    # O a mano
+    municipio = await cargadores_de(info).cargar(inmueble, "municipio")
+"""
+
+from __future__ import annotations
+
+import operator
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Any, Hashable, Iterable, Optional, Sequence
+
+from sqlalchemy import inspect, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import RelationshipProperty, configure_mappers
+from sqlalchemy.orm.exc import UnmappedColumnError
+from sqlalchemy.orm.interfaces import MANYTOONE, ONETOMANY
+from sqlalchemy.sql.elements import BinaryExpression, BooleanClauseList
+from sqlalchemy.sql.util import find_tables
+from strawberry.dataloader import DataLoader
+
+MUCHOS_A_UNO = "muchos_a_uno"
+UNO_A_MUCHOS = "uno_a_muchos"
+UNO_A_UNO = "uno_a_uno"
+
+# Claves por consulta (tamaño del IN)
+MAX_LOTE = 500
+
+# Clave en el contexto de strawberry
+CARGADORES = "cargadores"
+
+
+@dataclass(frozen=True, slots=True)
+class RelacionCargable:
+    """Relación que se puede cargar por lotes"""
+    clase: type
+    nombre: str
+    tipo: str
+    destino: type
+    local: str                  # atributo de clase con la clave (FK o PK)
+    remoto: str                 # atributo de destino con el que se compara
+    condiciones: tuple = ()     # criterios extra del primaryjoin sobre destino
+    orden: tuple = ()
+
+    @property
+    def ruta(self) -> str:
+        return f"{self.clase.__name__}.{self.nombre}"
+
+    def clave(self, objeto: Any) -> Optional[Hashable]:
+        return getattr(objeto, self.local)
+
+    def consulta(self, claves: Sequence[Hashable]):
+        stmt = select(self.destino).where(getattr(self.destino, self.remoto).in_(claves), *self.condiciones)
+        if self.orden:
+            stmt = stmt.order_by(*self.orden)
+        return stmt
+
+    def agrupar(self, claves: Sequence[Hashable], filas: Sequence[Any]) -> list:
+        """Resultado del lote en el orden de claves"""
+        grupos: dict[Hashable, list] = defaultdict(list)
+        for fila in filas:
+            grupos[getattr(fila, self.remoto)].append(fila)
+        if self.tipo == UNO_A_MUCHOS:
+            return [grupos.get(clave, []) for clave in claves]
+        return [grupos[clave][0] if clave in grupos else None for clave in claves]
+
+
+def _join_simple(prop: RelationshipProperty) -> Optional[tuple[Any, Any, tuple]]:
+    """(columna local, columna remota, condiciones extra) o None si no es un join simple"""
+    if prop.secondary is not None or len(prop.local_remote_pairs) != 1:
+        return None
+    local, remoto = prop.local_remote_pairs[0]
+    clausulas = prop.primaryjoin.clauses if isinstance(prop.primaryjoin, BooleanClauseList) else (prop.primaryjoin,)
+    igualdad, extra = None, []
+    for clausula in clausulas:
+        if (
+            isinstance(clausula, BinaryExpression)
+            and clausula.operator is operator.eq
+            and {clausula.left, clausula.right} == {local, remoto}
+        ):
+            igualdad = clausula
+        elif set(find_tables(clausula)) <= {prop.target}:
+            extra.append(clausula)
+        else:
+            return None
+    if igualdad is None:
+        return None
+    return local, remoto, tuple(extra)
+
+
+def relacion_cargable(prop: RelationshipProperty) -> Optional[RelacionCargable]:
+    """Descriptor de la relación, o None si no se puede cargar por lotes"""
+    if prop.direction not in (MANYTOONE, ONETOMANY):
+        return None
+    join = _join_simple(prop)
+    if join is None:
+        return None
+    local, remoto, condiciones = join
+    try:
+        atributo_local = prop.parent.get_property_by_column(local).key
+        atributo_remoto = prop.mapper.get_property_by_column(remoto).key
+    except UnmappedColumnError:
+        return None
+    if prop.direction is MANYTOONE:
+        tipo = MUCHOS_A_UNO
+    else:
+        tipo = UNO_A_MUCHOS if prop.uselist else UNO_A_UNO
+    return RelacionCargable(
+        clase=prop.parent.class_,
+        nombre=prop.key,
+        tipo=tipo,
+        destino=prop.mapper.class_,
+        local=atributo_local,
+        remoto=atributo_remoto,
+        condiciones=condiciones,
+        orden=tuple(prop.order_by or ()),
+    )
+
+
+class FabricaCargadores:
+    """Descriptores de las relaciones de los modelos; crea los cargadores de cada petición"""
+
+    def __init__(self, clases: Optional[Iterable[type]] = None):
+        self._clases = None if clases is None else tuple(clases)
+        self._relaciones: Optional[dict[tuple[type, str], RelacionCargable]] = None
+
+    def _modelos(self) -> tuple[type, ...]:
+        if self._clases is not None:
+            return self._clases
+        import models
+        candidatos = (getattr(models, nombre) for nombre in models.__all__)
+        return tuple(c for c in candidatos if isinstance(c, type) and inspect(c, raiseerr=False) is not None)
+
+    def relaciones(self) -> dict[tuple[type, str], RelacionCargable]:
+        """(clase, relación) -> descriptor, de todas las relaciones cargables"""
+        if self._relaciones is None:
+            configure_mappers()
+            relaciones = {}
+            for clase in self._modelos():
+                for prop in inspect(clase).relationships:
+                    relacion = relacion_cargable(prop)
+                    if relacion is not None:
+                        relaciones[(clase, prop.key)] = relacion
+            self._relaciones = relaciones
+        return self._relaciones
+
+    def relacion(self, clase: type, nombre: str) -> RelacionCargable:
+        relaciones = self.relaciones()
+        for base in clase.__mro__:
+            relacion = relaciones.get((base, nombre))
+            if relacion is not None:
+                return relacion
+        raise KeyError(f"{clase.__name__}.{nombre} no es una relación cargable por lotes")
+
+    def para_peticion(self, session: AsyncSession, max_lote: int = MAX_LOTE) -> "Cargadores":
+        return Cargadores(self, session, max_lote)
+
+
+class Cargadores:
+    """DataLoaders de una petición, creados al primer uso de cada relación"""
+
+    def __init__(self, fabrica: FabricaCargadores, session: AsyncSession, max_lote: int = MAX_LOTE):
+        self.fabrica = fabrica
+        self.session = session
+        self.max_lote = max_lote
+        self._loaders: dict[str, DataLoader] = {}
+
+    def loader(self, clase: type, nombre: str) -> DataLoader:
+        relacion = self.fabrica.relacion(clase, nombre)
+        loader = self._loaders.get(relacion.ruta)
+        if loader is None:
+            loader = self._loaders[relacion.ruta] = DataLoader(self._lote(relacion), max_batch_size=self.max_lote)
+        return loader
+
+    def _lote(self, relacion: RelacionCargable):
+        async def cargar(claves: list[Hashable]) -> list:
+            filas = (await self.session.scalars(relacion.consulta(claves))).all()
+            return relacion.agrupar(claves, filas)
+        return cargar
+
+    async def cargar(self, objeto: Any, nombre: str) -> Any:
+        """Valor de objeto.<nombre> cargado por lotes"""
+        relacion = self.fabrica.relacion(type(objeto), nombre)
+        clave = relacion.clave(objeto)
+        if clave is None:
+            return [] if relacion.tipo == UNO_A_MUCHOS else None
+        return await self.loader(relacion.clase, nombre).load(clave)
+
+
+FABRICA_CARGADORES = FabricaCargadores()
+
+
+def contexto_graphql(session: AsyncSession, **extra: Any) -> dict[str, Any]:
+    """Contexto de strawberry de una petición, con sus cargadores"""
+    return {"session": session, CARGADORES: FABRICA_CARGADORES.para_peticion(session), **extra}
+
+
+def cargadores_de(info: Any) -> Cargadores:
+    return info.context[CARGADORES]
+
+
+def resolver(clase: type, nombre: str):
+    """
+    Resolver de strawberry para el campo de la relación clase.<nombre>.
+    Sin anotación de retorno: strawberry toma el tipo del campo.
+    """
+    async def resolver_relacion(root, info):
+        return await cargadores_de(info).cargar(root, nombre)
+
+    resolver_relacion.__name__ = f"resolver_{clase.__name__}_{nombre}"
+    return resolver_relacion
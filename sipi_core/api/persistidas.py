@@ -0,0 +1,151 @@
+# api/persistidas.py
+"""
+Consultas persistidas: registro hash → documento GraphQL.
+
+El cliente envía el sha256 del documento en lugar del documento entero
+(protocolo APQ de Apollo: extensions.persistedQuery.sha256Hash, o "id").
+Para el mapa público el registro se carga de un directorio de ficheros
+.graphql y con solo_registradas=True no se acepta ninguna otra consulta.
+Sin solo_registradas funciona como APQ automático: el primer envío con
+documento y hash lo registra y los siguientes pueden mandar solo el hash.
+Los documentos registrados por APQ van a un LRU de max_apq entradas (el
+endpoint es público: el registro no puede crecer sin límite); los que
+llegan sin hash se parsean en cada petición y no se guardan.
+
+    REGISTRO = RegistroConsultas(solo_registradas=True)
+    REGISTRO.cargar_directorio("consultas/")
+    hash, documento, operacion = REGISTRO.resolver(cuerpo_peticion)
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Mapping, Optional
+
+from graphql import DocumentNode, OperationType, get_operation_ast, parse
+
+# Documentos registrados por APQ que se conservan como máximo
+MAX_APQ = 2000
+
+# Códigos de error (extensions.code); los dos primeros son los de APQ
+NO_ENCONTRADA = "PERSISTED_QUERY_NOT_FOUND"
+HASH_INCORRECTO = "PERSISTED_QUERY_HASH_MISMATCH"
+NO_PERMITIDA = "PERSISTED_QUERY_NOT_ALLOWED"
+
+
+class ErrorConsultaPersistida(Exception):
+    def __init__(self, codigo: str, mensaje: str):
+        super().__init__(mensaje)
+        self.codigo = codigo
+
+    def respuesta(self) -> dict[str, Any]:
+        """Cuerpo de respuesta GraphQL con el error"""
+        return {"errors": [{"message": str(self), "extensions": {"code": self.codigo}}]}
+
+
+@dataclass(frozen=True, slots=True)
+class ConsultaPersistida:
+    hash: str
+    documento: str
+    arbol: DocumentNode
+
+    def operacion(self, nombre: Optional[str] = None) -> Optional[OperationType]:
+        """Tipo de la operación (query, mutation...) o None si no existe"""
+        operacion = get_operation_ast(self.arbol, nombre)
+        return None if operacion is None else operacion.operation
+
+
+def hash_documento(documento: str) -> str:
+    return hashlib.sha256(documento.encode("utf-8")).hexdigest()
+
+
+class RegistroConsultas:
+    """
+    Registro de documentos por hash, con el árbol ya parseado. Los
+    registrados con registrar()/cargar_directorio() son permanentes; los
+    de APQ automático, un LRU de max_apq entradas.
+    """
+
+    def __init__(self, solo_registradas: bool = False, max_apq: int = MAX_APQ):
+        self.solo_registradas = solo_registradas
+        self.max_apq = max_apq
+        self._lock = threading.Lock()
+        self._consultas: dict[str, ConsultaPersistida] = {}
+        self._apq: OrderedDict[str, ConsultaPersistida] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._consultas) + len(self._apq)
+
+    def __contains__(self, hash: str) -> bool:
+        return hash in self._consultas or hash in self._apq
+
+    def registrar(self, documento: str) -> ConsultaPersistida:
+        """Registra el documento de forma permanente"""
+        hash = hash_documento(documento)
+        consulta = self._consultas.get(hash)
+        if consulta is None:
+            consulta = ConsultaPersistida(hash, documento, parse(documento))
+            with self._lock:
+                self._consultas[hash] = consulta
+                self._apq.pop(hash, None)
+        return consulta
+
+    def _registrar_apq(self, hash: str, documento: str) -> ConsultaPersistida:
+        consulta = self.obtener(hash)
+        if consulta is None:
+            consulta = ConsultaPersistida(hash, documento, parse(documento))
+            with self._lock:
+                self._apq[hash] = consulta
+                while len(self._apq) > self.max_apq:
+                    self._apq.popitem(last=False)
+        return consulta
+
+    def cargar_directorio(self, ruta: str, extension: str = ".graphql") -> list[ConsultaPersistida]:
+        """Registra cada fichero del directorio (un documento por fichero)"""
+        consultas = []
+        for nombre in sorted(os.listdir(ruta)):
+            if nombre.endswith(extension):
+                with open(os.path.join(ruta, nombre), encoding="utf-8") as fichero:
+                    consultas.append(self.registrar(fichero.read()))
+        return consultas
+
+    def obtener(self, hash: str) -> Optional[ConsultaPersistida]:
+        consulta = self._consultas.get(hash)
+        if consulta is None:
+            with self._lock:
+                consulta = self._apq.get(hash)
+                if consulta is not None:
+                    self._apq.move_to_end(hash)
+        return consulta
+
+    def resolver(self, peticion: Mapping[str, Any]) -> ConsultaPersistida:
+        """
+        Consulta de una petición GraphQL (query, id o hash APQ).
+        Lanza ErrorConsultaPersistida si no se puede resolver y
+        GraphQLSyntaxError si el documento no es válido.
+        """
+        persistida = (peticion.get("extensions") or {}).get("persistedQuery") or {}
+        hash = persistida.get("sha256Hash") or peticion.get("id")
+        documento = peticion.get("query")
+
+        if documento is None:
+            consulta = self.obtener(hash) if hash else None
+            if consulta is None:
+                raise ErrorConsultaPersistida(NO_ENCONTRADA, "PersistedQueryNotFound")
+            return consulta
+
+        if hash and hash != hash_documento(documento):
+            raise ErrorConsultaPersistida(HASH_INCORRECTO, "provided sha does not match query")
+        if self.solo_registradas:
+            consulta = self.obtener(hash or hash_documento(documento))
+            if consulta is None:
+                raise ErrorConsultaPersistida(NO_PERMITIDA, "Solo se aceptan consultas persistidas")
+            return consulta
+        if hash:
+            return self._registrar_apq(hash, documento)
+        # Sin hash: consulta de un solo uso, no se registra
+        return ConsultaPersistida(hash_documento(documento), documento, parse(documento))
@@ -0,0 +1,252 @@
+# api/planificacion.py
+"""
+Planificación de consultas GraphQL: coste y proyección a SQL.
+
+COSTE
+    LimiteCoste es una extensión de strawberry que, antes de ejecutar,
+    estima el coste de la operación a partir de su selección y la
+    rechaza si supera el presupuesto. Así se acota el abanico de
+    consultas anidadas como inmuebles → transmisiones → notaria → titulares.
+
+        coste(campo escalar)  = 0
+        coste(campo objeto)   = base + coste(subselección)
+        coste(campo lista)    = base + n * coste(subselección)
+
+    base es 1 (una consulta por lote con los cargadores de api.cargadores).
+    n es el argumento de paginación del campo (first, limit, limite; literal
+    o variable) o, sin él, multiplicador_lista. Se puede ajustar por campo
+    con strawberry.field(metadata={"coste": 5, "multiplicador": 100}) o
+    con costes={"Inmueble.transmisiones": 5}.
+
+        schema = strawberry.Schema(Query, extensions=[LimiteCoste(presupuesto=5000)])
+
+PROYECCIÓN
+    opciones_carga() traduce la selección del campo actual en opciones
+    de carga de SQLAlchemy: load_only con las columnas pedidas (más las
+    claves de las relaciones pedidas) y selectinload, con su propia
+    proyección, para cada relación. Las columnas no pedidas (descripcion,
+    geometrías...) no salen de la base de datos.
+
+        @strawberry.field
+        async def inmuebles(self, info: strawberry.Info, limite: int = 50) -> list[InmuebleGQL]:
+            stmt = proyectar(select(Inmueble).limit(limite), info, Inmueble)
+            return (await info.context["session"].scalars(stmt)).all()
+
+    Con selectin=False las relaciones se dejan a los cargadores (solo se
+    añaden sus claves a load_only). Los nombres GraphQL se convierten a
+    snake_case; los campos sin columna ni relación (calculados) se ignoran,
+    y sus columnas se declaran con siempre=("nombre", ...).
+"""
+
+from __future__ import annotations
+
+from typing import Any, Callable, Iterable, Mapping, Optional
+
+from graphql import (
+    DocumentNode,
+    FieldNode,
+    FragmentDefinitionNode,
+    FragmentSpreadNode,
+    GraphQLError,
+    GraphQLSchema,
+    InlineFragmentNode,
+    IntValueNode,
+    OperationDefinitionNode,
+    SelectionSetNode,
+    VariableNode,
+    get_named_type,
+    get_nullable_type,
+    is_list_type,
+)
+from graphql.utilities import get_operation_ast
+from sqlalchemy import inspect
+from sqlalchemy.orm import load_only, selectinload
+from strawberry.extensions import SchemaExtension
+from strawberry.types.nodes import FragmentSpread, InlineFragment, SelectedField
+
+from mixins.titularidad import camel_to_snake
+
+PRESUPUESTO = 5000
+MULTIPLICADOR_LISTA = 20
+
+# Argumentos que limitan el tamaño de una lista
+ARGUMENTOS_PAGINACION = ("first", "last", "limit", "limite")
+
+_DEFINICION_STRAWBERRY = "strawberry-definition"
+
+
+# ----------------------------------------------------------------------
+# Coste
+# ----------------------------------------------------------------------
+
+class _Calculo:
+    def __init__(
+        self,
+        schema: GraphQLSchema,
+        fragmentos: Mapping[str, FragmentDefinitionNode],
+        variables: Mapping[str, Any],
+        multiplicador_lista: int,
+        costes: Mapping[str, int],
+    ):
+        self.schema = schema
+        self.fragmentos = fragmentos
+        self.variables = variables
+        self.multiplicador_lista = multiplicador_lista
+        self.costes = costes
+
+    def _valor(self, nodo) -> Optional[int]:
+        if isinstance(nodo, IntValueNode):
+            return int(nodo.value)
+        if isinstance(nodo, VariableNode):
+            valor = self.variables.get(nodo.name.value)
+            return valor if isinstance(valor, int) else None
+        return None
+
+    def _multiplicador(self, nodo: FieldNode, metadata: Mapping) -> int:
+        for argumento in nodo.arguments:
+            if argumento.name.value in ARGUMENTOS_PAGINACION:
+                valor = self._valor(argumento.value)
+                if valor is not None:
+                    return max(valor, 0)
+        return metadata.get("multiplicador", self.multiplicador_lista)
+
+    def seleccion(self, tipo, seleccion: SelectionSetNode) -> int:
+        total = 0
+        for nodo in seleccion.selections:
+            if isinstance(nodo, FieldNode):
+                total += self.campo(tipo, nodo)
+            elif isinstance(nodo, FragmentSpreadNode):
+                fragmento = self.fragmentos[nodo.name.value]
+                total += self.seleccion(self.schema.get_type(fragmento.type_condition.name.value), fragmento.selection_set)
+            elif isinstance(nodo, InlineFragmentNode):
+                subtipo = self.schema.get_type(nodo.type_condition.name.value) if nodo.type_condition else tipo
+                total += self.seleccion(subtipo, nodo.selection_set)
+        return total
+
+    def campo(self, tipo, nodo: FieldNode) -> int:
+        nombre = nodo.name.value
+        definicion = getattr(tipo, "fields", {}).get(nombre)
+        if definicion is None or nodo.selection_set is None:
+            return 0
+        strawberry_field = definicion.extensions.get(_DEFINICION_STRAWBERRY)
+        metadata = getattr(strawberry_field, "metadata", None) or {}
+        base = metadata.get("coste", self.costes.get(f"{tipo.name}.{nombre}", 1))
+        hijos = self.seleccion(get_named_type(definicion.type), nodo.selection_set)
+        if is_list_type(get_nullable_type(definicion.type)):
+            return base + self._multiplicador(nodo, metadata) * hijos
+        return base + hijos
+
+
+def coste_consulta(
+    schema: GraphQLSchema,
+    documento: DocumentNode,
+    variables: Optional[Mapping[str, Any]] = None,
+    nombre_operacion: Optional[str] = None,
+    multiplicador_lista: int = MULTIPLICADOR_LISTA,
+    costes: Optional[Mapping[str, int]] = None,
+) -> int:
+    """Coste estimado de la operación (0 si no se encuentra)"""
+    operacion: Optional[OperationDefinitionNode] = get_operation_ast(documento, nombre_operacion)
+    if operacion is None:
+        return 0
+    fragmentos = {
+        definicion.name.value: definicion
+        for definicion in documento.definitions
+        if isinstance(definicion, FragmentDefinitionNode)
+    }
+    calculo = _Calculo(schema, fragmentos, variables or {}, multiplicador_lista, costes or {})
+    return calculo.seleccion(schema.get_root_type(operacion.operation), operacion.selection_set)
+
+
+class LimiteCoste(SchemaExtension):
+    """Rechaza las operaciones con coste estimado por encima del presupuesto"""
+
+    def __init__(
+        self,
+        presupuesto: int = PRESUPUESTO,
+        multiplicador_lista: int = MULTIPLICADOR_LISTA,
+        costes: Optional[Mapping[str, int]] = None,
+        callback: Optional[Callable[[int, Any], None]] = None,
+    ):
+        self.presupuesto = presupuesto
+        self.multiplicador_lista = multiplicador_lista
+        self.costes = costes or {}
+        self.callback = callback
+
+    def on_execute(self):
+        contexto = self.execution_context
+        coste = coste_consulta(
+            contexto.schema._schema,
+            contexto.graphql_document,
+            contexto.variables,
+            contexto.operation_name,
+            self.multiplicador_lista,
+            self.costes,
+        )
+        if self.callback is not None:
+            self.callback(coste, contexto)
+        if coste > self.presupuesto:
+            raise GraphQLError(
+                f"Consulta demasiado costosa: coste estimado {coste}, presupuesto {self.presupuesto}",
+                extensions={"code": "COSTE_EXCEDIDO", "coste": coste, "presupuesto": self.presupuesto},
+            )
+        yield
+
+
+# ----------------------------------------------------------------------
+# Proyección
+# ----------------------------------------------------------------------
+
+def _campos(selecciones: Iterable) -> Iterable[SelectedField]:
+    """Campos de la selección, con los fragmentos aplanados"""
+    for seleccion in selecciones:
+        if isinstance(seleccion, SelectedField):
+            yield seleccion
+        elif isinstance(seleccion, (FragmentSpread, InlineFragment)):
+            yield from _campos(seleccion.selections)
+
+
+def _opciones(modelo: type, selecciones: Iterable, selectin: bool, siempre: Iterable[str]) -> tuple[list, list]:
+    """(atributos para load_only, opciones de relaciones)"""
+    mapper = inspect(modelo)
+    columnas = {nombre for nombre in siempre if nombre in mapper.column_attrs}
+    relaciones = []
+    for campo in _campos(selecciones):
+        nombre = camel_to_snake(campo.name)
+        if nombre in mapper.column_attrs:
+            columnas.add(nombre)
+            continue
+        relacion = mapper.relationships.get(nombre)
+        if relacion is None:
+            continue
+        # Claves locales: selectinload y los cargadores las necesitan
+        columnas.update(mapper.get_property_by_column(c).key for c in relacion.local_columns)
+        if not selectin:
+            continue
+        destino = relacion.mapper
+        remotas = [] if relacion.secondary is not None else [
+            destino.get_property_by_column(c).key for c in relacion.remote_side
+        ]
+        hijas, subrelaciones = _opciones(destino.class_, campo.selections, selectin, remotas)
+        opcion = selectinload(getattr(modelo, nombre))
+        relaciones.append(opcion.options(load_only(*(getattr(destino.class_, c) for c in hijas)), *subrelaciones))
+    if not columnas:
+        columnas = {mapper.get_property_by_column(c).key for c in mapper.primary_key}
+    return sorted(columnas), relaciones
+
+
+def opciones_carga(
+    info: Any,
+    modelo: type,
+    selectin: bool = True,
+    siempre: Iterable[str] = (),
+) -> list:
+    """Opciones de carga para la selección del campo actual sobre modelo"""
+    selecciones = [s for campo in info.selected_fields for s in campo.selections]
+    columnas, relaciones = _opciones(modelo, selecciones, selectin, siempre)
+    return [load_only(*(getattr(modelo, c) for c in columnas)), *relaciones]
+
+
+def proyectar(stmt, info: Any, modelo: type, selectin: bool = True, siempre: Iterable[str] = ()):
+    """stmt con las opciones de opciones_carga()"""
+    return stmt.options(*opciones_carga(info, modelo, selectin, siempre))
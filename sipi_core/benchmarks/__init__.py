@@ -0,0 +1,7 @@
+# benchmarks/__init__.py
+"""
+Mediciones de rendimiento contra una base de datos real.
+
+Se ejecutan como módulos desde sipi_core, p. ej.:
+    python -m benchmarks.exportacion --sembrar 1000000 --formato geoparquet
+"""
@@ -0,0 +1,113 @@
+# benchmarks/busqueda.py
+"""
+Benchmark de services.busqueda: latencia p50/p95/p99 de buscar().
+
+Con --sembrar N inserta N inmuebles sintéticos (nombres tipo "Ermita de
+San Roque 123", descripción corta y una denominación alternativa en uno
+de cada tres) dentro de la misma transacción; los triggers calculan el
+tsvector como en producción. Tras un ANALYZE ejecuta las búsquedas de
+CONSULTAS --repeticiones veces y hace rollback al final.
+
+USO (desde sipi_core, con DATABASE_URL definido):
+    python -m benchmarks.busqueda --sembrar 500000
+    python -m benchmarks.busqueda --repeticiones 50 --limite 50
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import time
+
+from sqlalchemy import text
+
+from db.sessions import SyncDatabaseManager
+from services.busqueda import buscar
+
+# Texto completo, trigramas con erratas, frases y exclusiones
+CONSULTAS = (
+    "ermita san roque",
+    "catedral",
+    "convento santo domingo",
+    "monasterio santa maría",
+    "iglesia barroca",
+    "basilica magdalena",
+    "catedarl sebastian",
+    "ermita san roke",
+    '"santa ana"',
+    "colegiata -gótico",
+    "parroquia asuncion",
+    "santuario",
+)
+
+_SQL_SEMBRAR = text("""
+    INSERT INTO app.inmuebles (id, nombre, descripcion, es_visitable, en_venta, activo, created_at)
+    SELECT app.uuid_generate_v7(),
+           (ARRAY['Iglesia', 'Ermita', 'Catedral', 'Convento', 'Monasterio', 'Capilla',
+                  'Santuario', 'Colegiata', 'Basílica', 'Parroquia'])[1 + g % 10]
+             || ' de '
+             || (ARRAY['San Roque', 'Santa María', 'San Juan Bautista', 'Nuestra Señora de la Asunción',
+                       'San Miguel', 'Santiago Apóstol', 'San Pedro', 'Santa Ana', 'San Sebastián',
+                       'La Magdalena', 'San Francisco', 'Santo Domingo'])[1 + (g / 10) % 12]
+             || ' ' || g,
+           'Templo ' || (ARRAY['románico', 'gótico', 'mudéjar', 'barroco', 'neoclásico', 'renacentista'])[1 + g % 6]
+             || ' de una nave con retablo mayor y torre campanario',
+           false, false, true, now()
+    FROM generate_series(1, CAST(:n AS integer)) AS g
+""")
+
+_SQL_DENOMINACIONES = text("""
+    INSERT INTO app.inmuebles_denominaciones (id, inmueble_id, denominacion, es_principal, created_at)
+    SELECT app.uuid_generate_v7(), i.id, 'Antiguo ' || i.nombre, false, now()
+    FROM app.inmuebles i
+    WHERE i.created_at = now() AND random() < 1.0 / 3  -- solo los sembrados en esta transacción
+""")
+
+
+def _percentil(latencias: list[float], p: int) -> float:
+    return statistics.quantiles(latencias, n=100, method="inclusive")[p - 1]
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark del buscador de inmuebles")
+    parser.add_argument("--sembrar", type=int, default=0, help="inmuebles sintéticos a insertar (se deshace al final)")
+    parser.add_argument("--repeticiones", type=int, default=20)
+    parser.add_argument("--limite", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    manager = SyncDatabaseManager()
+    try:
+        with manager.session() as session:
+            if args.sembrar:
+                inicio = time.perf_counter()
+                session.execute(_SQL_SEMBRAR, {"n": args.sembrar})
+                session.execute(_SQL_DENOMINACIONES)
+                session.execute(text("ANALYZE app.inmuebles"))
+                session.execute(text("ANALYZE app.inmuebles_denominaciones"))
+                print(f"sembrado:  {args.sembrar:,} inmuebles en {time.perf_counter() - inicio:.1f} s")
+
+            buscar(session, CONSULTAS[0], limite=args.limite)  # calentamiento
+            latencias, por_consulta, encontrados = [], {}, {}
+            for _ in range(args.repeticiones):
+                for consulta in CONSULTAS:
+                    inicio = time.perf_counter()
+                    resultados = buscar(session, consulta, limite=args.limite)
+                    transcurrido = (time.perf_counter() - inicio) * 1000
+                    latencias.append(transcurrido)
+                    por_consulta.setdefault(consulta, []).append(transcurrido)
+                    encontrados[consulta] = len(resultados)
+            session.rollback()
+    finally:
+        manager.close()
+
+    print(f"búsquedas: {len(latencias)} ({len(CONSULTAS)} consultas x {args.repeticiones})")
+    print(f"p50:       {_percentil(latencias, 50):.1f} ms")
+    print(f"p95:       {_percentil(latencias, 95):.1f} ms")
+    print(f"p99:       {_percentil(latencias, 99):.1f} ms")
+    for consulta in CONSULTAS:
+        tiempos = por_consulta[consulta]
+        print(f"  {consulta:<28} mediana {statistics.median(tiempos):7.1f} ms  ({encontrados[consulta]} resultados)")
+
+
+if __name__ == "__main__":
+    main()
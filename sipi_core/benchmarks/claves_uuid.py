@@ -0,0 +1,91 @@
+# benchmarks/claves_uuid.py
+"""
+Benchmark de claves primarias: varchar(36) con uuid v4 (esquema anterior)
+frente a uuid nativo con v4 y con v7 (migración 5b9e2d7c4a16).
+
+Para cada variante crea una tabla temporal con PK, una FK indexada (como
+las *_id de los modelos) y created_at, inserta --filas filas en lotes de
+--lote y mide filas/s y el tamaño de tabla e índices. Todo ocurre en una
+transacción que se deshace al final.
+
+USO (desde sipi_core, con DATABASE_URL definido):
+    python -m benchmarks.claves_uuid --filas 2000000
+    python -m benchmarks.claves_uuid --filas 500000 --lote 10000
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+from sqlalchemy import text
+
+from db.sessions import SyncDatabaseManager
+
+# nombre → (tipo de columna, expresión que genera la clave)
+VARIANTES = {
+    "varchar(36) v4": ("varchar(36)", "gen_random_uuid()::text"),
+    "uuid v4": ("uuid", "gen_random_uuid()"),
+    "uuid v7": ("uuid", "app.uuid_generate_v7()"),
+}
+
+
+def _mb(n: int) -> str:
+    return f"{n / (1024 * 1024):8.1f} MB"
+
+
+def _variante(session, tabla: str, tipo: str, generador: str, filas: int, lote: int) -> dict:
+    session.execute(text(f"""
+        CREATE TEMP TABLE {tabla} (
+            id {tipo} PRIMARY KEY,
+            padre_id {tipo},
+            created_at timestamp NOT NULL DEFAULT now()
+        ) ON COMMIT DROP
+    """))
+    session.execute(text(f"CREATE INDEX ON {tabla} (padre_id)"))
+    insertar = text(f"""
+        INSERT INTO {tabla} (id, padre_id)
+        SELECT {generador}, {generador} FROM generate_series(1, CAST(:n AS integer))
+    """)
+    inicio = time.perf_counter()
+    for hechas in range(0, filas, lote):
+        session.execute(insertar, {"n": min(lote, filas - hechas)})
+    segundos = time.perf_counter() - inicio
+    tabla_bytes, pk_bytes, indices_bytes = session.execute(text(f"""
+        SELECT pg_relation_size('{tabla}'),
+               pg_relation_size('{tabla}_pkey'),
+               pg_indexes_size('{tabla}')
+    """)).one()
+    return {
+        "filas_s": filas / segundos,
+        "segundos": segundos,
+        "tabla": tabla_bytes,
+        "pk": pk_bytes,
+        "indices": indices_bytes,
+    }
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark de claves uuid: varchar(36) frente a uuid nativo")
+    parser.add_argument("--filas", type=int, default=1_000_000)
+    parser.add_argument("--lote", type=int, default=5000)
+    args = parser.parse_args(argv)
+
+    manager = SyncDatabaseManager()
+    resultados = {}
+    try:
+        with manager.session() as session:
+            for i, (nombre, (tipo, generador)) in enumerate(VARIANTES.items()):
+                resultados[nombre] = _variante(session, f"bench_claves_{i}", tipo, generador, args.filas, args.lote)
+            session.rollback()
+    finally:
+        manager.close()
+
+    print(f"filas: {args.filas:,} (lote={args.lote})")
+    print(f"{'variante':<16} {'filas/s':>10} {'tabla':>11} {'PK':>11} {'índices':>11}")
+    for nombre, r in resultados.items():
+        print(f"{nombre:<16} {r['filas_s']:>10,.0f} {_mb(r['tabla'])} {_mb(r['pk'])} {_mb(r['indices'])}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+# benchmarks/exportacion.py
+"""
+Benchmark de services.exportacion: filas/s y memoria pico (RSS).
+
+Con --sembrar N inserta N inmuebles sintéticos (puntos aleatorios en la
+península) dentro de la misma transacción, exporta y hace rollback, de
+modo que la base no queda modificada. Sin --sembrar exporta los datos
+existentes.
+
+USO (desde sipi_core, con DATABASE_URL definido):
+    python -m benchmarks.exportacion --sembrar 1000000 --formato geoparquet
+    python -m benchmarks.exportacion --sembrar 1000000 --formato geojsonl --async
+    python -m benchmarks.exportacion --formato csv --columnas id,nombre,municipio --lote 10000
+
+La memoria pico se lee de getrusage (ru_maxrss) antes y después de
+exportar; con un cursor de servidor la diferencia debe depender del
+lote, no del número de filas.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import resource
+import sys
+import tempfile
+
+from sqlalchemy import text
+
+from db.sessions import AsyncDatabaseManager, SyncDatabaseManager
+from services.exportacion import FORMATOS, ResumenExportacion, exportar, exportar_async
+
+_SQL_SEMBRAR = text("""
+    INSERT INTO app.inmuebles (
+        id, nombre, coordenadas, es_visitable, en_venta, activo,
+        superficie_construida, ano_construccion, created_at
+    )
+    SELECT app.uuid_generate_v7(),
+           'Inmueble sintético ' || g,
+           ST_SetSRID(ST_MakePoint(-9.3 + random() * 12.6, 36.0 + random() * 7.8), 4326),
+           g % 7 = 0,
+           g % 50 = 0,
+           true,
+           round((50 + random() * 2000)::numeric, 2),
+           1100 + (g % 900),
+           now()
+    FROM generate_series(1, CAST(:n AS integer)) AS g
+""")
+
+
+def _rss_pico_mb() -> float:
+    """Memoria residente máxima del proceso, en MB"""
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux la da en KB; macOS en bytes
+    return pico / (1024 * 1024) if sys.platform == "darwin" else pico / 1024
+
+
+def _informe(resumen: ResumenExportacion, rss_inicial: float, args) -> None:
+    tamano = os.path.getsize(resumen.ruta) / (1024 * 1024)
+    print(f"formato:        {resumen.formato} ({'async' if args.modo_async else 'sync'}, lote={args.lote})")
+    print(f"filas:          {resumen.filas:,}")
+    print(f"tiempo:         {resumen.segundos:.1f} s")
+    print(f"filas/s:        {resumen.filas_por_segundo:,.0f}")
+    print(f"RSS pico:       {_rss_pico_mb():.0f} MB (antes de exportar: {rss_inicial:.0f} MB)")
+    print(f"fichero:        {resumen.ruta} ({tamano:.1f} MB)")
+
+
+def _sync(args, ruta: str) -> None:
+    manager = SyncDatabaseManager()
+    try:
+        with manager.session() as session:
+            if args.sembrar:
+                session.execute(_SQL_SEMBRAR, {"n": args.sembrar})
+            rss_inicial = _rss_pico_mb()
+            resumen = exportar(session, ruta, args.formato, args.columnas, lote=args.lote, limite=args.limite)
+            session.rollback()
+        _informe(resumen, rss_inicial, args)
+    finally:
+        manager.close()
+
+
+async def _async(args, ruta: str) -> None:
+    manager = AsyncDatabaseManager()
+    try:
+        async with manager.session() as session:
+            if args.sembrar:
+                await session.execute(_SQL_SEMBRAR, {"n": args.sembrar})
+            rss_inicial = _rss_pico_mb()
+            resumen = await exportar_async(session, ruta, args.formato, args.columnas, lote=args.lote, limite=args.limite)
+            await session.rollback()
+        _informe(resumen, rss_inicial, args)
+    finally:
+        await manager.close()
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark de exportación de inmuebles")
+    parser.add_argument("--formato", choices=FORMATOS, default="geojsonl")
+    parser.add_argument("--sembrar", type=int, default=0, help="inmuebles sintéticos a insertar (se deshace al final)")
+    parser.add_argument("--limite", type=int, default=None)
+    parser.add_argument("--lote", type=int, default=5000)
+    parser.add_argument("--columnas", type=lambda valor: valor.split(","), default=None)
+    parser.add_argument("--salida", default=None, help="fichero de salida (por defecto, uno temporal)")
+    parser.add_argument("--async", dest="modo_async", action="store_true", help="usar AsyncSession (asyncpg)")
+    args = parser.parse_args(argv)
+
+    extension = {"geojsonl": ".geojsonl", "csv": ".csv", "geoparquet": ".parquet"}[args.formato]
+    ruta = args.salida or os.path.join(tempfile.gettempdir(), f"sipi_inmuebles{extension}")
+    if args.modo_async:
+        asyncio.run(_async(args, ruta))
+    else:
+        _sync(args, ruta)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,7 @@
+# dashboard/__init__.py
+"""
+Piezas comunes de los dashboards internos (streamlit).
+
+Las páginas viven con cada dashboard; aquí está la capa de datos, que lee
+los resúmenes materializados de services.resumenes con caché de streamlit.
+"""
@@ -0,0 +1,104 @@
+# dashboard/datos.py
+"""
+Capa de datos de los dashboards: conteos preagregados con caché.
+
+Cada función devuelve un DataFrame (id, nombre, inmuebles, visitables,
+con_coordenadas) leído de app.mv_resumen_inmuebles (services.resumenes),
+nunca de las tablas base. El resultado se guarda con st.cache_data y la
+clave incluye el sello de frescura de la vista: mientras no se refresque,
+cada interacción del dashboard se sirve de memoria; tras un refresco, el
+sello cambia y las consultas se repiten (una vez) contra la vista nueva.
+El sello se relee como mucho cada FRESCURA_TTL_S segundos.
+
+USO (en una página de streamlit):
+    from dashboard import datos
+
+    st.caption(datos.texto_frescura())
+    ccaa = datos.por_comunidad()
+    st.bar_chart(ccaa, x="nombre", y="inmuebles")
+    provincias = datos.por_provincia(comunidad_autonoma=ccaa_id)
+    figuras = datos.por_figura_proteccion(provincia=provincia_id)
+"""
+
+from __future__ import annotations
+
+import os
+from datetime import datetime
+from typing import Any, Optional
+
+import pandas as pd
+import streamlit as st
+
+from db.sessions import SyncDatabaseManager
+from services import resumenes
+
+FRESCURA_TTL_S = int(os.getenv("DASHBOARD_FRESCURA_TTL_S", "60"))
+
+COLUMNAS = ["id", "nombre", "inmuebles", "visitables", "con_coordenadas"]
+
+
+@st.cache_resource
+def _manager() -> SyncDatabaseManager:
+    """Un manager (y un pool) por proceso de streamlit"""
+    return SyncDatabaseManager()
+
+
+@st.cache_data(ttl=FRESCURA_TTL_S, show_spinner=False)
+def sello(vista: str = resumenes.VISTA_RESUMEN) -> Optional[datetime]:
+    """Instante del último refresco de la vista (None si nunca se refrescó)"""
+    with _manager().session() as session:
+        frescura = resumenes.frescura(session).get(vista)
+    return None if frescura is None else frescura.refrescado_en
+
+
+@st.cache_data(max_entries=512, show_spinner=False)
+def _conteos(dimension: str, filtros: tuple[tuple[str, Any], ...], sello: Optional[datetime]) -> pd.DataFrame:
+    # sello solo forma parte de la clave de caché
+    with _manager().session() as session:
+        filas = resumenes.conteos(session, dimension, **dict(filtros))
+    return pd.DataFrame([
+        (f.id, f.nombre, f.inmuebles, f.visitables, f.con_coordenadas) for f in filas
+    ], columns=COLUMNAS)
+
+
+def conteos(dimension: str, **filtros: Any) -> pd.DataFrame:
+    """Conteos por dimensión (ver services.resumenes.DIMENSIONES) con filtros por id"""
+    return _conteos(dimension, tuple(sorted(filtros.items())), sello())
+
+
+def por_comunidad(**filtros: Any) -> pd.DataFrame:
+    return conteos("comunidad_autonoma", **filtros)
+
+
+def por_provincia(**filtros: Any) -> pd.DataFrame:
+    return conteos("provincia", **filtros)
+
+
+def por_municipio(**filtros: Any) -> pd.DataFrame:
+    return conteos("municipio", **filtros)
+
+
+def por_tipo_inmueble(**filtros: Any) -> pd.DataFrame:
+    return conteos("tipo_inmueble", **filtros)
+
+
+def por_figura_proteccion(**filtros: Any) -> pd.DataFrame:
+    return conteos("figura_proteccion", **filtros)
+
+
+def por_estado_conservacion(**filtros: Any) -> pd.DataFrame:
+    return conteos("estado_conservacion", **filtros)
+
+
+def texto_frescura() -> str:
+    momento = sello()
+    if momento is None:
+        return "Resúmenes sin refrescar"
+    return f"Datos a {momento:%d/%m/%Y %H:%M} UTC"
+
+
+def refrescar() -> None:
+    """Refresca la vista (botón de administración) y caduca el sello"""
+    with _manager().session() as session:
+        resumenes.refrescar(session)
+    sello.clear()
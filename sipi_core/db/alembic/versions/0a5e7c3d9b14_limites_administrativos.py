@@ -0,0 +1,51 @@
+"""limites administrativos en schema gis
+
+Revision ID: 0a5e7c3d9b14
+Revises: f1c8d4b27a90
+Create Date: 2026-10-17 14:27:50.361842
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from geoalchemy2 import Geometry
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0a5e7c3d9b14'
+down_revision: Union[str, None] = 'f1c8d4b27a90'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# tabla de límites → (columna FK, tabla referenciada)
+LIMITES = {
+    'limites_comunidades': ('comunidad_autonoma_id', 'app.comunidades_autonomas.id'),
+    'limites_provincias': ('provincia_id', 'app.provincias.id'),
+    'limites_municipios': ('municipio_id', 'app.municipios.id'),
+}
+
+
+def upgrade() -> None:
+    op.execute("CREATE SCHEMA IF NOT EXISTS gis")
+    for tabla, (columna, referencia) in LIMITES.items():
+        op.create_geospatial_table(tabla,
+        sa.Column(columna, sa.String(length=36), nullable=False),
+        sa.Column('geom', Geometry(geometry_type='MULTIPOLYGON', srid=4326, spatial_index=False, from_text='ST_GeomFromEWKT', name='geometry', nullable=False), nullable=False),
+        sa.Column('geom_simplificada', Geometry(geometry_type='MULTIPOLYGON', srid=4326, spatial_index=False, from_text='ST_GeomFromEWKT', name='geometry'), nullable=True),
+        sa.Column('fuente', sa.String(length=100), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint([columna], [referencia], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint(columna),
+        schema='gis'
+        )
+        op.create_geospatial_index(f'idx_{tabla}_geom', tabla, ['geom'], unique=False, schema='gis', postgresql_using='gist', postgresql_ops={})
+        op.create_geospatial_index(f'idx_{tabla}_geom_simplificada', tabla, ['geom_simplificada'], unique=False, schema='gis', postgresql_using='gist', postgresql_ops={})
+
+
+def downgrade() -> None:
+    for tabla in reversed(LIMITES):
+        op.drop_geospatial_index(f'idx_{tabla}_geom_simplificada', table_name=tabla, schema='gis', postgresql_using='gist', column_name='geom_simplificada')
+        op.drop_geospatial_index(f'idx_{tabla}_geom', table_name=tabla, schema='gis', postgresql_using='gist', column_name='geom')
+        op.drop_geospatial_table(tabla, schema='gis')
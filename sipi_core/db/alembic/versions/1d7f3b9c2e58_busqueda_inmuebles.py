@@ -0,0 +1,163 @@
+"""buscador de inmuebles: tsvector ponderado y trigramas sin tildes
+
+Revision ID: 1d7f3b9c2e58
+Revises: 0a5e7c3d9b14
+Create Date: 2026-10-17 16:02:37.514820
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '1d7f3b9c2e58'
+down_revision: Union[str, None] = '0a5e7c3d9b14'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Configuración de texto: spanish (stemming y stopwords) + unaccent
+CONFIGURACION = 'app.spanish_unaccent'
+
+TSVECTOR_INMUEBLE = f"""
+CREATE OR REPLACE FUNCTION app.inmueble_tsvector(
+    p_id text, p_nombre text, p_descripcion text, p_municipio_id text, p_diocesis_id text
+) RETURNS tsvector
+LANGUAGE sql STABLE AS $$
+    SELECT setweight(to_tsvector('{CONFIGURACION}', coalesce(p_nombre, '')), 'A')
+        || setweight(to_tsvector('{CONFIGURACION}', coalesce((
+               SELECT string_agg(d.denominacion, ' ')
+               FROM app.inmuebles_denominaciones d
+               WHERE d.inmueble_id = p_id AND d.deleted_at IS NULL
+           ), '')), 'B')
+        || setweight(to_tsvector('{CONFIGURACION}', concat_ws(' ',
+               (SELECT m.nombre_oficial FROM app.municipios m WHERE m.id = p_municipio_id),
+               (SELECT di.nombre FROM app.diocesis di WHERE di.id = p_diocesis_id)
+           )), 'C')
+        || setweight(to_tsvector('{CONFIGURACION}', left(coalesce(p_descripcion, ''), 100000)), 'D')
+$$
+"""
+
+TRIGGERS = """
+CREATE OR REPLACE FUNCTION app.inmuebles_busqueda_trg() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    NEW.busqueda := app.inmueble_tsvector(NEW.id, NEW.nombre, NEW.descripcion, NEW.municipio_id, NEW.diocesis_id);
+    RETURN NEW;
+END
+$$;
+
+CREATE TRIGGER inmuebles_busqueda
+    BEFORE INSERT OR UPDATE OF nombre, descripcion, municipio_id, diocesis_id ON app.inmuebles
+    FOR EACH ROW EXECUTE FUNCTION app.inmuebles_busqueda_trg();
+
+CREATE OR REPLACE FUNCTION app.inmuebles_denominaciones_busqueda_trg() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    UPDATE app.inmuebles i
+    SET busqueda = app.inmueble_tsvector(i.id, i.nombre, i.descripcion, i.municipio_id, i.diocesis_id)
+    WHERE i.id IN (
+        CASE WHEN TG_OP <> 'INSERT' THEN OLD.inmueble_id END,
+        CASE WHEN TG_OP <> 'DELETE' THEN NEW.inmueble_id END
+    );
+    RETURN NULL;
+END
+$$;
+
+CREATE TRIGGER inmuebles_denominaciones_busqueda
+    AFTER INSERT OR DELETE OR UPDATE OF denominacion, inmueble_id, deleted_at ON app.inmuebles_denominaciones
+    FOR EACH ROW EXECUTE FUNCTION app.inmuebles_denominaciones_busqueda_trg();
+
+CREATE OR REPLACE FUNCTION app.municipios_busqueda_trg() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    UPDATE app.inmuebles i
+    SET busqueda = app.inmueble_tsvector(i.id, i.nombre, i.descripcion, i.municipio_id, i.diocesis_id)
+    WHERE i.municipio_id = NEW.id;
+    RETURN NULL;
+END
+$$;
+
+CREATE TRIGGER municipios_busqueda
+    AFTER UPDATE OF nombre_oficial ON app.municipios
+    FOR EACH ROW WHEN (OLD.nombre_oficial IS DISTINCT FROM NEW.nombre_oficial)
+    EXECUTE FUNCTION app.municipios_busqueda_trg();
+
+CREATE OR REPLACE FUNCTION app.diocesis_busqueda_trg() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    UPDATE app.inmuebles i
+    SET busqueda = app.inmueble_tsvector(i.id, i.nombre, i.descripcion, i.municipio_id, i.diocesis_id)
+    WHERE i.diocesis_id = NEW.id;
+    RETURN NULL;
+END
+$$;
+
+CREATE TRIGGER diocesis_busqueda
+    AFTER UPDATE OF nombre ON app.diocesis
+    FOR EACH ROW WHEN (OLD.nombre IS DISTINCT FROM NEW.nombre)
+    EXECUTE FUNCTION app.diocesis_busqueda_trg();
+"""
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.execute("CREATE EXTENSION IF NOT EXISTS unaccent")
+
+    # unaccent() no es IMMUTABLE y no puede usarse en índices: envoltorio con
+    # el diccionario cualificado con el schema donde esté la extensión.
+    esquema = op.get_bind().execute(sa.text(
+        "SELECT extnamespace::regnamespace::text FROM pg_extension WHERE extname = 'unaccent'"
+    )).scalar_one()
+    op.execute(f"""
+        CREATE OR REPLACE FUNCTION app.f_unaccent(text) RETURNS text
+        LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT AS
+        $$ SELECT {esquema}.unaccent('{esquema}.unaccent'::regdictionary, $1) $$
+    """)
+    op.execute(f"CREATE TEXT SEARCH CONFIGURATION {CONFIGURACION} (COPY = pg_catalog.spanish)")
+    op.execute(f"""
+        ALTER TEXT SEARCH CONFIGURATION {CONFIGURACION}
+        ALTER MAPPING FOR hword, hword_part, word WITH {esquema}.unaccent, spanish_stem
+    """)
+
+    op.add_column('inmuebles', sa.Column('busqueda', postgresql.TSVECTOR(), nullable=True), schema='app')
+    op.execute(TSVECTOR_INMUEBLE)
+    op.execute(TRIGGERS)
+
+    # Relleno inicial (el trigger de inmuebles no salta: solo se toca busqueda)
+    op.execute("""
+        UPDATE app.inmuebles
+        SET busqueda = app.inmueble_tsvector(id, nombre, descripcion, municipio_id, diocesis_id)
+    """)
+
+    op.create_index('ix_inmuebles_busqueda', 'inmuebles', ['busqueda'], unique=False, schema='app', postgresql_using='gin')
+    op.create_index('ix_inmuebles_nombre_trgm', 'inmuebles', [sa.text('app.f_unaccent(nombre) gin_trgm_ops')],
+                    unique=False, schema='app', postgresql_using='gin')
+    op.create_index('ix_inmuebles_denominaciones_denominacion_trgm', 'inmuebles_denominaciones',
+                    [sa.text('app.f_unaccent(denominacion) gin_trgm_ops')], unique=False, schema='app', postgresql_using='gin')
+
+
+def downgrade() -> None:
+    op.drop_index('ix_inmuebles_denominaciones_denominacion_trgm', table_name='inmuebles_denominaciones', schema='app')
+    op.drop_index('ix_inmuebles_nombre_trgm', table_name='inmuebles', schema='app')
+    op.drop_index('ix_inmuebles_busqueda', table_name='inmuebles', schema='app')
+
+    op.execute("DROP TRIGGER IF EXISTS diocesis_busqueda ON app.diocesis")
+    op.execute("DROP TRIGGER IF EXISTS municipios_busqueda ON app.municipios")
+    op.execute("DROP TRIGGER IF EXISTS inmuebles_denominaciones_busqueda ON app.inmuebles_denominaciones")
+    op.execute("DROP TRIGGER IF EXISTS inmuebles_busqueda ON app.inmuebles")
+    for funcion in (
+        'diocesis_busqueda_trg()',
+        'municipios_busqueda_trg()',
+        'inmuebles_denominaciones_busqueda_trg()',
+        'inmuebles_busqueda_trg()',
+        'inmueble_tsvector(text, text, text, text, text)',
+    ):
+        op.execute(f"DROP FUNCTION IF EXISTS app.{funcion}")
+
+    op.drop_column('inmuebles', 'busqueda', schema='app')
+    op.execute(f"DROP TEXT SEARCH CONFIGURATION IF EXISTS {CONFIGURACION}")
+    op.execute("DROP FUNCTION IF EXISTS app.f_unaccent(text)")
@@ -0,0 +1,28 @@
+"""indices parciales uso y proteccion actuales
+
+Revision ID: 3c1f5a7e9b20
+Revises: 88d33911b427
+Create Date: 2026-10-17 09:12:04.318207
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c1f5a7e9b20'
+down_revision: Union[str, None] = '88d33911b427'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_inmuebles_usos_actual', 'inmuebles_usos', ['inmueble_id', 'tipo_uso_id'], unique=False, schema='app', postgresql_where=sa.text('fecha_hasta IS NULL'))
+    op.create_index('ix_inmuebles_niveles_proteccion_actual', 'inmuebles_niveles_proteccion', ['inmueble_id', 'fecha_desde', 'figura_proteccion_id'], unique=False, schema='app', postgresql_where=sa.text('fecha_hasta IS NULL'))
+
+
+def downgrade() -> None:
+    op.drop_index('ix_inmuebles_niveles_proteccion_actual', table_name='inmuebles_niveles_proteccion', schema='app')
+    op.drop_index('ix_inmuebles_usos_actual', table_name='inmuebles_usos', schema='app')
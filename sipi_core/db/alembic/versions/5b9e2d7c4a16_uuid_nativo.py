@@ -0,0 +1,182 @@
+"""claves uuid nativas: varchar(36) -> uuid y generador uuid v7
+
+Revision ID: 5b9e2d7c4a16
+Revises: 1d7f3b9c2e58
+Create Date: 2026-10-17 18:24:51.203117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b9e2d7c4a16'
+down_revision: Union[str, None] = '1d7f3b9c2e58'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+ESQUEMAS = ('app', 'gis')
+
+UUID_REGEX = '^[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}$'
+
+# PostgreSQL 18 trae uuidv7(); en versiones anteriores se construye sobre
+# gen_random_uuid(): 48 bits de milisegundos y la versión 0100 -> 0111.
+UUID_V7_NATIVO = """
+CREATE OR REPLACE FUNCTION app.uuid_generate_v7() RETURNS uuid
+LANGUAGE sql VOLATILE PARALLEL SAFE AS $$ SELECT uuidv7() $$
+"""
+
+UUID_V7 = """
+CREATE OR REPLACE FUNCTION app.uuid_generate_v7() RETURNS uuid
+LANGUAGE sql VOLATILE PARALLEL SAFE AS $$
+    SELECT encode(
+        set_bit(set_bit(
+            overlay(uuid_send(gen_random_uuid())
+                    PLACING substring(int8send(floor(extract(epoch FROM clock_timestamp()) * 1000)::bigint) FROM 3)
+                    FROM 1 FOR 6),
+            52, 1), 53, 1),
+        'hex')::uuid
+$$
+"""
+
+TSVECTOR_INMUEBLE = """
+CREATE OR REPLACE FUNCTION app.inmueble_tsvector(
+    p_id {tipo}, p_nombre text, p_descripcion text, p_municipio_id {tipo}, p_diocesis_id {tipo}
+) RETURNS tsvector
+LANGUAGE sql STABLE AS $$
+    SELECT setweight(to_tsvector('app.spanish_unaccent', coalesce(p_nombre, '')), 'A')
+        || setweight(to_tsvector('app.spanish_unaccent', coalesce((
+               SELECT string_agg(d.denominacion, ' ')
+               FROM app.inmuebles_denominaciones d
+               WHERE d.inmueble_id = p_id AND d.deleted_at IS NULL
+           ), '')), 'B')
+        || setweight(to_tsvector('app.spanish_unaccent', concat_ws(' ',
+               (SELECT m.nombre_oficial FROM app.municipios m WHERE m.id = p_municipio_id),
+               (SELECT di.nombre FROM app.diocesis di WHERE di.id = p_diocesis_id)
+           )), 'C')
+        || setweight(to_tsvector('app.spanish_unaccent', left(coalesce(p_descripcion, ''), 100000)), 'D')
+$$
+"""
+
+# Triggers de 1d7f3b9c2e58 con columnas en UPDATE OF: PostgreSQL no deja
+# cambiar el tipo de esas columnas, así que se quitan y se recrean. Las
+# funciones plpgsql resuelven inmueble_tsvector al ejecutarse y se conservan.
+TRIGGERS_BUSQUEDA = {
+    'inmuebles_busqueda': ('app.inmuebles', """
+CREATE TRIGGER inmuebles_busqueda
+    BEFORE INSERT OR UPDATE OF nombre, descripcion, municipio_id, diocesis_id ON app.inmuebles
+    FOR EACH ROW EXECUTE FUNCTION app.inmuebles_busqueda_trg()
+"""),
+    'inmuebles_denominaciones_busqueda': ('app.inmuebles_denominaciones', """
+CREATE TRIGGER inmuebles_denominaciones_busqueda
+    AFTER INSERT OR DELETE OR UPDATE OF denominacion, inmueble_id, deleted_at ON app.inmuebles_denominaciones
+    FOR EACH ROW EXECUTE FUNCTION app.inmuebles_denominaciones_busqueda_trg()
+"""),
+}
+
+
+def _quitar_triggers_busqueda() -> None:
+    for nombre, (tabla, _) in TRIGGERS_BUSQUEDA.items():
+        op.execute(f"DROP TRIGGER IF EXISTS {nombre} ON {tabla}")
+
+
+def _crear_triggers_busqueda() -> None:
+    for _, ddl in TRIGGERS_BUSQUEDA.values():
+        op.execute(ddl)
+
+
+def _columnas(conexion, tipo: str) -> dict[tuple[str, str], list[str]]:
+    """(schema, tabla) -> columnas del tipo dado, solo tablas ordinarias"""
+    filas = conexion.execute(sa.text("""
+        SELECT n.nspname, c.relname, a.attname
+        FROM pg_attribute a
+        JOIN pg_class c ON c.oid = a.attrelid
+        JOIN pg_namespace n ON n.oid = c.relnamespace
+        WHERE n.nspname = ANY(CAST(:esquemas AS text[]))
+          AND c.relkind IN ('r', 'p')
+          AND a.attnum > 0 AND NOT a.attisdropped
+          AND format_type(a.atttypid, a.atttypmod) = CAST(:tipo AS text)
+        ORDER BY n.nspname, c.relname, a.attnum
+    """), {"esquemas": list(ESQUEMAS), "tipo": tipo}).all()
+    columnas: dict[tuple[str, str], list[str]] = {}
+    for esquema, tabla, columna in filas:
+        columnas.setdefault((esquema, tabla), []).append(columna)
+    return columnas
+
+
+def _fks(conexion, columnas: dict[tuple[str, str], list[str]]) -> list[tuple[str, str, str, str]]:
+    """FKs sobre alguna de las columnas: (schema, tabla, nombre, definición)"""
+    filas = conexion.execute(sa.text("""
+        SELECT n.nspname, c.relname, k.conname, pg_get_constraintdef(k.oid),
+               array_agg(a.attname::text ORDER BY a.attnum)
+        FROM pg_constraint k
+        JOIN pg_class c ON c.oid = k.conrelid
+        JOIN pg_namespace n ON n.oid = c.relnamespace
+        JOIN pg_attribute a ON a.attrelid = k.conrelid AND a.attnum = ANY(k.conkey)
+        WHERE k.contype = 'f' AND n.nspname = ANY(CAST(:esquemas AS text[]))
+        GROUP BY n.nspname, c.relname, k.conname, k.oid
+        ORDER BY n.nspname, c.relname, k.conname
+    """), {"esquemas": list(ESQUEMAS)}).all()
+    return [
+        (esquema, tabla, nombre, definicion)
+        for esquema, tabla, nombre, definicion, atributos in filas
+        if set(atributos) & set(columnas.get((esquema, tabla), ()))
+    ]
+
+
+def _convertir(tipo_origen: str, tipo_destino: str, conversion: str) -> None:
+    conexion = op.get_bind()
+    columnas = _columnas(conexion, tipo_origen)
+    fks = _fks(conexion, columnas)
+
+    # Las FKs exigen el mismo tipo a ambos lados: se quitan y se recrean al final
+    for esquema, tabla, nombre, _ in fks:
+        op.execute(f'ALTER TABLE {esquema}."{tabla}" DROP CONSTRAINT "{nombre}"')
+
+    # Un ALTER TABLE por tabla: una sola reescritura aunque cambien varias columnas
+    for (esquema, tabla), nombres in columnas.items():
+        cambios = ", ".join(
+            f'ALTER COLUMN "{columna}" TYPE {tipo_destino} USING "{columna}"{conversion}'
+            for columna in nombres
+        )
+        op.execute(f'ALTER TABLE {esquema}."{tabla}" {cambios}')
+
+    for esquema, tabla, nombre, definicion in fks:
+        op.execute(f'ALTER TABLE {esquema}."{tabla}" ADD CONSTRAINT "{nombre}" {definicion}')
+
+
+def upgrade() -> None:
+    conexion = op.get_bind()
+    nativo = conexion.execute(sa.text("SELECT to_regproc('pg_catalog.uuidv7') IS NOT NULL")).scalar_one()
+    op.execute(UUID_V7_NATIVO if nativo else UUID_V7)
+
+    # Antes de reescribir nada: todos los valores deben ser uuid válidos
+    invalidas = []
+    for (esquema, tabla), nombres in _columnas(conexion, 'character varying(36)').items():
+        for columna in nombres:
+            n = conexion.execute(sa.text(
+                f'SELECT count(*) FROM {esquema}."{tabla}" '
+                f'WHERE "{columna}" IS NOT NULL AND "{columna}" !~ CAST(:regex AS text)'
+            ), {"regex": UUID_REGEX}).scalar_one()
+            if n:
+                invalidas.append(f'{esquema}.{tabla}.{columna} ({n} filas)')
+    if invalidas:
+        raise RuntimeError("Valores que no son uuid en: " + ", ".join(invalidas))
+
+    _quitar_triggers_busqueda()
+    op.execute("DROP FUNCTION IF EXISTS app.inmueble_tsvector(text, text, text, text, text)")
+    _convertir('character varying(36)', 'uuid', '::uuid')
+    op.execute(TSVECTOR_INMUEBLE.format(tipo='uuid'))
+    _crear_triggers_busqueda()
+
+
+def downgrade() -> None:
+    _quitar_triggers_busqueda()
+    op.execute("DROP FUNCTION IF EXISTS app.inmueble_tsvector(uuid, text, text, uuid, uuid)")
+    _convertir('uuid', 'character varying(36)', '::text')
+    op.execute(TSVECTOR_INMUEBLE.format(tipo='text'))
+    _crear_triggers_busqueda()
+    op.execute("DROP FUNCTION IF EXISTS app.uuid_generate_v7()")
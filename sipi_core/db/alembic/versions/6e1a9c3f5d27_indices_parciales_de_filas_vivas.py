@@ -0,0 +1,112 @@
+"""indices parciales de filas vivas
+
+Revision ID: 6e1a9c3f5d27
+Revises: 5b9e2d7c4a16
+Create Date: 2026-10-17 19:35:21.428488
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6e1a9c3f5d27'
+down_revision: Union[str, None] = '5b9e2d7c4a16'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_comunidades_autonomas_codigo_ine_vivos', 'comunidades_autonomas', ['codigo_ine'], unique=False, schema='app', postgresql_where=sa.text('deleted_at IS NULL'))
+    op.create_index('ix_comunidades_autonomas_nombre_oficial_vivos', 'comunidades_autonomas', ['nombre_oficial'], unique=False, schema='app', postgresql_where=sa.text('deleted_at IS NULL'))
+    op.create_index('ix_provincias_codigo_ine_vivos', 'provincias', ['codigo_ine'], unique=False, schema='app', postgresql_where=sa.text('deleted_at IS NULL'))
+    op.create_index('ix_provincias_nombre_oficial_vivos', 'provincias', ['nombre_oficial'], unique=False, schema='app', postgresql_where=sa.text('deleted_at IS NULL'))
+    op.create_index('ix_provincias_comunidad_autonoma_id_vivos', 'provincias', ['comunidad_autonoma_id'], unique=False, schema='app', postgresql_where=sa.text('deleted_at IS NULL'))
+    op.create_index('ix_municipios_codigo_ine_vivos', 'municipios', ['codigo_ine'], unique=False, schema='app', postgresql_where=sa.text('deleted_at IS NULL'))
+    op.create_index('ix_municipios_nombre_oficial_vivos', 'municipios', ['nombre_oficial'], unique=False, schema='app', postgresql_where=sa.text('deleted_at IS NULL'))
+    op.create_index('ix_municipios_provincia_id_vivos', 'municipios', ['provincia_id'], unique=False, schema='app', postgresql_where=sa.text('deleted_at IS NULL'))
+    op.create_index('ix_diocesis_nombre_vivos', 'diocesis', ['nombre'], unique=False, schema='app', postgresql_where=sa.text('deleted_at IS NULL'))
+    op.create_index('ix_diocesis_tipo_via_id_vivos', 'diocesis', ['tipo_via_id'], unique=False, schema='app', postgresql_where=sa.text('deleted_at IS NULL'))
+    op.create_index('ix_diocesis_comunidad_autonoma_id_vivos', 'diocesis', ['comunidad_autonoma_id'], unique=False, schema='app', postgresql_where=sa.text('deleted_at IS NULL'))
+    op.create_index('ix_diocesis_provincia_id_vivos', 'diocesis', ['provincia_id'], unique=False, schema='app', postgresql_where=sa.text('deleted_at IS NULL'))
+    op.create_index('ix_diocesis_municipio_id_vivos', 'diocesis', ['municipio_id'], unique=False, schema='app', postgresql_where=sa.text('deleted_at IS NULL'))
+    op.create_index('ix_inmuebles_nombre_vivos', 'inmuebles', ['nombre'], unique=False, schema='app', postgresql_where=sa.text('deleted_at IS NULL'))
+    op.create_index('ix_inmuebles_inmueble_principal_id_vivos', 'inmuebles', ['inmueble_principal_id'], unique=False, schema='app', postgresql_where=sa.text('deleted_at IS NULL'))
+    op.create_index('ix_inmuebles_comunidad_autonoma_id_vivos', 'inmuebles', ['comunidad_autonoma_id'], unique=False, schema='app', postgresql_where=sa.text('deleted_at IS NULL'))
+    op.create_index('ix_inmuebles_provincia_id_vivos', 'inmuebles', ['provincia_id'], unique=False, schema='app', postgresql_where=sa.text('deleted_at IS NULL'))
+    op.create_index('ix_inmuebles_municipio_id_vivos', 'inmuebles', ['municipio_id'], unique=False, schema='app', postgresql_where=sa.text('deleted_at IS NULL'))
+    op.create_index('ix_inmuebles_tipo_inmueble_id_vivos', 'inmuebles', ['tipo_inmueble_id'], unique=False, schema='app', postgresql_where=sa.text('deleted_at IS NULL'))
+    op.create_index('ix_inmuebles_estado_conservacion_id_vivos', 'inmuebles', ['estado_conservacion_id'], unique=False, schema='app', postgresql_where=sa.text('deleted_at IS NULL'))
+    op.create_index('ix_inmuebles_estado_tratamiento_id_vivos', 'inmuebles', ['estado_tratamiento_id'], unique=False, schema='app', postgresql_where=sa.text('deleted_at IS NULL'))
+    op.create_index('ix_inmuebles_diocesis_id_vivos', 'inmuebles', ['diocesis_id'], unique=False, schema='app', postgresql_where=sa.text('deleted_at IS NULL'))
+    op.create_index('ix_inmuebles_entidad_religiosa_id_vivos', 'inmuebles', ['entidad_religiosa_id'], unique=False, schema='app', postgresql_where=sa.text('deleted_at IS NULL'))
+    op.create_index('ix_citas_bibliograficas_inmueble_id_vivos', 'citas_bibliograficas', ['inmueble_id'], unique=False, schema='app', postgresql_where=sa.text('deleted_at IS NULL'))
+    op.create_index('ix_citas_bibliograficas_fuente_id_vivos', 'citas_bibliograficas', ['fuente_id'], unique=False, schema='app', postgresql_where=sa.text('deleted_at IS NULL'))
+    op.create_index('ix_inmatriculaciones_inmueble_id_vivos', 'inmatriculaciones', ['inmueble_id'], unique=False, schema='app', postgresql_where=sa.text('deleted_at IS NULL'))
+    op.create_index('ix_inmatriculaciones_registro_propiedad_id_vivos', 'inmatriculaciones', ['registro_propiedad_id'], unique=False, schema='app', postgresql_where=sa.text('deleted_at IS NULL'))
+    op.create_index('ix_inmatriculaciones_tipo_certificacion_propiedad_id_vivos', 'inmatriculaciones', ['tipo_certificacion_propiedad_id'], unique=False, schema='app', postgresql_where=sa.text('deleted_at IS NULL'))
+    op.create_index('ix_inmuebles_denominaciones_inmueble_id_vivos', 'inmuebles_denominaciones', ['inmueble_id'], unique=False, schema='app', postgresql_where=sa.text('deleted_at IS NULL'))
+    op.create_index('ix_inmuebles_documentos_inmueble_id_vivos', 'inmuebles_documentos', ['inmueble_id'], unique=False, schema='app', postgresql_where=sa.text('deleted_at IS NULL'))
+    op.create_index('ix_inmuebles_documentos_documento_id_vivos', 'inmuebles_documentos', ['documento_id'], unique=False, schema='app', postgresql_where=sa.text('deleted_at IS NULL'))
+    op.create_index('ix_inmuebles_niveles_proteccion_inmueble_id_vivos', 'inmuebles_niveles_proteccion', ['inmueble_id'], unique=False, schema='app', postgresql_where=sa.text('deleted_at IS NULL'))
+    op.create_index('ix_inmuebles_niveles_proteccion_figura_proteccion_id_vivos', 'inmuebles_niveles_proteccion', ['figura_proteccion_id'], unique=False, schema='app', postgresql_where=sa.text('deleted_at IS NULL'))
+    op.create_index('ix_inmuebles_usos_inmueble_id_vivos', 'inmuebles_usos', ['inmueble_id'], unique=False, schema='app', postgresql_where=sa.text('deleted_at IS NULL'))
+    op.create_index('ix_inmuebles_usos_tipo_uso_id_vivos', 'inmuebles_usos', ['tipo_uso_id'], unique=False, schema='app', postgresql_where=sa.text('deleted_at IS NULL'))
+    op.create_index('ix_intervenciones_inmueble_id_vivos', 'intervenciones', ['inmueble_id'], unique=False, schema='app', postgresql_where=sa.text('deleted_at IS NULL'))
+    op.create_index('ix_intervenciones_nombre_vivos', 'intervenciones', ['nombre'], unique=False, schema='app', postgresql_where=sa.text('deleted_at IS NULL'))
+    op.create_index('ix_portals_detecciones_inmueble_id_vivos', 'portals_detecciones', ['inmueble_id'], unique=False, schema='app', postgresql_where=sa.text('deleted_at IS NULL'))
+    op.create_index('ix_portals_detecciones_inmueble_core_id_vivos', 'portals_detecciones', ['inmueble_core_id'], unique=False, schema='app', postgresql_where=sa.text('deleted_at IS NULL'))
+    op.create_index('ix_transmisiones_inmueble_id_vivos', 'transmisiones', ['inmueble_id'], unique=False, schema='app', postgresql_where=sa.text('deleted_at IS NULL'))
+    op.create_index('ix_transmisiones_notaria_id_vivos', 'transmisiones', ['notaria_id'], unique=False, schema='app', postgresql_where=sa.text('deleted_at IS NULL'))
+    op.create_index('ix_transmisiones_registro_propiedad_id_vivos', 'transmisiones', ['registro_propiedad_id'], unique=False, schema='app', postgresql_where=sa.text('deleted_at IS NULL'))
+    op.create_index('ix_transmisiones_tipo_transmision_id_vivos', 'transmisiones', ['tipo_transmision_id'], unique=False, schema='app', postgresql_where=sa.text('deleted_at IS NULL'))
+    op.create_index('ix_transmisiones_tipo_certificacion_propiedad_id_vivos', 'transmisiones', ['tipo_certificacion_propiedad_id'], unique=False, schema='app', postgresql_where=sa.text('deleted_at IS NULL'))
+
+
+def downgrade() -> None:
+    op.drop_index('ix_transmisiones_tipo_certificacion_propiedad_id_vivos', table_name='transmisiones', schema='app')
+    op.drop_index('ix_transmisiones_tipo_transmision_id_vivos', table_name='transmisiones', schema='app')
+    op.drop_index('ix_transmisiones_registro_propiedad_id_vivos', table_name='transmisiones', schema='app')
+    op.drop_index('ix_transmisiones_notaria_id_vivos', table_name='transmisiones', schema='app')
+    op.drop_index('ix_transmisiones_inmueble_id_vivos', table_name='transmisiones', schema='app')
+    op.drop_index('ix_portals_detecciones_inmueble_core_id_vivos', table_name='portals_detecciones', schema='app')
+    op.drop_index('ix_portals_detecciones_inmueble_id_vivos', table_name='portals_detecciones', schema='app')
+    op.drop_index('ix_intervenciones_nombre_vivos', table_name='intervenciones', schema='app')
+    op.drop_index('ix_intervenciones_inmueble_id_vivos', table_name='intervenciones', schema='app')
+    op.drop_index('ix_inmuebles_usos_tipo_uso_id_vivos', table_name='inmuebles_usos', schema='app')
+    op.drop_index('ix_inmuebles_usos_inmueble_id_vivos', table_name='inmuebles_usos', schema='app')
+    op.drop_index('ix_inmuebles_niveles_proteccion_figura_proteccion_id_vivos', table_name='inmuebles_niveles_proteccion', schema='app')
+    op.drop_index('ix_inmuebles_niveles_proteccion_inmueble_id_vivos', table_name='inmuebles_niveles_proteccion', schema='app')
+    op.drop_index('ix_inmuebles_documentos_documento_id_vivos', table_name='inmuebles_documentos', schema='app')
+    op.drop_index('ix_inmuebles_documentos_inmueble_id_vivos', table_name='inmuebles_documentos', schema='app')
+    op.drop_index('ix_inmuebles_denominaciones_inmueble_id_vivos', table_name='inmuebles_denominaciones', schema='app')
+    op.drop_index('ix_inmatriculaciones_tipo_certificacion_propiedad_id_vivos', table_name='inmatriculaciones', schema='app')
+    op.drop_index('ix_inmatriculaciones_registro_propiedad_id_vivos', table_name='inmatriculaciones', schema='app')
+    op.drop_index('ix_inmatriculaciones_inmueble_id_vivos', table_name='inmatriculaciones', schema='app')
+    op.drop_index('ix_citas_bibliograficas_fuente_id_vivos', table_name='citas_bibliograficas', schema='app')
+    op.drop_index('ix_citas_bibliograficas_inmueble_id_vivos', table_name='citas_bibliograficas', schema='app')
+    op.drop_index('ix_inmuebles_entidad_religiosa_id_vivos', table_name='inmuebles', schema='app')
+    op.drop_index('ix_inmuebles_diocesis_id_vivos', table_name='inmuebles', schema='app')
+    op.drop_index('ix_inmuebles_estado_tratamiento_id_vivos', table_name='inmuebles', schema='app')
+    op.drop_index('ix_inmuebles_estado_conservacion_id_vivos', table_name='inmuebles', schema='app')
+    op.drop_index('ix_inmuebles_tipo_inmueble_id_vivos', table_name='inmuebles', schema='app')
+    op.drop_index('ix_inmuebles_municipio_id_vivos', table_name='inmuebles', schema='app')
+    op.drop_index('ix_inmuebles_provincia_id_vivos', table_name='inmuebles', schema='app')
+    op.drop_index('ix_inmuebles_comunidad_autonoma_id_vivos', table_name='inmuebles', schema='app')
+    op.drop_index('ix_inmuebles_inmueble_principal_id_vivos', table_name='inmuebles', schema='app')
+    op.drop_index('ix_inmuebles_nombre_vivos', table_name='inmuebles', schema='app')
+    op.drop_index('ix_diocesis_municipio_id_vivos', table_name='diocesis', schema='app')
+    op.drop_index('ix_diocesis_provincia_id_vivos', table_name='diocesis', schema='app')
+    op.drop_index('ix_diocesis_comunidad_autonoma_id_vivos', table_name='diocesis', schema='app')
+    op.drop_index('ix_diocesis_tipo_via_id_vivos', table_name='diocesis', schema='app')
+    op.drop_index('ix_diocesis_nombre_vivos', table_name='diocesis', schema='app')
+    op.drop_index('ix_municipios_provincia_id_vivos', table_name='municipios', schema='app')
+    op.drop_index('ix_municipios_nombre_oficial_vivos', table_name='municipios', schema='app')
+    op.drop_index('ix_municipios_codigo_ine_vivos', table_name='municipios', schema='app')
+    op.drop_index('ix_provincias_comunidad_autonoma_id_vivos', table_name='provincias', schema='app')
+    op.drop_index('ix_provincias_nombre_oficial_vivos', table_name='provincias', schema='app')
+    op.drop_index('ix_provincias_codigo_ine_vivos', table_name='provincias', schema='app')
+    op.drop_index('ix_comunidades_autonomas_nombre_oficial_vivos', table_name='comunidades_autonomas', schema='app')
+    op.drop_index('ix_comunidades_autonomas_codigo_ine_vivos', table_name='comunidades_autonomas', schema='app')
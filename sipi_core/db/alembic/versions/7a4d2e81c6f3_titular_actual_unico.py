@@ -0,0 +1,38 @@
+"""titular actual unico por entidad
+
+Revision ID: 7a4d2e81c6f3
+Revises: 3c1f5a7e9b20
+Create Date: 2026-10-17 10:03:41.902115
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7a4d2e81c6f3'
+down_revision: Union[str, None] = '3c1f5a7e9b20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# tabla de titulares -> FK a la entidad
+TITULARES = {
+    'notarias_titulares': 'notaria_id',
+    'registros_propiedad_titulares': 'registro_propiedad_id',
+    'diocesis_titulares': 'diocesis_id',
+    'entidades_religiosas_titulares': 'entidad_religiosa_id',
+    'administraciones_titulares': 'administracion_id',
+}
+
+
+def upgrade() -> None:
+    # Falla si alguna entidad tiene más de un titular sin fecha_fin: cerrar antes los sobrantes
+    for tabla, fk in TITULARES.items():
+        op.create_index(f'uq_{tabla}_actual', tabla, [fk], unique=True, schema='app', postgresql_where=sa.text('fecha_fin IS NULL'))
+
+
+def downgrade() -> None:
+    for tabla in TITULARES:
+        op.drop_index(f'uq_{tabla}_actual', table_name=tabla, schema='app')
@@ -0,0 +1,482 @@
+"""consolidacion de indices de auditoria y duplicados
+
+Generada con db.asesor_indices: duplicados de geografía y figuras de
+protección, codigo cubierto por uq_codigo_ccaa e índices de AuditMixin
+que los modelos ya no declaran (mixins.base.INDICES_AUDITORIA).
+
+Revision ID: 9c4e7a2b1f35
+Revises: 6e1a9c3f5d27
+Create Date: 2026-10-17 19:38:14.958859
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9c4e7a2b1f35'
+down_revision: Union[str, None] = '6e1a9c3f5d27'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.drop_index('ix_ccaa_codigo_ine', table_name='comunidades_autonomas', schema='app')
+    op.drop_index('ix_ccaa_nombre', table_name='comunidades_autonomas', schema='app')
+    op.drop_index('ix_provincia_codigo_ine', table_name='provincias', schema='app')
+    op.drop_index('ix_provincia_nombre', table_name='provincias', schema='app')
+    op.drop_index('ix_provincia_ccaa', table_name='provincias', schema='app')
+    op.drop_index('ix_municipio_codigo_ine', table_name='municipios', schema='app')
+    op.drop_index('ix_municipio_nombre', table_name='municipios', schema='app')
+    op.drop_index('ix_municipio_provincia', table_name='municipios', schema='app')
+    op.drop_index('ix_figura_nivel', table_name='tipos_figura_proteccion', schema='app')
+    op.drop_index('ix_figura_activo', table_name='tipos_figura_proteccion', schema='app')
+    op.drop_index('ix_app_tipos_figura_proteccion_codigo', table_name='tipos_figura_proteccion', schema='app')
+    op.drop_index('ix_app_usuarios_deleted_at', table_name='usuarios', schema='app')
+    op.drop_index('ix_app_usuarios_created_by_id', table_name='usuarios', schema='app')
+    op.drop_index('ix_app_usuarios_updated_by_id', table_name='usuarios', schema='app')
+    op.drop_index('ix_app_usuarios_deleted_by_id', table_name='usuarios', schema='app')
+    op.drop_index('ix_app_comunidades_autonomas_deleted_at', table_name='comunidades_autonomas', schema='app')
+    op.drop_index('ix_app_comunidades_autonomas_created_by_id', table_name='comunidades_autonomas', schema='app')
+    op.drop_index('ix_app_comunidades_autonomas_updated_by_id', table_name='comunidades_autonomas', schema='app')
+    op.drop_index('ix_app_comunidades_autonomas_deleted_by_id', table_name='comunidades_autonomas', schema='app')
+    op.drop_index('ix_app_estados_conservacion_deleted_at', table_name='estados_conservacion', schema='app')
+    op.drop_index('ix_app_estados_conservacion_created_by_id', table_name='estados_conservacion', schema='app')
+    op.drop_index('ix_app_estados_conservacion_updated_by_id', table_name='estados_conservacion', schema='app')
+    op.drop_index('ix_app_estados_conservacion_deleted_by_id', table_name='estados_conservacion', schema='app')
+    op.drop_index('ix_app_estados_tratamiento_deleted_at', table_name='estados_tratamiento', schema='app')
+    op.drop_index('ix_app_estados_tratamiento_created_by_id', table_name='estados_tratamiento', schema='app')
+    op.drop_index('ix_app_estados_tratamiento_updated_by_id', table_name='estados_tratamiento', schema='app')
+    op.drop_index('ix_app_estados_tratamiento_deleted_by_id', table_name='estados_tratamiento', schema='app')
+    op.drop_index('ix_app_fuentes_historiograficas_deleted_at', table_name='fuentes_historiograficas', schema='app')
+    op.drop_index('ix_app_fuentes_historiograficas_created_by_id', table_name='fuentes_historiograficas', schema='app')
+    op.drop_index('ix_app_fuentes_historiograficas_updated_by_id', table_name='fuentes_historiograficas', schema='app')
+    op.drop_index('ix_app_fuentes_historiograficas_deleted_by_id', table_name='fuentes_historiograficas', schema='app')
+    op.drop_index('ix_app_osm_places_created_by_id', table_name='osm_places', schema='app')
+    op.drop_index('ix_app_osm_places_updated_by_id', table_name='osm_places', schema='app')
+    op.drop_index('ix_app_osm_places_deleted_by_id', table_name='osm_places', schema='app')
+    op.drop_index('ix_app_portals_inmuebles_raw_created_by_id', table_name='portals_inmuebles_raw', schema='app')
+    op.drop_index('ix_app_portals_inmuebles_raw_updated_by_id', table_name='portals_inmuebles_raw', schema='app')
+    op.drop_index('ix_app_portals_inmuebles_raw_deleted_by_id', table_name='portals_inmuebles_raw', schema='app')
+    op.drop_index('ix_app_roles_deleted_at', table_name='roles', schema='app')
+    op.drop_index('ix_app_roles_created_by_id', table_name='roles', schema='app')
+    op.drop_index('ix_app_roles_updated_by_id', table_name='roles', schema='app')
+    op.drop_index('ix_app_roles_deleted_by_id', table_name='roles', schema='app')
+    op.drop_index('ix_app_roles_tecnico_deleted_at', table_name='roles_tecnico', schema='app')
+    op.drop_index('ix_app_roles_tecnico_created_by_id', table_name='roles_tecnico', schema='app')
+    op.drop_index('ix_app_roles_tecnico_updated_by_id', table_name='roles_tecnico', schema='app')
+    op.drop_index('ix_app_roles_tecnico_deleted_by_id', table_name='roles_tecnico', schema='app')
+    op.drop_index('ix_app_tipos_certificacion_propiedad_deleted_at', table_name='tipos_certificacion_propiedad', schema='app')
+    op.drop_index('ix_app_tipos_certificacion_propiedad_created_by_id', table_name='tipos_certificacion_propiedad', schema='app')
+    op.drop_index('ix_app_tipos_certificacion_propiedad_updated_by_id', table_name='tipos_certificacion_propiedad', schema='app')
+    op.drop_index('ix_app_tipos_certificacion_propiedad_deleted_by_id', table_name='tipos_certificacion_propiedad', schema='app')
+    op.drop_index('ix_app_tipos_documento_deleted_at', table_name='tipos_documento', schema='app')
+    op.drop_index('ix_app_tipos_documento_created_by_id', table_name='tipos_documento', schema='app')
+    op.drop_index('ix_app_tipos_documento_updated_by_id', table_name='tipos_documento', schema='app')
+    op.drop_index('ix_app_tipos_documento_deleted_by_id', table_name='tipos_documento', schema='app')
+    op.drop_index('ix_app_tipos_entidad_religiosa_deleted_at', table_name='tipos_entidad_religiosa', schema='app')
+    op.drop_index('ix_app_tipos_entidad_religiosa_created_by_id', table_name='tipos_entidad_religiosa', schema='app')
+    op.drop_index('ix_app_tipos_entidad_religiosa_updated_by_id', table_name='tipos_entidad_religiosa', schema='app')
+    op.drop_index('ix_app_tipos_entidad_religiosa_deleted_by_id', table_name='tipos_entidad_religiosa', schema='app')
+    op.drop_index('ix_app_tipos_inmueble_deleted_at', table_name='tipos_inmueble', schema='app')
+    op.drop_index('ix_app_tipos_inmueble_created_by_id', table_name='tipos_inmueble', schema='app')
+    op.drop_index('ix_app_tipos_inmueble_updated_by_id', table_name='tipos_inmueble', schema='app')
+    op.drop_index('ix_app_tipos_inmueble_deleted_by_id', table_name='tipos_inmueble', schema='app')
+    op.drop_index('ix_app_tipos_licencia_deleted_at', table_name='tipos_licencia', schema='app')
+    op.drop_index('ix_app_tipos_licencia_created_by_id', table_name='tipos_licencia', schema='app')
+    op.drop_index('ix_app_tipos_licencia_updated_by_id', table_name='tipos_licencia', schema='app')
+    op.drop_index('ix_app_tipos_licencia_deleted_by_id', table_name='tipos_licencia', schema='app')
+    op.drop_index('ix_app_tipos_mime_documento_deleted_at', table_name='tipos_mime_documento', schema='app')
+    op.drop_index('ix_app_tipos_mime_documento_created_by_id', table_name='tipos_mime_documento', schema='app')
+    op.drop_index('ix_app_tipos_mime_documento_updated_by_id', table_name='tipos_mime_documento', schema='app')
+    op.drop_index('ix_app_tipos_mime_documento_deleted_by_id', table_name='tipos_mime_documento', schema='app')
+    op.drop_index('ix_app_tipos_persona_deleted_at', table_name='tipos_persona', schema='app')
+    op.drop_index('ix_app_tipos_persona_created_by_id', table_name='tipos_persona', schema='app')
+    op.drop_index('ix_app_tipos_persona_updated_by_id', table_name='tipos_persona', schema='app')
+    op.drop_index('ix_app_tipos_persona_deleted_by_id', table_name='tipos_persona', schema='app')
+    op.drop_index('ix_app_tipos_titulo_propiedad_deleted_at', table_name='tipos_titulo_propiedad', schema='app')
+    op.drop_index('ix_app_tipos_titulo_propiedad_created_by_id', table_name='tipos_titulo_propiedad', schema='app')
+    op.drop_index('ix_app_tipos_titulo_propiedad_updated_by_id', table_name='tipos_titulo_propiedad', schema='app')
+    op.drop_index('ix_app_tipos_titulo_propiedad_deleted_by_id', table_name='tipos_titulo_propiedad', schema='app')
+    op.drop_index('ix_app_tipos_transmision_deleted_at', table_name='tipos_transmision', schema='app')
+    op.drop_index('ix_app_tipos_transmision_created_by_id', table_name='tipos_transmision', schema='app')
+    op.drop_index('ix_app_tipos_transmision_updated_by_id', table_name='tipos_transmision', schema='app')
+    op.drop_index('ix_app_tipos_transmision_deleted_by_id', table_name='tipos_transmision', schema='app')
+    op.drop_index('ix_app_tipos_uso_inmueble_deleted_at', table_name='tipos_uso_inmueble', schema='app')
+    op.drop_index('ix_app_tipos_uso_inmueble_created_by_id', table_name='tipos_uso_inmueble', schema='app')
+    op.drop_index('ix_app_tipos_uso_inmueble_updated_by_id', table_name='tipos_uso_inmueble', schema='app')
+    op.drop_index('ix_app_tipos_uso_inmueble_deleted_by_id', table_name='tipos_uso_inmueble', schema='app')
+    op.drop_index('ix_app_tipos_via_deleted_at', table_name='tipos_via', schema='app')
+    op.drop_index('ix_app_tipos_via_created_by_id', table_name='tipos_via', schema='app')
+    op.drop_index('ix_app_tipos_via_updated_by_id', table_name='tipos_via', schema='app')
+    op.drop_index('ix_app_tipos_via_deleted_by_id', table_name='tipos_via', schema='app')
+    op.drop_index('ix_app_fuentes_documentales_deleted_at', table_name='fuentes_documentales', schema='app')
+    op.drop_index('ix_app_fuentes_documentales_created_by_id', table_name='fuentes_documentales', schema='app')
+    op.drop_index('ix_app_fuentes_documentales_updated_by_id', table_name='fuentes_documentales', schema='app')
+    op.drop_index('ix_app_fuentes_documentales_deleted_by_id', table_name='fuentes_documentales', schema='app')
+    op.drop_index('ix_app_provincias_deleted_at', table_name='provincias', schema='app')
+    op.drop_index('ix_app_provincias_created_by_id', table_name='provincias', schema='app')
+    op.drop_index('ix_app_provincias_updated_by_id', table_name='provincias', schema='app')
+    op.drop_index('ix_app_provincias_deleted_by_id', table_name='provincias', schema='app')
+    op.drop_index('ix_app_tipos_figura_proteccion_deleted_at', table_name='tipos_figura_proteccion', schema='app')
+    op.drop_index('ix_app_tipos_figura_proteccion_created_by_id', table_name='tipos_figura_proteccion', schema='app')
+    op.drop_index('ix_app_tipos_figura_proteccion_updated_by_id', table_name='tipos_figura_proteccion', schema='app')
+    op.drop_index('ix_app_tipos_figura_proteccion_deleted_by_id', table_name='tipos_figura_proteccion', schema='app')
+    op.drop_index('ix_app_documentos_deleted_at', table_name='documentos', schema='app')
+    op.drop_index('ix_app_documentos_created_by_id', table_name='documentos', schema='app')
+    op.drop_index('ix_app_documentos_updated_by_id', table_name='documentos', schema='app')
+    op.drop_index('ix_app_documentos_deleted_by_id', table_name='documentos', schema='app')
+    op.drop_index('ix_app_municipios_deleted_at', table_name='municipios', schema='app')
+    op.drop_index('ix_app_municipios_created_by_id', table_name='municipios', schema='app')
+    op.drop_index('ix_app_municipios_updated_by_id', table_name='municipios', schema='app')
+    op.drop_index('ix_app_municipios_deleted_by_id', table_name='municipios', schema='app')
+    op.drop_index('ix_app_administraciones_deleted_at', table_name='administraciones', schema='app')
+    op.drop_index('ix_app_administraciones_created_by_id', table_name='administraciones', schema='app')
+    op.drop_index('ix_app_administraciones_updated_by_id', table_name='administraciones', schema='app')
+    op.drop_index('ix_app_administraciones_deleted_by_id', table_name='administraciones', schema='app')
+    op.drop_index('ix_app_agencias_inmobiliarias_deleted_at', table_name='agencias_inmobiliarias', schema='app')
+    op.drop_index('ix_app_agencias_inmobiliarias_created_by_id', table_name='agencias_inmobiliarias', schema='app')
+    op.drop_index('ix_app_agencias_inmobiliarias_updated_by_id', table_name='agencias_inmobiliarias', schema='app')
+    op.drop_index('ix_app_agencias_inmobiliarias_deleted_by_id', table_name='agencias_inmobiliarias', schema='app')
+    op.drop_index('ix_app_colegios_profesionales_deleted_at', table_name='colegios_profesionales', schema='app')
+    op.drop_index('ix_app_colegios_profesionales_created_by_id', table_name='colegios_profesionales', schema='app')
+    op.drop_index('ix_app_colegios_profesionales_updated_by_id', table_name='colegios_profesionales', schema='app')
+    op.drop_index('ix_app_colegios_profesionales_deleted_by_id', table_name='colegios_profesionales', schema='app')
+    op.drop_index('ix_app_diocesis_deleted_at', table_name='diocesis', schema='app')
+    op.drop_index('ix_app_diocesis_created_by_id', table_name='diocesis', schema='app')
+    op.drop_index('ix_app_diocesis_updated_by_id', table_name='diocesis', schema='app')
+    op.drop_index('ix_app_diocesis_deleted_by_id', table_name='diocesis', schema='app')
+    op.drop_index('ix_app_entidades_religiosas_deleted_at', table_name='entidades_religiosas', schema='app')
+    op.drop_index('ix_app_entidades_religiosas_created_by_id', table_name='entidades_religiosas', schema='app')
+    op.drop_index('ix_app_entidades_religiosas_updated_by_id', table_name='entidades_religiosas', schema='app')
+    op.drop_index('ix_app_entidades_religiosas_deleted_by_id', table_name='entidades_religiosas', schema='app')
+    op.drop_index('ix_app_notarias_deleted_at', table_name='notarias', schema='app')
+    op.drop_index('ix_app_notarias_created_by_id', table_name='notarias', schema='app')
+    op.drop_index('ix_app_notarias_updated_by_id', table_name='notarias', schema='app')
+    op.drop_index('ix_app_notarias_deleted_by_id', table_name='notarias', schema='app')
+    op.drop_index('ix_app_privados_deleted_at', table_name='privados', schema='app')
+    op.drop_index('ix_app_privados_created_by_id', table_name='privados', schema='app')
+    op.drop_index('ix_app_privados_updated_by_id', table_name='privados', schema='app')
+    op.drop_index('ix_app_privados_deleted_by_id', table_name='privados', schema='app')
+    op.drop_index('ix_app_registros_propiedad_deleted_at', table_name='registros_propiedad', schema='app')
+    op.drop_index('ix_app_registros_propiedad_created_by_id', table_name='registros_propiedad', schema='app')
+    op.drop_index('ix_app_registros_propiedad_updated_by_id', table_name='registros_propiedad', schema='app')
+    op.drop_index('ix_app_registros_propiedad_deleted_by_id', table_name='registros_propiedad', schema='app')
+    op.drop_index('ix_app_administraciones_titulares_deleted_at', table_name='administraciones_titulares', schema='app')
+    op.drop_index('ix_app_administraciones_titulares_created_by_id', table_name='administraciones_titulares', schema='app')
+    op.drop_index('ix_app_administraciones_titulares_updated_by_id', table_name='administraciones_titulares', schema='app')
+    op.drop_index('ix_app_administraciones_titulares_deleted_by_id', table_name='administraciones_titulares', schema='app')
+    op.drop_index('ix_app_diocesis_titulares_deleted_at', table_name='diocesis_titulares', schema='app')
+    op.drop_index('ix_app_diocesis_titulares_created_by_id', table_name='diocesis_titulares', schema='app')
+    op.drop_index('ix_app_diocesis_titulares_updated_by_id', table_name='diocesis_titulares', schema='app')
+    op.drop_index('ix_app_diocesis_titulares_deleted_by_id', table_name='diocesis_titulares', schema='app')
+    op.drop_index('ix_app_entidades_religiosas_titulares_deleted_at', table_name='entidades_religiosas_titulares', schema='app')
+    op.drop_index('ix_app_entidades_religiosas_titulares_created_by_id', table_name='entidades_religiosas_titulares', schema='app')
+    op.drop_index('ix_app_entidades_religiosas_titulares_updated_by_id', table_name='entidades_religiosas_titulares', schema='app')
+    op.drop_index('ix_app_entidades_religiosas_titulares_deleted_by_id', table_name='entidades_religiosas_titulares', schema='app')
+    op.drop_index('ix_app_inmuebles_created_by_id', table_name='inmuebles', schema='app')
+    op.drop_index('ix_app_inmuebles_updated_by_id', table_name='inmuebles', schema='app')
+    op.drop_index('ix_app_inmuebles_deleted_by_id', table_name='inmuebles', schema='app')
+    op.drop_index('ix_app_notarias_titulares_deleted_at', table_name='notarias_titulares', schema='app')
+    op.drop_index('ix_app_notarias_titulares_created_by_id', table_name='notarias_titulares', schema='app')
+    op.drop_index('ix_app_notarias_titulares_updated_by_id', table_name='notarias_titulares', schema='app')
+    op.drop_index('ix_app_notarias_titulares_deleted_by_id', table_name='notarias_titulares', schema='app')
+    op.drop_index('ix_app_registros_propiedad_titulares_deleted_at', table_name='registros_propiedad_titulares', schema='app')
+    op.drop_index('ix_app_registros_propiedad_titulares_created_by_id', table_name='registros_propiedad_titulares', schema='app')
+    op.drop_index('ix_app_registros_propiedad_titulares_updated_by_id', table_name='registros_propiedad_titulares', schema='app')
+    op.drop_index('ix_app_registros_propiedad_titulares_deleted_by_id', table_name='registros_propiedad_titulares', schema='app')
+    op.drop_index('ix_app_tecnicos_deleted_at', table_name='tecnicos', schema='app')
+    op.drop_index('ix_app_tecnicos_created_by_id', table_name='tecnicos', schema='app')
+    op.drop_index('ix_app_tecnicos_updated_by_id', table_name='tecnicos', schema='app')
+    op.drop_index('ix_app_tecnicos_deleted_by_id', table_name='tecnicos', schema='app')
+    op.drop_index('ix_app_citas_bibliograficas_deleted_at', table_name='citas_bibliograficas', schema='app')
+    op.drop_index('ix_app_citas_bibliograficas_created_by_id', table_name='citas_bibliograficas', schema='app')
+    op.drop_index('ix_app_citas_bibliograficas_updated_by_id', table_name='citas_bibliograficas', schema='app')
+    op.drop_index('ix_app_citas_bibliograficas_deleted_by_id', table_name='citas_bibliograficas', schema='app')
+    op.drop_index('ix_app_inmatriculaciones_deleted_at', table_name='inmatriculaciones', schema='app')
+    op.drop_index('ix_app_inmatriculaciones_created_by_id', table_name='inmatriculaciones', schema='app')
+    op.drop_index('ix_app_inmatriculaciones_updated_by_id', table_name='inmatriculaciones', schema='app')
+    op.drop_index('ix_app_inmatriculaciones_deleted_by_id', table_name='inmatriculaciones', schema='app')
+    op.drop_index('ix_app_inmuebles_denominaciones_created_by_id', table_name='inmuebles_denominaciones', schema='app')
+    op.drop_index('ix_app_inmuebles_denominaciones_updated_by_id', table_name='inmuebles_denominaciones', schema='app')
+    op.drop_index('ix_app_inmuebles_denominaciones_deleted_by_id', table_name='inmuebles_denominaciones', schema='app')
+    op.drop_index('ix_app_inmuebles_documentos_deleted_at', table_name='inmuebles_documentos', schema='app')
+    op.drop_index('ix_app_inmuebles_documentos_created_by_id', table_name='inmuebles_documentos', schema='app')
+    op.drop_index('ix_app_inmuebles_documentos_updated_by_id', table_name='inmuebles_documentos', schema='app')
+    op.drop_index('ix_app_inmuebles_documentos_deleted_by_id', table_name='inmuebles_documentos', schema='app')
+    op.drop_index('ix_app_inmuebles_niveles_proteccion_deleted_at', table_name='inmuebles_niveles_proteccion', schema='app')
+    op.drop_index('ix_app_inmuebles_niveles_proteccion_created_by_id', table_name='inmuebles_niveles_proteccion', schema='app')
+    op.drop_index('ix_app_inmuebles_niveles_proteccion_updated_by_id', table_name='inmuebles_niveles_proteccion', schema='app')
+    op.drop_index('ix_app_inmuebles_niveles_proteccion_deleted_by_id', table_name='inmuebles_niveles_proteccion', schema='app')
+    op.drop_index('ix_app_inmuebles_osm_ext_deleted_at', table_name='inmuebles_osm_ext', schema='app')
+    op.drop_index('ix_app_inmuebles_osm_ext_created_by_id', table_name='inmuebles_osm_ext', schema='app')
+    op.drop_index('ix_app_inmuebles_osm_ext_updated_by_id', table_name='inmuebles_osm_ext', schema='app')
+    op.drop_index('ix_app_inmuebles_osm_ext_deleted_by_id', table_name='inmuebles_osm_ext', schema='app')
+    op.drop_index('ix_app_inmuebles_usos_deleted_at', table_name='inmuebles_usos', schema='app')
+    op.drop_index('ix_app_inmuebles_usos_created_by_id', table_name='inmuebles_usos', schema='app')
+    op.drop_index('ix_app_inmuebles_usos_updated_by_id', table_name='inmuebles_usos', schema='app')
+    op.drop_index('ix_app_inmuebles_usos_deleted_by_id', table_name='inmuebles_usos', schema='app')
+    op.drop_index('ix_app_inmuebles_wd_ext_deleted_at', table_name='inmuebles_wd_ext', schema='app')
+    op.drop_index('ix_app_inmuebles_wd_ext_created_by_id', table_name='inmuebles_wd_ext', schema='app')
+    op.drop_index('ix_app_inmuebles_wd_ext_updated_by_id', table_name='inmuebles_wd_ext', schema='app')
+    op.drop_index('ix_app_inmuebles_wd_ext_deleted_by_id', table_name='inmuebles_wd_ext', schema='app')
+    op.drop_index('ix_app_intervenciones_deleted_at', table_name='intervenciones', schema='app')
+    op.drop_index('ix_app_intervenciones_created_by_id', table_name='intervenciones', schema='app')
+    op.drop_index('ix_app_intervenciones_updated_by_id', table_name='intervenciones', schema='app')
+    op.drop_index('ix_app_intervenciones_deleted_by_id', table_name='intervenciones', schema='app')
+    op.drop_index('ix_app_portals_detecciones_deleted_at', table_name='portals_detecciones', schema='app')
+    op.drop_index('ix_app_portals_detecciones_created_by_id', table_name='portals_detecciones', schema='app')
+    op.drop_index('ix_app_portals_detecciones_updated_by_id', table_name='portals_detecciones', schema='app')
+    op.drop_index('ix_app_portals_detecciones_deleted_by_id', table_name='portals_detecciones', schema='app')
+    op.drop_index('ix_app_transmisiones_deleted_at', table_name='transmisiones', schema='app')
+    op.drop_index('ix_app_transmisiones_created_by_id', table_name='transmisiones', schema='app')
+    op.drop_index('ix_app_transmisiones_updated_by_id', table_name='transmisiones', schema='app')
+    op.drop_index('ix_app_transmisiones_deleted_by_id', table_name='transmisiones', schema='app')
+    op.drop_index('ix_app_intervenciones_subvenciones_deleted_at', table_name='intervenciones_subvenciones', schema='app')
+    op.drop_index('ix_app_intervenciones_subvenciones_created_by_id', table_name='intervenciones_subvenciones', schema='app')
+    op.drop_index('ix_app_intervenciones_subvenciones_updated_by_id', table_name='intervenciones_subvenciones', schema='app')
+    op.drop_index('ix_app_intervenciones_subvenciones_deleted_by_id', table_name='intervenciones_subvenciones', schema='app')
+    op.drop_index('ix_app_intervenciones_tecnicos_deleted_at', table_name='intervenciones_tecnicos', schema='app')
+    op.drop_index('ix_app_intervenciones_tecnicos_created_by_id', table_name='intervenciones_tecnicos', schema='app')
+    op.drop_index('ix_app_intervenciones_tecnicos_updated_by_id', table_name='intervenciones_tecnicos', schema='app')
+    op.drop_index('ix_app_intervenciones_tecnicos_deleted_by_id', table_name='intervenciones_tecnicos', schema='app')
+    op.drop_index('ix_app_transmision_anunciantes_deleted_at', table_name='transmision_anunciantes', schema='app')
+    op.drop_index('ix_app_transmision_anunciantes_created_by_id', table_name='transmision_anunciantes', schema='app')
+    op.drop_index('ix_app_transmision_anunciantes_updated_by_id', table_name='transmision_anunciantes', schema='app')
+    op.drop_index('ix_app_transmision_anunciantes_deleted_by_id', table_name='transmision_anunciantes', schema='app')
+    op.drop_index('ix_app_subvenciones_administraciones_deleted_at', table_name='subvenciones_administraciones', schema='app')
+    op.drop_index('ix_app_subvenciones_administraciones_created_by_id', table_name='subvenciones_administraciones', schema='app')
+    op.drop_index('ix_app_subvenciones_administraciones_updated_by_id', table_name='subvenciones_administraciones', schema='app')
+    op.drop_index('ix_app_subvenciones_administraciones_deleted_by_id', table_name='subvenciones_administraciones', schema='app')
+
+
+def downgrade() -> None:
+    op.execute('CREATE INDEX ix_app_subvenciones_administraciones_deleted_by_id ON app.subvenciones_administraciones USING btree (deleted_by_id)')
+    op.execute('CREATE INDEX ix_app_subvenciones_administraciones_updated_by_id ON app.subvenciones_administraciones USING btree (updated_by_id)')
+    op.execute('CREATE INDEX ix_app_subvenciones_administraciones_created_by_id ON app.subvenciones_administraciones USING btree (created_by_id)')
+    op.execute('CREATE INDEX ix_app_subvenciones_administraciones_deleted_at ON app.subvenciones_administraciones USING btree (deleted_at)')
+    op.execute('CREATE INDEX ix_app_transmision_anunciantes_deleted_by_id ON app.transmision_anunciantes USING btree (deleted_by_id)')
+    op.execute('CREATE INDEX ix_app_transmision_anunciantes_updated_by_id ON app.transmision_anunciantes USING btree (updated_by_id)')
+    op.execute('CREATE INDEX ix_app_transmision_anunciantes_created_by_id ON app.transmision_anunciantes USING btree (created_by_id)')
+    op.execute('CREATE INDEX ix_app_transmision_anunciantes_deleted_at ON app.transmision_anunciantes USING btree (deleted_at)')
+    op.execute('CREATE INDEX ix_app_intervenciones_tecnicos_deleted_by_id ON app.intervenciones_tecnicos USING btree (deleted_by_id)')
+    op.execute('CREATE INDEX ix_app_intervenciones_tecnicos_updated_by_id ON app.intervenciones_tecnicos USING btree (updated_by_id)')
+    op.execute('CREATE INDEX ix_app_intervenciones_tecnicos_created_by_id ON app.intervenciones_tecnicos USING btree (created_by_id)')
+    op.execute('CREATE INDEX ix_app_intervenciones_tecnicos_deleted_at ON app.intervenciones_tecnicos USING btree (deleted_at)')
+    op.execute('CREATE INDEX ix_app_intervenciones_subvenciones_deleted_by_id ON app.intervenciones_subvenciones USING btree (deleted_by_id)')
+    op.execute('CREATE INDEX ix_app_intervenciones_subvenciones_updated_by_id ON app.intervenciones_subvenciones USING btree (updated_by_id)')
+    op.execute('CREATE INDEX ix_app_intervenciones_subvenciones_created_by_id ON app.intervenciones_subvenciones USING btree (created_by_id)')
+    op.execute('CREATE INDEX ix_app_intervenciones_subvenciones_deleted_at ON app.intervenciones_subvenciones USING btree (deleted_at)')
+    op.execute('CREATE INDEX ix_app_transmisiones_deleted_by_id ON app.transmisiones USING btree (deleted_by_id)')
+    op.execute('CREATE INDEX ix_app_transmisiones_updated_by_id ON app.transmisiones USING btree (updated_by_id)')
+    op.execute('CREATE INDEX ix_app_transmisiones_created_by_id ON app.transmisiones USING btree (created_by_id)')
+    op.execute('CREATE INDEX ix_app_transmisiones_deleted_at ON app.transmisiones USING btree (deleted_at)')
+    op.execute('CREATE INDEX ix_app_portals_detecciones_deleted_by_id ON app.portals_detecciones USING btree (deleted_by_id)')
+    op.execute('CREATE INDEX ix_app_portals_detecciones_updated_by_id ON app.portals_detecciones USING btree (updated_by_id)')
+    op.execute('CREATE INDEX ix_app_portals_detecciones_created_by_id ON app.portals_detecciones USING btree (created_by_id)')
+    op.execute('CREATE INDEX ix_app_portals_detecciones_deleted_at ON app.portals_detecciones USING btree (deleted_at)')
+    op.execute('CREATE INDEX ix_app_intervenciones_deleted_by_id ON app.intervenciones USING btree (deleted_by_id)')
+    op.execute('CREATE INDEX ix_app_intervenciones_updated_by_id ON app.intervenciones USING btree (updated_by_id)')
+    op.execute('CREATE INDEX ix_app_intervenciones_created_by_id ON app.intervenciones USING btree (created_by_id)')
+    op.execute('CREATE INDEX ix_app_intervenciones_deleted_at ON app.intervenciones USING btree (deleted_at)')
+    op.execute('CREATE INDEX ix_app_inmuebles_wd_ext_deleted_by_id ON app.inmuebles_wd_ext USING btree (deleted_by_id)')
+    op.execute('CREATE INDEX ix_app_inmuebles_wd_ext_updated_by_id ON app.inmuebles_wd_ext USING btree (updated_by_id)')
+    op.execute('CREATE INDEX ix_app_inmuebles_wd_ext_created_by_id ON app.inmuebles_wd_ext USING btree (created_by_id)')
+    op.execute('CREATE INDEX ix_app_inmuebles_wd_ext_deleted_at ON app.inmuebles_wd_ext USING btree (deleted_at)')
+    op.execute('CREATE INDEX ix_app_inmuebles_usos_deleted_by_id ON app.inmuebles_usos USING btree (deleted_by_id)')
+    op.execute('CREATE INDEX ix_app_inmuebles_usos_updated_by_id ON app.inmuebles_usos USING btree (updated_by_id)')
+    op.execute('CREATE INDEX ix_app_inmuebles_usos_created_by_id ON app.inmuebles_usos USING btree (created_by_id)')
+    op.execute('CREATE INDEX ix_app_inmuebles_usos_deleted_at ON app.inmuebles_usos USING btree (deleted_at)')
+    op.execute('CREATE INDEX ix_app_inmuebles_osm_ext_deleted_by_id ON app.inmuebles_osm_ext USING btree (deleted_by_id)')
+    op.execute('CREATE INDEX ix_app_inmuebles_osm_ext_updated_by_id ON app.inmuebles_osm_ext USING btree (updated_by_id)')
+    op.execute('CREATE INDEX ix_app_inmuebles_osm_ext_created_by_id ON app.inmuebles_osm_ext USING btree (created_by_id)')
+    op.execute('CREATE INDEX ix_app_inmuebles_osm_ext_deleted_at ON app.inmuebles_osm_ext USING btree (deleted_at)')
+    op.execute('CREATE INDEX ix_app_inmuebles_niveles_proteccion_deleted_by_id ON app.inmuebles_niveles_proteccion USING btree (deleted_by_id)')
+    op.execute('CREATE INDEX ix_app_inmuebles_niveles_proteccion_updated_by_id ON app.inmuebles_niveles_proteccion USING btree (updated_by_id)')
+    op.execute('CREATE INDEX ix_app_inmuebles_niveles_proteccion_created_by_id ON app.inmuebles_niveles_proteccion USING btree (created_by_id)')
+    op.execute('CREATE INDEX ix_app_inmuebles_niveles_proteccion_deleted_at ON app.inmuebles_niveles_proteccion USING btree (deleted_at)')
+    op.execute('CREATE INDEX ix_app_inmuebles_documentos_deleted_by_id ON app.inmuebles_documentos USING btree (deleted_by_id)')
+    op.execute('CREATE INDEX ix_app_inmuebles_documentos_updated_by_id ON app.inmuebles_documentos USING btree (updated_by_id)')
+    op.execute('CREATE INDEX ix_app_inmuebles_documentos_created_by_id ON app.inmuebles_documentos USING btree (created_by_id)')
+    op.execute('CREATE INDEX ix_app_inmuebles_documentos_deleted_at ON app.inmuebles_documentos USING btree (deleted_at)')
+    op.execute('CREATE INDEX ix_app_inmuebles_denominaciones_deleted_by_id ON app.inmuebles_denominaciones USING btree (deleted_by_id)')
+    op.execute('CREATE INDEX ix_app_inmuebles_denominaciones_updated_by_id ON app.inmuebles_denominaciones USING btree (updated_by_id)')
+    op.execute('CREATE INDEX ix_app_inmuebles_denominaciones_created_by_id ON app.inmuebles_denominaciones USING btree (created_by_id)')
+    op.execute('CREATE INDEX ix_app_inmatriculaciones_deleted_by_id ON app.inmatriculaciones USING btree (deleted_by_id)')
+    op.execute('CREATE INDEX ix_app_inmatriculaciones_updated_by_id ON app.inmatriculaciones USING btree (updated_by_id)')
+    op.execute('CREATE INDEX ix_app_inmatriculaciones_created_by_id ON app.inmatriculaciones USING btree (created_by_id)')
+    op.execute('CREATE INDEX ix_app_inmatriculaciones_deleted_at ON app.inmatriculaciones USING btree (deleted_at)')
+    op.execute('CREATE INDEX ix_app_citas_bibliograficas_deleted_by_id ON app.citas_bibliograficas USING btree (deleted_by_id)')
+    op.execute('CREATE INDEX ix_app_citas_bibliograficas_updated_by_id ON app.citas_bibliograficas USING btree (updated_by_id)')
+    op.execute('CREATE INDEX ix_app_citas_bibliograficas_created_by_id ON app.citas_bibliograficas USING btree (created_by_id)')
+    op.execute('CREATE INDEX ix_app_citas_bibliograficas_deleted_at ON app.citas_bibliograficas USING btree (deleted_at)')
+    op.execute('CREATE INDEX ix_app_tecnicos_deleted_by_id ON app.tecnicos USING btree (deleted_by_id)')
+    op.execute('CREATE INDEX ix_app_tecnicos_updated_by_id ON app.tecnicos USING btree (updated_by_id)')
+    op.execute('CREATE INDEX ix_app_tecnicos_created_by_id ON app.tecnicos USING btree (created_by_id)')
+    op.execute('CREATE INDEX ix_app_tecnicos_deleted_at ON app.tecnicos USING btree (deleted_at)')
+    op.execute('CREATE INDEX ix_app_registros_propiedad_titulares_deleted_by_id ON app.registros_propiedad_titulares USING btree (deleted_by_id)')
+    op.execute('CREATE INDEX ix_app_registros_propiedad_titulares_updated_by_id ON app.registros_propiedad_titulares USING btree (updated_by_id)')
+    op.execute('CREATE INDEX ix_app_registros_propiedad_titulares_created_by_id ON app.registros_propiedad_titulares USING btree (created_by_id)')
+    op.execute('CREATE INDEX ix_app_registros_propiedad_titulares_deleted_at ON app.registros_propiedad_titulares USING btree (deleted_at)')
+    op.execute('CREATE INDEX ix_app_notarias_titulares_deleted_by_id ON app.notarias_titulares USING btree (deleted_by_id)')
+    op.execute('CREATE INDEX ix_app_notarias_titulares_updated_by_id ON app.notarias_titulares USING btree (updated_by_id)')
+    op.execute('CREATE INDEX ix_app_notarias_titulares_created_by_id ON app.notarias_titulares USING btree (created_by_id)')
+    op.execute('CREATE INDEX ix_app_notarias_titulares_deleted_at ON app.notarias_titulares USING btree (deleted_at)')
+    op.execute('CREATE INDEX ix_app_inmuebles_deleted_by_id ON app.inmuebles USING btree (deleted_by_id)')
+    op.execute('CREATE INDEX ix_app_inmuebles_updated_by_id ON app.inmuebles USING btree (updated_by_id)')
+    op.execute('CREATE INDEX ix_app_inmuebles_created_by_id ON app.inmuebles USING btree (created_by_id)')
+    op.execute('CREATE INDEX ix_app_entidades_religiosas_titulares_deleted_by_id ON app.entidades_religiosas_titulares USING btree (deleted_by_id)')
+    op.execute('CREATE INDEX ix_app_entidades_religiosas_titulares_updated_by_id ON app.entidades_religiosas_titulares USING btree (updated_by_id)')
+    op.execute('CREATE INDEX ix_app_entidades_religiosas_titulares_created_by_id ON app.entidades_religiosas_titulares USING btree (created_by_id)')
+    op.execute('CREATE INDEX ix_app_entidades_religiosas_titulares_deleted_at ON app.entidades_religiosas_titulares USING btree (deleted_at)')
+    op.execute('CREATE INDEX ix_app_diocesis_titulares_deleted_by_id ON app.diocesis_titulares USING btree (deleted_by_id)')
+    op.execute('CREATE INDEX ix_app_diocesis_titulares_updated_by_id ON app.diocesis_titulares USING btree (updated_by_id)')
+    op.execute('CREATE INDEX ix_app_diocesis_titulares_created_by_id ON app.diocesis_titulares USING btree (created_by_id)')
+    op.execute('CREATE INDEX ix_app_diocesis_titulares_deleted_at ON app.diocesis_titulares USING btree (deleted_at)')
+    op.execute('CREATE INDEX ix_app_administraciones_titulares_deleted_by_id ON app.administraciones_titulares USING btree (deleted_by_id)')
+    op.execute('CREATE INDEX ix_app_administraciones_titulares_updated_by_id ON app.administraciones_titulares USING btree (updated_by_id)')
+    op.execute('CREATE INDEX ix_app_administraciones_titulares_created_by_id ON app.administraciones_titulares USING btree (created_by_id)')
+    op.execute('CREATE INDEX ix_app_administraciones_titulares_deleted_at ON app.administraciones_titulares USING btree (deleted_at)')
+    op.execute('CREATE INDEX ix_app_registros_propiedad_deleted_by_id ON app.registros_propiedad USING btree (deleted_by_id)')
+    op.execute('CREATE INDEX ix_app_registros_propiedad_updated_by_id ON app.registros_propiedad USING btree (updated_by_id)')
+    op.execute('CREATE INDEX ix_app_registros_propiedad_created_by_id ON app.registros_propiedad USING btree (created_by_id)')
+    op.execute('CREATE INDEX ix_app_registros_propiedad_deleted_at ON app.registros_propiedad USING btree (deleted_at)')
+    op.execute('CREATE INDEX ix_app_privados_deleted_by_id ON app.privados USING btree (deleted_by_id)')
+    op.execute('CREATE INDEX ix_app_privados_updated_by_id ON app.privados USING btree (updated_by_id)')
+    op.execute('CREATE INDEX ix_app_privados_created_by_id ON app.privados USING btree (created_by_id)')
+    op.execute('CREATE INDEX ix_app_privados_deleted_at ON app.privados USING btree (deleted_at)')
+    op.execute('CREATE INDEX ix_app_notarias_deleted_by_id ON app.notarias USING btree (deleted_by_id)')
+    op.execute('CREATE INDEX ix_app_notarias_updated_by_id ON app.notarias USING btree (updated_by_id)')
+    op.execute('CREATE INDEX ix_app_notarias_created_by_id ON app.notarias USING btree (created_by_id)')
+    op.execute('CREATE INDEX ix_app_notarias_deleted_at ON app.notarias USING btree (deleted_at)')
+    op.execute('CREATE INDEX ix_app_entidades_religiosas_deleted_by_id ON app.entidades_religiosas USING btree (deleted_by_id)')
+    op.execute('CREATE INDEX ix_app_entidades_religiosas_updated_by_id ON app.entidades_religiosas USING btree (updated_by_id)')
+    op.execute('CREATE INDEX ix_app_entidades_religiosas_created_by_id ON app.entidades_religiosas USING btree (created_by_id)')
+    op.execute('CREATE INDEX ix_app_entidades_religiosas_deleted_at ON app.entidades_religiosas USING btree (deleted_at)')
+    op.execute('CREATE INDEX ix_app_diocesis_deleted_by_id ON app.diocesis USING btree (deleted_by_id)')
+    op.execute('CREATE INDEX ix_app_diocesis_updated_by_id ON app.diocesis USING btree (updated_by_id)')
+    op.execute('CREATE INDEX ix_app_diocesis_created_by_id ON app.diocesis USING btree (created_by_id)')
+    op.execute('CREATE INDEX ix_app_diocesis_deleted_at ON app.diocesis USING btree (deleted_at)')
+    op.execute('CREATE INDEX ix_app_colegios_profesionales_deleted_by_id ON app.colegios_profesionales USING btree (deleted_by_id)')
+    op.execute('CREATE INDEX ix_app_colegios_profesionales_updated_by_id ON app.colegios_profesionales USING btree (updated_by_id)')
+    op.execute('CREATE INDEX ix_app_colegios_profesionales_created_by_id ON app.colegios_profesionales USING btree (created_by_id)')
+    op.execute('CREATE INDEX ix_app_colegios_profesionales_deleted_at ON app.colegios_profesionales USING btree (deleted_at)')
+    op.execute('CREATE INDEX ix_app_agencias_inmobiliarias_deleted_by_id ON app.agencias_inmobiliarias USING btree (deleted_by_id)')
+    op.execute('CREATE INDEX ix_app_agencias_inmobiliarias_updated_by_id ON app.agencias_inmobiliarias USING btree (updated_by_id)')
+    op.execute('CREATE INDEX ix_app_agencias_inmobiliarias_created_by_id ON app.agencias_inmobiliarias USING btree (created_by_id)')
+    op.execute('CREATE INDEX ix_app_agencias_inmobiliarias_deleted_at ON app.agencias_inmobiliarias USING btree (deleted_at)')
+    op.execute('CREATE INDEX ix_app_administraciones_deleted_by_id ON app.administraciones USING btree (deleted_by_id)')
+    op.execute('CREATE INDEX ix_app_administraciones_updated_by_id ON app.administraciones USING btree (updated_by_id)')
+    op.execute('CREATE INDEX ix_app_administraciones_created_by_id ON app.administraciones USING btree (created_by_id)')
+    op.execute('CREATE INDEX ix_app_administraciones_deleted_at ON app.administraciones USING btree (deleted_at)')
+    op.execute('CREATE INDEX ix_app_municipios_deleted_by_id ON app.municipios USING btree (deleted_by_id)')
+    op.execute('CREATE INDEX ix_app_municipios_updated_by_id ON app.municipios USING btree (updated_by_id)')
+    op.execute('CREATE INDEX ix_app_municipios_created_by_id ON app.municipios USING btree (created_by_id)')
+    op.execute('CREATE INDEX ix_app_municipios_deleted_at ON app.municipios USING btree (deleted_at)')
+    op.execute('CREATE INDEX ix_app_documentos_deleted_by_id ON app.documentos USING btree (deleted_by_id)')
+    op.execute('CREATE INDEX ix_app_documentos_updated_by_id ON app.documentos USING btree (updated_by_id)')
+    op.execute('CREATE INDEX ix_app_documentos_created_by_id ON app.documentos USING btree (created_by_id)')
+    op.execute('CREATE INDEX ix_app_documentos_deleted_at ON app.documentos USING btree (deleted_at)')
+    op.execute('CREATE INDEX ix_app_tipos_figura_proteccion_deleted_by_id ON app.tipos_figura_proteccion USING btree (deleted_by_id)')
+    op.execute('CREATE INDEX ix_app_tipos_figura_proteccion_updated_by_id ON app.tipos_figura_proteccion USING btree (updated_by_id)')
+    op.execute('CREATE INDEX ix_app_tipos_figura_proteccion_created_by_id ON app.tipos_figura_proteccion USING btree (created_by_id)')
+    op.execute('CREATE INDEX ix_app_tipos_figura_proteccion_deleted_at ON app.tipos_figura_proteccion USING btree (deleted_at)')
+    op.execute('CREATE INDEX ix_app_provincias_deleted_by_id ON app.provincias USING btree (deleted_by_id)')
+    op.execute('CREATE INDEX ix_app_provincias_updated_by_id ON app.provincias USING btree (updated_by_id)')
+    op.execute('CREATE INDEX ix_app_provincias_created_by_id ON app.provincias USING btree (created_by_id)')
+    op.execute('CREATE INDEX ix_app_provincias_deleted_at ON app.provincias USING btree (deleted_at)')
+    op.execute('CREATE INDEX ix_app_fuentes_documentales_deleted_by_id ON app.fuentes_documentales USING btree (deleted_by_id)')
+    op.execute('CREATE INDEX ix_app_fuentes_documentales_updated_by_id ON app.fuentes_documentales USING btree (updated_by_id)')
+    op.execute('CREATE INDEX ix_app_fuentes_documentales_created_by_id ON app.fuentes_documentales USING btree (created_by_id)')
+    op.execute('CREATE INDEX ix_app_fuentes_documentales_deleted_at ON app.fuentes_documentales USING btree (deleted_at)')
+    op.execute('CREATE INDEX ix_app_tipos_via_deleted_by_id ON app.tipos_via USING btree (deleted_by_id)')
+    op.execute('CREATE INDEX ix_app_tipos_via_updated_by_id ON app.tipos_via USING btree (updated_by_id)')
+    op.execute('CREATE INDEX ix_app_tipos_via_created_by_id ON app.tipos_via USING btree (created_by_id)')
+    op.execute('CREATE INDEX ix_app_tipos_via_deleted_at ON app.tipos_via USING btree (deleted_at)')
+    op.execute('CREATE INDEX ix_app_tipos_uso_inmueble_deleted_by_id ON app.tipos_uso_inmueble USING btree (deleted_by_id)')
+    op.execute('CREATE INDEX ix_app_tipos_uso_inmueble_updated_by_id ON app.tipos_uso_inmueble USING btree (updated_by_id)')
+    op.execute('CREATE INDEX ix_app_tipos_uso_inmueble_created_by_id ON app.tipos_uso_inmueble USING btree (created_by_id)')
+    op.execute('CREATE INDEX ix_app_tipos_uso_inmueble_deleted_at ON app.tipos_uso_inmueble USING btree (deleted_at)')
+    op.execute('CREATE INDEX ix_app_tipos_transmision_deleted_by_id ON app.tipos_transmision USING btree (deleted_by_id)')
+    op.execute('CREATE INDEX ix_app_tipos_transmision_updated_by_id ON app.tipos_transmision USING btree (updated_by_id)')
+    op.execute('CREATE INDEX ix_app_tipos_transmision_created_by_id ON app.tipos_transmision USING btree (created_by_id)')
+    op.execute('CREATE INDEX ix_app_tipos_transmision_deleted_at ON app.tipos_transmision USING btree (deleted_at)')
+    op.execute('CREATE INDEX ix_app_tipos_titulo_propiedad_deleted_by_id ON app.tipos_titulo_propiedad USING btree (deleted_by_id)')
+    op.execute('CREATE INDEX ix_app_tipos_titulo_propiedad_updated_by_id ON app.tipos_titulo_propiedad USING btree (updated_by_id)')
+    op.execute('CREATE INDEX ix_app_tipos_titulo_propiedad_created_by_id ON app.tipos_titulo_propiedad USING btree (created_by_id)')
+    op.execute('CREATE INDEX ix_app_tipos_titulo_propiedad_deleted_at ON app.tipos_titulo_propiedad USING btree (deleted_at)')
+    op.execute('CREATE INDEX ix_app_tipos_persona_deleted_by_id ON app.tipos_persona USING btree (deleted_by_id)')
+    op.execute('CREATE INDEX ix_app_tipos_persona_updated_by_id ON app.tipos_persona USING btree (updated_by_id)')
+    op.execute('CREATE INDEX ix_app_tipos_persona_created_by_id ON app.tipos_persona USING btree (created_by_id)')
+    op.execute('CREATE INDEX ix_app_tipos_persona_deleted_at ON app.tipos_persona USING btree (deleted_at)')
+    op.execute('CREATE INDEX ix_app_tipos_mime_documento_deleted_by_id ON app.tipos_mime_documento USING btree (deleted_by_id)')
+    op.execute('CREATE INDEX ix_app_tipos_mime_documento_updated_by_id ON app.tipos_mime_documento USING btree (updated_by_id)')
+    op.execute('CREATE INDEX ix_app_tipos_mime_documento_created_by_id ON app.tipos_mime_documento USING btree (created_by_id)')
+    op.execute('CREATE INDEX ix_app_tipos_mime_documento_deleted_at ON app.tipos_mime_documento USING btree (deleted_at)')
+    op.execute('CREATE INDEX ix_app_tipos_licencia_deleted_by_id ON app.tipos_licencia USING btree (deleted_by_id)')
+    op.execute('CREATE INDEX ix_app_tipos_licencia_updated_by_id ON app.tipos_licencia USING btree (updated_by_id)')
+    op.execute('CREATE INDEX ix_app_tipos_licencia_created_by_id ON app.tipos_licencia USING btree (created_by_id)')
+    op.execute('CREATE INDEX ix_app_tipos_licencia_deleted_at ON app.tipos_licencia USING btree (deleted_at)')
+    op.execute('CREATE INDEX ix_app_tipos_inmueble_deleted_by_id ON app.tipos_inmueble USING btree (deleted_by_id)')
+    op.execute('CREATE INDEX ix_app_tipos_inmueble_updated_by_id ON app.tipos_inmueble USING btree (updated_by_id)')
+    op.execute('CREATE INDEX ix_app_tipos_inmueble_created_by_id ON app.tipos_inmueble USING btree (created_by_id)')
+    op.execute('CREATE INDEX ix_app_tipos_inmueble_deleted_at ON app.tipos_inmueble USING btree (deleted_at)')
+    op.execute('CREATE INDEX ix_app_tipos_entidad_religiosa_deleted_by_id ON app.tipos_entidad_religiosa USING btree (deleted_by_id)')
+    op.execute('CREATE INDEX ix_app_tipos_entidad_religiosa_updated_by_id ON app.tipos_entidad_religiosa USING btree (updated_by_id)')
+    op.execute('CREATE INDEX ix_app_tipos_entidad_religiosa_created_by_id ON app.tipos_entidad_religiosa USING btree (created_by_id)')
+    op.execute('CREATE INDEX ix_app_tipos_entidad_religiosa_deleted_at ON app.tipos_entidad_religiosa USING btree (deleted_at)')
+    op.execute('CREATE INDEX ix_app_tipos_documento_deleted_by_id ON app.tipos_documento USING btree (deleted_by_id)')
+    op.execute('CREATE INDEX ix_app_tipos_documento_updated_by_id ON app.tipos_documento USING btree (updated_by_id)')
+    op.execute('CREATE INDEX ix_app_tipos_documento_created_by_id ON app.tipos_documento USING btree (created_by_id)')
+    op.execute('CREATE INDEX ix_app_tipos_documento_deleted_at ON app.tipos_documento USING btree (deleted_at)')
+    op.execute('CREATE INDEX ix_app_tipos_certificacion_propiedad_deleted_by_id ON app.tipos_certificacion_propiedad USING btree (deleted_by_id)')
+    op.execute('CREATE INDEX ix_app_tipos_certificacion_propiedad_updated_by_id ON app.tipos_certificacion_propiedad USING btree (updated_by_id)')
+    op.execute('CREATE INDEX ix_app_tipos_certificacion_propiedad_created_by_id ON app.tipos_certificacion_propiedad USING btree (created_by_id)')
+    op.execute('CREATE INDEX ix_app_tipos_certificacion_propiedad_deleted_at ON app.tipos_certificacion_propiedad USING btree (deleted_at)')
+    op.execute('CREATE INDEX ix_app_roles_tecnico_deleted_by_id ON app.roles_tecnico USING btree (deleted_by_id)')
+    op.execute('CREATE INDEX ix_app_roles_tecnico_updated_by_id ON app.roles_tecnico USING btree (updated_by_id)')
+    op.execute('CREATE INDEX ix_app_roles_tecnico_created_by_id ON app.roles_tecnico USING btree (created_by_id)')
+    op.execute('CREATE INDEX ix_app_roles_tecnico_deleted_at ON app.roles_tecnico USING btree (deleted_at)')
+    op.execute('CREATE INDEX ix_app_roles_deleted_by_id ON app.roles USING btree (deleted_by_id)')
+    op.execute('CREATE INDEX ix_app_roles_updated_by_id ON app.roles USING btree (updated_by_id)')
+    op.execute('CREATE INDEX ix_app_roles_created_by_id ON app.roles USING btree (created_by_id)')
+    op.execute('CREATE INDEX ix_app_roles_deleted_at ON app.roles USING btree (deleted_at)')
+    op.execute('CREATE INDEX ix_app_portals_inmuebles_raw_deleted_by_id ON app.portals_inmuebles_raw USING btree (deleted_by_id)')
+    op.execute('CREATE INDEX ix_app_portals_inmuebles_raw_updated_by_id ON app.portals_inmuebles_raw USING btree (updated_by_id)')
+    op.execute('CREATE INDEX ix_app_portals_inmuebles_raw_created_by_id ON app.portals_inmuebles_raw USING btree (created_by_id)')
+    op.execute('CREATE INDEX ix_app_osm_places_deleted_by_id ON app.osm_places USING btree (deleted_by_id)')
+    op.execute('CREATE INDEX ix_app_osm_places_updated_by_id ON app.osm_places USING btree (updated_by_id)')
+    op.execute('CREATE INDEX ix_app_osm_places_created_by_id ON app.osm_places USING btree (created_by_id)')
+    op.execute('CREATE INDEX ix_app_fuentes_historiograficas_deleted_by_id ON app.fuentes_historiograficas USING btree (deleted_by_id)')
+    op.execute('CREATE INDEX ix_app_fuentes_historiograficas_updated_by_id ON app.fuentes_historiograficas USING btree (updated_by_id)')
+    op.execute('CREATE INDEX ix_app_fuentes_historiograficas_created_by_id ON app.fuentes_historiograficas USING btree (created_by_id)')
+    op.execute('CREATE INDEX ix_app_fuentes_historiograficas_deleted_at ON app.fuentes_historiograficas USING btree (deleted_at)')
+    op.execute('CREATE INDEX ix_app_estados_tratamiento_deleted_by_id ON app.estados_tratamiento USING btree (deleted_by_id)')
+    op.execute('CREATE INDEX ix_app_estados_tratamiento_updated_by_id ON app.estados_tratamiento USING btree (updated_by_id)')
+    op.execute('CREATE INDEX ix_app_estados_tratamiento_created_by_id ON app.estados_tratamiento USING btree (created_by_id)')
+    op.execute('CREATE INDEX ix_app_estados_tratamiento_deleted_at ON app.estados_tratamiento USING btree (deleted_at)')
+    op.execute('CREATE INDEX ix_app_estados_conservacion_deleted_by_id ON app.estados_conservacion USING btree (deleted_by_id)')
+    op.execute('CREATE INDEX ix_app_estados_conservacion_updated_by_id ON app.estados_conservacion USING btree (updated_by_id)')
+    op.execute('CREATE INDEX ix_app_estados_conservacion_created_by_id ON app.estados_conservacion USING btree (created_by_id)')
+    op.execute('CREATE INDEX ix_app_estados_conservacion_deleted_at ON app.estados_conservacion USING btree (deleted_at)')
+    op.execute('CREATE INDEX ix_app_comunidades_autonomas_deleted_by_id ON app.comunidades_autonomas USING btree (deleted_by_id)')
+    op.execute('CREATE INDEX ix_app_comunidades_autonomas_updated_by_id ON app.comunidades_autonomas USING btree (updated_by_id)')
+    op.execute('CREATE INDEX ix_app_comunidades_autonomas_created_by_id ON app.comunidades_autonomas USING btree (created_by_id)')
+    op.execute('CREATE INDEX ix_app_comunidades_autonomas_deleted_at ON app.comunidades_autonomas USING btree (deleted_at)')
+    op.execute('CREATE INDEX ix_app_usuarios_deleted_by_id ON app.usuarios USING btree (deleted_by_id)')
+    op.execute('CREATE INDEX ix_app_usuarios_updated_by_id ON app.usuarios USING btree (updated_by_id)')
+    op.execute('CREATE INDEX ix_app_usuarios_created_by_id ON app.usuarios USING btree (created_by_id)')
+    op.execute('CREATE INDEX ix_app_usuarios_deleted_at ON app.usuarios USING btree (deleted_at)')
+    op.execute('CREATE INDEX ix_app_tipos_figura_proteccion_codigo ON app.tipos_figura_proteccion USING btree (codigo)')
+    op.execute('CREATE INDEX ix_figura_activo ON app.tipos_figura_proteccion USING btree (activo)')
+    op.execute('CREATE INDEX ix_figura_nivel ON app.tipos_figura_proteccion USING btree (nivel)')
+    op.execute('CREATE INDEX ix_municipio_provincia ON app.municipios USING btree (provincia_id)')
+    op.execute('CREATE INDEX ix_municipio_nombre ON app.municipios USING btree (nombre_oficial)')
+    op.execute('CREATE INDEX ix_municipio_codigo_ine ON app.municipios USING btree (codigo_ine)')
+    op.execute('CREATE INDEX ix_provincia_ccaa ON app.provincias USING btree (comunidad_autonoma_id)')
+    op.execute('CREATE INDEX ix_provincia_nombre ON app.provincias USING btree (nombre_oficial)')
+    op.execute('CREATE INDEX ix_provincia_codigo_ine ON app.provincias USING btree (codigo_ine)')
+    op.execute('CREATE INDEX ix_ccaa_nombre ON app.comunidades_autonomas USING btree (nombre_oficial)')
+    op.execute('CREATE INDEX ix_ccaa_codigo_ine ON app.comunidades_autonomas USING btree (codigo_ine)')
@@ -0,0 +1,86 @@
+"""resumenes materializados para dashboards y sellos de refresco
+
+Revision ID: a7c3e5f9b2d4
+Revises: 9c4e7a2b1f35
+Create Date: 2026-10-17 21:08:42.517306
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7c3e5f9b2d4'
+down_revision: Union[str, None] = '9c4e7a2b1f35'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Conteos de inmuebles vivos por cada combinación de dimensiones del
+# dashboard. La figura es la protección actual (fecha_hasta IS NULL, la
+# más reciente), como Inmueble.figura_proteccion_actual. clave identifica
+# la combinación (con NULLs) para el índice único de REFRESH CONCURRENTLY.
+MV_RESUMEN_INMUEBLES = """
+CREATE MATERIALIZED VIEW app.mv_resumen_inmuebles AS
+SELECT
+    md5(concat_ws('|',
+        coalesce(i.comunidad_autonoma_id::text, '-'),
+        coalesce(i.provincia_id::text, '-'),
+        coalesce(i.municipio_id::text, '-'),
+        coalesce(i.tipo_inmueble_id::text, '-'),
+        coalesce(np.figura_proteccion_id::text, '-'),
+        coalesce(i.estado_conservacion_id::text, '-')
+    )) AS clave,
+    i.comunidad_autonoma_id,
+    i.provincia_id,
+    i.municipio_id,
+    i.tipo_inmueble_id,
+    np.figura_proteccion_id,
+    i.estado_conservacion_id,
+    count(*)::bigint AS inmuebles,
+    (count(*) FILTER (WHERE i.es_visitable))::bigint AS visitables,
+    count(i.coordenadas)::bigint AS con_coordenadas
+FROM app.inmuebles i
+LEFT JOIN LATERAL (
+    SELECT n.figura_proteccion_id
+    FROM app.inmuebles_niveles_proteccion n
+    WHERE n.inmueble_id = i.id AND n.fecha_hasta IS NULL AND n.deleted_at IS NULL
+    ORDER BY n.fecha_desde DESC
+    LIMIT 1
+) np ON true
+WHERE i.deleted_at IS NULL
+GROUP BY i.comunidad_autonoma_id, i.provincia_id, i.municipio_id,
+         i.tipo_inmueble_id, np.figura_proteccion_id, i.estado_conservacion_id
+WITH DATA
+"""
+
+
+def upgrade() -> None:
+    op.create_table(
+        'resumenes_refresco',
+        sa.Column('vista', sa.String(length=100), nullable=False),
+        sa.Column('refrescado_en', sa.DateTime(), nullable=False),
+        sa.Column('duracion_ms', sa.Integer(), nullable=True),
+        sa.Column('filas', sa.BigInteger(), nullable=True),
+        sa.PrimaryKeyConstraint('vista'),
+        schema='app',
+    )
+
+    op.execute(MV_RESUMEN_INMUEBLES)
+    op.execute("CREATE UNIQUE INDEX ux_mv_resumen_inmuebles_clave ON app.mv_resumen_inmuebles (clave)")
+    # Filtros de drill-down del dashboard
+    for columna in ('comunidad_autonoma_id', 'provincia_id', 'municipio_id'):
+        op.execute(f"CREATE INDEX ix_mv_resumen_inmuebles_{columna} ON app.mv_resumen_inmuebles ({columna})")
+
+    op.execute("""
+        INSERT INTO app.resumenes_refresco (vista, refrescado_en, filas)
+        SELECT 'app.mv_resumen_inmuebles', now() AT TIME ZONE 'utc', count(*)
+        FROM app.mv_resumen_inmuebles
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP MATERIALIZED VIEW IF EXISTS app.mv_resumen_inmuebles")
+    op.drop_table('resumenes_refresco', schema='app')
@@ -0,0 +1,228 @@
+"""estadisticas territoriales: tabla de agregados, cola de territorios y triggers
+
+Revision ID: b4e8d1f6a3c9
+Revises: a7c3e5f9b2d4
+Create Date: 2026-10-17 21:52:06.884190
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b4e8d1f6a3c9'
+down_revision: Union[str, None] = 'a7c3e5f9b2d4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Identificador de la terna comunidad/provincia/municipio (con NULLs)
+TERRITORIO_CLAVE = """
+CREATE OR REPLACE FUNCTION app.territorio_clave(p_comunidad uuid, p_provincia uuid, p_municipio uuid)
+RETURNS text
+LANGUAGE sql IMMUTABLE PARALLEL SAFE AS $$
+    SELECT md5(concat_ws('|',
+        coalesce(p_comunidad::text, '-'),
+        coalesce(p_provincia::text, '-'),
+        coalesce(p_municipio::text, '-')))
+$$
+"""
+
+# Encola los territorios de los inmuebles dados. Si ya estaban pendientes,
+# DO UPDATE (y no DO NOTHING) bloquea la fila hasta que el escritor
+# confirme: refrescar() la salta con SKIP LOCKED en vez de recalcular con
+# una instantánea sin sus cambios y borrarla.
+ENCOLAR = """
+CREATE OR REPLACE FUNCTION app.estadisticas_encolar(p_inmuebles uuid[])
+RETURNS void
+LANGUAGE sql AS $$
+    INSERT INTO app.estadisticas_pendientes (clave, comunidad_autonoma_id, provincia_id, municipio_id)
+    SELECT DISTINCT app.territorio_clave(i.comunidad_autonoma_id, i.provincia_id, i.municipio_id),
+           i.comunidad_autonoma_id, i.provincia_id, i.municipio_id
+    FROM app.inmuebles i
+    WHERE i.id = ANY(p_inmuebles)
+    ON CONFLICT (clave) DO UPDATE SET clave = EXCLUDED.clave
+$$
+"""
+
+# inmuebles: territorio anterior y nuevo. En UPDATE solo si cambia algo
+# que cuenta (territorio, alta o borrado lógico).
+ENCOLAR_INMUEBLES = """
+CREATE OR REPLACE FUNCTION app.estadisticas_encolar_inmuebles()
+RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO app.estadisticas_pendientes (clave, comunidad_autonoma_id, provincia_id, municipio_id)
+        SELECT DISTINCT app.territorio_clave(n.comunidad_autonoma_id, n.provincia_id, n.municipio_id),
+               n.comunidad_autonoma_id, n.provincia_id, n.municipio_id
+        FROM nuevas n
+        ON CONFLICT (clave) DO UPDATE SET clave = EXCLUDED.clave;
+    ELSIF TG_OP = 'DELETE' THEN
+        INSERT INTO app.estadisticas_pendientes (clave, comunidad_autonoma_id, provincia_id, municipio_id)
+        SELECT DISTINCT app.territorio_clave(v.comunidad_autonoma_id, v.provincia_id, v.municipio_id),
+               v.comunidad_autonoma_id, v.provincia_id, v.municipio_id
+        FROM viejas v
+        ON CONFLICT (clave) DO UPDATE SET clave = EXCLUDED.clave;
+    ELSE
+        INSERT INTO app.estadisticas_pendientes (clave, comunidad_autonoma_id, provincia_id, municipio_id)
+        SELECT DISTINCT app.territorio_clave(t.comunidad_autonoma_id, t.provincia_id, t.municipio_id),
+               t.comunidad_autonoma_id, t.provincia_id, t.municipio_id
+        FROM viejas v
+        JOIN nuevas n ON n.id = v.id
+        CROSS JOIN LATERAL (VALUES
+            (v.comunidad_autonoma_id, v.provincia_id, v.municipio_id),
+            (n.comunidad_autonoma_id, n.provincia_id, n.municipio_id)
+        ) AS t (comunidad_autonoma_id, provincia_id, municipio_id)
+        WHERE (v.comunidad_autonoma_id, v.provincia_id, v.municipio_id, v.created_at, v.deleted_at)
+              IS DISTINCT FROM
+              (n.comunidad_autonoma_id, n.provincia_id, n.municipio_id, n.created_at, n.deleted_at)
+        ON CONFLICT (clave) DO UPDATE SET clave = EXCLUDED.clave;
+    END IF;
+    RETURN NULL;
+END
+$$
+"""
+
+# Tablas hijas con inmueble_id (inmatriculaciones, transmisiones, intervenciones)
+ENCOLAR_POR_INMUEBLE = """
+CREATE OR REPLACE FUNCTION app.estadisticas_encolar_por_inmueble()
+RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        PERFORM app.estadisticas_encolar(ARRAY(SELECT DISTINCT inmueble_id FROM nuevas));
+    ELSIF TG_OP = 'DELETE' THEN
+        PERFORM app.estadisticas_encolar(ARRAY(SELECT DISTINCT inmueble_id FROM viejas));
+    ELSE
+        PERFORM app.estadisticas_encolar(ARRAY(
+            SELECT inmueble_id FROM viejas UNION SELECT inmueble_id FROM nuevas
+        ));
+    END IF;
+    RETURN NULL;
+END
+$$
+"""
+
+# Subvenciones: inmueble a través de la intervención
+ENCOLAR_POR_INTERVENCION = """
+CREATE OR REPLACE FUNCTION app.estadisticas_encolar_por_intervencion()
+RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        PERFORM app.estadisticas_encolar(ARRAY(
+            SELECT iv.inmueble_id FROM app.intervenciones iv WHERE iv.id IN (SELECT intervencion_id FROM nuevas)
+        ));
+    ELSIF TG_OP = 'DELETE' THEN
+        PERFORM app.estadisticas_encolar(ARRAY(
+            SELECT iv.inmueble_id FROM app.intervenciones iv WHERE iv.id IN (SELECT intervencion_id FROM viejas)
+        ));
+    ELSE
+        PERFORM app.estadisticas_encolar(ARRAY(
+            SELECT iv.inmueble_id FROM app.intervenciones iv
+            WHERE iv.id IN (SELECT intervencion_id FROM viejas UNION SELECT intervencion_id FROM nuevas)
+        ));
+    END IF;
+    RETURN NULL;
+END
+$$
+"""
+
+# tabla -> función; triggers por sentencia con tablas de transición
+# (una carga masiva encola una vez por territorio, no por fila)
+TRIGGERS = {
+    'inmuebles': 'estadisticas_encolar_inmuebles',
+    'inmatriculaciones': 'estadisticas_encolar_por_inmueble',
+    'transmisiones': 'estadisticas_encolar_por_inmueble',
+    'intervenciones': 'estadisticas_encolar_por_inmueble',
+    'intervenciones_subvenciones': 'estadisticas_encolar_por_intervencion',
+}
+
+EVENTOS = {
+    'insert': 'INSERT REFERENCING NEW TABLE AS nuevas',
+    'update': 'UPDATE REFERENCING OLD TABLE AS viejas NEW TABLE AS nuevas',
+    'delete': 'DELETE REFERENCING OLD TABLE AS viejas',
+}
+
+
+def upgrade() -> None:
+    op.execute(TERRITORIO_CLAVE)
+
+    op.create_table(
+        'estadisticas_territoriales',
+        sa.Column('clave', sa.String(length=32), nullable=False),
+        sa.Column('anio', sa.SmallInteger(), nullable=False),
+        sa.Column('comunidad_autonoma_id', sa.Uuid(as_uuid=False), nullable=True),
+        sa.Column('provincia_id', sa.Uuid(as_uuid=False), nullable=True),
+        sa.Column('municipio_id', sa.Uuid(as_uuid=False), nullable=True),
+        sa.Column('inmuebles', sa.Integer(), nullable=False),
+        sa.Column('inmatriculaciones', sa.Integer(), nullable=False),
+        sa.Column('transmisiones', sa.Integer(), nullable=False),
+        sa.Column('precio_venta', sa.Numeric(precision=18, scale=2), nullable=False),
+        sa.Column('intervenciones', sa.Integer(), nullable=False),
+        sa.Column('presupuesto', sa.Numeric(precision=18, scale=2), nullable=False),
+        sa.Column('subvenciones', sa.Integer(), nullable=False),
+        sa.Column('importe_aplicado', sa.Numeric(precision=18, scale=2), nullable=False),
+        sa.Column('actualizado_en', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('clave', 'anio'),
+        schema='app',
+    )
+    for columna in ('comunidad_autonoma_id', 'provincia_id', 'municipio_id'):
+        op.create_index(f'ix_app_estadisticas_territoriales_{columna}', 'estadisticas_territoriales', [columna],
+                        unique=False, schema='app')
+
+    op.create_table(
+        'estadisticas_pendientes',
+        sa.Column('clave', sa.String(length=32), nullable=False),
+        sa.Column('comunidad_autonoma_id', sa.Uuid(as_uuid=False), nullable=True),
+        sa.Column('provincia_id', sa.Uuid(as_uuid=False), nullable=True),
+        sa.Column('municipio_id', sa.Uuid(as_uuid=False), nullable=True),
+        sa.PrimaryKeyConstraint('clave'),
+        schema='app',
+    )
+
+    op.execute(
+        "CREATE INDEX ix_inmuebles_territorio ON app.inmuebles "
+        "(app.territorio_clave(comunidad_autonoma_id, provincia_id, municipio_id)) "
+        "WHERE deleted_at IS NULL"
+    )
+
+    op.execute(ENCOLAR)
+    op.execute(ENCOLAR_INMUEBLES)
+    op.execute(ENCOLAR_POR_INMUEBLE)
+    op.execute(ENCOLAR_POR_INTERVENCION)
+    for tabla, funcion in TRIGGERS.items():
+        for evento, definicion in EVENTOS.items():
+            op.execute(
+                f"CREATE TRIGGER trg_{tabla}_estadisticas_{evento} AFTER {definicion} "
+                f"ON app.{tabla} FOR EACH STATEMENT EXECUTE FUNCTION app.{funcion}()"
+            )
+
+    # Todos los territorios quedan pendientes: el primer refrescar() llena la tabla
+    op.execute("""
+        INSERT INTO app.estadisticas_pendientes (clave, comunidad_autonoma_id, provincia_id, municipio_id)
+        SELECT DISTINCT app.territorio_clave(comunidad_autonoma_id, provincia_id, municipio_id),
+               comunidad_autonoma_id, provincia_id, municipio_id
+        FROM app.inmuebles
+        WHERE deleted_at IS NULL
+        ON CONFLICT (clave) DO NOTHING
+    """)
+
+
+def downgrade() -> None:
+    for tabla in TRIGGERS:
+        for evento in EVENTOS:
+            op.execute(f"DROP TRIGGER IF EXISTS trg_{tabla}_estadisticas_{evento} ON app.{tabla}")
+    op.execute("DROP FUNCTION IF EXISTS app.estadisticas_encolar_por_intervencion()")
+    op.execute("DROP FUNCTION IF EXISTS app.estadisticas_encolar_por_inmueble()")
+    op.execute("DROP FUNCTION IF EXISTS app.estadisticas_encolar_inmuebles()")
+    op.execute("DROP FUNCTION IF EXISTS app.estadisticas_encolar(uuid[])")
+    op.execute("DROP INDEX IF EXISTS app.ix_inmuebles_territorio")
+    op.drop_table('estadisticas_pendientes', schema='app')
+    for columna in ('municipio_id', 'provincia_id', 'comunidad_autonoma_id'):
+        op.drop_index(f'ix_app_estadisticas_territoriales_{columna}', table_name='estadisticas_territoriales', schema='app')
+    op.drop_table('estadisticas_territoriales', schema='app')
+    op.execute("DROP FUNCTION IF EXISTS app.territorio_clave(uuid, uuid, uuid)")
@@ -0,0 +1,49 @@
+"""unique portal id_portal en anuncios raw
+
+Revision ID: b8e2f04d6a17
+Revises: 7a4d2e81c6f3
+Create Date: 2026-10-17 11:21:57.640382
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b8e2f04d6a17'
+down_revision: Union[str, None] = '7a4d2e81c6f3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Duplicados previos: se conserva el anuncio scrapeado más recientemente
+    # y se le reasignan las detecciones de los que se eliminan
+    op.execute("""
+        CREATE TEMP TABLE tmp_raw_duplicados ON COMMIT DROP AS
+        SELECT id, keep_id FROM (
+            SELECT id, first_value(id) OVER (
+                PARTITION BY portal, id_portal ORDER BY scraped_at DESC, id DESC
+            ) AS keep_id
+            FROM app.portals_inmuebles_raw
+        ) ranked
+        WHERE id <> keep_id
+    """)
+    op.execute("""
+        UPDATE app.portals_detecciones d
+        SET inmueble_id = dup.keep_id
+        FROM tmp_raw_duplicados dup
+        WHERE d.inmueble_id = dup.id
+    """)
+    op.execute("""
+        DELETE FROM app.portals_inmuebles_raw r
+        USING tmp_raw_duplicados dup
+        WHERE r.id = dup.id
+    """)
+    op.create_unique_constraint('uq_portals_inmuebles_raw_portal_id_portal', 'portals_inmuebles_raw', ['portal', 'id_portal'], schema='app')
+
+
+def downgrade() -> None:
+    op.drop_constraint('uq_portals_inmuebles_raw_portal_id_portal', 'portals_inmuebles_raw', schema='app', type_='unique')
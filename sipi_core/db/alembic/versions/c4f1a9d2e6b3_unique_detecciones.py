@@ -0,0 +1,43 @@
+"""unique anuncio-inmueble en detecciones y extensiones de matching
+
+Revision ID: c4f1a9d2e6b3
+Revises: b8e2f04d6a17
+Create Date: 2026-10-17 12:04:18.215907
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4f1a9d2e6b3'
+down_revision: Union[str, None] = 'b8e2f04d6a17'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # word_similarity() y unaccent() del motor de matching (services.deteccion)
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.execute("CREATE EXTENSION IF NOT EXISTS unaccent")
+
+    # Duplicados previos: se conserva la detección actualizada más recientemente
+    op.execute("""
+        DELETE FROM app.portals_detecciones d
+        USING (
+            SELECT id, first_value(id) OVER (
+                PARTITION BY inmueble_id, inmueble_core_id
+                ORDER BY confirmed_at DESC NULLS LAST, last_updated_at DESC, id DESC
+            ) AS keep_id
+            FROM app.portals_detecciones
+            WHERE inmueble_core_id IS NOT NULL
+        ) ranked
+        WHERE d.id = ranked.id AND ranked.id <> ranked.keep_id
+    """)
+    op.create_unique_constraint('uq_portals_detecciones_raw_core', 'portals_detecciones', ['inmueble_id', 'inmueble_core_id'], schema='app')
+
+
+def downgrade() -> None:
+    op.drop_constraint('uq_portals_detecciones_raw_core', 'portals_detecciones', schema='app', type_='unique')
@@ -0,0 +1,35 @@
+"""marcas de agua del matching incremental
+
+Revision ID: d2a7c5e19f84
+Revises: c4f1a9d2e6b3
+Create Date: 2026-10-17 12:41:06.530114
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd2a7c5e19f84'
+down_revision: Union[str, None] = 'c4f1a9d2e6b3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('portals_watermarks',
+    sa.Column('proceso', sa.String(length=50), nullable=False),
+    sa.Column('fuente', sa.String(length=100), nullable=False),
+    sa.Column('marca', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('proceso', 'fuente'),
+    schema='app'
+    )
+    op.create_index(op.f('ix_app_portals_inmuebles_raw_scraped_at'), 'portals_inmuebles_raw', ['scraped_at'], unique=False, schema='app')
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_app_portals_inmuebles_raw_scraped_at'), table_name='portals_inmuebles_raw', schema='app')
+    op.drop_table('portals_watermarks', schema='app')
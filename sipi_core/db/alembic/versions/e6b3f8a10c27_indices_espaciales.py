@@ -0,0 +1,45 @@
+"""indices GiST espaciales (geometry y geography) sin bloqueo
+
+Revision ID: e6b3f8a10c27
+Revises: d2a7c5e19f84
+Create Date: 2026-10-17 13:15:42.908361
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e6b3f8a10c27'
+down_revision: Union[str, None] = 'd2a7c5e19f84'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# tabla → columna de geometría
+COLUMNAS_GEOMETRIA = {
+    'inmuebles': 'coordenadas',
+    'osm_places': 'geom',
+    'portals_inmuebles_raw': 'geom',
+}
+
+
+def upgrade() -> None:
+    # CREATE INDEX CONCURRENTLY no puede ejecutarse dentro de una transacción.
+    # Los índices geometry ya los crea la migración inicial; IF NOT EXISTS cubre
+    # las bases creadas con create_all o restauradas sin ellos.
+    with op.get_context().autocommit_block():
+        for tabla, columna in COLUMNAS_GEOMETRIA.items():
+            op.create_index(f'idx_{tabla}_{columna}', tabla, [columna], unique=False, schema='app',
+                            postgresql_using='gist', postgresql_concurrently=True, if_not_exists=True)
+            op.create_index(f'idx_{tabla}_{columna}_geog', tabla, [sa.text(f'geography({columna})')], unique=False, schema='app',
+                            postgresql_using='gist', postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for tabla, columna in COLUMNAS_GEOMETRIA.items():
+            op.drop_index(f'idx_{tabla}_{columna}_geog', table_name=tabla, schema='app',
+                          postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,26 @@
+"""posicion reanudable en portals_watermarks
+
+Revision ID: f1c8d4b27a90
+Revises: e6b3f8a10c27
+Create Date: 2026-10-17 13:52:27.114570
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f1c8d4b27a90'
+down_revision: Union[str, None] = 'e6b3f8a10c27'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('portals_watermarks', sa.Column('posicion', sa.String(length=100), nullable=True), schema='app')
+
+
+def downgrade() -> None:
+    op.drop_column('portals_watermarks', 'posicion', schema='app')
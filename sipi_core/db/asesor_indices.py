@@ -0,0 +1,332 @@
+# db/asesor_indices.py
+"""
+Asesor de índices: lee pg_stat_user_indexes / pg_stat_user_tables y
+propone índices que borrar.
+
+Motivos, en orden de seguridad:
+
+    - invalido:  índice marcado como no válido (CREATE INDEX CONCURRENTLY
+                 fallido); no se usa y sí se mantiene en cada escritura.
+    - duplicado: mismas columnas, clases de operadores, expresiones,
+                 predicado y método que otro (p. ej. ix_ccaa_codigo_ine
+                 frente al único de codigo_ine). Se conserva el de la PK o
+                 restricción, luego el único y luego el más usado.
+    - cubierto:  B-tree no único cuyas columnas son prefijo de otro B-tree
+                 con el mismo predicado.
+    - auditoria: índice de una columna de AuditMixin que el modelo ya no
+                 declara (INDICES_AUDITORIA o su __indices_auditoria__).
+    - sin_uso:   idx_scan = 0 desde el último reset de estadísticas. Solo
+                 entra en la migración con --sin-uso: los contadores son por
+                 servidor (una réplica tiene los suyos) y un índice usado una
+                 vez al mes puede no aparecer.
+
+Los índices que respaldan una PK o restricción no se proponen nunca.
+
+USO (desde sipi_core, con DATABASE_URL definido):
+    python -m db.asesor_indices                                   # informe
+    python -m db.asesor_indices --sin-uso --min-tamano-kb 1024    # incluye los no usados de más de 1 MB
+    python -m db.asesor_indices --migracion --down-revision <head> --escribir
+
+La migración borra los índices en upgrade y los recrea en downgrade con
+su definición (pg_get_indexdef).
+"""
+
+from __future__ import annotations
+
+import argparse
+import secrets
+import sys
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional, Sequence
+
+from sqlalchemy import MetaData, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from db.indices_vivos import escribir_migracion, fichero_migracion
+from mixins.base import COLUMNAS_AUDITORIA
+
+ESQUEMAS = ("app", "gis")
+
+MOTIVOS = ("invalido", "duplicado", "cubierto", "auditoria", "sin_uso")
+
+_SQL_INDICES = text("""
+    SELECT s.schemaname, s.relname, s.indexrelname,
+           s.idx_scan,
+           pg_relation_size(s.indexrelid) AS tamano,
+           i.indisunique, i.indisprimary, i.indisvalid,
+           EXISTS (SELECT 1 FROM pg_constraint k WHERE k.conindid = s.indexrelid) AS restriccion,
+           i.indkey::text AS claves,
+           i.indclass::text AS clases,
+           i.indcollation::text AS colaciones,
+           coalesce(pg_get_expr(i.indexprs, i.indrelid), '') AS expresiones,
+           coalesce(pg_get_expr(i.indpred, i.indrelid), '') AS predicado,
+           am.amname AS metodo,
+           ARRAY(
+               SELECT a.attname::text
+               FROM unnest(i.indkey::int2[]) WITH ORDINALITY AS k(attnum, n)
+               JOIN pg_attribute a ON a.attrelid = i.indrelid AND a.attnum = k.attnum
+               ORDER BY k.n
+           ) AS columnas,
+           pg_get_indexdef(s.indexrelid) AS definicion,
+           t.n_tup_ins + t.n_tup_upd + t.n_tup_del AS escrituras
+    FROM pg_stat_user_indexes s
+    JOIN pg_index i ON i.indexrelid = s.indexrelid
+    JOIN pg_class c ON c.oid = s.indexrelid
+    JOIN pg_am am ON am.oid = c.relam
+    JOIN pg_stat_user_tables t ON t.relid = s.relid
+    WHERE s.schemaname = ANY(CAST(:esquemas AS text[]))
+    ORDER BY s.schemaname, s.relname, s.indexrelname
+""")
+
+_SQL_RESET = text("SELECT stats_reset FROM pg_stat_database WHERE datname = current_database()")
+
+
+@dataclass(frozen=True, slots=True)
+class Indice:
+    esquema: str
+    tabla: str
+    nombre: str
+    escaneos: int
+    tamano: int
+    unico: bool
+    primario: bool
+    valido: bool
+    restriccion: bool
+    claves: str
+    clases: str
+    colaciones: str
+    expresiones: str
+    predicado: str
+    metodo: str
+    columnas: tuple[str, ...]
+    definicion: str
+    escrituras_tabla: int
+
+    @property
+    def protegido(self) -> bool:
+        """Respalda una PK o restricción: no se puede borrar por separado"""
+        return self.primario or self.restriccion
+
+
+@dataclass(frozen=True, slots=True)
+class Recomendacion:
+    indice: Indice
+    motivo: str
+    detalle: str
+
+
+@dataclass(frozen=True, slots=True)
+class Analisis:
+    recomendaciones: list[Recomendacion]
+    estadisticas_desde: Optional[datetime]
+
+    def para_migracion(self, incluir_sin_uso: bool = False) -> list[Recomendacion]:
+        return [r for r in self.recomendaciones if incluir_sin_uso or r.motivo != "sin_uso"]
+
+
+def _indice(fila) -> Indice:
+    return Indice(
+        esquema=fila.schemaname,
+        tabla=fila.relname,
+        nombre=fila.indexrelname,
+        escaneos=fila.idx_scan,
+        tamano=fila.tamano,
+        unico=fila.indisunique,
+        primario=fila.indisprimary,
+        valido=fila.indisvalid,
+        restriccion=fila.restriccion,
+        claves=fila.claves,
+        clases=fila.clases,
+        colaciones=fila.colaciones,
+        expresiones=fila.expresiones,
+        predicado=fila.predicado,
+        metodo=fila.metodo,
+        columnas=tuple(fila.columnas),
+        definicion=fila.definicion,
+        escrituras_tabla=fila.escrituras,
+    )
+
+
+def _preferencia(indice: Indice):
+    """Orden para decidir cuál de un grupo de duplicados se conserva"""
+    return (not indice.primario, not indice.restriccion, not indice.unico, -indice.escaneos, indice.nombre)
+
+
+def _duplicados(indices: Sequence[Indice]) -> list[Recomendacion]:
+    grupos = defaultdict(list)
+    for indice in indices:
+        if indice.valido:
+            grupos[(indice.esquema, indice.tabla, indice.claves, indice.clases, indice.colaciones,
+                    indice.expresiones, indice.predicado, indice.metodo)].append(indice)
+    recomendaciones = []
+    for grupo in grupos.values():
+        if len(grupo) < 2:
+            continue
+        conservado, *resto = sorted(grupo, key=_preferencia)
+        recomendaciones.extend(
+            Recomendacion(indice, "duplicado", f"duplica {conservado.nombre}")
+            for indice in resto if not indice.protegido
+        )
+    return recomendaciones
+
+
+def _cubiertos(indices: Sequence[Indice]) -> list[Recomendacion]:
+    por_tabla = defaultdict(list)
+    for indice in indices:
+        if indice.valido and indice.metodo == "btree" and not indice.expresiones:
+            por_tabla[(indice.esquema, indice.tabla)].append(indice)
+    recomendaciones = []
+    for grupo in por_tabla.values():
+        for indice in grupo:
+            if indice.unico or indice.protegido:
+                continue
+            claves, clases = indice.claves.split(), indice.clases.split()
+            for otro in grupo:
+                otras_claves = otro.claves.split()
+                if (
+                    len(otras_claves) > len(claves)
+                    and otras_claves[:len(claves)] == claves
+                    and otro.clases.split()[:len(clases)] == clases
+                    and otro.predicado == indice.predicado
+                ):
+                    recomendaciones.append(Recomendacion(indice, "cubierto", f"prefijo de {otro.nombre}"))
+                    break
+    return recomendaciones
+
+
+def _auditoria(indices: Sequence[Indice], metadata: Optional[MetaData]) -> list[Recomendacion]:
+    if metadata is None:
+        return []
+    recomendaciones = []
+    for indice in indices:
+        if (
+            len(indice.columnas) != 1
+            or indice.columnas[0] not in COLUMNAS_AUDITORIA
+            or indice.predicado
+            or indice.expresiones
+            or indice.protegido
+        ):
+            continue
+        tabla = metadata.tables.get(f"{indice.esquema}.{indice.tabla}")
+        if tabla is None or any(i.name == indice.nombre for i in tabla.indexes):
+            continue
+        recomendaciones.append(Recomendacion(indice, "auditoria", "no declarado por el modelo"))
+    return recomendaciones
+
+
+def recomendar(indices: Sequence[Indice], metadata: Optional[MetaData] = None,
+               min_tamano: int = 0) -> list[Recomendacion]:
+    """Recomendaciones para una lista de índices; cada índice aparece una vez, con su primer motivo"""
+    candidatas = [
+        *(Recomendacion(i, "invalido", "CREATE INDEX CONCURRENTLY fallido") for i in indices
+          if not i.valido and not i.protegido),
+        *_duplicados(indices),
+        *_cubiertos(indices),
+        *_auditoria(indices, metadata),
+        *(Recomendacion(i, "sin_uso", f"0 escaneos, {i.escrituras_tabla:,} escrituras en la tabla") for i in indices
+          if i.valido and i.escaneos == 0 and not i.unico and not i.protegido and i.tamano >= min_tamano),
+    ]
+    vistos, recomendaciones = set(), []
+    for recomendacion in candidatas:
+        clave = (recomendacion.indice.esquema, recomendacion.indice.nombre)
+        if clave not in vistos:
+            vistos.add(clave)
+            recomendaciones.append(recomendacion)
+    return recomendaciones
+
+
+def analizar(session: Session, esquemas: Sequence[str] = ESQUEMAS,
+             metadata: Optional[MetaData] = None, min_tamano: int = 0) -> Analisis:
+    """Lee las estadísticas de la base y devuelve las recomendaciones"""
+    indices = [_indice(fila) for fila in session.execute(_SQL_INDICES, {"esquemas": list(esquemas)})]
+    desde = session.execute(_SQL_RESET).scalar()
+    return Analisis(recomendar(indices, metadata, min_tamano), desde)
+
+
+async def analizar_async(session: AsyncSession, esquemas: Sequence[str] = ESQUEMAS,
+                         metadata: Optional[MetaData] = None, min_tamano: int = 0) -> Analisis:
+    """Versión asíncrona de analizar()"""
+    filas = await session.execute(_SQL_INDICES, {"esquemas": list(esquemas)})
+    indices = [_indice(fila) for fila in filas]
+    desde = (await session.execute(_SQL_RESET)).scalar()
+    return Analisis(recomendar(indices, metadata, min_tamano), desde)
+
+
+def _tamano(n: int) -> str:
+    for unidad in ("B", "kB", "MB", "GB"):
+        if n < 1024 or unidad == "GB":
+            return f"{n:.0f} {unidad}" if unidad == "B" else f"{n:.1f} {unidad}"
+        n /= 1024
+
+
+def informe(analisis: Analisis) -> str:
+    """Informe de texto agrupado por motivo"""
+    desde = analisis.estadisticas_desde.isoformat(" ", "seconds") if analisis.estadisticas_desde else "desconocido"
+    lineas = [f"Estadísticas desde: {desde}"]
+    for motivo in MOTIVOS:
+        grupo = [r for r in analisis.recomendaciones if r.motivo == motivo]
+        if not grupo:
+            continue
+        total = sum(r.indice.tamano for r in grupo)
+        lineas.append(f"\n{motivo} ({len(grupo)} índices, {_tamano(total)}):")
+        lineas.extend(
+            f"  {r.indice.esquema}.{r.indice.nombre:<55} {_tamano(r.indice.tamano):>10}  {r.detalle}"
+            for r in grupo
+        )
+    if len(lineas) == 1:
+        lineas.append("Sin recomendaciones.")
+    return "\n".join(lineas)
+
+
+def migracion(recomendaciones: Sequence[Recomendacion], revision: str, down_revision: str,
+              mensaje: str = "consolidacion de indices") -> str:
+    """Migración que borra los índices recomendados y los recrea en downgrade"""
+    borrar = [
+        f"op.drop_index('{r.indice.nombre}', table_name='{r.indice.tabla}', schema='{r.indice.esquema}')"
+        for r in recomendaciones
+    ]
+    recrear = [f"op.execute({r.indice.definicion!r})" for r in reversed(recomendaciones)]
+    return fichero_migracion(mensaje, revision, down_revision, borrar, recrear)
+
+
+def main(argv=None) -> None:
+    from db.registry import Base
+    from db.sessions import SyncDatabaseManager
+    import models  # noqa: F401  registra todas las tablas
+
+    parser = argparse.ArgumentParser(description="Asesor de índices duplicados, cubiertos y sin uso")
+    parser.add_argument("--esquemas", type=lambda valor: valor.split(","), default=list(ESQUEMAS))
+    parser.add_argument("--min-tamano-kb", type=int, default=64, help="tamaño mínimo para proponer un índice sin uso")
+    parser.add_argument("--sin-uso", action="store_true", help="incluir los índices sin uso en la migración")
+    parser.add_argument("--migracion", action="store_true", help="generar la migración Alembic")
+    parser.add_argument("--down-revision", default=None, help="revisión actual (alembic heads)")
+    parser.add_argument("--revision", default=None, help="id de la nueva revisión (por defecto, aleatorio)")
+    parser.add_argument("--mensaje", default="consolidacion de indices")
+    parser.add_argument("--escribir", action="store_true", help="escribir en db/alembic/versions")
+    args = parser.parse_args(argv)
+    if args.migracion and not args.down_revision:
+        parser.error("--migracion requiere --down-revision")
+
+    manager = SyncDatabaseManager()
+    try:
+        with manager.session() as session:
+            analisis = analizar(session, args.esquemas, Base.metadata, args.min_tamano_kb * 1024)
+    finally:
+        manager.close()
+
+    if not args.migracion:
+        print(informe(analisis))
+        return
+    revision = args.revision or secrets.token_hex(6)
+    contenido = migracion(analisis.para_migracion(args.sin_uso), revision, args.down_revision, args.mensaje)
+    if args.escribir:
+        print(escribir_migracion(contenido, revision, args.mensaje))
+    else:
+        sys.stdout.write(contenido)
+
+
+if __name__ == "__main__":
+    main()
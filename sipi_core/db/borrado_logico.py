@@ -0,0 +1,92 @@
+# db/borrado_logico.py
+"""
+Filtro global de borrado lógico.
+
+Toda consulta ORM (select, Session.get, relaciones perezosas y selectin)
+sobre modelos con AuditMixin excluye las filas con deleted_at, mediante
+with_loader_criteria en el evento do_orm_execute de Session. Se aplica
+también a AsyncSession, que ejecuta sobre una Session síncrona.
+
+El SQL en texto (text()) no se filtra: los servicios que lo usan ya
+ponen deleted_at IS NULL de forma explícita.
+
+Para vistas de administración (papelera, restaurar) se desactiva:
+
+    # Por sesión
+    with manager.session(incluir_eliminados=True) as session: ...
+    incluir_eliminados(session)
+
+    # Por sentencia
+    session.execute(select(Inmueble).execution_options(incluir_eliminados=True))
+
+    # Temporalmente en una sesión existente
+    with sin_filtro_eliminados(session):
+        inmueble = session.get(Inmueble, id)
+        inmueble.restore()
+"""
+
+from __future__ import annotations
+
+from contextlib import contextmanager
+from typing import Iterator, Union
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import ORMExecuteState, Session, with_loader_criteria
+
+from mixins import AuditMixin
+
+# Clave en Session.info y en execution_options
+INCLUIR_ELIMINADOS = "incluir_eliminados"
+
+
+def _filtrar_eliminados(estado: ORMExecuteState) -> None:
+    if (
+        not estado.is_select
+        or estado.is_column_load
+        # Las cargas de relaciones heredan las opciones de la consulta que
+        # cargó el objeto: con el filtro desactivado allí, también aquí
+        or estado.is_relationship_load
+        or estado.execution_options.get(INCLUIR_ELIMINADOS, False)
+        or estado.session.info.get(INCLUIR_ELIMINADOS, False)
+    ):
+        return
+    estado.statement = estado.statement.options(
+        with_loader_criteria(
+            AuditMixin,
+            lambda cls: cls.deleted_at.is_(None),
+            include_aliases=True,
+            track_closure_variables=False,
+        )
+    )
+
+
+def listen() -> None:
+    """Registra el filtro en todas las sesiones (idempotente)"""
+    if not event.contains(Session, "do_orm_execute", _filtrar_eliminados):
+        event.listen(Session, "do_orm_execute", _filtrar_eliminados)
+
+
+def remove() -> None:
+    """Quita el filtro global (p. ej. scripts de mantenimiento)"""
+    if event.contains(Session, "do_orm_execute", _filtrar_eliminados):
+        event.remove(Session, "do_orm_execute", _filtrar_eliminados)
+
+
+def incluir_eliminados(session: Union[Session, AsyncSession], incluir: bool = True) -> None:
+    """Activa o desactiva el filtro para toda la vida de la sesión"""
+    session.info[INCLUIR_ELIMINADOS] = incluir
+
+
+@contextmanager
+def sin_filtro_eliminados(session: Union[Session, AsyncSession]) -> Iterator[None]:
+    """Desactiva el filtro dentro del bloque y restaura el valor anterior"""
+    anterior = session.info.get(INCLUIR_ELIMINADOS, False)
+    session.info[INCLUIR_ELIMINADOS] = True
+    try:
+        yield
+    finally:
+        session.info[INCLUIR_ELIMINADOS] = anterior
+
+
+listen()
@@ -0,0 +1,197 @@
+# db/detector_n1.py
+"""
+Detector de consultas N+1 en relaciones perezosas.
+
+Relaciones como Inmueble.municipio, Inmueble.usos, AuditMixin.created_by o
+Intervencion.tecnicos son lazy="select": recorrer una lista de objetos y
+tocar la relación lanza una consulta por objeto. El detector cuenta, en el
+evento do_orm_execute de Session, las cargas perezosas de cada relación
+(Clase.relacion) y el punto del código que las provoca. Cuando una misma
+relación supera el umbral, lanza ErrorN1 o emite AvisoN1 con la relación
+y los sitios de llamada. Las cargas selectin/joined/subquery y los get()
+resueltos en el identity map no cuentan.
+
+Se activa por sesión o para todo el contexto (petición, test):
+
+    # Todas las sesiones abiertas dentro del bloque (contextvars: vale para asyncio)
+    with detectar_n1(umbral=5) as detector:
+        respuesta = schema.execute_sync(consulta)
+    print(detector.informe())
+
+    # Una sesión concreta
+    with manager.session(detector_n1=DetectorN1(umbral=5, accion="warn")) as session: ...
+    with detectar_n1(session, umbral=5): ...
+
+    # pytest (ver db/detector_n1_pytest.py)
+    pytest_plugins = ["db.detector_n1_pytest"]
+
+En staging, DB_N1_THRESHOLD=<n> da a cada sesión de los managers un
+detector propio (DB_N1_ACTION=warn|raise, por defecto warn).
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+import warnings
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Iterator, Optional, Union
+
+import sqlalchemy
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import ORMExecuteState, Session
+
+ACCIONES = ("raise", "warn")
+UMBRAL_POR_DEFECTO = 5
+
+# Clave en Session.info
+DETECTOR_N1 = "detector_n1"
+
+_ACTIVO: ContextVar[Optional["DetectorN1"]] = ContextVar("detector_n1", default=None)
+
+# Marcos que no son sitio de llamada: SQLAlchemy y este módulo
+_IGNORAR = (os.path.dirname(sqlalchemy.__file__), __file__)
+_MAX_SITIOS = 3
+
+
+class ErrorN1(AssertionError):
+    """Una relación se cargó de forma perezosa más veces que el umbral"""
+
+
+class AvisoN1(UserWarning):
+    """Versión aviso de ErrorN1 (warnings.simplefilter('error', AvisoN1) la convierte en error)"""
+
+
+@dataclass(slots=True)
+class CargasRelacion:
+    relacion: str
+    cargas: int = 0
+    sitios: Counter = field(default_factory=Counter)
+
+    def describir(self) -> str:
+        sitios = "\n".join(f"    {n}x {sitio}" for sitio, n in self.sitios.most_common(_MAX_SITIOS))
+        return f"{self.relacion}: {self.cargas} cargas perezosas\n{sitios}"
+
+
+class DetectorN1:
+    """Cuenta cargas perezosas por relación y avisa al pasar del umbral"""
+
+    def __init__(self, umbral: int = UMBRAL_POR_DEFECTO, accion: str = "raise"):
+        if accion not in ACCIONES:
+            raise ValueError(f"Acción N+1 no válida: {accion} (opciones: {', '.join(ACCIONES)})")
+        self.umbral = umbral
+        self.accion = accion
+        self.relaciones: dict[str, CargasRelacion] = {}
+
+    def registrar(self, relacion: str, sitio: str) -> None:
+        registro = self.relaciones.get(relacion)
+        if registro is None:
+            registro = self.relaciones[relacion] = CargasRelacion(relacion)
+        registro.cargas += 1
+        registro.sitios[sitio] += 1
+        if registro.cargas <= self.umbral:
+            return
+        mensaje = f"N+1 en {registro.describir()}\n(umbral {self.umbral}; usa selectinload/joinedload)"
+        if self.accion == "raise":
+            raise ErrorN1(mensaje)
+        if registro.cargas == self.umbral + 1:
+            # Un aviso por relación: el informe final tiene el total
+            warnings.warn(mensaje, AvisoN1, stacklevel=2)
+
+    def excesos(self) -> list[CargasRelacion]:
+        """Relaciones por encima del umbral, de más a menos cargas"""
+        return sorted(
+            (r for r in self.relaciones.values() if r.cargas > self.umbral),
+            key=lambda r: r.cargas,
+            reverse=True,
+        )
+
+    def informe(self) -> str:
+        registros = sorted(self.relaciones.values(), key=lambda r: r.cargas, reverse=True)
+        if not registros:
+            return "Sin cargas perezosas"
+        return "\n".join(r.describir() for r in registros)
+
+    def comprobar(self) -> None:
+        """Lanza ErrorN1 si alguna relación superó el umbral (fin de test o de petición)"""
+        excesos = self.excesos()
+        if excesos:
+            detalle = "\n".join(r.describir() for r in excesos)
+            raise ErrorN1(f"N+1 en {len(excesos)} relaciones (umbral {self.umbral}):\n{detalle}")
+
+    def reiniciar(self) -> None:
+        self.relaciones.clear()
+
+
+def _sitio() -> str:
+    """Primer marco fuera de SQLAlchemy y de este módulo"""
+    marco = sys._getframe(2)
+    while marco is not None and marco.f_code.co_filename.startswith(_IGNORAR):
+        marco = marco.f_back
+    if marco is None:
+        return "?"
+    return f"{marco.f_code.co_filename}:{marco.f_lineno} en {marco.f_code.co_name}"
+
+
+def _contar_carga(estado: ORMExecuteState) -> None:
+    if not estado.is_relationship_load or estado.lazy_loaded_from is None:
+        return
+    detector = estado.session.info.get(DETECTOR_N1) or _ACTIVO.get()
+    if detector is None:
+        return
+    propiedad = estado.loader_strategy_path[-1]
+    relacion = f"{estado.lazy_loaded_from.class_.__name__}.{propiedad.key}"
+    detector.registrar(relacion, _sitio())
+
+
+def listen() -> None:
+    """Registra el contador en todas las sesiones (idempotente)"""
+    if not event.contains(Session, "do_orm_execute", _contar_carga):
+        event.listen(Session, "do_orm_execute", _contar_carga)
+
+
+def remove() -> None:
+    if event.contains(Session, "do_orm_execute", _contar_carga):
+        event.remove(Session, "do_orm_execute", _contar_carga)
+
+
+@contextmanager
+def detectar_n1(
+    session: Optional[Union[Session, AsyncSession]] = None,
+    umbral: int = UMBRAL_POR_DEFECTO,
+    accion: str = "raise",
+    detector: Optional[DetectorN1] = None,
+) -> Iterator[DetectorN1]:
+    """
+    Activa un detector dentro del bloque: en la sesión dada o, sin sesión,
+    en todas las del contexto actual. Devuelve el detector para el informe.
+    """
+    detector = detector or DetectorN1(umbral, accion)
+    if session is None:
+        token = _ACTIVO.set(detector)
+        try:
+            yield detector
+        finally:
+            _ACTIVO.reset(token)
+        return
+    anterior = session.info.get(DETECTOR_N1)
+    session.info[DETECTOR_N1] = detector
+    try:
+        yield detector
+    finally:
+        session.info[DETECTOR_N1] = anterior
+
+
+def detector_por_defecto() -> Optional[DetectorN1]:
+    """Detector nuevo si DB_N1_THRESHOLD está definido (staging), None si no"""
+    umbral = os.getenv("DB_N1_THRESHOLD")
+    if not umbral:
+        return None
+    return DetectorN1(int(umbral), os.getenv("DB_N1_ACTION", "warn"))
+
+
+listen()
@@ -0,0 +1,57 @@
+# db/detector_n1_pytest.py
+"""
+Plugin de pytest para el detector de N+1.
+
+    # conftest.py
+    pytest_plugins = ["db.detector_n1_pytest"]
+
+    def test_listado_inmuebles(detector_n1):
+        listar_inmuebles(session)            # falla si una relación pasa del umbral
+
+    @pytest.mark.n1(umbral=2)
+    def test_ficha(detector_n1): ...
+
+Con --n1 el detector se activa en todos los tests, sin pedir el fixture.
+El umbral por defecto es --n1-umbral (5). Los fallos salen al final del
+test con el informe de relaciones y sitios de llamada; con
+@pytest.mark.n1(accion="raise") fallan en la propia carga perezosa.
+"""
+
+from __future__ import annotations
+
+from typing import Iterator
+
+import pytest
+
+from db.detector_n1 import UMBRAL_POR_DEFECTO, DetectorN1, detectar_n1
+
+
+def pytest_addoption(parser) -> None:
+    grupo = parser.getgroup("n1", "detector de consultas N+1")
+    grupo.addoption("--n1", action="store_true", help="activa el detector de N+1 en todos los tests")
+    grupo.addoption("--n1-umbral", type=int, default=UMBRAL_POR_DEFECTO,
+                    help="cargas perezosas permitidas por relación")
+
+
+def pytest_configure(config) -> None:
+    config.addinivalue_line("markers", "n1(umbral=None, accion='warn'): configura el detector de N+1 del test")
+
+
+@pytest.fixture
+def detector_n1(request) -> Iterator[DetectorN1]:
+    """Detector activo durante el test; al terminar falla si hubo N+1"""
+    marca = request.node.get_closest_marker("n1")
+    opciones = marca.kwargs if marca else {}
+    umbral = opciones.get("umbral", request.config.getoption("--n1-umbral"))
+    # warn durante el test para reunir todas las relaciones; el fallo, al final
+    with detectar_n1(umbral=umbral, accion=opciones.get("accion", "warn")) as detector:
+        yield detector
+    if detector.accion == "warn":
+        detector.comprobar()
+
+
+@pytest.fixture(autouse=True)
+def _detector_n1_global(request) -> Iterator[None]:
+    if request.config.getoption("--n1") and "detector_n1" not in request.fixturenames:
+        request.getfixturevalue("detector_n1")
+    yield
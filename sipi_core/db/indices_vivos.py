@@ -0,0 +1,197 @@
+# db/indices_vivos.py
+"""
+Índices parciales de filas vivas (WHERE deleted_at IS NULL).
+
+Con el filtro global de db.borrado_logico todas las consultas ORM llevan
+deleted_at IS NULL; un índice parcial con esa condición solo contiene las
+filas vivas, es más pequeño que el completo y el planificador lo usa en
+cuanto la consulta incluye la condición.
+
+Se generan para las columnas de búsqueda habitual (nombre, nombre_oficial,
+codigo_ine) y las FKs de negocio (no las de auditoría) de las tablas de
+TABLAS_CALIENTES. Los índices completos se mantienen: los necesitan las
+comprobaciones de FK al borrar el padre y las vistas con
+incluir_eliminados.
+
+registrar() los declara en los modelos (lo llama models/__init__.py), de
+modo que autogenerate y create_all los conocen. La migración se genera con:
+
+    python -m db.indices_vivos --down-revision <head>              # a stdout
+    python -m db.indices_vivos --down-revision <head> --escribir   # a db/alembic/versions
+    python -m db.indices_vivos --tablas todas                      # todas las tablas con deleted_at
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import os
+import secrets
+import sys
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Iterable, Optional
+
+from sqlalchemy import Index, MetaData, Table, text
+
+CONDICION = "deleted_at IS NULL"
+
+# Columnas de búsqueda por igualdad o prefijo
+COLUMNAS_BUSQUEDA = ("nombre", "nombre_oficial", "codigo_ine")
+
+# FKs de AuditMixin: no se consultan en caliente
+FKS_AUDITORIA = ("created_by_id", "updated_by_id", "deleted_by_id")
+
+# Tablas con más lecturas: geografía, inmuebles y sus tablas hijas
+TABLAS_CALIENTES = (
+    "comunidades_autonomas",
+    "provincias",
+    "municipios",
+    "diocesis",
+    "inmuebles",
+    "inmuebles_denominaciones",
+    "inmuebles_documentos",
+    "inmuebles_usos",
+    "inmuebles_niveles_proteccion",
+    "inmatriculaciones",
+    "transmisiones",
+    "intervenciones",
+    "citas_bibliograficas",
+    "portals_detecciones",
+)
+
+_LONGITUD_MAXIMA = 63  # NAMEDATALEN - 1
+
+
+@dataclass(frozen=True, slots=True)
+class IndiceVivo:
+    esquema: str
+    tabla: str
+    columna: str
+
+    @property
+    def nombre(self) -> str:
+        nombre = f"ix_{self.tabla}_{self.columna}_vivos"
+        if len(nombre) <= _LONGITUD_MAXIMA:
+            return nombre
+        firma = hashlib.sha1(nombre.encode()).hexdigest()[:8]
+        return f"{nombre[:_LONGITUD_MAXIMA - 15]}_{firma}_vivos"
+
+
+def _columnas(tabla: Table) -> list[str]:
+    return [
+        c.name for c in tabla.c
+        if c.name in COLUMNAS_BUSQUEDA or (c.foreign_keys and c.name not in FKS_AUDITORIA)
+    ]
+
+
+def candidatos(metadata: MetaData, tablas: Optional[Iterable[str]] = TABLAS_CALIENTES) -> list[IndiceVivo]:
+    """Índices parciales para las tablas dadas (None = todas las que tienen deleted_at)"""
+    seleccion = None if tablas is None else set(tablas)
+    indices = []
+    for tabla in metadata.sorted_tables:
+        if "deleted_at" not in tabla.c or (seleccion is not None and tabla.name not in seleccion):
+            continue
+        esquema = tabla.schema or metadata.schema
+        indices.extend(IndiceVivo(esquema, tabla.name, columna) for columna in _columnas(tabla))
+    return indices
+
+
+def registrar(metadata: MetaData, tablas: Optional[Iterable[str]] = TABLAS_CALIENTES) -> list[Index]:
+    """Declara en las tablas los índices de candidatos() que aún no existan"""
+    creados = []
+    for indice in candidatos(metadata, tablas):
+        tabla = metadata.tables[f"{indice.esquema}.{indice.tabla}"]
+        if any(i.name == indice.nombre for i in tabla.indexes):
+            continue
+        creados.append(Index(indice.nombre, tabla.c[indice.columna], postgresql_where=text(CONDICION)))
+    return creados
+
+
+def fichero_migracion(mensaje: str, revision: str, down_revision: str,
+                      upgrade: list[str], downgrade: list[str]) -> str:
+    """Fichero de migración Alembic con las sentencias op.* dadas (una por línea)"""
+    cuerpo_upgrade = "\n".join(f"    {linea}" for linea in upgrade) or "    pass"
+    cuerpo_downgrade = "\n".join(f"    {linea}" for linea in downgrade) or "    pass"
+    return f'''"""{mensaje}
+
+Revision ID: {revision}
+Revises: {down_revision}
+Create Date: {datetime.now()}
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '{revision}'
+down_revision: Union[str, None] = '{down_revision}'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+{cuerpo_upgrade}
+
+
+def downgrade() -> None:
+{cuerpo_downgrade}
+'''
+
+
+def escribir_migracion(contenido: str, revision: str, mensaje: str) -> str:
+    """Guarda la migración en db/alembic/versions y devuelve la ruta"""
+    sufijo = "_".join(mensaje.split())[:40]
+    ruta = os.path.join(os.path.dirname(__file__), "alembic", "versions", f"{revision}_{sufijo}.py")
+    with open(ruta, "w", encoding="utf-8") as fichero:
+        fichero.write(contenido)
+    return ruta
+
+
+def migracion(indices: list[IndiceVivo], revision: str, down_revision: str, mensaje: str) -> str:
+    """Migración que crea (y en downgrade borra) los índices"""
+    crear = [
+        f"op.create_index('{i.nombre}', '{i.tabla}', ['{i.columna}'], unique=False, "
+        f"schema='{i.esquema}', postgresql_where=sa.text('{CONDICION}'))"
+        for i in indices
+    ]
+    borrar = [
+        f"op.drop_index('{i.nombre}', table_name='{i.tabla}', schema='{i.esquema}')"
+        for i in reversed(indices)
+    ]
+    return fichero_migracion(mensaje, revision, down_revision, crear, borrar)
+
+
+def main(argv=None) -> None:
+    from db.registry import Base
+    import models  # noqa: F401  registra todas las tablas
+
+    parser = argparse.ArgumentParser(description="Genera la migración de índices parciales de filas vivas")
+    parser.add_argument("--down-revision", required=True, help="revisión actual (alembic heads)")
+    parser.add_argument("--revision", default=None, help="id de la nueva revisión (por defecto, aleatorio)")
+    parser.add_argument("--tablas", default=None,
+                        help="tablas separadas por comas, o 'todas' (por defecto, TABLAS_CALIENTES)")
+    parser.add_argument("--mensaje", default="indices parciales de filas vivas")
+    parser.add_argument("--escribir", action="store_true", help="escribir en db/alembic/versions")
+    args = parser.parse_args(argv)
+
+    if args.tablas == "todas":
+        tablas = None
+    elif args.tablas:
+        tablas = args.tablas.split(",")
+    else:
+        tablas = TABLAS_CALIENTES
+    revision = args.revision or secrets.token_hex(6)
+    contenido = migracion(candidatos(Base.metadata, tablas), revision, args.down_revision, args.mensaje)
+
+    if not args.escribir:
+        sys.stdout.write(contenido)
+        return
+    print(escribir_migracion(contenido, revision, args.mensaje))
+
+
+if __name__ == "__main__":
+    main()
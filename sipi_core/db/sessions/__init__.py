@@ -1,3 +1,9 @@
 from .manager import AsyncDatabaseManager,SyncDatabaseManager, DatabaseConfig
+from .metricas import METRICAS, MetricasBD, ExportadorPrometheus, ExportadorInstantanea
+from .replicas import EnrutadorReplicas, SesionEnrutada
 
-__all__ = ["AsyncDatabaseManager", "SyncDatabaseManager", "DatabaseConfig"]
+__all__ = [
+    "AsyncDatabaseManager", "SyncDatabaseManager", "DatabaseConfig",
+    "METRICAS", "MetricasBD", "ExportadorPrometheus", "ExportadorInstantanea",
+    "EnrutadorReplicas", "SesionEnrutada",
+]
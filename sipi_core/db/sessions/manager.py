@@ -1,14 +1,19 @@
 
 # db/sessions/manager.py
 
-from typing import AsyncGenerator, Generator
+from typing import AsyncGenerator, Generator, Optional, Sequence
 from contextlib import asynccontextmanager, contextmanager
 from sqlalchemy import create_engine, text
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
 from sqlalchemy.orm import sessionmaker, Session
-from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
 import os
 
+# Registra el filtro global de borrado lógico en todas las sesiones
+from db.borrado_logico import INCLUIR_ELIMINADOS
+from db.detector_n1 import DETECTOR_N1, DetectorN1, detector_por_defecto
+from db.sessions.metricas import MetricasBD, clase_pool, metricas_por_defecto
+from db.sessions.replicas import CONSISTENCIA, SOLO_LECTURA, EnrutadorReplicas, SesionEnrutada
+
 
 class DatabaseConfig:
     """Configuración compartida para conexiones de base de datos"""
@@ -34,6 +39,18 @@ class DatabaseConfig:
             database_url = database_url.replace("postgresql://", "postgresql+asyncpg://")
         
         return database_url
+
+    @staticmethod
+    def get_replica_urls(async_mode: bool = False, urls: Optional[Sequence[str]] = None) -> list[str]:
+        """URLs de réplicas de lectura (por defecto DATABASE_REPLICA_URLS, separadas por comas)"""
+        if urls is None:
+            urls = os.getenv("DATABASE_REPLICA_URLS", "").split(",")
+        urls = [url.strip() for url in urls if url.strip()]
+        urls = [url.replace("postgresql+asyncpg://", "postgresql://").replace("postgresql+psycopg2://", "postgresql://")
+                for url in urls]
+        if async_mode:
+            urls = [url.replace("postgresql://", "postgresql+asyncpg://") for url in urls]
+        return urls
     
     @staticmethod
     def get_schema() -> str:
@@ -52,10 +69,20 @@ class SyncDatabaseManager:
     """
     Manager síncrono para conexiones a base de datos.
     Usado por Alembic y operaciones síncronas.
+
+    Con metricas (o DB_METRICS=1) instrumenta pool y sentencias con la
+    etiqueta bd="primario-sync": ver db/sessions/metricas.py.
     """
     
-    def __init__(self, database_url: str = None, echo: bool = False, **pool_kwargs):
+    def __init__(
+        self,
+        database_url: str = None,
+        echo: bool = False,
+        metricas: Optional[MetricasBD] = None,
+        **pool_kwargs
+    ):
         self.database_url = database_url or DatabaseConfig.get_database_url(async_mode=False)
+        self.metricas = metricas if metricas is not None else metricas_por_defecto()
         self.schema = DatabaseConfig.get_schema()
         self.defined_schemas = DatabaseConfig.get_defined_schemas()
         
@@ -66,11 +93,13 @@ class SyncDatabaseManager:
         
         self.engine = create_engine(
             self.database_url,
-            poolclass=QueuePool,
+            poolclass=clase_pool(self.metricas, asincrono=False),
             echo=echo,
             connect_args=connect_args,
             **pool_kwargs
         )
+        if self.metricas is not None:
+            self.metricas.instrumentar(self.engine, "primario-sync")
         
         self.session_maker = sessionmaker(
             self.engine,
@@ -83,9 +112,18 @@ class SyncDatabaseManager:
         self.engine.dispose()
     
     @contextmanager
-    def session(self) -> Generator[Session, None, None]:
-        """Context manager para sesiones de base de datos"""
-        session = self.session_maker()
+    def session(
+        self,
+        incluir_eliminados: bool = False,
+        detector_n1: Optional[DetectorN1] = None,
+    ) -> Generator[Session, None, None]:
+        """
+        Context manager para sesiones de base de datos.
+        incluir_eliminados desactiva el filtro de borrado lógico (vistas de administración).
+        detector_n1 cuenta las cargas perezosas de la sesión (por defecto, DB_N1_THRESHOLD).
+        """
+        info = {INCLUIR_ELIMINADOS: incluir_eliminados, DETECTOR_N1: detector_n1 or detector_por_defecto()}
+        session = self.session_maker(info=info)
         try:
             yield session
         except Exception:
@@ -111,6 +149,10 @@ class SyncDatabaseManager:
             # Extensiones PostGIS
             session.execute(text("CREATE EXTENSION IF NOT EXISTS postgis"))
             session.execute(text("CREATE EXTENSION IF NOT EXISTS postgis_topology"))
+
+            # Extensiones de búsqueda textual (matching de anuncios, buscador)
+            session.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+            session.execute(text("CREATE EXTENSION IF NOT EXISTS unaccent"))
             
             # Crear schemas definidos
             for schema in self.defined_schemas:
@@ -134,10 +176,25 @@ class AsyncDatabaseManager:
     """
     Manager asíncrono para conexiones a base de datos.
     Usado por la aplicación (FastAPI, etc.).
+
+    Con replica_urls (o DATABASE_REPLICA_URLS) las sesiones abiertas con
+    solo_lectura=True leen de las réplicas: ver db/sessions/replicas.py.
+    Con metricas (o DB_METRICS=1) instrumenta pools y sentencias del
+    primario y de cada réplica: ver db/sessions/metricas.py.
     """
     
-    def __init__(self, database_url: str = None, echo: bool = False, **pool_kwargs):
+    def __init__(
+        self,
+        database_url: str = None,
+        echo: bool = False,
+        replica_urls: Optional[Sequence[str]] = None,
+        estrategia_replicas: Optional[str] = None,
+        ventana_lectura_escrituras: Optional[float] = None,
+        metricas: Optional[MetricasBD] = None,
+        **pool_kwargs
+    ):
         self.database_url = database_url or DatabaseConfig.get_database_url(async_mode=True)
+        self.metricas = metricas if metricas is not None else metricas_por_defecto()
         self.schema = DatabaseConfig.get_schema()
         self.defined_schemas = DatabaseConfig.get_defined_schemas()
         
@@ -150,26 +207,81 @@ class AsyncDatabaseManager:
         
         self.engine = create_async_engine(
             self.database_url,
-            poolclass=AsyncAdaptedQueuePool,
+            poolclass=clase_pool(self.metricas, asincrono=True),
             echo=echo,
             connect_args=connect_args,
             **pool_kwargs
         )
+        if self.metricas is not None:
+            self.metricas.instrumentar(self.engine.sync_engine, "primario")
+        
+        # Réplicas de lectura: mismo pool y search_path que el primario
+        replica_urls = DatabaseConfig.get_replica_urls(async_mode=True, urls=replica_urls)
+        self.enrutador: Optional[EnrutadorReplicas] = None
+        if replica_urls:
+            replicas = [
+                create_async_engine(
+                    url,
+                    poolclass=clase_pool(self.metricas, asincrono=True),
+                    echo=echo,
+                    connect_args=connect_args,
+                    pool_pre_ping=True,
+                    **pool_kwargs
+                )
+                for url in replica_urls
+            ]
+            if self.metricas is not None:
+                for replica in replicas:
+                    self.metricas.instrumentar(replica.sync_engine, f"replica:{replica.url.host}")
+            max_retraso = os.getenv("DATABASE_REPLICA_MAX_LAG_S")
+            self.enrutador = EnrutadorReplicas(
+                self.engine,
+                replicas,
+                estrategia=estrategia_replicas or os.getenv("DATABASE_REPLICA_STRATEGY", "round_robin"),
+                ventana_s=(
+                    ventana_lectura_escrituras if ventana_lectura_escrituras is not None
+                    else float(os.getenv("DATABASE_READ_YOUR_WRITES_S", "5"))
+                ),
+                expulsion_s=float(os.getenv("DATABASE_REPLICA_EJECT_S", "30")),
+                max_retraso_s=float(max_retraso) if max_retraso else None,
+            )
         
         self.session_maker = async_sessionmaker(
             self.engine,
             class_=AsyncSession,
             expire_on_commit=False,
+            sync_session_class=SesionEnrutada,
+            enrutador=self.enrutador,
         )
     
     async def close(self):
-        """Cierra el engine"""
+        """Cierra el engine (y los de las réplicas)"""
+        if self.enrutador is not None:
+            await self.enrutador.close()
         await self.engine.dispose()
     
     @asynccontextmanager
-    async def session(self) -> AsyncGenerator[AsyncSession, None]:
-        """Context manager asíncrono para sesiones de base de datos"""
-        async with self.session_maker() as session:
+    async def session(
+        self,
+        incluir_eliminados: bool = False,
+        solo_lectura: bool = False,
+        consistencia: Optional[str] = None,
+        detector_n1: Optional[DetectorN1] = None,
+    ) -> AsyncGenerator[AsyncSession, None]:
+        """
+        Context manager asíncrono para sesiones de base de datos.
+        incluir_eliminados desactiva el filtro de borrado lógico (vistas de administración).
+        solo_lectura envía las transacciones a una réplica, salvo en la ventana de
+        leer lo escrito de la clave consistencia (sin clave no hay ventana).
+        detector_n1 cuenta las cargas perezosas de la sesión (por defecto, DB_N1_THRESHOLD).
+        """
+        info = {
+            INCLUIR_ELIMINADOS: incluir_eliminados,
+            SOLO_LECTURA: solo_lectura,
+            CONSISTENCIA: consistencia,
+            DETECTOR_N1: detector_n1 or detector_por_defecto(),
+        }
+        async with self.session_maker(info=info) as session:
             try:
                 yield session
             except Exception:
@@ -195,6 +307,10 @@ class AsyncDatabaseManager:
             # Extensiones PostGIS
             await session.execute(text("CREATE EXTENSION IF NOT EXISTS postgis"))
             await session.execute(text("CREATE EXTENSION IF NOT EXISTS postgis_topology"))
+
+            # Extensiones de búsqueda textual (matching de anuncios, buscador)
+            await session.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+            await session.execute(text("CREATE EXTENSION IF NOT EXISTS unaccent"))
             
             # Crear schemas definidos
             for schema in self.defined_schemas:
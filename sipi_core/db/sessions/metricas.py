@@ -0,0 +1,404 @@
+# db/sessions/metricas.py
+"""
+Instrumentación de pools y sentencias de los managers de sesión.
+
+Con métricas activas (DB_METRICS=1 o metricas=... en el manager) se
+registran, por base de datos ("primario" o la réplica):
+
+    - Espera para obtener conexión del pool (histograma). Incluye abrir
+      una conexión nueva cuando el pool crece.
+    - Tamaño, conexiones prestadas, libres y overflow del pool (gauges,
+      leídos del pool al exportar).
+    - Latencia (histograma), filas y errores por sentencia, agrupadas por
+      huella: el SQL normalizado sin literales ni parámetros, de modo que
+      "WHERE id = 'a'" y "WHERE id = 'b'" cuentan juntas.
+
+Sin métricas no se registra ningún evento y el pool es el de SQLAlchemy:
+el coste es nulo.
+
+Exportación intercambiable:
+
+    print(METRICAS.exportar(ExportadorPrometheus()))   # texto para /metrics
+    datos = METRICAS.exportar(ExportadorInstantanea())  # dict en proceso
+
+Un exportador es cualquier objeto con exportar(metricas) (ver Exportador).
+"""
+
+from __future__ import annotations
+
+import bisect
+import hashlib
+import os
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Optional, Protocol
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool, QueuePool
+
+# Límites superiores de los buckets, en segundos
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Huellas distintas como máximo; el resto se agrupa en OTRAS
+MAX_HUELLAS = 1000
+OTRAS = "otras"
+
+PREFIJO = "sipi_db"
+
+
+# ----------------------------------------------------------------------
+# Huellas de sentencias
+# ----------------------------------------------------------------------
+
+_COMENTARIOS = re.compile(r"/\*.*?\*/|--[^\n]*", re.S)
+_CADENAS = re.compile(r"'(?:[^']|'')*'")
+_PARAMETROS = re.compile(r"%\(\w+\)s|%s|\$\d+|(?<![:\w]):\w+|\?")
+_NUMEROS = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?(?![\w.])")
+# Cada ? puede llevar el cast del bind (IN (?::UUID, ?::UUID), ANY(?::VARCHAR(?)[]))
+_CAST = r"(?:\s*::\s*\w+(?:\s+\w+)*(?:\s*\(\s*\?(?:\s*,\s*\?)?\s*\))?(?:\s*\[\])*)?"
+_LISTAS = re.compile(rf"\(\s*\?{_CAST}(?:\s*,\s*\?{_CAST})*\s*\)")
+_FILAS = re.compile(r"\(\?\)(?:\s*,\s*\(\?\))+")
+_ESPACIOS = re.compile(r"\s+")
+
+_cache_huellas: dict[str, tuple[str, str]] = {}
+_MAX_CACHE = 4096
+
+
+def normalizar(sql: str) -> str:
+    """SQL sin comentarios, literales ni parámetros, con espacios colapsados"""
+    sql = _COMENTARIOS.sub(" ", sql)
+    sql = _CADENAS.sub("?", sql)
+    sql = _PARAMETROS.sub("?", sql)
+    sql = _NUMEROS.sub("?", sql)
+    sql = _LISTAS.sub("(?)", sql)
+    sql = _FILAS.sub("(?)", sql)
+    return _ESPACIOS.sub(" ", sql).strip()
+
+
+def huella(sql: str) -> tuple[str, str]:
+    """(huella, sql normalizado); cacheado por texto, que SQLAlchemy repite"""
+    resultado = _cache_huellas.get(sql)
+    if resultado is None:
+        normalizado = normalizar(sql)
+        resultado = (hashlib.sha1(normalizado.encode()).hexdigest()[:12], normalizado)
+        if len(_cache_huellas) >= _MAX_CACHE:
+            _cache_huellas.clear()
+        _cache_huellas[sql] = resultado
+    return resultado
+
+
+# ----------------------------------------------------------------------
+# Tipos de métrica
+# ----------------------------------------------------------------------
+
+@dataclass(slots=True)
+class Histograma:
+    cuentas: list[int] = field(default_factory=lambda: [0] * (len(BUCKETS) + 1))
+    suma: float = 0.0
+    total: int = 0
+    maximo: float = 0.0
+
+    def observar(self, valor: float) -> None:
+        self.cuentas[bisect.bisect_left(BUCKETS, valor)] += 1
+        self.suma += valor
+        self.total += 1
+        if valor > self.maximo:
+            self.maximo = valor
+
+    def acumuladas(self) -> list[tuple[float, int]]:
+        """(le, cuenta acumulada) al estilo Prometheus, con +Inf al final"""
+        acumulado, salida = 0, []
+        for limite, cuenta in zip((*BUCKETS, float("inf")), self.cuentas):
+            acumulado += cuenta
+            salida.append((limite, acumulado))
+        return salida
+
+    def percentil(self, p: float) -> float:
+        """Aproximación por el límite superior del bucket (el máximo en el último)"""
+        if not self.total:
+            return 0.0
+        objetivo = p * self.total
+        for limite, acumulado in self.acumuladas():
+            if acumulado >= objetivo:
+                return min(limite, self.maximo)
+        return self.maximo
+
+
+@dataclass(slots=True)
+class MetricaSentencia:
+    consulta: str
+    latencia: Histograma = field(default_factory=Histograma)
+    filas: int = 0
+    errores: int = 0
+
+
+# ----------------------------------------------------------------------
+# Pools con medición de espera
+# ----------------------------------------------------------------------
+
+class _EsperaMedida:
+    """Mide _do_get (espera en la cola y, si hace falta, conexión nueva)"""
+    metricas: Optional["MetricasBD"] = None
+    bd: str = ""
+
+    def _do_get(self):
+        if self.metricas is None:
+            return super()._do_get()
+        inicio = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            self.metricas.observar_espera(self.bd, time.perf_counter() - inicio)
+
+    def recreate(self):
+        # engine.dispose() recrea el pool: se conserva la instrumentación
+        nuevo = super().recreate()
+        nuevo.metricas, nuevo.bd = self.metricas, self.bd
+        return nuevo
+
+
+class QueuePoolMedido(_EsperaMedida, QueuePool):
+    pass
+
+
+class AsyncAdaptedQueuePoolMedido(_EsperaMedida, AsyncAdaptedQueuePool):
+    pass
+
+
+def clase_pool(metricas: Optional["MetricasBD"], asincrono: bool) -> type[Pool]:
+    """Clase de pool para create_engine: la medida solo con métricas"""
+    if metricas is None:
+        return AsyncAdaptedQueuePool if asincrono else QueuePool
+    return AsyncAdaptedQueuePoolMedido if asincrono else QueuePoolMedido
+
+
+# ----------------------------------------------------------------------
+# Registro
+# ----------------------------------------------------------------------
+
+class MetricasBD:
+    """Métricas de pools y sentencias de uno o varios engines"""
+
+    def __init__(self, max_huellas: int = MAX_HUELLAS):
+        self.max_huellas = max_huellas
+        self._lock = threading.Lock()
+        self._engines: dict[str, Engine] = {}
+        self._esperas: dict[str, Histograma] = {}
+        self._sentencias: dict[tuple[str, str], MetricaSentencia] = {}
+
+    # -- Registro de engines -------------------------------------------
+
+    def instrumentar(self, engine: Engine, bd: str) -> None:
+        """Escucha los eventos del engine (síncrono; en async, engine.sync_engine)"""
+        pool = engine.pool
+        if isinstance(pool, _EsperaMedida):
+            pool.metricas, pool.bd = self, bd
+        self._engines[bd] = engine
+        self._esperas.setdefault(bd, Histograma())
+
+        def antes(conexion, cursor, sentencia, parametros, contexto, executemany) -> None:
+            conexion.info.setdefault("_metricas_inicio", []).append(time.perf_counter())
+
+        def despues(conexion, cursor, sentencia, parametros, contexto, executemany) -> None:
+            inicio = conexion.info["_metricas_inicio"].pop()
+            filas = cursor.rowcount if cursor is not None and cursor.rowcount and cursor.rowcount > 0 else 0
+            self.observar_sentencia(bd, sentencia, time.perf_counter() - inicio, filas)
+
+        def error(contexto) -> None:
+            if contexto.connection is not None and contexto.statement is not None:
+                pila = contexto.connection.info.get("_metricas_inicio")
+                if pila:
+                    pila.pop()
+                self.observar_error(bd, contexto.statement)
+
+        event.listen(engine, "before_cursor_execute", antes)
+        event.listen(engine, "after_cursor_execute", despues)
+        event.listen(engine, "handle_error", error)
+
+    # -- Observaciones -------------------------------------------------
+
+    def observar_espera(self, bd: str, segundos: float) -> None:
+        with self._lock:
+            self._esperas.setdefault(bd, Histograma()).observar(segundos)
+
+    def _sentencia(self, bd: str, sql: str) -> MetricaSentencia:
+        clave_huella, consulta = huella(sql)
+        clave = (bd, clave_huella)
+        metrica = self._sentencias.get(clave)
+        if metrica is None:
+            if len(self._sentencias) >= self.max_huellas:
+                clave, consulta = (bd, OTRAS), OTRAS
+                metrica = self._sentencias.get(clave)
+            if metrica is None:
+                metrica = self._sentencias[clave] = MetricaSentencia(consulta)
+        return metrica
+
+    def observar_sentencia(self, bd: str, sql: str, segundos: float, filas: int) -> None:
+        with self._lock:
+            metrica = self._sentencia(bd, sql)
+            metrica.latencia.observar(segundos)
+            metrica.filas += filas
+
+    def observar_error(self, bd: str, sql: str) -> None:
+        with self._lock:
+            self._sentencia(bd, sql).errores += 1
+
+    def reiniciar(self) -> None:
+        with self._lock:
+            self._esperas = {bd: Histograma() for bd in self._esperas}
+            self._sentencias.clear()
+
+    # -- Lectura -------------------------------------------------------
+
+    def pools(self) -> dict[str, dict[str, Any]]:
+        """Gauges del pool y espera de checkout por base de datos"""
+        salida = {}
+        with self._lock:
+            for bd, engine in self._engines.items():
+                pool = engine.pool
+                espera = self._esperas[bd]
+                salida[bd] = {
+                    "tamano": getattr(pool, "size", lambda: 0)(),
+                    "prestadas": getattr(pool, "checkedout", lambda: 0)(),
+                    "libres": getattr(pool, "checkedin", lambda: 0)(),
+                    "overflow": max(0, getattr(pool, "overflow", lambda: 0)()),
+                    "espera": _copia(espera),
+                }
+        return salida
+
+    def sentencias(self) -> dict[tuple[str, str], MetricaSentencia]:
+        with self._lock:
+            return {
+                clave: MetricaSentencia(m.consulta, _copia(m.latencia), m.filas, m.errores)
+                for clave, m in self._sentencias.items()
+            }
+
+    def exportar(self, exportador: "Exportador") -> Any:
+        return exportador.exportar(self)
+
+
+def _copia(histograma: Histograma) -> Histograma:
+    return Histograma(list(histograma.cuentas), histograma.suma, histograma.total, histograma.maximo)
+
+
+# ----------------------------------------------------------------------
+# Exportadores
+# ----------------------------------------------------------------------
+
+class Exportador(Protocol):
+    def exportar(self, metricas: MetricasBD) -> Any: ...
+
+
+def _etiqueta(valor: str) -> str:
+    return valor.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _etiquetas(**valores: str) -> str:
+    return ",".join(f'{clave}="{_etiqueta(valor)}"' for clave, valor in valores.items())
+
+
+def _limite(valor: float) -> str:
+    return "+Inf" if valor == float("inf") else repr(valor)
+
+
+@dataclass(frozen=True, slots=True)
+class ExportadorPrometheus:
+    """Formato de texto de Prometheus (exposition format 0.0.4)"""
+    prefijo: str = PREFIJO
+    longitud_consulta: int = 200  # truncado del SQL en la métrica _info
+
+    def _histograma(self, lineas: list[str], nombre: str, histograma: Histograma, **etiquetas: str) -> None:
+        for limite, acumulado in histograma.acumuladas():
+            lineas.append(f"{nombre}_bucket{{{_etiquetas(**etiquetas, le=_limite(limite))}}} {acumulado}")
+        lineas.append(f"{nombre}_sum{{{_etiquetas(**etiquetas)}}} {histograma.suma!r}")
+        lineas.append(f"{nombre}_count{{{_etiquetas(**etiquetas)}}} {histograma.total}")
+
+    def exportar(self, metricas: MetricasBD) -> str:
+        p = self.prefijo
+        pools, sentencias = metricas.pools(), metricas.sentencias()
+        lineas = [
+            f"# HELP {p}_pool_conexiones Conexiones del pool por estado",
+            f"# TYPE {p}_pool_conexiones gauge",
+        ]
+        for bd, datos in pools.items():
+            for estado in ("tamano", "prestadas", "libres", "overflow"):
+                lineas.append(f"{p}_pool_conexiones{{{_etiquetas(bd=bd, estado=estado)}}} {datos[estado]}")
+        lineas += [
+            f"# HELP {p}_checkout_espera_segundos Espera para obtener una conexión del pool",
+            f"# TYPE {p}_checkout_espera_segundos histogram",
+        ]
+        for bd, datos in pools.items():
+            self._histograma(lineas, f"{p}_checkout_espera_segundos", datos["espera"], bd=bd)
+        lineas += [
+            f"# HELP {p}_sentencia_segundos Latencia de sentencias por huella",
+            f"# TYPE {p}_sentencia_segundos histogram",
+        ]
+        for (bd, clave), metrica in sentencias.items():
+            self._histograma(lineas, f"{p}_sentencia_segundos", metrica.latencia, bd=bd, huella=clave)
+        for nombre, atributo, ayuda in (
+            ("sentencia_filas_total", "filas", "Filas devueltas o afectadas por huella"),
+            ("sentencia_errores_total", "errores", "Errores por huella"),
+        ):
+            lineas += [f"# HELP {p}_{nombre} {ayuda}", f"# TYPE {p}_{nombre} counter"]
+            for (bd, clave), metrica in sentencias.items():
+                lineas.append(f"{p}_{nombre}{{{_etiquetas(bd=bd, huella=clave)}}} {getattr(metrica, atributo)}")
+        lineas += [f"# HELP {p}_sentencia_info SQL normalizado de cada huella", f"# TYPE {p}_sentencia_info gauge"]
+        for (bd, clave), metrica in sentencias.items():
+            consulta = metrica.consulta[:self.longitud_consulta]
+            lineas.append(f"{p}_sentencia_info{{{_etiquetas(bd=bd, huella=clave, consulta=consulta)}}} 1")
+        return "\n".join(lineas) + "\n"
+
+
+@dataclass(frozen=True, slots=True)
+class ExportadorInstantanea:
+    """Dict en proceso: pools y sentencias ordenadas por tiempo total"""
+    max_sentencias: Optional[int] = 50
+
+    def exportar(self, metricas: MetricasBD) -> dict[str, Any]:
+        pools = {
+            bd: {
+                **{k: v for k, v in datos.items() if k != "espera"},
+                "espera_ms": _resumen(datos["espera"]),
+            }
+            for bd, datos in metricas.pools().items()
+        }
+        sentencias = sorted(
+            (
+                {
+                    "bd": bd,
+                    "huella": clave,
+                    "consulta": metrica.consulta,
+                    "llamadas": metrica.latencia.total,
+                    "filas": metrica.filas,
+                    "errores": metrica.errores,
+                    "total_ms": metrica.latencia.suma * 1000,
+                    **_resumen(metrica.latencia),
+                }
+                for (bd, clave), metrica in metricas.sentencias().items()
+            ),
+            key=lambda fila: fila["total_ms"],
+            reverse=True,
+        )
+        return {"pools": pools, "sentencias": sentencias[:self.max_sentencias]}
+
+
+def _resumen(histograma: Histograma) -> dict[str, float]:
+    return {
+        "media": histograma.suma / histograma.total * 1000 if histograma.total else 0.0,
+        "p50": histograma.percentil(0.50) * 1000,
+        "p95": histograma.percentil(0.95) * 1000,
+        "p99": histograma.percentil(0.99) * 1000,
+        "max": histograma.maximo * 1000,
+    }
+
+
+# Registro compartido por los managers cuando DB_METRICS está activo
+METRICAS = MetricasBD()
+
+
+def metricas_por_defecto() -> Optional[MetricasBD]:
+    """METRICAS si DB_METRICS está activo; None (sin instrumentación) si no"""
+    return METRICAS if os.getenv("DB_METRICS", "").lower() in ("1", "true", "si", "yes") else None
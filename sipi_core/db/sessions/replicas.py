@@ -0,0 +1,271 @@
+# db/sessions/replicas.py
+"""
+Enrutado de lecturas a réplicas para AsyncDatabaseManager.
+
+Las sesiones abiertas con solo_lectura=True (teselas, buscador,
+exportaciones) envían sus transacciones a una réplica; el resto va al
+primario. Dentro de una sesión de solo lectura, una escritura (flush, DML
+o SELECT ... FOR UPDATE) va al primario y fija en él el resto de la
+transacción. Cada transacción usa una sola réplica, elegida al empezar,
+para leer de un único snapshot.
+
+Elección de réplica (DATABASE_REPLICA_STRATEGY):
+    - round_robin:      turno rotatorio entre las disponibles.
+    - menos_conexiones: la de menos conexiones prestadas por su pool.
+
+Salud: un error de conexión o desconexión en una réplica la expulsa
+durante DATABASE_REPLICA_EJECT_S segundos, que se duplican con cada fallo
+seguido (hasta 10 veces). Pasado ese tiempo vuelve a recibir tráfico y la
+primera conexión buena la readmite. comprobar() / vigilar() hacen además
+un ping activo y, con DATABASE_REPLICA_MAX_LAG_S, expulsan réplicas con
+más retraso de replicación. Sin réplicas disponibles se lee del primario.
+
+Leer lo escrito: tras un commit con escrituras en una sesión con clave de
+consistencia (p. ej. el id de usuario), durante DATABASE_READ_YOUR_WRITES_S
+segundos las sesiones de solo lectura con la misma clave leen del
+primario. Sin clave (por defecto) no se abre ni se consulta ninguna
+ventana: las escrituras de procesos de fondo no desvían las lecturas al
+primario. Solo se detectan las escrituras del ORM (flush e
+insert/update/delete); tras un UPDATE en text() se llama a
+registrar_escritura(clave).
+
+USO:
+    manager = AsyncDatabaseManager(replica_urls=["postgresql://...@replica1/sipi"])
+    async with manager.session(solo_lectura=True, consistencia=usuario_id) as session:
+        tile = await TILE_SERVICE.tile_async(session, "inmuebles", z, x, y)
+
+    asyncio.create_task(manager.enrutador.vigilar(15))
+"""
+
+from __future__ import annotations
+
+import asyncio
+import itertools
+import logging
+import time
+from dataclasses import dataclass
+from typing import Optional, Sequence
+
+from sqlalchemy import event, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import Select
+from sqlalchemy.sql.dml import UpdateBase
+
+logger = logging.getLogger(__name__)
+
+ESTRATEGIAS = ("round_robin", "menos_conexiones")
+
+# Claves en Session.info
+SOLO_LECTURA = "solo_lectura"
+CONSISTENCIA = "consistencia"
+_BIND_LECTURA = "_bind_lectura"
+_ESCRIBIO = "_escribio"
+
+_MAX_DUPLICACIONES = 10
+
+# Ventanas de leer lo escrito antes de purgar las caducadas
+_MAX_VENTANAS = 10_000
+
+_SQL_RETRASO = text("""
+    SELECT CASE WHEN pg_is_in_recovery()
+                THEN coalesce(extract(epoch FROM now() - pg_last_xact_replay_timestamp()), 0)
+                ELSE 0
+           END
+""")
+
+
+@dataclass(slots=True)
+class Replica:
+    engine: AsyncEngine
+    fallos: int = 0
+    expulsada_hasta: float = 0.0
+    retraso_s: Optional[float] = None
+
+    @property
+    def nombre(self) -> str:
+        return self.engine.url.render_as_string(hide_password=True)
+
+    def disponible(self, ahora: float) -> bool:
+        return ahora >= self.expulsada_hasta
+
+    def conexiones(self) -> int:
+        return self.engine.sync_engine.pool.checkedout()
+
+
+class EnrutadorReplicas:
+    """Elige el engine de lectura y lleva la salud de las réplicas"""
+
+    def __init__(
+        self,
+        primario: AsyncEngine,
+        replicas: Sequence[AsyncEngine],
+        estrategia: str = "round_robin",
+        ventana_s: float = 5.0,
+        expulsion_s: float = 30.0,
+        max_retraso_s: Optional[float] = None,
+    ):
+        if estrategia not in ESTRATEGIAS:
+            raise ValueError(f"Estrategia de réplicas no válida: {estrategia} (opciones: {', '.join(ESTRATEGIAS)})")
+        self.primario = primario
+        self.replicas = [Replica(engine) for engine in replicas]
+        self.estrategia = estrategia
+        self.ventana_s = ventana_s
+        self.expulsion_s = expulsion_s
+        self.max_retraso_s = max_retraso_s
+        self._turno = itertools.count()
+        self._escrituras: dict[str, float] = {}
+        for replica in self.replicas:
+            self._escuchar(replica)
+
+    # ------------------------------------------------------------------
+    # Salud
+    # ------------------------------------------------------------------
+
+    def _escuchar(self, replica: Replica) -> None:
+        def error(contexto) -> None:
+            # Sin conexión: falló al conectar; is_disconnect: se cayó en uso
+            if contexto.connection is None or contexto.is_disconnect:
+                self.expulsar(replica, str(contexto.original_exception).strip())
+
+        def conectada(conexion) -> None:
+            if replica.fallos and replica.disponible(time.monotonic()):
+                self.readmitir(replica)
+
+        event.listen(replica.engine.sync_engine, "handle_error", error)
+        event.listen(replica.engine.sync_engine, "engine_connect", conectada)
+
+    def expulsar(self, replica: Replica, motivo: str) -> None:
+        replica.fallos += 1
+        duracion = self.expulsion_s * 2 ** min(replica.fallos - 1, _MAX_DUPLICACIONES)
+        replica.expulsada_hasta = time.monotonic() + duracion
+        logger.warning("Réplica %s expulsada %.0f s (%d fallos): %s", replica.nombre, duracion, replica.fallos, motivo)
+
+    def readmitir(self, replica: Replica) -> None:
+        if replica.fallos:
+            logger.info("Réplica %s readmitida", replica.nombre)
+        replica.fallos = 0
+        replica.expulsada_hasta = 0.0
+
+    async def comprobar(self) -> None:
+        """Ping y retraso de replicación de cada réplica; expulsa o readmite"""
+        for replica in self.replicas:
+            try:
+                async with replica.engine.connect() as conexion:
+                    replica.retraso_s = (await conexion.execute(_SQL_RETRASO)).scalar()
+            except Exception as error:  # noqa: BLE001  cualquier fallo deja la réplica fuera
+                self.expulsar(replica, str(error).strip())
+                continue
+            if self.max_retraso_s is not None and replica.retraso_s > self.max_retraso_s:
+                self.expulsar(replica, f"retraso de replicación {replica.retraso_s:.1f} s")
+            else:
+                self.readmitir(replica)
+
+    async def vigilar(self, intervalo_s: float = 15.0) -> None:
+        """Bucle de comprobar() para lanzar como tarea en segundo plano"""
+        while True:
+            await self.comprobar()
+            await asyncio.sleep(intervalo_s)
+
+    def estado(self) -> list[dict]:
+        """Resumen por réplica (diagnóstico y métricas)"""
+        ahora = time.monotonic()
+        return [
+            {
+                "replica": replica.nombre,
+                "disponible": replica.disponible(ahora),
+                "fallos": replica.fallos,
+                "expulsada_s": max(0.0, replica.expulsada_hasta - ahora),
+                "conexiones": replica.conexiones(),
+                "retraso_s": replica.retraso_s,
+            }
+            for replica in self.replicas
+        ]
+
+    # ------------------------------------------------------------------
+    # Elección
+    # ------------------------------------------------------------------
+
+    def registrar_escritura(self, consistencia: Optional[str]) -> None:
+        """Abre la ventana de leer lo escrito para la clave (sin clave, nada)"""
+        if consistencia is None:
+            return
+        ahora = time.monotonic()
+        if len(self._escrituras) >= _MAX_VENTANAS:
+            # Una clave por usuario: se olvidan las ventanas ya cerradas
+            self._escrituras = {
+                clave: momento for clave, momento in self._escrituras.items()
+                if ahora - momento < self.ventana_s
+            }
+        self._escrituras[consistencia] = ahora
+
+    def en_ventana(self, consistencia: Optional[str]) -> bool:
+        if consistencia is None:
+            return False
+        escritura = self._escrituras.get(consistencia)
+        return escritura is not None and time.monotonic() - escritura < self.ventana_s
+
+    def elegir(self, consistencia: Optional[str] = None) -> Engine:
+        """Engine (síncrono, para get_bind) de la próxima transacción de lectura"""
+        if self.en_ventana(consistencia):
+            return self.primario.sync_engine
+        ahora = time.monotonic()
+        disponibles = [replica for replica in self.replicas if replica.disponible(ahora)]
+        if not disponibles:
+            return self.primario.sync_engine
+        turno = next(self._turno) % len(disponibles)
+        if self.estrategia == "menos_conexiones":
+            # Empates resueltos por turno para no cargar siempre la primera
+            rotadas = disponibles[turno:] + disponibles[:turno]
+            return min(rotadas, key=Replica.conexiones).engine.sync_engine
+        return disponibles[turno].engine.sync_engine
+
+    async def close(self) -> None:
+        for replica in self.replicas:
+            await replica.engine.dispose()
+
+
+def _es_escritura(clause) -> bool:
+    if isinstance(clause, UpdateBase):
+        return True
+    return isinstance(clause, Select) and clause._for_update_arg is not None
+
+
+class SesionEnrutada(Session):
+    """
+    Session con get_bind() que envía las transacciones de solo lectura a
+    una réplica. Sin enrutador se comporta como Session.
+    """
+
+    def __init__(self, *args, enrutador: Optional[EnrutadorReplicas] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.enrutador = enrutador
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        if self._flushing or _es_escritura(clause):
+            self.info[_ESCRIBIO] = True
+        if self.enrutador is None or not self.info.get(SOLO_LECTURA) or self.info.get(_ESCRIBIO):
+            return super().get_bind(mapper=mapper, clause=clause, **kwargs)
+        bind = self.info.get(_BIND_LECTURA)
+        if bind is None:
+            bind = self.info[_BIND_LECTURA] = self.enrutador.elegir(self.info.get(CONSISTENCIA))
+        return bind
+
+
+@event.listens_for(SesionEnrutada, "after_flush")
+def _tras_flush(session, contexto) -> None:
+    session.info[_ESCRIBIO] = True
+
+
+@event.listens_for(SesionEnrutada, "after_commit")
+def _tras_commit(session) -> None:
+    if session.info.pop(_ESCRIBIO, False) and session.enrutador is not None:
+        session.enrutador.registrar_escritura(session.info.get(CONSISTENCIA))
+
+
+@event.listens_for(SesionEnrutada, "after_transaction_end")
+def _tras_transaccion(session, transaccion) -> None:
+    if transaccion.parent is None:
+        session.info.pop(_BIND_LECTURA, None)
+        session.info.pop(_ESCRIBIO, None)
@@ -1,5 +1,5 @@
 # app/db/mixins/__init__.py
-from .base import UUIDPKMixin, AuditMixin
+from .base import UUIDPKMixin, AuditMixin, UUIDType, uuid7
 from .identificacion import TipoIdentificacion, IdentificacionMixin
 from .contacto import ContactoMixin, ContactoDireccionMixin
 from .direccion import DireccionMixin
@@ -9,6 +9,8 @@ from .documento import DocumentoMixin
 __all__ = [
     "UUIDPKMixin",
     "AuditMixin",
+    "UUIDType",
+    "uuid7",
     "TipoIdentificacion",
     "IdentificacionMixin",
     "ContactoMixin",
@@ -1,55 +1,114 @@
 # app/db/mixins/base.py
 from datetime import datetime, timezone
+import os
+import threading
+import time
 import uuid
 from typing import Optional, TYPE_CHECKING
-from sqlalchemy import String, DateTime
+from sqlalchemy import String, DateTime, Uuid
 from sqlalchemy.orm import Mapped, mapped_column, relationship, declared_attr
 from sqlalchemy.schema import ForeignKey
 
 if TYPE_CHECKING:
     from models.users import Usuario
 
+# Claves primarias y FKs: uuid nativo de PostgreSQL (16 bytes), valores str en Python
+UUIDType = Uuid(as_uuid=False)
+
+_uuid7_lock = threading.Lock()
+_uuid7_ultimo_ms = 0
+_uuid7_contador = 0
+
+
+def uuid7() -> uuid.UUID:
+    """
+    UUID versión 7 (RFC 9562): 48 bits de milisegundos Unix, 12 bits de
+    contador (monótono dentro del mismo milisegundo) y 62 bits aleatorios.
+    Ordenados por tiempo, las inserciones van al final del índice de la PK.
+    """
+    global _uuid7_ultimo_ms, _uuid7_contador
+    with _uuid7_lock:
+        ms = time.time_ns() // 1_000_000
+        if ms > _uuid7_ultimo_ms:
+            _uuid7_ultimo_ms = ms
+            _uuid7_contador = int.from_bytes(os.urandom(2), "big") & 0x7FF
+        else:
+            # Mismo milisegundo (o reloj hacia atrás): se incrementa el contador
+            _uuid7_contador += 1
+            if _uuid7_contador > 0xFFF:
+                _uuid7_ultimo_ms += 1
+                _uuid7_contador = 0
+        ms, contador = _uuid7_ultimo_ms, _uuid7_contador
+    aleatorio = int.from_bytes(os.urandom(8), "big") & ((1 << 62) - 1)
+    return uuid.UUID(int=(ms << 80) | (0x7 << 76) | (contador << 64) | (0b10 << 62) | aleatorio)
+
+
 class UUIDPKMixin:
-    """Clave primaria UUID estándar"""
+    """Clave primaria UUID (v7, ordenada por tiempo)"""
     id: Mapped[str] = mapped_column(
-        String(36), 
-        primary_key=True, 
-        default=lambda: str(uuid.uuid4())
+        UUIDType,
+        primary_key=True,
+        default=lambda: str(uuid7())
     )
 
+# Índices de las columnas de AuditMixin. Por defecto solo created_at y
+# updated_at, que leen las marcas de agua y los procesos incrementales; un
+# modelo puede fijar los suyos con __indices_auditoria__ = ("created_at", "deleted_at", ...)
+# (COLUMNAS_AUDITORIA para todas). Es una constante del código y no del
+# entorno: las migraciones se generan desde Base.metadata.
+# Sin índice en *_by_id, borrar físicamente un usuario recorre las tablas; los usuarios se
+# borran de forma lógica.
+COLUMNAS_AUDITORIA = ("created_at", "updated_at", "deleted_at", "created_by_id", "updated_by_id", "deleted_by_id")
+INDICES_AUDITORIA = ("created_at", "updated_at")
+
+
+def indices_auditoria(cls) -> tuple[str, ...]:
+    """Columnas de auditoría con índice para el modelo"""
+    propios = getattr(cls, "__indices_auditoria__", None)
+    return tuple(propios) if propios is not None else INDICES_AUDITORIA
+
+
 class AuditMixin:
     """Auditoría de creación, modificación y eliminación lógica"""
     
     # Timestamps (timezone-naive para PostgreSQL TIMESTAMP WITHOUT TIME ZONE)
-    created_at: Mapped[datetime] = mapped_column(
-        DateTime,
-        default=lambda: datetime.utcnow(),
-        nullable=False,
-        index=True
-    )
-    updated_at: Mapped[Optional[datetime]] = mapped_column(
-        DateTime,
-        onupdate=lambda: datetime.utcnow(),
-        index=True
-    )
-    deleted_at: Mapped[Optional[datetime]] = mapped_column(
-        DateTime,
-        index=True
-    )
+    @declared_attr
+    def created_at(cls) -> Mapped[datetime]:
+        return mapped_column(
+            DateTime,
+            default=lambda: datetime.utcnow(),
+            nullable=False,
+            index="created_at" in indices_auditoria(cls)
+        )
+
+    @declared_attr
+    def updated_at(cls) -> Mapped[Optional[datetime]]:
+        return mapped_column(
+            DateTime,
+            onupdate=lambda: datetime.utcnow(),
+            index="updated_at" in indices_auditoria(cls)
+        )
+
+    @declared_attr
+    def deleted_at(cls) -> Mapped[Optional[datetime]]:
+        return mapped_column(
+            DateTime,
+            index="deleted_at" in indices_auditoria(cls)
+        )
     
     # Foreign Keys para usuarios responsables - usando lambda para evaluación perezosa
     @declared_attr
     def created_by_id(cls) -> Mapped[Optional[str]]:
         # Usar string con schema explícito para evitar problemas de orden
-        return mapped_column(String(36), ForeignKey("app.usuarios.id"), index=True)
+        return mapped_column(UUIDType, ForeignKey("app.usuarios.id"), index="created_by_id" in indices_auditoria(cls))
     
     @declared_attr
     def updated_by_id(cls) -> Mapped[Optional[str]]:
-        return mapped_column(String(36), ForeignKey("app.usuarios.id"), index=True)
+        return mapped_column(UUIDType, ForeignKey("app.usuarios.id"), index="updated_by_id" in indices_auditoria(cls))
     
     @declared_attr
     def deleted_by_id(cls) -> Mapped[Optional[str]]:
-        return mapped_column(String(36), ForeignKey("app.usuarios.id"), index=True)
+        return mapped_column(UUIDType, ForeignKey("app.usuarios.id"), index="deleted_by_id" in indices_auditoria(cls))
     
     # Relaciones
     @declared_attr
@@ -1,5 +1,6 @@
 # app/db/mixins/titularidad.py
 from typing import List, Optional
+from sqlalchemy import Index, text
 from sqlalchemy.orm import Mapped, relationship, declared_attr
 import re
 
@@ -8,28 +9,51 @@ def camel_to_snake(name: str) -> str:
     name = re.sub('(.)([A-Z][a-z]+)', r'\1_\2', name)
     return re.sub('([a-z0-9])([A-Z])', r'\1_\2', name).lower()
 
+def titular_fk(entidad: str) -> str:
+    """Nombre de la FK del titular hacia su entidad: Notaria → notaria_id"""
+    return f"{camel_to_snake(entidad)}_id"
+
+def indice_titular_actual(titular_cls) -> Index:
+    """
+    Índice único parcial sobre la FK de una tabla de titulares
+    WHERE fecha_fin IS NULL: como mucho un titular vigente por entidad,
+    y respalda la carga de TitularidadMixin.titular_actual.
+
+    NotariaTitular → uq_notarias_titulares_actual (notaria_id)
+    """
+    entidad = titular_cls.__name__.removesuffix("Titular")
+    return Index(
+        f"uq_{titular_cls.__tablename__}_actual",
+        titular_fk(entidad),
+        unique=True,
+        postgresql_where=text("fecha_fin IS NULL"),
+    )
+
 class TitularidadMixin:
     """
     Mixin para entidades con titulares temporales
-    
+
     USO EN MODELO PRINCIPAL:
     class Notaria(Base, TitularidadMixin):
         __table_args__ = {'schema': 'sipi'}
         # ... campos ...
-        
+
     USO EN MODELO TITULAR:
     class NotariaTitular(TitularBase):
         __table_args__ = {'schema': 'sipi'}
         notaria_id: Mapped[str] = ForeignKey("app.notarias.id")
         notaria: Mapped["Notaria"] = relationship("Notaria", back_populates="titulares")
-    
+
     ACCESO:
-    - notaria.titulares → Lista completa histórica
-    - notaria.titular_actual → El titular actual (sin fecha_fin)
+    - notaria.titulares → Lista completa histórica (se carga solo al acceder)
+    - notaria.titular_actual → El titular actual (sin fecha_fin), una sola fila
     - notaria.tiene_titular → bool
     - notaria.titulares_anteriores → Los históricos
+
+    TitularBase añade a cada tabla de titulares el índice único parcial
+    de indice_titular_actual() sobre la FK (WHERE fecha_fin IS NULL).
     """
-    
+
     @declared_attr
     def titulares(cls):
         """Relación con todos los titulares (histórico completo)"""
@@ -37,23 +61,29 @@ class TitularidadMixin:
             f"{cls.__name__}Titular",
             back_populates=camel_to_snake(cls.__name__),
             cascade="all, delete-orphan",
-            lazy="selectin"
+            lazy="select"
         )
-    
-    @property
-    def titular_actual(self):
-        """Titular actual (sin fecha_fin)"""
-        return next(
-            (t for t in self.titulares if t.fecha_fin is None),
-            None
+
+    @declared_attr
+    def titular_actual(cls):
+        """Titular actual (sin fecha_fin): relación de solo lectura con join filtrado"""
+        titular = f"{cls.__name__}Titular"
+        return relationship(
+            titular,
+            primaryjoin=(
+                f"and_({cls.__name__}.id == {titular}.{titular_fk(cls.__name__)}, "
+                f"{titular}.fecha_fin.is_(None))"
+            ),
+            uselist=False,
+            viewonly=True,
         )
-    
+
     @property
     def tiene_titular(self) -> bool:
         """¿Hay titular actualmente asignado?"""
         return self.titular_actual is not None
-    
+
     @property
     def titulares_anteriores(self):
         """Lista de titulares históricos (con fecha_fin)"""
-        return [t for t in self.titulares if t.fecha_fin is not None]
\ No newline at end of file
+        return [t for t in self.titulares if t.fecha_fin is not None]
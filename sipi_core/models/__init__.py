@@ -136,7 +136,8 @@ from models.subvenciones import (
 # ============================================================================
 from models.discovery import (
     InmuebleRaw, 
-    DeteccionAnuncio
+    DeteccionAnuncio,
+    PipelineWatermark
 )
 
 # ============================================================================
@@ -146,6 +147,30 @@ from models.osm import (
     OSMPlace
 )
 
+# ============================================================================
+# ADMINISTRATIVE BOUNDARIES (GIS Schema - Depende de geografía)
+# ============================================================================
+from models.limites import (
+    LimiteComunidad,
+    LimiteProvincia,
+    LimiteMunicipio
+)
+
+# ============================================================================
+# SUMMARIES (APP Schema - sellos de refresco y estadísticas territoriales)
+# ============================================================================
+from models.resumenes import (
+    ResumenRefresco,
+    EstadisticaTerritorial,
+    EstadisticaPendiente
+)
+
+# ============================================================================
+# LIVE-ROW PARTIAL INDEXES (WHERE deleted_at IS NULL - requiere todas las tablas)
+# ============================================================================
+from db.indices_vivos import registrar as _registrar_indices_vivos
+_registrar_indices_vivos(Base.metadata)
+
 # ============================================================================
 # EXPORTS
 # ============================================================================
@@ -214,8 +239,14 @@ __all__ = [
     'IntervencionSubvencion', 'SubvencionAdministracion',
     
     # Discovery
-    'InmuebleRaw', 'DeteccionAnuncio',
+    'InmuebleRaw', 'DeteccionAnuncio', 'PipelineWatermark',
     
     # OSM
     'OSMPlace',
+
+    # Administrative boundaries (GIS Schema)
+    'LimiteComunidad', 'LimiteProvincia', 'LimiteMunicipio',
+
+    # Dashboard summaries
+    'ResumenRefresco', 'EstadisticaTerritorial', 'EstadisticaPendiente',
 ]
\ No newline at end of file
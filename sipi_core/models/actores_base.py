@@ -9,15 +9,17 @@ all actor types in the application.
 from __future__ import annotations
 from datetime import datetime
 from typing import Optional
-from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.orm import Mapped, mapped_column, declared_attr
 from sqlalchemy import String, ForeignKey
 
 from db.registry import Base
 from mixins import (
     UUIDPKMixin, 
     AuditMixin, 
-    IdentificacionMixin
+    IdentificacionMixin,
+    UUIDType,
 )
+from mixins.titularidad import indice_titular_actual
 
 
 class PersonaMixin(IdentificacionMixin):
@@ -27,7 +29,7 @@ class PersonaMixin(IdentificacionMixin):
     Provides common identification fields for all person types.
     """
     tipo_persona_id: Mapped[Optional[str]] = mapped_column(
-        String(36), 
+        UUIDType, 
         ForeignKey("app.tipos_persona.id"), 
         index=True,
         comment="Reference to person type (physical/legal)"
@@ -42,6 +44,11 @@ class TitularBase(UUIDPKMixin, AuditMixin, IdentificacionMixin, Base):
     (e.g., notaries, registrars, bishops, administrators).
     """
     __abstract__ = True
+
+    @declared_attr.directive
+    def __table_args__(cls):
+        # Un único titular vigente por entidad (ver TitularidadMixin.titular_actual)
+        return (indice_titular_actual(cls),)
     
     fecha_inicio: Mapped[datetime] = mapped_column(
         index=True,
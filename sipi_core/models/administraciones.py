@@ -14,6 +14,7 @@ from mixins import (
     AuditMixin,
     ContactoDireccionMixin,
     TitularidadMixin,
+    UUIDType,
 )
 from .actores_base import TitularBase
 
@@ -39,7 +40,7 @@ class Administracion(
 
     # Auto-referencia: usar schema explícito
     administracion_padre_id: Mapped[Optional[str]] = mapped_column(
-        String(36),
+        UUIDType,
         ForeignKey("app.administraciones.id"),  # Schema explícito
         index=True,
     )
@@ -94,11 +95,6 @@ class Administracion(
         cascade="all, delete-orphan",
     )
 
-    titulares: Mapped[list["AdministracionTitular"]] = relationship(
-        "AdministracionTitular",
-        back_populates="administracion",
-        cascade="all, delete-orphan",
-    )
     subvenciones: Mapped[list["SubvencionAdministracion"]] = relationship(
         "SubvencionAdministracion",
         back_populates="administracion",
@@ -112,7 +108,7 @@ class AdministracionTitular(TitularBase, ContactoDireccionMixin, Base):
     __tablename__ = "administraciones_titulares"
 
     administracion_id: Mapped[str] = mapped_column(
-        String(36),
+        UUIDType,
         ForeignKey("app.administraciones.id"),
         index=True,
     )
@@ -15,12 +15,15 @@ from sqlalchemy import (
     ForeignKey,
     Integer,
     DateTime,
+    UniqueConstraint,
+    Index,
+    text,
 )
 from sqlalchemy.dialects.postgresql import JSONB
 from geoalchemy2 import Geometry
 
 from db.registry import Base
-from mixins import AuditMixin
+from mixins import AuditMixin, UUIDType
 
 if TYPE_CHECKING:
     from models.inmuebles import Inmueble
@@ -28,6 +31,14 @@ if TYPE_CHECKING:
 
 class InmuebleRaw(Base, AuditMixin):
     __tablename__ = "portals_inmuebles_raw"
+    # deleted_at indexado: versión de teselas (services.teselas) lo consultan
+    __indices_auditoria__ = ("created_at", "updated_at", "deleted_at")
+    __table_args__ = (
+        # Clave natural del anuncio: destino del upsert de services.ingesta_raw
+        UniqueConstraint("portal", "id_portal", name="uq_portals_inmuebles_raw_portal_id_portal"),
+        # Búsquedas por radio en metros (services.espacial)
+        Index("idx_portals_inmuebles_raw_geom_geog", text("geography(geom)"), postgresql_using="gist"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     portal: Mapped[str] = mapped_column(String(50))
@@ -53,7 +64,7 @@ class InmuebleRaw(Base, AuditMixin):
     provincia: Mapped[Optional[str]] = mapped_column(String(200))
 
     scraped_at: Mapped[datetime] = mapped_column(
-        DateTime, default=datetime.utcnow
+        DateTime, default=datetime.utcnow, index=True
     )
     is_active: Mapped[bool] = mapped_column(Boolean, default=True)
 
@@ -66,6 +77,10 @@ class InmuebleRaw(Base, AuditMixin):
 
 class DeteccionAnuncio(Base, AuditMixin):
     __tablename__ = "portals_detecciones"
+    __table_args__ = (
+        # Una detección por par (anuncio, inmueble): destino del upsert de services.deteccion
+        UniqueConstraint("inmueble_id", "inmueble_core_id", name="uq_portals_detecciones_raw_core"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     inmueble_id: Mapped[int] = mapped_column(
@@ -75,7 +90,7 @@ class DeteccionAnuncio(Base, AuditMixin):
     )
 
     inmueble_core_id: Mapped[Optional[str]] = mapped_column(
-        String(36),
+        UUIDType,
         ForeignKey("app.inmuebles.id"),
         index=True,
     )
@@ -97,3 +112,22 @@ class DeteccionAnuncio(Base, AuditMixin):
         back_populates="detecciones",
     )
     inmueble_core: Mapped[Optional["Inmueble"]] = relationship("Inmueble")
+
+
+class PipelineWatermark(Base):
+    """
+    Marca de agua de un proceso incremental sobre una fuente: hasta qué
+    instante (created_at / updated_at / scraped_at) se han procesado ya
+    los cambios (services.deteccion), o punto de control de una carga
+    reanudable (services.osm_import).
+    """
+    __tablename__ = "portals_watermarks"
+
+    proceso: Mapped[str] = mapped_column(String(50), primary_key=True)
+    fuente: Mapped[str] = mapped_column(String(100), primary_key=True)
+    marca: Mapped[datetime] = mapped_column(DateTime)
+    # Posición opaca para reanudar un proceso por lotes (offset, último id...)
+    posicion: Mapped[Optional[str]] = mapped_column(String(100))
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime, default=datetime.utcnow
+    )
@@ -8,7 +8,7 @@ from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy import String, Text, ForeignKey
 
 from db.registry import Base
-from mixins import UUIDPKMixin, AuditMixin, DocumentoMixin
+from mixins import UUIDPKMixin, AuditMixin, DocumentoMixin, UUIDType
 
 if TYPE_CHECKING:
     from models.inmuebles import Inmueble
@@ -20,17 +20,17 @@ class Documento(UUIDPKMixin, AuditMixin, DocumentoMixin, Base):
     __tablename__ = "documentos"
 
     tipo_documento_id: Mapped[str] = mapped_column(
-        String(36),
+        UUIDType,
         ForeignKey("app.tipos_documento.id", ondelete="RESTRICT"),
         index=True,
     )
     tipo_licencia_id: Mapped[Optional[str]] = mapped_column(
-        String(36),
+        UUIDType,
         ForeignKey("app.tipos_licencia.id", ondelete="RESTRICT"),
         index=True,
     )
     fuente_documental_id: Mapped[Optional[str]] = mapped_column(
-        String(36),
+        UUIDType,
         ForeignKey("app.fuentes_documentales.id", ondelete="RESTRICT"),
         index=True,
     )
@@ -58,12 +58,12 @@ class InmuebleDocumento(UUIDPKMixin, AuditMixin, Base):
     __tablename__ = "inmuebles_documentos"
 
     inmueble_id: Mapped[str] = mapped_column(
-        String(36),
+        UUIDType,
         ForeignKey("app.inmuebles.id", ondelete="CASCADE"),
         index=True,
     )
     documento_id: Mapped[str] = mapped_column(
-        String(36),
+        UUIDType,
         ForeignKey("app.documentos.id", ondelete="CASCADE"),
         index=True,
     )
@@ -14,6 +14,7 @@ from mixins import (
     IdentificacionMixin,
     ContactoDireccionMixin,
     TitularidadMixin,
+    UUIDType,
 )
 from models.actores_base import TitularBase
 
@@ -45,18 +46,13 @@ class Diocesis(
         "Inmueble",
         back_populates="diocesis",
     )
-    titulares: Mapped[list["DiocesisTitular"]] = relationship(
-        "DiocesisTitular",
-        back_populates="diocesis",
-        cascade="all, delete-orphan",
-    )
 
 
 class DiocesisTitular(TitularBase, Base):
     __tablename__ = "diocesis_titulares"
 
     diocesis_id: Mapped[str] = mapped_column(
-        String(36),
+        UUIDType,
         ForeignKey("app.diocesis.id"),
         index=True,
     )
@@ -84,7 +80,7 @@ class EntidadReligiosa(
         index=True,
     )
     tipo_entidad_id: Mapped[Optional[str]] = mapped_column(
-        String(36),
+        UUIDType,
         ForeignKey("app.tipos_entidad_religiosa.id", ondelete="RESTRICT"),
         index=True,
     )
@@ -105,18 +101,13 @@ class EntidadReligiosa(
         "Inmueble",
         back_populates="entidad_religiosa",
     )
-    titulares: Mapped[list["EntidadReligiosaTitular"]] = relationship(
-        "EntidadReligiosaTitular",
-        back_populates="entidad_religiosa",
-        cascade="all, delete-orphan",
-    )
 
 
 class EntidadReligiosaTitular(TitularBase, Base):
     __tablename__ = "entidades_religiosas_titulares"
 
     entidad_religiosa_id: Mapped[str] = mapped_column(
-        String(36),
+        UUIDType,
         ForeignKey("app.entidades_religiosas.id", ondelete="CASCADE"),
         index=True,
     )
@@ -7,7 +7,7 @@ from sqlalchemy import String, Integer, Boolean, Text, ForeignKey, Index, CheckC
 import strawberry
 
 from db.registry import Base
-from mixins import UUIDPKMixin, AuditMixin
+from mixins import UUIDPKMixin, AuditMixin, UUIDType
 
 if TYPE_CHECKING:
     from models.gis import ComunidadAutonoma
@@ -24,8 +24,7 @@ class FiguraProteccion(UUIDPKMixin, AuditMixin, Base):
 
     codigo: Mapped[str] = mapped_column(
         String(20),
-        index=True,
-        nullable=False,
+        nullable=False,  # lo cubre uq_codigo_ccaa (columna inicial)
         comment="Código identificador de la figura (BIC, BRL, BCIL, etc.)"
     )
     denominacion: Mapped[str] = mapped_column(
@@ -64,7 +63,7 @@ class FiguraProteccion(UUIDPKMixin, AuditMixin, Base):
     activo: Mapped[bool] = mapped_column(Boolean, default=True, index=True, nullable=False)
 
     comunidad_autonoma_id: Mapped[Optional[str]] = mapped_column(
-        String(36),
+        UUIDType,
         ForeignKey("app.comunidades_autonomas.id"),
         index=True,
         nullable=True,
@@ -80,8 +79,6 @@ class FiguraProteccion(UUIDPKMixin, AuditMixin, Base):
         CheckConstraint("(nivel != 'nacional') OR (comunidad_autonoma_id IS NULL)", name="ck_nacional_sin_ccaa"),
         CheckConstraint("(nivel != 'autonomico') OR (comunidad_autonoma_id IS NOT NULL)", name="ck_autonomico_con_ccaa"),
         Index('uq_codigo_ccaa', 'codigo', 'comunidad_autonoma_id', unique=True),
-        Index('ix_figura_nivel', 'nivel'),
-        Index('ix_figura_activo', 'activo'),
     )
 
     @property
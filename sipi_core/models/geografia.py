@@ -4,10 +4,10 @@ from __future__ import annotations
 from typing import Optional, TYPE_CHECKING
 from models.administraciones import Administracion
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy import String, Boolean, ForeignKey, Index
+from sqlalchemy import String, Boolean, ForeignKey
 
 from db.registry import Base
-from mixins import UUIDPKMixin, AuditMixin
+from mixins import UUIDPKMixin, AuditMixin, UUIDType
 #from models import Inmueble, FiguraProteccion, Administracion
 
 if TYPE_CHECKING:
@@ -39,12 +39,6 @@ class ComunidadAutonoma(UUIDPKMixin, AuditMixin, Base):
     figuras_proteccion: Mapped[list["FiguraProteccion"]] = relationship("FiguraProteccion", back_populates="comunidad_autonoma")
     administraciones: Mapped[list["Administracion"]] = relationship("Administracion", back_populates="comunidad_autonoma")
 
-    __table_args__ = (
-        Index('ix_ccaa_codigo_ine', 'codigo_ine'),
-        Index('ix_ccaa_nombre', 'nombre_oficial'),
-        
-    )
-
     def __repr__(self) -> str:
         return f"<ComunidadAutonoma {self.codigo_ine} - {self.nombre_oficial}>"
 
@@ -57,7 +51,7 @@ class Provincia(UUIDPKMixin, AuditMixin, Base):
     nombre_oficial: Mapped[str] = mapped_column(String(100), index=True, nullable=False)
     nombre_cooficial: Mapped[Optional[str]] = mapped_column(String(100))
     nombre_alternativo: Mapped[Optional[str]] = mapped_column(String(100))
-    comunidad_autonoma_id: Mapped[str] = mapped_column(String(36), ForeignKey("app.comunidades_autonomas.id"), index=True, nullable=False)
+    comunidad_autonoma_id: Mapped[str] = mapped_column(UUIDType, ForeignKey("app.comunidades_autonomas.id"), index=True, nullable=False)
   
 
     # Relaciones
@@ -66,13 +60,6 @@ class Provincia(UUIDPKMixin, AuditMixin, Base):
     inmuebles: Mapped[list["Inmueble"]] = relationship("Inmueble", back_populates="provincia")
     administraciones: Mapped[list["Administracion"]] = relationship("Administracion", back_populates="provincia")
 
-    __table_args__ = (
-        Index('ix_provincia_codigo_ine', 'codigo_ine'),
-        Index('ix_provincia_nombre', 'nombre_oficial'),
-        Index('ix_provincia_ccaa', 'comunidad_autonoma_id'),
-       
-     )
-
     def __repr__(self) -> str:
         return f"<Provincia {self.codigo_ine} - {self.nombre_oficial}>"
 
@@ -86,7 +73,7 @@ class Municipio(UUIDPKMixin, AuditMixin, Base):
     nombre_oficial: Mapped[str] = mapped_column(String(100), index=True, nullable=False)
     nombre_cooficial: Mapped[Optional[str]] = mapped_column(String(100))
     nombre_alternativo: Mapped[Optional[str]] = mapped_column(String(100)) 
-    provincia_id: Mapped[str] = mapped_column(String(36), ForeignKey("app.provincias.id"), index=True, nullable=False)
+    provincia_id: Mapped[str] = mapped_column(UUIDType, ForeignKey("app.provincias.id"), index=True, nullable=False)
  
     
     # Relaciones
@@ -104,13 +91,6 @@ class Municipio(UUIDPKMixin, AuditMixin, Base):
     diocesis: Mapped[list["Diocesis"]] = relationship("Diocesis", back_populates="municipio_sede")
     entidades_religiosas: Mapped[list["EntidadReligiosa"]] = relationship("EntidadReligiosa", back_populates="municipio_sede")
     
-    __table_args__ = (
-        Index('ix_municipio_codigo_ine', 'codigo_ine'),
-        Index('ix_municipio_nombre', 'nombre_oficial'),
-        Index('ix_municipio_provincia', 'provincia_id'),
-       
-     )
-
 
     def __repr__(self) -> str:
         return f"<Municipio {self.codigo_ine} - {self.nombre_oficial}>"
\ No newline at end of file
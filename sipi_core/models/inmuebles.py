@@ -2,12 +2,14 @@ from __future__ import annotations
 from datetime import datetime
 from typing import Optional, List, TYPE_CHECKING
 from decimal import Decimal
-from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy import String, Text, Numeric, Boolean, ForeignKey
+from sqlalchemy.orm import Mapped, mapped_column, relationship, object_session
+from sqlalchemy import String, Text, Numeric, Boolean, ForeignKey, Index, ColumnElement, select, text
+from sqlalchemy.ext.hybrid import hybrid_property
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from geoalchemy2 import Geometry
 
 from db.registry import Base
-from mixins import UUIDPKMixin, AuditMixin
+from mixins import UUIDPKMixin, AuditMixin, UUIDType
 
 if TYPE_CHECKING:   
     from models.geografia import ComunidadAutonoma, Provincia, Municipio
@@ -26,40 +28,59 @@ if TYPE_CHECKING:
 
 class Inmueble(UUIDPKMixin, AuditMixin, Base):
     __tablename__ = "inmuebles"
+    # deleted_at indexado: marcas de agua (services.deteccion) y versión de teselas (services.teselas) lo consultan
+    __indices_auditoria__ = ("created_at", "updated_at", "deleted_at")
+    __table_args__ = (
+        # Búsquedas por radio en metros (services.espacial): GiST sobre el cast a geography
+        Index("idx_inmuebles_coordenadas_geog", text("geography(coordenadas)"), postgresql_using="gist"),
+        # Buscador (services.busqueda): texto completo y trigramas sin tildes
+        Index("ix_inmuebles_busqueda", "busqueda", postgresql_using="gin"),
+        Index("ix_inmuebles_nombre_trgm", text("app.f_unaccent(nombre) gin_trgm_ops"), postgresql_using="gin"),
+        # Recálculo por territorio de las estadísticas (services.estadisticas)
+        Index(
+            "ix_inmuebles_territorio",
+            text("app.territorio_clave(comunidad_autonoma_id, provincia_id, municipio_id)"),
+            postgresql_where=text("deleted_at IS NULL"),
+        ),
+    )
     
     nombre: Mapped[str] = mapped_column(String(255), index=True)
     descripcion: Mapped[Optional[str]] = mapped_column(Text)
 
+    # tsvector ponderado (nombre, denominaciones, municipio/diócesis, descripción).
+    # Lo mantienen triggers de base de datos; no se carga salvo que se pida.
+    busqueda: Mapped[Optional[str]] = mapped_column(TSVECTOR, deferred=True)
+
     # --- Visitabilidad ---
     es_visitable: Mapped[bool] = mapped_column(Boolean, default=False)
     horario_visitas: Mapped[Optional[str]] = mapped_column(Text)  # Obligatorio si BIC + Visitable
     enlace_web_visitas: Mapped[Optional[str]] = mapped_column(String(500))
 
     # --- Dependencias Complementarias (Auto-relación) ---
-    inmueble_principal_id: Mapped[Optional[str]] = mapped_column(String(36), ForeignKey("app.inmuebles.id"), index=True)
+    inmueble_principal_id: Mapped[Optional[str]] = mapped_column(UUIDType, ForeignKey("app.inmuebles.id"), index=True)
 
-    comunidad_autonoma_id: Mapped[Optional[str]] = mapped_column(String(36), ForeignKey("app.comunidades_autonomas.id"), index=True)
-    provincia_id: Mapped[Optional[str]] = mapped_column(String(36), ForeignKey("app.provincias.id"), index=True)
-    municipio_id: Mapped[Optional[str]] = mapped_column(String(36), ForeignKey("app.municipios.id"), index=True)
+    comunidad_autonoma_id: Mapped[Optional[str]] = mapped_column(UUIDType, ForeignKey("app.comunidades_autonomas.id"), index=True)
+    provincia_id: Mapped[Optional[str]] = mapped_column(UUIDType, ForeignKey("app.provincias.id"), index=True)
+    municipio_id: Mapped[Optional[str]] = mapped_column(UUIDType, ForeignKey("app.municipios.id"), index=True)
     direccion: Mapped[Optional[str]] = mapped_column(String(500))
     coordenadas: Mapped[Optional[Geometry]] = mapped_column(Geometry(geometry_type='POINT', srid=4326))
     
-    tipo_inmueble_id: Mapped[Optional[str]] = mapped_column(String(36), ForeignKey("app.tipos_inmueble.id"), index=True)
+    tipo_inmueble_id: Mapped[Optional[str]] = mapped_column(UUIDType, ForeignKey("app.tipos_inmueble.id"), index=True)
     # figura_proteccion_id: Deprecado - usar InmuebleNivelProteccion
-    estado_conservacion_id: Mapped[Optional[str]] = mapped_column(String(36), ForeignKey("app.estados_conservacion.id"), index=True)
-    estado_tratamiento_id: Mapped[Optional[str]] = mapped_column(String(36), ForeignKey("app.estados_tratamiento.id"), index=True)
+    estado_conservacion_id: Mapped[Optional[str]] = mapped_column(UUIDType, ForeignKey("app.estados_conservacion.id"), index=True)
+    estado_tratamiento_id: Mapped[Optional[str]] = mapped_column(UUIDType, ForeignKey("app.estados_tratamiento.id"), index=True)
 
     # --- Relaciones Eclesiásticas ---
-    diocesis_id: Mapped[Optional[str]] = mapped_column(String(36), ForeignKey("app.diocesis.id"), index=True)  # Demarcación geográfica
-    entidad_religiosa_id: Mapped[Optional[str]] = mapped_column(String(36), ForeignKey("app.entidades_religiosas.id"), index=True)  # Gestor/Custodio
+    diocesis_id: Mapped[Optional[str]] = mapped_column(UUIDType, ForeignKey("app.diocesis.id"), index=True)  # Demarcación geográfica
+    entidad_religiosa_id: Mapped[Optional[str]] = mapped_column(UUIDType, ForeignKey("app.entidades_religiosas.id"), index=True)  # Gestor/Custodio
 
     # --- Propietario actual (polimórfico) ---
     propietario_tipo_actor: Mapped[Optional[str]] = mapped_column(String(50), index=True)  # Código TipoActor
-    propietario_actor_id: Mapped[Optional[str]] = mapped_column(String(36), index=True)  # UUID del actor
+    propietario_actor_id: Mapped[Optional[str]] = mapped_column(UUIDType, index=True)  # UUID del actor
 
     # --- Usufructuario actual (polimórfico) ---
     usufructuario_tipo_actor: Mapped[Optional[str]] = mapped_column(String(50), index=True)  # Código TipoActor
-    usufructuario_actor_id: Mapped[Optional[str]] = mapped_column(String(36), index=True)  # UUID del actor
+    usufructuario_actor_id: Mapped[Optional[str]] = mapped_column(UUIDType, index=True)  # UUID del actor
     
     superficie_construida: Mapped[Optional[Decimal]] = mapped_column(Numeric(10, 2))
     superficie_parcela: Mapped[Optional[Decimal]] = mapped_column(Numeric(10, 2))
@@ -139,12 +160,14 @@ class Inmueble(UUIDPKMixin, AuditMixin, Base):
         # Por ahora retornar AUTO por defecto
         return "AUTO"
 
-    @property
+    @hybrid_property
     def uso_religioso_activo(self) -> bool:
         """
         Indica si el inmueble tiene uso religioso activo actualmente.
 
-        Retorna True si el uso actual (fecha_hasta=NULL) es de tipo "religioso"
+        Retorna True si el uso actual (fecha_hasta=NULL) es de tipo "religioso".
+        A nivel de clase es una expresión EXISTS, filtrable en SQL:
+        select(Inmueble).where(Inmueble.uso_religioso_activo)
         """
         for uso in self.usos:
             if uso.fecha_hasta is None:  # Uso actual
@@ -152,18 +175,50 @@ class Inmueble(UUIDPKMixin, AuditMixin, Base):
                     return True
         return False
 
-    @property
+    @uso_religioso_activo.inplace.expression
+    @classmethod
+    def _uso_religioso_activo_expression(cls) -> ColumnElement[bool]:
+        from models.tipologias import TipoUsoInmueble
+
+        return (
+            select(InmuebleUso.id)
+            .join(TipoUsoInmueble, InmuebleUso.tipo_uso_id == TipoUsoInmueble.id)
+            .where(
+                InmuebleUso.inmueble_id == cls.id,
+                InmuebleUso.fecha_hasta.is_(None),
+                TipoUsoInmueble.codigo == "religioso",
+            )
+            .exists()
+        )
+
+    @hybrid_property
     def figura_proteccion_actual(self) -> Optional[str]:
         """
         Retorna el ID de la figura de protección actual del inmueble.
 
         Consulta el historial de niveles de protección y retorna el ID
-        de la figura activa (fecha_hasta=NULL).
+        de la figura activa (fecha_hasta=NULL); si hay varias, la más reciente.
+        A nivel de clase es una subconsulta escalar correlacionada.
         """
-        for nivel in self.niveles_proteccion:
-            if nivel.fecha_hasta is None:  # Nivel de protección actual
-                return nivel.figura_proteccion_id
-        return None
+        actuales = [nivel for nivel in self.niveles_proteccion if nivel.fecha_hasta is None]
+        if not actuales:
+            return None
+        return max(actuales, key=lambda nivel: nivel.fecha_desde).figura_proteccion_id
+
+    @figura_proteccion_actual.inplace.expression
+    @classmethod
+    def _figura_proteccion_actual_expression(cls) -> ColumnElement[Optional[str]]:
+        return (
+            select(InmuebleNivelProteccion.figura_proteccion_id)
+            .where(
+                InmuebleNivelProteccion.inmueble_id == cls.id,
+                InmuebleNivelProteccion.fecha_hasta.is_(None),
+            )
+            .order_by(InmuebleNivelProteccion.fecha_desde.desc())
+            .limit(1)
+            .scalar_subquery()
+            .label("figura_proteccion_actual")
+        )
 
     @property
     def timeline_procesos(self) -> List[dict]:
@@ -173,65 +228,30 @@ class Inmueble(UUIDPKMixin, AuditMixin, Base):
         Incluye: Inmatriculaciones, Transmisiones e Intervenciones.
         Cada entrada contiene: tipo, fecha, id, y datos relevantes del proceso.
 
+        Se resuelve con una única consulta UNION ALL (services.timeline) en
+        lugar de cargar las tres relaciones. Para paginar, filtrar por fechas
+        o consultar lotes de inmuebles usar directamente services.timeline.
+
         Returns:
             List[dict]: Lista de eventos ordenados por fecha (más reciente primero)
         """
-        from datetime import datetime as dt
-
-        eventos = []
-
-        # Inmatriculacion
-        for inmat in self.inmatriculaciones:
-            eventos.append({
-                'tipo': 'INMATRICULACION',
-                'fecha': inmat.fecha_inmatriculacion,
-                'id': inmat.id,
-                'numero_finca': inmat.numero_finca,
-                'registro_propiedad_id': inmat.registro_propiedad_id,
-                'tipo_certificacion_propiedad_id': inmat.tipo_certificacion_propiedad_id,
-                'created_at': inmat.created_at,
-            })
-
-        # Transmisiones
-        for trans in self.transmisiones:
-            eventos.append({
-                'tipo': 'TRANSMISION',
-                'fecha': trans.fecha_transmision,
-                'id': trans.id,
-                'tipo_transmision_id': trans.tipo_transmision_id,
-                'notaria_id': trans.notaria_id,
-                'registro_propiedad_id': trans.registro_propiedad_id,
-                'precio_venta': trans.precio_venta,
-                'created_at': trans.created_at,
-            })
-
-        # Intervenciones
-        for interv in self.intervenciones:
-            eventos.append({
-                'tipo': 'INTERVENCION',
-                'fecha': interv.fecha_inicio,
-                'fecha_fin': interv.fecha_fin,
-                'id': interv.id,
-                'nombre': interv.nombre,
-                'descripcion': interv.descripcion,
-                'presupuesto': interv.presupuesto,
-                'created_at': interv.created_at,
-            })
-
-        # Ordenar por fecha (más reciente primero), usar created_at si fecha es None
-        return sorted(
-            eventos,
-            key=lambda x: x['fecha'] or x['created_at'] or dt.min,
-            reverse=True
-        )
+        from services.timeline import get_timeline
+
+        session = object_session(self)
+        if session is None or self.id is None:
+            return []
+        return [
+            evento.as_dict()
+            for evento in get_timeline(session, self.id, incluir_descripcion=True)
+        ]
 
 
 class Inmatriculacion(UUIDPKMixin, AuditMixin, Base):
     __tablename__ = "inmatriculaciones"
 
-    inmueble_id: Mapped[str] = mapped_column(String(36), ForeignKey("app.inmuebles.id"), index=True)
-    registro_propiedad_id: Mapped[Optional[str]] = mapped_column(String(36), ForeignKey("app.registros_propiedad.id"), index=True)
-    tipo_certificacion_propiedad_id: Mapped[Optional[str]] = mapped_column(String(36), ForeignKey("app.tipos_certificacion_propiedad.id"), index=True)
+    inmueble_id: Mapped[str] = mapped_column(UUIDType, ForeignKey("app.inmuebles.id"), index=True)
+    registro_propiedad_id: Mapped[Optional[str]] = mapped_column(UUIDType, ForeignKey("app.registros_propiedad.id"), index=True)
+    tipo_certificacion_propiedad_id: Mapped[Optional[str]] = mapped_column(UUIDType, ForeignKey("app.tipos_certificacion_propiedad.id"), index=True)
 
     fecha_inmatriculacion: Mapped[Optional[datetime]]
     numero_finca: Mapped[Optional[str]] = mapped_column(String(50), index=True)
@@ -249,8 +269,14 @@ class Inmatriculacion(UUIDPKMixin, AuditMixin, Base):
 
 class InmuebleDenominacion(UUIDPKMixin, AuditMixin, Base):
     __tablename__ = "inmuebles_denominaciones"
+    # deleted_at indexado: marcas de agua (services.deteccion) lo consultan
+    __indices_auditoria__ = ("created_at", "updated_at", "deleted_at")
+    __table_args__ = (
+        # Buscador (services.busqueda): trigramas sin tildes
+        Index("ix_inmuebles_denominaciones_denominacion_trgm", text("app.f_unaccent(denominacion) gin_trgm_ops"), postgresql_using="gin"),
+    )
     
-    inmueble_id: Mapped[str] = mapped_column(String(36), ForeignKey("app.inmuebles.id"), index=True)
+    inmueble_id: Mapped[str] = mapped_column(UUIDType, ForeignKey("app.inmuebles.id"), index=True)
     denominacion: Mapped[str] = mapped_column(String(255), index=True)
     es_principal: Mapped[bool] = mapped_column(Boolean, default=False)
     
@@ -260,7 +286,7 @@ class InmuebleDenominacion(UUIDPKMixin, AuditMixin, Base):
 class InmuebleOSMExt(UUIDPKMixin, AuditMixin, Base):
     __tablename__ = "inmuebles_osm_ext"
     
-    inmueble_id: Mapped[str] = mapped_column(String(36), ForeignKey("app.inmuebles.id"), index=True)
+    inmueble_id: Mapped[str] = mapped_column(UUIDType, ForeignKey("app.inmuebles.id"), index=True)
     osm_type: Mapped[str] = mapped_column(String(10))
     osm_id: Mapped[str] = mapped_column(String(50), index=True)
     osm_tags: Mapped[Optional[str]] = mapped_column(Text)
@@ -271,7 +297,7 @@ class InmuebleOSMExt(UUIDPKMixin, AuditMixin, Base):
 class InmuebleWDExt(UUIDPKMixin, AuditMixin, Base):
     __tablename__ = "inmuebles_wd_ext"
     
-    inmueble_id: Mapped[str] = mapped_column(String(36), ForeignKey("app.inmuebles.id"), index=True)
+    inmueble_id: Mapped[str] = mapped_column(UUIDType, ForeignKey("app.inmuebles.id"), index=True)
     wikidata_qid: Mapped[str] = mapped_column(String(32), unique=True, index=True)
     wikipedia_url: Mapped[Optional[str]] = mapped_column(String(500))
     
@@ -282,8 +308,8 @@ class InmuebleCita(UUIDPKMixin, AuditMixin, Base):
     """Cita bibliografica de un inmueble en una fuente"""
     __tablename__ = "citas_bibliograficas"
 
-    inmueble_id: Mapped[str] = mapped_column(String(36), ForeignKey("app.inmuebles.id"), index=True)
-    fuente_id: Mapped[str] = mapped_column(String(36), ForeignKey("app.fuentes_historiograficas.id"), index=True)
+    inmueble_id: Mapped[str] = mapped_column(UUIDType, ForeignKey("app.inmuebles.id"), index=True)
+    fuente_id: Mapped[str] = mapped_column(UUIDType, ForeignKey("app.fuentes_historiograficas.id"), index=True)
     referencia: Mapped[str] = mapped_column(String(500))
     pagina: Mapped[Optional[str]] = mapped_column(String(50))
     fecha: Mapped[Optional[datetime]]
@@ -300,9 +326,13 @@ class InmuebleUso(UUIDPKMixin, AuditMixin, Base):
     con fechas de inicio y fin de cada uso.
     """
     __tablename__ = "inmuebles_usos"
+    __table_args__ = (
+        # Uso actual: respalda Inmueble.uso_religioso_activo
+        Index("ix_inmuebles_usos_actual", "inmueble_id", "tipo_uso_id", postgresql_where=text("fecha_hasta IS NULL")),
+    )
 
-    inmueble_id: Mapped[str] = mapped_column(String(36), ForeignKey("app.inmuebles.id"), index=True)
-    tipo_uso_id: Mapped[str] = mapped_column(String(36), ForeignKey("app.tipos_uso_inmueble.id"), index=True)
+    inmueble_id: Mapped[str] = mapped_column(UUIDType, ForeignKey("app.inmuebles.id"), index=True)
+    tipo_uso_id: Mapped[str] = mapped_column(UUIDType, ForeignKey("app.tipos_uso_inmueble.id"), index=True)
 
     fecha_desde: Mapped[datetime] = mapped_column(index=True)
     fecha_hasta: Mapped[Optional[datetime]] = mapped_column(index=True)  # NULL = uso actual
@@ -322,9 +352,17 @@ class InmuebleNivelProteccion(UUIDPKMixin, AuditMixin, Base):
     con fechas de inicio y fin de cada nivel.
     """
     __tablename__ = "inmuebles_niveles_proteccion"
+    __table_args__ = (
+        # Protección actual: respalda Inmueble.figura_proteccion_actual
+        Index(
+            "ix_inmuebles_niveles_proteccion_actual",
+            "inmueble_id", "fecha_desde", "figura_proteccion_id",
+            postgresql_where=text("fecha_hasta IS NULL"),
+        ),
+    )
 
-    inmueble_id: Mapped[str] = mapped_column(String(36), ForeignKey("app.inmuebles.id"), index=True)
-    figura_proteccion_id: Mapped[str] = mapped_column(String(36), ForeignKey("app.tipos_figura_proteccion.id"), index=True)
+    inmueble_id: Mapped[str] = mapped_column(UUIDType, ForeignKey("app.inmuebles.id"), index=True)
+    figura_proteccion_id: Mapped[str] = mapped_column(UUIDType, ForeignKey("app.tipos_figura_proteccion.id"), index=True)
 
     fecha_desde: Mapped[datetime] = mapped_column(index=True)
     fecha_hasta: Mapped[Optional[datetime]] = mapped_column(index=True)  # NULL = protección actual
@@ -352,8 +390,8 @@ class InmuebleNivelProteccion(UUIDPKMixin, AuditMixin, Base):
 #     """
 #     __tablename__ = "inmuebles_eventos"
 #
-#     inmueble_id: Mapped[str] = mapped_column(String(36), ForeignKey("app.inmuebles.id"), index=True)
-#     tipo_evento_id: Mapped[str] = mapped_column(String(36), ForeignKey("app.eventos_registrables.id"), index=True)
+#     inmueble_id: Mapped[str] = mapped_column(UUIDType, ForeignKey("app.inmuebles.id"), index=True)
+#     tipo_evento_id: Mapped[str] = mapped_column(UUIDType, ForeignKey("app.eventos_registrables.id"), index=True)
 #     fecha_evento: Mapped[datetime]
 #     detalles: Mapped[Optional[dict]] = mapped_column(JSONB)
 #     descripcion: Mapped[Optional[str]] = mapped_column(Text)
@@ -0,0 +1,66 @@
+# models/limites.py
+"""
+Límites administrativos (GIS Schema).
+
+Un multipolígono por Comunidad Autónoma, Provincia y Municipio, en tablas
+del schema GIS registradas con register_gis_table. Cada límite guarda la
+geometría completa (geom) y una simplificada (geom_simplificada) para
+comprobaciones rápidas y aproximadas; ambas con índice GiST.
+
+La asignación masiva de municipio/provincia/CCAA a puntos está en
+services.geocodificacion.
+"""
+
+from __future__ import annotations
+from datetime import datetime
+from typing import Optional
+from sqlalchemy.orm import Mapped, mapped_column, declared_attr
+from sqlalchemy import String, DateTime, ForeignKey
+from geoalchemy2 import Geometry
+
+from db.registry import Base, GIS_SCHEMA
+from mixins import UUIDType
+from db.metadata import register_gis_table
+
+
+class LimiteBase(Base):
+    """Columnas comunes de las tablas de límites"""
+    __abstract__ = True
+
+    @declared_attr.directive
+    def __table_args__(cls):
+        return {"schema": GIS_SCHEMA}
+
+    geom: Mapped[Geometry] = mapped_column(Geometry(geometry_type="MULTIPOLYGON", srid=4326), nullable=False)
+    geom_simplificada: Mapped[Optional[Geometry]] = mapped_column(Geometry(geometry_type="MULTIPOLYGON", srid=4326))
+
+    fuente: Mapped[Optional[str]] = mapped_column(String(100))  # p. ej. "IGN-CNIG recintos 2024"
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class LimiteComunidad(LimiteBase):
+    __tablename__ = "limites_comunidades"
+
+    comunidad_autonoma_id: Mapped[str] = mapped_column(
+        UUIDType, ForeignKey("app.comunidades_autonomas.id", ondelete="CASCADE"), primary_key=True
+    )
+
+
+class LimiteProvincia(LimiteBase):
+    __tablename__ = "limites_provincias"
+
+    provincia_id: Mapped[str] = mapped_column(
+        UUIDType, ForeignKey("app.provincias.id", ondelete="CASCADE"), primary_key=True
+    )
+
+
+class LimiteMunicipio(LimiteBase):
+    __tablename__ = "limites_municipios"
+
+    municipio_id: Mapped[str] = mapped_column(
+        UUIDType, ForeignKey("app.municipios.id", ondelete="CASCADE"), primary_key=True
+    )
+
+
+for _limite in (LimiteComunidad, LimiteProvincia, LimiteMunicipio):
+    register_gis_table(_limite.__table__)
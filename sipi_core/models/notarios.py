@@ -5,14 +5,14 @@ from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy import String, ForeignKey
 
 from db.registry import Base
-from mixins import UUIDPKMixin, AuditMixin, ContactoDireccionMixin
+from mixins import UUIDPKMixin, AuditMixin, ContactoDireccionMixin, TitularidadMixin, UUIDType
 from .actores_base import TitularBase
 
 if TYPE_CHECKING:
     from models.geografia import Municipio
     from models.transmisiones import Transmision
 
-class Notaria(UUIDPKMixin, AuditMixin, ContactoDireccionMixin, Base):
+class Notaria(UUIDPKMixin, AuditMixin, ContactoDireccionMixin, TitularidadMixin, Base):
     __tablename__ = "notarias"
 
     codigo_oficial: Mapped[str] = mapped_column(String(20), unique=True, index=True, nullable=False)
@@ -27,11 +27,6 @@ class Notaria(UUIDPKMixin, AuditMixin, ContactoDireccionMixin, Base):
         "Transmision",
         back_populates="notaria",
     )
-    titulares: Mapped[list["NotariaTitular"]] = relationship(
-        "NotariaTitular",
-        back_populates="notaria",
-        cascade="all, delete-orphan",
-    )
 
     def __repr__(self) -> str:
         return f"<Notaria {self.codigo_oficial} - {self.nombre}>"
@@ -39,7 +34,7 @@ class Notaria(UUIDPKMixin, AuditMixin, ContactoDireccionMixin, Base):
 class NotariaTitular(TitularBase):
     __tablename__ = "notarias_titulares"
 
-    notaria_id: Mapped[str] = mapped_column(String(36), ForeignKey("app.notarias.id"), index=True)
+    notaria_id: Mapped[str] = mapped_column(UUIDType, ForeignKey("app.notarias.id"), index=True)
 
     notaria: Mapped["Notaria"] = relationship(
         "Notaria",
@@ -1,12 +1,12 @@
 from __future__ import annotations
 from typing import Optional
 from sqlalchemy.orm import Mapped, mapped_column
-from sqlalchemy import String, Integer, Text
+from sqlalchemy import String, Integer, Text, Index, text
 from sqlalchemy.dialects.postgresql import JSONB
 from geoalchemy2 import Geometry
 
 from db.registry import Base
-from mixins import UUIDPKMixin, AuditMixin
+from mixins import UUIDPKMixin, AuditMixin, UUIDType
 
 class OSMPlace(UUIDPKMixin, AuditMixin, Base):
     """
@@ -14,6 +14,12 @@ class OSMPlace(UUIDPKMixin, AuditMixin, Base):
     Se usa como referencia estática para geolocalización y matching.
     """
     __tablename__ = "osm_places"
+    # deleted_at indexado: versión de teselas (services.teselas) lo consultan
+    __indices_auditoria__ = ("created_at", "updated_at", "deleted_at")
+    __table_args__ = (
+        # Búsquedas por radio en metros (services.espacial)
+        Index("idx_osm_places_geom_geog", text("geography(geom)"), postgresql_using="gist"),
+    )
     
     # ID original de OSM (ej: 'node/12345')
     osm_id: Mapped[str] = mapped_column(String(50), unique=True, index=True)
@@ -25,7 +31,7 @@ class OSMPlace(UUIDPKMixin, AuditMixin, Base):
     denomination: Mapped[Optional[str]] = mapped_column(String(100))
     
     # Ubicación normalizada
-    municipio_id: Mapped[Optional[str]] = mapped_column(String(36), index=True) # Link to our Municipio if mapped
+    municipio_id: Mapped[Optional[str]] = mapped_column(UUIDType, index=True) # Link to our Municipio if mapped
     addr_city: Mapped[Optional[str]] = mapped_column(String(100))
     addr_postcode: Mapped[Optional[str]] = mapped_column(String(20))
     
@@ -5,7 +5,7 @@ from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy import String, ForeignKey
 
 from db.registry import Base
-from mixins import UUIDPKMixin, AuditMixin, IdentificacionMixin, ContactoDireccionMixin, TitularidadMixin
+from mixins import UUIDPKMixin, AuditMixin, IdentificacionMixin, ContactoDireccionMixin, TitularidadMixin, UUIDType
 from models.actores_base import TitularBase
 
 if TYPE_CHECKING:
@@ -37,11 +37,6 @@ class RegistroPropiedad(
         "Inmatriculacion",
         back_populates="registro_propiedad",
     )
-    titulares: Mapped[list["RegistroPropiedadTitular"]] = relationship(
-        "RegistroPropiedadTitular",
-        back_populates="registro_propiedad",
-        cascade="all, delete-orphan",
-    )
 
     def __repr__(self) -> str:
         return f"<RegistroPropiedad {self.codigo_oficial} - {self.nombre}>"
@@ -51,7 +46,7 @@ class RegistroPropiedadTitular(TitularBase, Base):
     __tablename__ = "registros_propiedad_titulares"
 
     registro_propiedad_id: Mapped[str] = mapped_column(
-        String(36),
+        UUIDType,
         ForeignKey("app.registros_propiedad.id"),
         index=True,
     )
@@ -0,0 +1,71 @@
+# models/resumenes.py
+from __future__ import annotations
+
+from typing import Optional
+from datetime import datetime
+from decimal import Decimal
+
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import String, Integer, SmallInteger, BigInteger, Numeric, DateTime
+
+from db.registry import Base
+from mixins import UUIDType
+
+
+class ResumenRefresco(Base):
+    """
+    Sello de frescura de una vista materializada de resúmenes
+    (services.resumenes): cuándo se refrescó por última vez, cuánto tardó
+    y cuántas filas tiene. Los dashboards lo muestran y lo usan como clave
+    de caché.
+    """
+    __tablename__ = "resumenes_refresco"
+
+    vista: Mapped[str] = mapped_column(String(100), primary_key=True)
+    refrescado_en: Mapped[datetime] = mapped_column(DateTime)
+    duracion_ms: Mapped[Optional[int]] = mapped_column(Integer)
+    filas: Mapped[Optional[int]] = mapped_column(BigInteger)
+
+
+class EstadisticaTerritorial(Base):
+    """
+    Estadísticas por territorio y año (services.estadisticas).
+
+    El territorio es la terna comunidad/provincia/municipio de los
+    inmuebles (cualquiera puede ser NULL); clave la identifica
+    (app.territorio_clave). anio es el año del hecho contado: alta del
+    inmueble, fecha de inmatriculación, de transmisión o de inicio de la
+    intervención (también para sus subvenciones); 0 = sin fecha.
+    """
+    __tablename__ = "estadisticas_territoriales"
+
+    clave: Mapped[str] = mapped_column(String(32), primary_key=True)
+    anio: Mapped[int] = mapped_column(SmallInteger, primary_key=True)
+    comunidad_autonoma_id: Mapped[Optional[str]] = mapped_column(UUIDType, index=True)
+    provincia_id: Mapped[Optional[str]] = mapped_column(UUIDType, index=True)
+    municipio_id: Mapped[Optional[str]] = mapped_column(UUIDType, index=True)
+
+    inmuebles: Mapped[int] = mapped_column(Integer, default=0)
+    inmatriculaciones: Mapped[int] = mapped_column(Integer, default=0)
+    transmisiones: Mapped[int] = mapped_column(Integer, default=0)
+    precio_venta: Mapped[Decimal] = mapped_column(Numeric(18, 2), default=0)
+    intervenciones: Mapped[int] = mapped_column(Integer, default=0)
+    presupuesto: Mapped[Decimal] = mapped_column(Numeric(18, 2), default=0)
+    subvenciones: Mapped[int] = mapped_column(Integer, default=0)
+    importe_aplicado: Mapped[Decimal] = mapped_column(Numeric(18, 2), default=0)
+
+    actualizado_en: Mapped[datetime] = mapped_column(DateTime)
+
+
+class EstadisticaPendiente(Base):
+    """
+    Territorios con cambios sin reflejar en estadisticas_territoriales.
+    La llenan triggers sobre inmuebles, inmatriculaciones, transmisiones,
+    intervenciones y subvenciones; la vacía services.estadisticas.refrescar().
+    """
+    __tablename__ = "estadisticas_pendientes"
+
+    clave: Mapped[str] = mapped_column(String(32), primary_key=True)
+    comunidad_autonoma_id: Mapped[Optional[str]] = mapped_column(UUIDType)
+    provincia_id: Mapped[Optional[str]] = mapped_column(UUIDType)
+    municipio_id: Mapped[Optional[str]] = mapped_column(UUIDType)
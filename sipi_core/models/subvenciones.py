@@ -6,7 +6,7 @@ from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy import String, Text, Numeric, ForeignKey
 
 from db.registry import Base
-from mixins import UUIDPKMixin, AuditMixin
+from mixins import UUIDPKMixin, AuditMixin, UUIDType
 
 if TYPE_CHECKING:
     from models.intervenciones import Intervencion
@@ -16,7 +16,7 @@ if TYPE_CHECKING:
 class IntervencionSubvencion(UUIDPKMixin, AuditMixin, Base):
     __tablename__ = "intervenciones_subvenciones"
 
-    intervencion_id: Mapped[str] = mapped_column(String(36), ForeignKey("app.intervenciones.id"), index=True)
+    intervencion_id: Mapped[str] = mapped_column(UUIDType, ForeignKey("app.intervenciones.id"), index=True)
     codigo_concesion: Mapped[str] = mapped_column(String(100), index=True)
     importe_aplicado: Mapped[Decimal | None] = mapped_column(Numeric(15, 2), nullable=True)
     porcentaje_financiacion: Mapped[float | None] = mapped_column(Numeric(5, 2), nullable=True)
@@ -30,8 +30,8 @@ class IntervencionSubvencion(UUIDPKMixin, AuditMixin, Base):
 class SubvencionAdministracion(UUIDPKMixin, AuditMixin, Base):
     __tablename__ = "subvenciones_administraciones"
 
-    subvencion_id: Mapped[str] = mapped_column(String(36), ForeignKey("app.intervenciones_subvenciones.id"), index=True)
-    administracion_id: Mapped[str] = mapped_column(String(36), ForeignKey("app.administraciones.id"), index=True)
+    subvencion_id: Mapped[str] = mapped_column(UUIDType, ForeignKey("app.intervenciones_subvenciones.id"), index=True)
+    administracion_id: Mapped[str] = mapped_column(UUIDType, ForeignKey("app.administraciones.id"), index=True)
     importe_aportado: Mapped[Decimal | None] = mapped_column(Numeric(15, 2), nullable=True)
     porcentaje_participacion: Mapped[float | None] = mapped_column(Numeric(5, 2), nullable=True)
 
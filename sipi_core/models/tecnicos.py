@@ -7,7 +7,7 @@ from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy import String, ForeignKey
 
 from db.registry import Base
-from mixins import UUIDPKMixin, AuditMixin, IdentificacionMixin, ContactoDireccionMixin
+from mixins import UUIDPKMixin, AuditMixin, IdentificacionMixin, ContactoDireccionMixin, UUIDType
 
 if TYPE_CHECKING:
     from models.geografia import Municipio
@@ -18,12 +18,12 @@ class Tecnico(UUIDPKMixin, AuditMixin, IdentificacionMixin, ContactoDireccionMix
     __tablename__ = "tecnicos"
 
     rol_tecnico_id: Mapped[Optional[str]] = mapped_column(
-        String(36),
+        UUIDType,
         ForeignKey("app.roles_tecnico.id"),
         index=True,
     )
     colegio_profesional_id: Mapped[Optional[str]] = mapped_column(
-        String(36),
+        UUIDType,
         ForeignKey("app.colegios_profesionales.id"),
         index=True,
     )
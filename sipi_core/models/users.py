@@ -15,15 +15,15 @@ from sqlalchemy import (
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from db.registry import Base, metadata
-from mixins import UUIDPKMixin, AuditMixin, IdentificacionMixin, ContactoMixin
+from mixins import UUIDPKMixin, AuditMixin, IdentificacionMixin, ContactoMixin, UUIDType
 
 
 # Tabla de asociación muchos-a-muchos
 usuario_rol = Table(
     "usuario_rol",
     metadata,  # ← metadata del registry, no Base.metadata
-    Column("usuario_id", String(36), ForeignKey("app.usuarios.id"), primary_key=True),
-    Column("rol_id", String(36), ForeignKey("app.roles.id"), primary_key=True),
+    Column("usuario_id", UUIDType, ForeignKey("app.usuarios.id"), primary_key=True),
+    Column("rol_id", UUIDType, ForeignKey("app.roles.id"), primary_key=True),
     Column(
         "fecha_asignacion",
         DateTime,
@@ -31,7 +31,7 @@ usuario_rol = Table(
     ),
     Column(
         "asignado_por",
-        String(36),
+        UUIDType,
         ForeignKey("app.usuarios.id"),
         nullable=True,
     ),
@@ -48,6 +48,9 @@ class Usuario(UUIDPKMixin, AuditMixin, IdentificacionMixin, ContactoMixin, Base)
     roles: Mapped[list["Rol"]] = relationship(
         "Rol",
         secondary=usuario_rol,
+        # usuario_rol tiene dos FKs a usuarios (usuario_id y asignado_por)
+        primaryjoin=lambda: Usuario.id == usuario_rol.c.usuario_id,
+        secondaryjoin=lambda: Rol.id == usuario_rol.c.rol_id,
         back_populates="usuarios",
     )
 
@@ -61,5 +64,7 @@ class Rol(UUIDPKMixin, AuditMixin, Base):
     usuarios: Mapped[list["Usuario"]] = relationship(
         "Usuario",
         secondary=usuario_rol,
+        primaryjoin=lambda: Rol.id == usuario_rol.c.rol_id,
+        secondaryjoin=lambda: Usuario.id == usuario_rol.c.usuario_id,
         back_populates="roles",
     )
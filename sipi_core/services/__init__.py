@@ -0,0 +1,43 @@
+# services/__init__.py
+"""
+Servicios de consulta y procesamiento sobre los modelos SIPI.
+
+Cada módulo agrupa una funcionalidad concreta y trabaja con sesiones
+síncronas (Session) o asíncronas (AsyncSession) de db.sessions.
+"""
+
+from .timeline import (
+    EventoTimeline,
+    TimelineCursor,
+    timeline_query,
+    get_timeline,
+    get_timelines,
+    get_timeline_async,
+    get_timelines_async,
+)
+from .gazetteer import (
+    GeoGazetteer,
+    GEO_GAZETTEER,
+    normalizar_nombre,
+)
+from .catalogos import (
+    CatalogCache,
+    CatalogoSnapshot,
+    CATALOG_CACHE,
+)
+
+__all__ = [
+    "EventoTimeline",
+    "TimelineCursor",
+    "timeline_query",
+    "get_timeline",
+    "get_timelines",
+    "get_timeline_async",
+    "get_timelines_async",
+    "GeoGazetteer",
+    "GEO_GAZETTEER",
+    "normalizar_nombre",
+    "CatalogCache",
+    "CatalogoSnapshot",
+    "CATALOG_CACHE",
+]
@@ -0,0 +1,225 @@
+# services/busqueda.py
+"""
+Buscador de inmuebles por texto.
+
+Combina dos índices (migración 1d7f3b9c2e58):
+
+    - Texto completo: Inmueble.busqueda, tsvector con la configuración
+      app.spanish_unaccent (stemming español, sin tildes) y pesos
+      A nombre · B denominaciones · C municipio y diócesis · D descripción.
+      Lo mantienen triggers al cambiar el inmueble, sus denominaciones o el
+      nombre del municipio / diócesis. Índice GIN ix_inmuebles_busqueda.
+    - Trigramas: app.f_unaccent(nombre) y app.f_unaccent(denominacion) con
+      gin_trgm_ops, para nombres parciales o mal escritos ("catedral sevila").
+
+Los candidatos son la unión de las tres búsquedas indexadas (@@ sobre el
+tsvector y <% de word_similarity sobre los nombres), cada una limitada a
+max_candidatos (las de texto completo, las de mayor ts_rank_cd) para que
+una palabra muy común no dispare el coste. Se puntúan con ts_rank_cd y
+la similitud de trigramas, y solo la página final pasa por ts_headline,
+que es la parte cara.
+
+USO:
+    with manager.session() as session:
+        for r in buscar(session, "ermita san roque", FiltroBusqueda(provincia_ids=[...]), limite=20):
+            print(r.inmueble_id, r.puntuacion, r.nombre_resaltado, r.fragmento)
+
+    async with manager.session() as session:
+        resultados = await buscar_async(session, "catedral sevila")
+
+Latencia (p50/p95) contra una base sembrada: benchmarks/busqueda.py.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Optional, Sequence
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+CONFIGURACION = "app.spanish_unaccent"
+
+# Marcas de resaltado de ts_headline
+INICIO_RESALTADO = "<mark>"
+FIN_RESALTADO = "</mark>"
+
+
+@dataclass(frozen=True, slots=True)
+class FiltroBusqueda:
+    """Restricciones sobre los inmuebles encontrados (None = sin filtro)"""
+    comunidad_autonoma_ids: Optional[Sequence[str]] = None
+    provincia_ids: Optional[Sequence[str]] = None
+    municipio_ids: Optional[Sequence[str]] = None
+    tipo_inmueble_ids: Optional[Sequence[str]] = None
+    diocesis_ids: Optional[Sequence[str]] = None
+    en_venta: Optional[bool] = None
+    activo: Optional[bool] = None
+
+
+@dataclass(frozen=True, slots=True)
+class ResultadoBusqueda:
+    inmueble_id: str
+    puntuacion: float
+    rango_texto: float        # ts_rank_cd sobre el tsvector
+    similitud: float          # word_similarity con nombre o denominación
+    nombre_resaltado: str
+    denominacion: Optional[str]            # denominación más parecida (resaltada), si la hay
+    fragmento: Optional[str]               # fragmentos de la descripción con coincidencias
+
+
+# Filtro → (fragmento SQL, parámetro). Los fragmentos son fijos.
+_FILTROS_LISTA = (
+    ("comunidad_autonoma_ids", "i.comunidad_autonoma_id = ANY(CAST(:comunidad_autonoma_ids AS uuid[]))"),
+    ("provincia_ids", "i.provincia_id = ANY(CAST(:provincia_ids AS uuid[]))"),
+    ("municipio_ids", "i.municipio_id = ANY(CAST(:municipio_ids AS uuid[]))"),
+    ("tipo_inmueble_ids", "i.tipo_inmueble_id = ANY(CAST(:tipo_inmueble_ids AS uuid[]))"),
+    ("diocesis_ids", "i.diocesis_id = ANY(CAST(:diocesis_ids AS uuid[]))"),
+)
+_FILTROS_BOOL = (
+    ("en_venta", "i.en_venta = CAST(:en_venta AS boolean)"),
+    ("activo", "i.activo = CAST(:activo AS boolean)"),
+)
+
+
+def _filtros(filtro: FiltroBusqueda) -> tuple[str, dict]:
+    condiciones, params = [], {}
+    for campo, sql in _FILTROS_LISTA:
+        valores = getattr(filtro, campo)
+        if valores is not None:
+            condiciones.append(sql)
+            params[campo] = list(valores)
+    for campo, sql in _FILTROS_BOOL:
+        valor = getattr(filtro, campo)
+        if valor is not None:
+            condiciones.append(sql)
+            params[campo] = valor
+    return "".join(f" AND {condicion}" for condicion in condiciones), params
+
+
+def _sql_busqueda(condiciones: str):
+    return text(f"""
+        WITH consulta AS (
+            SELECT websearch_to_tsquery('{CONFIGURACION}', CAST(:q AS text)) AS tsq,
+                   app.f_unaccent(CAST(:q AS text)) AS q
+        ),
+        candidatos AS (
+            (SELECT i.id FROM app.inmuebles i, consulta
+             WHERE i.busqueda @@ consulta.tsq
+             ORDER BY ts_rank_cd(i.busqueda, consulta.tsq) DESC
+             LIMIT CAST(:max_candidatos AS integer))
+            UNION
+            (SELECT i.id FROM app.inmuebles i, consulta
+             WHERE consulta.q <% app.f_unaccent(i.nombre)
+             LIMIT CAST(:max_candidatos AS integer))
+            UNION
+            (SELECT d.inmueble_id FROM app.inmuebles_denominaciones d, consulta
+             WHERE consulta.q <% app.f_unaccent(d.denominacion) AND d.deleted_at IS NULL
+             LIMIT CAST(:max_candidatos AS integer))
+        ),
+        puntuados AS (
+            SELECT i.id, i.nombre, i.descripcion, den.denominacion,
+                   ts_rank_cd(i.busqueda, consulta.tsq) AS rango_texto,
+                   greatest(word_similarity(consulta.q, app.f_unaccent(i.nombre)), coalesce(den.similitud, 0)) AS similitud
+            FROM candidatos c
+            JOIN app.inmuebles i ON i.id = c.id
+            CROSS JOIN consulta
+            LEFT JOIN LATERAL (
+                SELECT d.denominacion, word_similarity(consulta.q, app.f_unaccent(d.denominacion)) AS similitud
+                FROM app.inmuebles_denominaciones d
+                WHERE d.inmueble_id = i.id AND d.deleted_at IS NULL
+                ORDER BY 2 DESC
+                LIMIT 1
+            ) den ON true
+            WHERE i.deleted_at IS NULL{condiciones}
+        ),
+        pagina AS (
+            SELECT *, CAST(:peso_texto AS float8) * rango_texto + CAST(:peso_trigramas AS float8) * similitud AS puntuacion
+            FROM puntuados
+            ORDER BY puntuacion DESC, id
+            LIMIT CAST(:limite AS integer) OFFSET CAST(:offset AS integer)
+        )
+        SELECT p.id, p.puntuacion, p.rango_texto, p.similitud,
+               ts_headline('{CONFIGURACION}', p.nombre, consulta.tsq, CAST(:opciones_nombre AS text)),
+               CASE WHEN p.denominacion IS NOT NULL
+                    THEN ts_headline('{CONFIGURACION}', p.denominacion, consulta.tsq, CAST(:opciones_nombre AS text))
+               END,
+               CASE WHEN p.descripcion IS NOT NULL AND to_tsvector('{CONFIGURACION}', p.descripcion) @@ consulta.tsq
+                    THEN ts_headline('{CONFIGURACION}', p.descripcion, consulta.tsq, CAST(:opciones_fragmento AS text))
+               END
+        FROM pagina p CROSS JOIN consulta
+        ORDER BY p.puntuacion DESC, p.id
+    """)
+
+
+def _preparar(q: str, filtro: Optional[FiltroBusqueda], limite: int, offset: int,
+              peso_texto: float, peso_trigramas: float, max_candidatos: int):
+    q = " ".join(q.split())
+    if not q:
+        raise ValueError("La búsqueda está vacía")
+    condiciones, params = _filtros(filtro or FiltroBusqueda())
+    marcas = f"StartSel={INICIO_RESALTADO}, StopSel={FIN_RESALTADO}"
+    params.update(
+        q=q,
+        limite=limite,
+        offset=offset,
+        peso_texto=peso_texto,
+        peso_trigramas=peso_trigramas,
+        max_candidatos=max(max_candidatos, limite + offset),
+        opciones_nombre=f"{marcas}, HighlightAll=true",
+        opciones_fragmento=f"{marcas}, MaxFragments=2, MaxWords=25, MinWords=8",
+    )
+    return _sql_busqueda(condiciones), params
+
+
+def _resultados(filas) -> list[ResultadoBusqueda]:
+    return [
+        ResultadoBusqueda(
+            inmueble_id=str(fila[0]),
+            puntuacion=float(fila[1]),
+            rango_texto=float(fila[2]),
+            similitud=float(fila[3]),
+            nombre_resaltado=fila[4],
+            denominacion=fila[5],
+            fragmento=fila[6],
+        )
+        for fila in filas
+    ]
+
+
+def buscar(
+    session: Session,
+    q: str,
+    filtro: Optional[FiltroBusqueda] = None,
+    limite: int = 20,
+    offset: int = 0,
+    peso_texto: float = 1.0,
+    peso_trigramas: float = 0.5,
+    max_candidatos: int = 1000,
+) -> list[ResultadoBusqueda]:
+    """
+    Inmuebles que coinciden con la búsqueda, de mayor a menor puntuación
+    (peso_texto · ts_rank_cd + peso_trigramas · similitud).
+
+    q admite la sintaxis de websearch_to_tsquery ("frase exacta", -excluir, or).
+    max_candidatos se aplica a cada índice antes de los filtros: con filtros
+    muy selectivos y términos muy comunes conviene subirlo.
+    """
+    stmt, params = _preparar(q, filtro, limite, offset, peso_texto, peso_trigramas, max_candidatos)
+    return _resultados(session.execute(stmt, params).all())
+
+
+async def buscar_async(
+    session: AsyncSession,
+    q: str,
+    filtro: Optional[FiltroBusqueda] = None,
+    limite: int = 20,
+    offset: int = 0,
+    peso_texto: float = 1.0,
+    peso_trigramas: float = 0.5,
+    max_candidatos: int = 1000,
+) -> list[ResultadoBusqueda]:
+    """Versión asíncrona de buscar()"""
+    stmt, params = _preparar(q, filtro, limite, offset, peso_texto, peso_trigramas, max_candidatos)
+    return _resultados((await session.execute(stmt, params)).all())
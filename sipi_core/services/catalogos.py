@@ -0,0 +1,273 @@
+# services/catalogos.py
+"""
+Caché read-through de catálogos (tipologías).
+
+Los catálogos (subclases de TipologiaBase, TipoLicencia, FuenteDocumental,
+FiguraProteccion...) son tablas pequeñas que casi nunca cambian. En lugar
+de hacer join con ellas en cada consulta, se sirven desde snapshots
+inmutables en memoria, indexados por id, codigo y nombre.
+
+INVALIDACIÓN:
+    Cada tabla registrada tiene un contador de versión. Un listener
+    after_flush de Session lo incrementa cuando se inserta, modifica o
+    borra una fila del catálogo, y se vuelve a incrementar en after_commit
+    para que una lectura concurrente hecha antes del commit no deje
+    datos antiguos cacheados. Un snapshot cuya versión no coincide con la
+    actual se recarga en el siguiente acceso.
+
+    Los contadores son del proceso: cada worker detecta los cambios que
+    hace él mismo. Para cambios hechos en otro proceso, llamar a
+    CATALOG_CACHE.invalidate().
+
+USO:
+    with manager.session() as session:
+        tipos = CATALOG_CACHE.get(session, TipoInmueble)
+        iglesia = tipos.by_codigo("iglesia") or tipos.by_nombre("Iglesia")
+        tipo = tipos.by_id(inmueble.tipo_inmueble_id)
+
+    async with manager.session() as session:
+        licencias = await CATALOG_CACHE.get_async(session, TipoLicencia)
+"""
+
+from __future__ import annotations
+
+import threading
+from collections import namedtuple
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Any, Mapping, Optional
+
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from models.tipologias import (
+    TipologiaBase,
+    TipoLicencia,
+    FuenteDocumental,
+)
+from models.figuras_proteccion import FiguraProteccion
+
+# Columnas de AuditMixin que no se copian al snapshot
+_CAMPOS_AUDITORIA = frozenset({
+    "created_at", "updated_at", "deleted_at",
+    "created_by_id", "updated_by_id", "deleted_by_id",
+    "created_from_ip", "updated_from_ip",
+})
+
+_INFO_TABLAS = "catalogos_modificados"
+
+
+@dataclass(frozen=True)
+class _Spec:
+    """Cómo se carga e indexa un catálogo registrado"""
+    model: type
+    tabla: str
+    campos: tuple[str, ...]
+    fila: type
+    codigo: Optional[str]
+    nombre: Optional[str]
+
+
+class CatalogoSnapshot:
+    """Contenido inmutable de un catálogo en una versión concreta"""
+
+    __slots__ = ("model", "version", "items", "_por_id", "_por_codigo", "_por_nombre")
+
+    def __init__(self, spec: _Spec, version: int, filas):
+        self.model = spec.model
+        self.version = version
+        self.items: tuple = tuple(spec.fila(*fila) for fila in filas)
+        self._por_id = MappingProxyType({item.id: item for item in self.items})
+        self._por_codigo = self._indexar(spec.codigo)
+        self._por_nombre = self._indexar(spec.nombre)
+
+    def _indexar(self, campo: Optional[str]) -> Mapping[str, tuple]:
+        indice: dict[str, list] = {}
+        if campo:
+            for item in self.items:
+                indice.setdefault(getattr(item, campo), []).append(item)
+        return MappingProxyType({clave: tuple(items) for clave, items in indice.items()})
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def by_id(self, id: str):
+        return self._por_id.get(id)
+
+    def by_codigo(self, codigo: str):
+        """Primera coincidencia (FiguraProteccion repite codigo entre CCAA: ver all_by_codigo)"""
+        items = self._por_codigo.get(codigo)
+        return items[0] if items else None
+
+    def by_nombre(self, nombre: str):
+        items = self._por_nombre.get(nombre)
+        return items[0] if items else None
+
+    def all_by_codigo(self, codigo: str) -> tuple:
+        return self._por_codigo.get(codigo, ())
+
+    def all_by_nombre(self, nombre: str) -> tuple:
+        return self._por_nombre.get(nombre, ())
+
+
+class CatalogCache:
+    """Registro de catálogos cacheados con invalidación por versión de tabla"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._specs: dict[type, _Spec] = {}
+        self._por_tabla: dict[str, _Spec] = {}
+        self._versiones: dict[str, int] = {}
+        self._snapshots: dict[type, CatalogoSnapshot] = {}
+
+    # ------------------------------------------------------------------
+    # Registro
+    # ------------------------------------------------------------------
+
+    def register(self, model: type, *, codigo: Optional[str] = "codigo", nombre: Optional[str] = "nombre") -> None:
+        """
+        Registra un modelo de catálogo.
+
+        codigo / nombre: columnas por las que indexar (se ignoran si el
+        modelo no las tiene).
+        """
+        campos = tuple(
+            columna.key for columna in model.__table__.columns
+            if columna.key not in _CAMPOS_AUDITORIA
+        )
+        spec = _Spec(
+            model=model,
+            tabla=model.__table__.fullname,
+            campos=campos,
+            fila=namedtuple(model.__name__, campos),
+            codigo=codigo if codigo in campos else None,
+            nombre=nombre if nombre in campos else None,
+        )
+        with self._lock:
+            self._specs[model] = spec
+            self._por_tabla[spec.tabla] = spec
+            self._versiones.setdefault(spec.tabla, 0)
+
+    def is_registered(self, model: type) -> bool:
+        return model in self._specs
+
+    # ------------------------------------------------------------------
+    # Versiones e invalidación
+    # ------------------------------------------------------------------
+
+    def version(self, model: type) -> int:
+        return self._versiones[self._specs[model].tabla]
+
+    def bump(self, tabla: str) -> None:
+        """Incrementa la versión de una tabla registrada (nombre con schema)"""
+        with self._lock:
+            if tabla in self._versiones:
+                self._versiones[tabla] += 1
+
+    def invalidate(self, model: Optional[type] = None) -> None:
+        """Fuerza la recarga de un catálogo, o de todos si no se indica modelo"""
+        specs = [self._specs[model]] if model is not None else list(self._specs.values())
+        for spec in specs:
+            self.bump(spec.tabla)
+
+    def _tablas_modificadas(self, session: Session) -> set[str]:
+        tablas = set()
+        for obj in (*session.new, *session.dirty, *session.deleted):
+            tabla = getattr(type(obj), "__table__", None)
+            if tabla is not None and tabla.fullname in self._por_tabla:
+                tablas.add(tabla.fullname)
+        return tablas
+
+    def _after_flush(self, session: Session, flush_context) -> None:
+        tablas = self._tablas_modificadas(session)
+        if tablas:
+            session.info.setdefault(_INFO_TABLAS, set()).update(tablas)
+            for tabla in tablas:
+                self.bump(tabla)
+
+    def _after_commit(self, session: Session) -> None:
+        for tabla in session.info.pop(_INFO_TABLAS, ()):
+            self.bump(tabla)
+
+    def _after_rollback(self, session: Session) -> None:
+        session.info.pop(_INFO_TABLAS, None)
+
+    def listen(self, session_cls: type = Session) -> None:
+        """Engancha los listeners de invalidación a una clase de Session"""
+        event.listen(session_cls, "after_flush", self._after_flush)
+        event.listen(session_cls, "after_commit", self._after_commit)
+        event.listen(session_cls, "after_rollback", self._after_rollback)
+
+    # ------------------------------------------------------------------
+    # Lectura
+    # ------------------------------------------------------------------
+
+    def _vigente(self, spec: _Spec) -> Optional[CatalogoSnapshot]:
+        snapshot = self._snapshots.get(spec.model)
+        if snapshot is not None and snapshot.version == self._versiones[spec.tabla]:
+            return snapshot
+        return None
+
+    def _consulta(self, spec: _Spec):
+        tabla = spec.model.__table__
+        return select(*(tabla.c[campo] for campo in spec.campos)).where(tabla.c.deleted_at.is_(None))
+
+    def _guardar(self, spec: _Spec, version: int, filas) -> CatalogoSnapshot:
+        snapshot = CatalogoSnapshot(spec, version, filas)
+        with self._lock:
+            # Si hubo un bump durante la carga, la versión ya no coincide y se recargará
+            self._snapshots[spec.model] = snapshot
+        return snapshot
+
+    def get(self, session: Session, model: type) -> CatalogoSnapshot:
+        """Snapshot vigente del catálogo, cargándolo si hace falta"""
+        spec = self._specs[model]
+        snapshot = self._vigente(spec)
+        if snapshot is None:
+            version = self._versiones[spec.tabla]
+            snapshot = self._guardar(spec, version, session.execute(self._consulta(spec)).all())
+        return snapshot
+
+    async def get_async(self, session: AsyncSession, model: type) -> CatalogoSnapshot:
+        """Versión asíncrona de get()"""
+        spec = self._specs[model]
+        snapshot = self._vigente(spec)
+        if snapshot is None:
+            version = self._versiones[spec.tabla]
+            snapshot = self._guardar(spec, version, (await session.execute(self._consulta(spec))).all())
+        return snapshot
+
+
+def _subclases(cls: type) -> list[type]:
+    resultado = []
+    for sub in cls.__subclasses__():
+        resultado.append(sub)
+        resultado.extend(_subclases(sub))
+    return resultado
+
+
+def catalogos_por_defecto() -> list[tuple[type, dict[str, Any]]]:
+    """
+    Catálogos registrados en CATALOG_CACHE: (modelo, opciones de register).
+
+    Incluye todas las subclases concretas de TipologiaBase (TipoUsoInmueble
+    entre ellas) más TipoLicencia, FuenteDocumental y FiguraProteccion.
+    """
+    catalogos = [(model, {}) for model in _subclases(TipologiaBase) if not model.__dict__.get("__abstract__")]
+    catalogos += [
+        (TipoLicencia, {}),
+        (FuenteDocumental, {}),
+        (FiguraProteccion, {"nombre": "denominacion"}),
+    ]
+    return catalogos
+
+
+# Instancia compartida del proceso
+CATALOG_CACHE = CatalogCache()
+for _model, _opciones in catalogos_por_defecto():
+    CATALOG_CACHE.register(_model, **_opciones)
+CATALOG_CACHE.listen()
@@ -0,0 +1,433 @@
+# services/deteccion.py
+"""
+Motor de matching entre anuncios scrapeados (InmuebleRaw) e inmuebles.
+
+Para cada anuncio genera candidatos y guarda una DeteccionAnuncio por par
+(anuncio, inmueble) con su score (0-100) y el desglose en evidences (JSONB).
+
+CANDIDATOS:
+    - Anuncio con coordenadas precisas: los K inmuebles más cercanos por
+      KNN (<->, índice GiST sobre Inmueble.coordenadas) dentro de un radio
+      en metros.
+    - Anuncio sin coordenadas o con geo_type aproximado: inmuebles del
+      municipio cuyo nombre coincide con "ciudad" (sin tildes ni
+      mayúsculas) o, si no hay ciudad o no coincide con ningún
+      municipio, de la provincia.
+
+SCORE:
+    peso_geo * factor_geo + peso_texto * similitud_texto, donde similitud_texto
+    es la mayor word_similarity (pg_trgm) de Inmueble.nombre o de sus
+    InmuebleDenominacion.denominacion frente a titulo + descripcion.
+
+Todo se resuelve en una sentencia por lote de miles de anuncios
+(INSERT ... SELECT ... ON CONFLICT), nunca anuncio a anuncio. Requiere las
+extensiones pg_trgm y unaccent (ver DatabaseManager.init_database).
+
+MODO INCREMENTAL:
+    run_incremental() guarda una marca de agua por tabla fuente
+    (PipelineWatermark) y solo re-puntúa los anuncios nuevos o
+    re-scrapeados y los que pueden verse afectados por inmuebles o
+    denominaciones cambiados desde la última ejecución. Las detecciones
+    pendientes que dejan de ser candidatas se eliminan; las re-puntuadas
+    actualizan last_updated_at.
+
+USO:
+    async with manager.session() as session:
+        engine = MatchingEngine(session)
+        resumen = await engine.run()              # pasada completa
+        resumen = await engine.run_incremental()  # solo cambios
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Iterable, Optional
+
+from sqlalchemy import Integer, String, bindparam, func, select, text
+from sqlalchemy.dialects.postgresql import ARRAY, insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models.discovery import InmuebleRaw, DeteccionAnuncio, PipelineWatermark
+from models.inmuebles import Inmueble, InmuebleDenominacion
+from models.geografia import Municipio, Provincia
+
+STATUS_PENDIENTE = "pendiente"
+VERSION_SCORING = 1
+
+# Marcas de agua del modo incremental (PipelineWatermark)
+PROCESO = "deteccion"
+FUENTE_RAW = InmuebleRaw.__table__.fullname
+FUENTE_INMUEBLES = Inmueble.__table__.fullname
+FUENTE_DENOMINACIONES = InmuebleDenominacion.__table__.fullname
+FUENTES = (FUENTE_RAW, FUENTE_INMUEBLES, FUENTE_DENOMINACIONES)
+SOLAPE = timedelta(minutes=5)
+
+
+@dataclass(frozen=True)
+class MatchingConfig:
+    """Parámetros del matching"""
+    radio_m: float = 300.0
+    k_vecinos: int = 10
+    max_candidatos: int = 5            # detecciones guardadas por anuncio
+    score_minimo: float = 25.0
+    peso_geo: float = 0.4
+    peso_texto: float = 0.6
+    factor_municipio: float = 0.35     # factor_geo si solo coincide el municipio
+    factor_provincia: float = 0.1      # factor_geo si solo coincide la provincia
+    max_descripcion: int = 1000        # caracteres de descripción comparados
+    geo_types_aproximados: frozenset[str] = field(
+        default_factory=lambda: frozenset({"unknown", "approximate", "city", "municipio", "province", "provincia", "zone"})
+    )
+
+
+@dataclass(frozen=True, slots=True)
+class LoteMatching:
+    """Resultado del matching de un lote de anuncios"""
+    anuncios: int
+    insertadas: int
+    actualizadas: int
+    eliminadas: int = 0  # pendientes que dejan de ser candidatas
+
+
+@dataclass(slots=True)
+class ResumenMatching:
+    lotes: int = 0
+    anuncios: int = 0
+    insertadas: int = 0
+    actualizadas: int = 0
+    eliminadas: int = 0
+    incremental: bool = False
+
+    def add(self, lote: LoteMatching) -> None:
+        self.lotes += 1
+        self.anuncios += lote.anuncios
+        self.insertadas += lote.insertadas
+        self.actualizadas += lote.actualizadas
+        self.eliminadas += lote.eliminadas
+
+
+def _sql_matching() -> str:
+    raw = InmuebleRaw.__table__.fullname
+    inmuebles = Inmueble.__table__.fullname
+    denominaciones = InmuebleDenominacion.__table__.fullname
+    municipios = Municipio.__table__.fullname
+    provincias = Provincia.__table__.fullname
+    detecciones = DeteccionAnuncio.__table__.fullname
+    return f"""
+        WITH raw AS (
+            SELECT r.id,
+                   r.geom,
+                   (r.geom IS NOT NULL AND NOT (r.geo_type = ANY(:geo_aprox))) AS preciso,
+                   lower(unaccent(coalesce(r.titulo, '') || ' ' || left(coalesce(r.descripcion, ''), CAST(:max_desc AS integer)))) AS texto,
+                   lower(unaccent(r.ciudad)) AS ciudad,
+                   lower(unaccent(r.provincia)) AS provincia
+            FROM {raw} r
+            WHERE r.id = ANY(:ids) AND r.is_active AND r.deleted_at IS NULL
+        ),
+        nombres_municipio AS (
+            SELECT m.id, lower(unaccent(n.nombre)) AS nombre
+            FROM {municipios} m
+            CROSS JOIN LATERAL unnest(ARRAY[m.nombre_oficial, m.nombre_cooficial, m.nombre_alternativo]) AS n(nombre)
+            WHERE n.nombre IS NOT NULL AND m.deleted_at IS NULL
+        ),
+        nombres_provincia AS (
+            SELECT p.id, lower(unaccent(n.nombre)) AS nombre
+            FROM {provincias} p
+            CROSS JOIN LATERAL unnest(ARRAY[p.nombre_oficial, p.nombre_cooficial, p.nombre_alternativo]) AS n(nombre)
+            WHERE n.nombre IS NOT NULL AND p.deleted_at IS NULL
+        ),
+        candidatos AS (
+            -- KNN dentro del radio
+            SELECT raw.id AS raw_id, k.inmueble_id, k.distancia_m, 'radio' AS via
+            FROM raw
+            CROSS JOIN LATERAL (
+                SELECT i.id AS inmueble_id,
+                       ST_Distance(i.coordenadas::geography, raw.geom::geography) AS distancia_m
+                FROM {inmuebles} i
+                WHERE i.coordenadas IS NOT NULL AND i.deleted_at IS NULL
+                ORDER BY i.coordenadas <-> raw.geom
+                LIMIT CAST(:k AS integer)
+            ) k
+            WHERE raw.preciso AND k.distancia_m <= CAST(:radio_m AS float8)
+
+            UNION ALL
+
+            -- Ubicación aproximada: municipio por nombre
+            SELECT DISTINCT raw.id, i.id, NULL::float8, 'municipio'
+            FROM raw
+            JOIN nombres_municipio nm ON nm.nombre = raw.ciudad
+            JOIN {inmuebles} i ON i.municipio_id = nm.id AND i.deleted_at IS NULL
+            WHERE NOT raw.preciso
+
+            UNION ALL
+
+            -- Sin ciudad, o ciudad que no es ningún municipio: provincia por nombre
+            SELECT DISTINCT raw.id, i.id, NULL::float8, 'provincia'
+            FROM raw
+            JOIN nombres_provincia np ON np.nombre = raw.provincia
+            JOIN {inmuebles} i ON i.provincia_id = np.id AND i.deleted_at IS NULL
+            WHERE NOT raw.preciso
+              AND NOT EXISTS (SELECT 1 FROM nombres_municipio nm WHERE nm.nombre = raw.ciudad)
+        ),
+        similitudes AS (
+            SELECT c.raw_id, c.inmueble_id, c.via, c.distancia_m,
+                   word_similarity(lower(unaccent(i.nombre)), raw.texto) AS sim_nombre,
+                   coalesce(d.sim, 0) AS sim_denominacion,
+                   CASE c.via
+                        WHEN 'radio' THEN 1 - c.distancia_m / CAST(:radio_m AS float8)
+                        WHEN 'municipio' THEN CAST(:factor_municipio AS float8)
+                        ELSE CAST(:factor_provincia AS float8)
+                   END AS factor_geo
+            FROM candidatos c
+            JOIN raw ON raw.id = c.raw_id
+            JOIN {inmuebles} i ON i.id = c.inmueble_id
+            LEFT JOIN LATERAL (
+                SELECT max(word_similarity(lower(unaccent(den.denominacion)), raw.texto)) AS sim
+                FROM {denominaciones} den
+                WHERE den.inmueble_id = c.inmueble_id AND den.deleted_at IS NULL
+            ) d ON true
+        ),
+        puntuados AS (
+            SELECT s.*,
+                   100 * (CAST(:peso_geo AS float8) * s.factor_geo + CAST(:peso_texto AS float8) * greatest(s.sim_nombre, s.sim_denominacion)) AS score
+            FROM similitudes s
+        ),
+        ranking AS (
+            SELECT p.*, row_number() OVER (PARTITION BY p.raw_id ORDER BY p.score DESC, p.inmueble_id) AS posicion
+            FROM puntuados p
+        ),
+        seleccion AS (
+            SELECT * FROM ranking r
+            WHERE r.posicion <= CAST(:max_candidatos AS integer) AND r.score >= CAST(:score_minimo AS float8)
+        ),
+        obsoletas AS (
+            -- Candidatos pendientes que ya no salen al re-puntuar el anuncio
+            DELETE FROM {detecciones} d
+            WHERE d.inmueble_id = ANY(:ids)
+              AND d.confirmed_at IS NULL
+              AND d.status = CAST(:status AS varchar)
+              AND NOT EXISTS (
+                  SELECT 1 FROM seleccion s
+                  WHERE s.raw_id = d.inmueble_id AND s.inmueble_id = d.inmueble_core_id
+              )
+            RETURNING 1
+        ),
+        fusion AS (
+            INSERT INTO {detecciones} AS d
+                (inmueble_id, inmueble_core_id, score, status, evidences,
+                 first_detected_at, last_updated_at, created_at)
+            SELECT r.raw_id, r.inmueble_id, round(r.score::numeric, 2), CAST(:status AS varchar),
+                   jsonb_build_object(
+                       'version', CAST(:version AS integer),
+                       'via', r.via,
+                       'distancia_m', round(r.distancia_m::numeric, 1),
+                       'factor_geo', round(r.factor_geo::numeric, 4),
+                       'sim_nombre', round(r.sim_nombre::numeric, 4),
+                       'sim_denominacion', round(r.sim_denominacion::numeric, 4),
+                       'posicion', r.posicion
+                   ),
+                   now() AT TIME ZONE 'utc', now() AT TIME ZONE 'utc', now() AT TIME ZONE 'utc'
+            FROM seleccion r
+            ON CONFLICT (inmueble_id, inmueble_core_id) DO UPDATE SET
+                score = EXCLUDED.score,
+                evidences = EXCLUDED.evidences,
+                last_updated_at = EXCLUDED.last_updated_at,
+                updated_at = EXCLUDED.last_updated_at
+            WHERE d.confirmed_at IS NULL
+            RETURNING (d.xmax = 0) AS insertada
+        )
+        SELECT count(*) FILTER (WHERE insertada) AS insertadas,
+               count(*) FILTER (WHERE NOT insertada) AS actualizadas,
+               (SELECT count(*) FROM obsoletas) AS eliminadas
+        FROM fusion
+    """
+
+
+def _sql_afectados() -> str:
+    """
+    Anuncios a re-puntuar desde las marcas de agua: los que han cambiado y
+    los que pueden ganar o perder candidatos por un inmueble cambiado.
+    """
+    raw = InmuebleRaw.__table__.fullname
+    inmuebles = Inmueble.__table__.fullname
+    denominaciones = InmuebleDenominacion.__table__.fullname
+    municipios = Municipio.__table__.fullname
+    provincias = Provincia.__table__.fullname
+    detecciones = DeteccionAnuncio.__table__.fullname
+    return f"""
+        WITH inmuebles_cambiados AS (
+            SELECT i.id FROM {inmuebles} i
+            WHERE i.created_at > :desde_inmuebles OR i.updated_at > :desde_inmuebles OR i.deleted_at > :desde_inmuebles
+            UNION
+            SELECT den.inmueble_id FROM {denominaciones} den
+            WHERE den.created_at > :desde_denominaciones OR den.updated_at > :desde_denominaciones
+               OR den.deleted_at > :desde_denominaciones
+        ),
+        cambiados AS (
+            SELECT i.id, i.coordenadas, i.municipio_id, i.provincia_id
+            FROM {inmuebles} i JOIN inmuebles_cambiados c ON c.id = i.id
+        )
+        -- Anuncios nuevos o modificados
+        SELECT r.id FROM {raw} r
+        WHERE r.created_at > :desde_raw OR r.updated_at > :desde_raw OR r.scraped_at > :desde_raw
+        UNION
+        -- Anuncios que ya apuntaban a un inmueble cambiado
+        SELECT d.inmueble_id FROM {detecciones} d JOIN inmuebles_cambiados c ON c.id = d.inmueble_core_id
+        UNION
+        -- Anuncios cerca de la posición actual (índice idx_portals_inmuebles_raw_geom_geog)
+        SELECT r.id FROM cambiados c
+        JOIN {raw} r ON ST_DWithin(geography(r.geom), geography(c.coordenadas), CAST(:radio_m AS float8))
+        WHERE c.coordenadas IS NOT NULL
+        UNION
+        -- Anuncios con ubicación aproximada en el municipio o la provincia
+        SELECT r.id FROM cambiados c
+        JOIN {municipios} m ON m.id = c.municipio_id
+        CROSS JOIN LATERAL unnest(ARRAY[m.nombre_oficial, m.nombre_cooficial, m.nombre_alternativo]) AS n(nombre)
+        JOIN {raw} r ON lower(unaccent(r.ciudad)) = lower(unaccent(n.nombre))
+        UNION
+        SELECT r.id FROM cambiados c
+        JOIN {provincias} p ON p.id = c.provincia_id
+        CROSS JOIN LATERAL unnest(ARRAY[p.nombre_oficial, p.nombre_cooficial, p.nombre_alternativo]) AS n(nombre)
+        JOIN {raw} r ON lower(unaccent(r.provincia)) = lower(unaccent(n.nombre))
+        WHERE NOT EXISTS (
+            SELECT 1 FROM {municipios} m
+            CROSS JOIN LATERAL unnest(ARRAY[m.nombre_oficial, m.nombre_cooficial, m.nombre_alternativo]) AS nm(nombre)
+            WHERE m.deleted_at IS NULL AND lower(unaccent(nm.nombre)) = lower(unaccent(r.ciudad))
+        )
+    """
+
+
+class MatchingEngine:
+    """
+    Genera y puntúa DeteccionAnuncio por lotes de anuncios.
+
+    Args:
+        session: Sesión asíncrona.
+        config: Parámetros de matching.
+        batch_size: Anuncios por sentencia.
+        commit_each_batch: Confirma tras cada lote.
+    """
+
+    def __init__(
+        self,
+        session: AsyncSession,
+        config: Optional[MatchingConfig] = None,
+        batch_size: int = 2000,
+        commit_each_batch: bool = True,
+    ):
+        self.session = session
+        self.config = config or MatchingConfig()
+        self.batch_size = batch_size
+        self.commit_each_batch = commit_each_batch
+        self._stmt = text(_sql_matching()).bindparams(
+            bindparam("ids", type_=ARRAY(Integer)),
+            bindparam("geo_aprox", type_=ARRAY(String)),
+        )
+
+    def _params(self, ids: list[int]) -> dict:
+        c = self.config
+        return {
+            "ids": ids,
+            "geo_aprox": sorted(c.geo_types_aproximados),
+            "max_desc": c.max_descripcion,
+            "k": c.k_vecinos,
+            "radio_m": c.radio_m,
+            "factor_municipio": c.factor_municipio,
+            "factor_provincia": c.factor_provincia,
+            "peso_geo": c.peso_geo,
+            "peso_texto": c.peso_texto,
+            "max_candidatos": c.max_candidatos,
+            "score_minimo": c.score_minimo,
+            "status": STATUS_PENDIENTE,
+            "version": VERSION_SCORING,
+        }
+
+    async def match_batch(self, raw_ids: Iterable[int]) -> LoteMatching:
+        """Puntúa un lote de anuncios (ids de InmuebleRaw) en una sola sentencia"""
+        ids = list(raw_ids)
+        if not ids:
+            return LoteMatching(0, 0, 0)
+        insertadas, actualizadas, eliminadas = (await self.session.execute(self._stmt, self._params(ids))).one()
+        if self.commit_each_batch:
+            await self.session.commit()
+        return LoteMatching(len(ids), insertadas, actualizadas, eliminadas)
+
+    async def match_ids(self, raw_ids: Iterable[int]) -> ResumenMatching:
+        """Puntúa una lista arbitraria de anuncios, troceada en lotes"""
+        ids = list(raw_ids)
+        resumen = ResumenMatching()
+        for inicio in range(0, len(ids), self.batch_size):
+            resumen.add(await self.match_batch(ids[inicio:inicio + self.batch_size]))
+        return resumen
+
+    async def run(self) -> ResumenMatching:
+        """Puntúa todos los anuncios activos, recorriendo la tabla por keyset sobre id"""
+        resumen = ResumenMatching()
+        ultimo = 0
+        while True:
+            ids = (await self.session.execute(
+                select(InmuebleRaw.id)
+                .where(InmuebleRaw.id > ultimo, InmuebleRaw.is_active.is_(True))
+                .order_by(InmuebleRaw.id)
+                .limit(self.batch_size)
+            )).scalars().all()
+            if not ids:
+                return resumen
+            resumen.add(await self.match_batch(ids))
+            ultimo = ids[-1]
+
+    # ------------------------------------------------------------------
+    # Modo incremental
+    # ------------------------------------------------------------------
+
+    async def _marcas(self) -> dict[str, datetime]:
+        filas = await self.session.execute(
+            select(PipelineWatermark.fuente, PipelineWatermark.marca)
+            .where(PipelineWatermark.proceso == PROCESO)
+        )
+        return dict(filas.all())
+
+    async def _guardar_marcas(self, marca: datetime) -> None:
+        ahora = datetime.utcnow()
+        stmt = pg_insert(PipelineWatermark).values([
+            {"proceso": PROCESO, "fuente": fuente, "marca": marca, "updated_at": ahora}
+            for fuente in FUENTES
+        ])
+        await self.session.execute(stmt.on_conflict_do_update(
+            index_elements=[PipelineWatermark.proceso, PipelineWatermark.fuente],
+            set_={"marca": stmt.excluded.marca, "updated_at": stmt.excluded.updated_at},
+        ))
+        await self.session.commit()
+
+    async def afectados(self, marcas: dict[str, datetime], solape: timedelta = SOLAPE) -> list[int]:
+        """Ids de InmuebleRaw a re-puntuar por cambios posteriores a las marcas"""
+        params = {
+            "desde_raw": marcas[FUENTE_RAW] - solape,
+            "desde_inmuebles": marcas[FUENTE_INMUEBLES] - solape,
+            "desde_denominaciones": marcas[FUENTE_DENOMINACIONES] - solape,
+            "radio_m": self.config.radio_m,
+        }
+        ids = (await self.session.execute(text(_sql_afectados()), params)).scalars().all()
+        return sorted(ids)
+
+    async def run_incremental(self, solape: timedelta = SOLAPE) -> ResumenMatching:
+        """
+        Re-puntúa solo los anuncios afectados por cambios desde la última
+        ejecución (anuncios nuevos o re-scrapeados, inmuebles y
+        denominaciones creados, modificados o borrados).
+
+        La primera vez, o si falta alguna marca, hace una pasada completa.
+        La marca nueva es el instante de inicio, y se lee con un solape
+        para no perder transacciones que confirmaron tarde; re-puntuar un
+        anuncio dos veces es idempotente.
+        """
+        inicio = (await self.session.execute(select(func.timezone("utc", func.now())))).scalar_one()
+        marcas = await self._marcas()
+        if all(fuente in marcas for fuente in FUENTES):
+            resumen = await self.match_ids(await self.afectados(marcas, solape))
+            resumen.incremental = True
+        else:
+            resumen = await self.run()
+        await self._guardar_marcas(inicio)
+        return resumen
@@ -0,0 +1,163 @@
+# services/espacial.py
+"""
+Consultas espaciales sobre las columnas de geometría (POINT, SRID 4326).
+
+Cada función devuelve un Select (sin ejecutar), escrito de forma que
+PostgreSQL use el índice GiST de expresión idx_<tabla>_<col>_geog:
+
+    - mas_cercanos:    ORDER BY geography(geom) <-> geography(punto) LIMIT n
+                       (KNN en metros), con la distancia en metros.
+    - dentro_de_radio: ST_DWithin(geography(geom), geography(punto), metros).
+    - en_bbox:         geography(geom) && geography(ST_MakeEnvelope(...)),
+                       con el filtro exacto en lon/lat (las geometrías son
+                       puntos) para no arrastrar los bordes geodésicos.
+
+Modelos soportados: Inmueble (coordenadas), OSMPlace y InmuebleRaw (geom).
+
+indices_usados() ejecuta EXPLAIN de una consulta y devuelve los índices
+del plan, para comprobar contra una base real que no hay seq scan.
+
+USO:
+    stmt = mas_cercanos(Inmueble, lon=-5.99, lat=37.39, n=10)
+    for inmueble, distancia_m in session.execute(stmt):
+        ...
+
+    stmt = dentro_de_radio(OSMPlace, lon, lat, metros=500).where(OSMPlace.amenity == "place_of_worship")
+    assert "idx_osm_places_geom_geog" in indices_usados(session, stmt)
+"""
+
+from __future__ import annotations
+
+import json
+import math
+
+from sqlalchemy import Select, func, select, text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from models.inmuebles import Inmueble
+from models.osm import OSMPlace
+from models.discovery import InmuebleRaw
+
+SRID = 4326
+
+# Modelo → nombre del atributo de geometría
+COLUMNAS_GEOMETRIA: dict[type, str] = {
+    Inmueble: "coordenadas",
+    OSMPlace: "geom",
+    InmuebleRaw: "geom",
+}
+
+
+def columna_geometria(model: type):
+    """Atributo de geometría de un modelo soportado"""
+    try:
+        return getattr(model, COLUMNAS_GEOMETRIA[model])
+    except KeyError:
+        raise ValueError(f"{model.__name__} no tiene geometría registrada en services.espacial") from None
+
+
+def punto(lon: float, lat: float):
+    """Punto WGS84 como expresión SQL"""
+    return func.ST_SetSRID(func.ST_MakePoint(lon, lat), SRID)
+
+
+def distancia_m(model: type, lon: float, lat: float):
+    """Distancia geodésica en metros desde el punto a la geometría del modelo"""
+    return func.ST_Distance(func.geography(columna_geometria(model)), func.geography(punto(lon, lat)))
+
+
+def mas_cercanos(model: type, lon: float, lat: float, n: int = 10) -> Select:
+    """
+    Los n objetos más cercanos al punto (KNN), como filas (objeto, distancia_m).
+
+    El orden usa <-> entre geographies (metros sobre la esfera), que
+    recorre el índice idx_<tabla>_<col>_geog.
+    """
+    geom = columna_geometria(model)
+    return (
+        select(model, distancia_m(model, lon, lat).label("distancia_m"))
+        .where(geom.is_not(None), model.deleted_at.is_(None))
+        .order_by(func.geography(geom).op("<->")(func.geography(punto(lon, lat))))
+        .limit(n)
+    )
+
+
+def dentro_de_radio(model: type, lon: float, lat: float, metros: float, ordenar: bool = True) -> Select:
+    """Objetos a menos de `metros` del punto, como filas (objeto, distancia_m)"""
+    geom = columna_geometria(model)
+    distancia = distancia_m(model, lon, lat)
+    stmt = (
+        select(model, distancia.label("distancia_m"))
+        .where(
+            func.ST_DWithin(func.geography(geom), func.geography(punto(lon, lat)), metros),
+            model.deleted_at.is_(None),
+        )
+    )
+    return stmt.order_by(distancia) if ordenar else stmt
+
+
+def _margen_geodesico(min_lon: float, max_lon: float) -> float:
+    """
+    Grados de latitud que se separa un lado geodésico del paralelo entre
+    los mismos extremos (flecha w²/8 en radianes, por lo alto).
+    """
+    ancho = math.radians(max_lon - min_lon)
+    return math.degrees(ancho * ancho / 8)
+
+
+def en_bbox(model: type, min_lon: float, min_lat: float, max_lon: float, max_lat: float) -> Select:
+    """Objetos cuya geometría cae en el rectángulo (lon/lat WGS84)"""
+    geom = columna_geometria(model)
+    # Caja geography (índice _geog): sus lados norte y sur son geodésicos,
+    # así que se ensancha en latitud para cubrir los paralelos y el
+    # rectángulo exacto se comprueba sobre las coordenadas
+    margen = _margen_geodesico(min_lon, max_lon)
+    envolvente = func.ST_MakeEnvelope(
+        min_lon, max(min_lat - margen, -90.0), max_lon, min(max_lat + margen, 90.0), SRID,
+    )
+    return (
+        select(model)
+        .where(
+            func.geography(geom).op("&&")(func.geography(envolvente)),
+            func.ST_X(geom).between(min_lon, max_lon),
+            func.ST_Y(geom).between(min_lat, max_lat),
+            model.deleted_at.is_(None),
+        )
+    )
+
+
+# ----------------------------------------------------------------------
+# Verificación de planes
+# ----------------------------------------------------------------------
+
+def _explain(stmt: Select):
+    """EXPLAIN (FORMAT JSON) de la consulta con los parámetros en línea"""
+    sql = stmt.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True})
+    return text("EXPLAIN (FORMAT JSON) " + str(sql).replace(":", r"\:"))
+
+
+def _indices_plan(nodo: dict) -> set[str]:
+    indices = {nodo["Index Name"]} if "Index Name" in nodo else set()
+    for hijo in nodo.get("Plans", ()):
+        indices |= _indices_plan(hijo)
+    return indices
+
+
+def _plan(resultado) -> dict:
+    plan = resultado.scalar_one()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return plan[0]["Plan"]
+
+
+def indices_usados(session: Session, stmt: Select) -> set[str]:
+    """Nombres de los índices que aparecen en el plan (EXPLAIN) de la consulta"""
+    return _indices_plan(_plan(session.execute(_explain(stmt))))
+
+
+async def indices_usados_async(session: AsyncSession, stmt: Select) -> set[str]:
+    """Versión asíncrona de indices_usados()"""
+    return _indices_plan(_plan(await session.execute(_explain(stmt))))
+
@@ -0,0 +1,387 @@
+# services/estadisticas.py
+"""
+Estadísticas territoriales por año, con refresco incremental.
+
+app.estadisticas_territoriales (migración b4e8d1f6a3c9) guarda, por cada
+territorio (terna comunidad/provincia/municipio de los inmuebles) y año:
+
+    inmuebles, inmatriculaciones, transmisiones (y suma de precio_venta),
+    intervenciones (y suma de presupuesto), subvenciones (y suma de
+    importe_aplicado)
+
+El año es el del hecho: alta del inmueble (created_at), inmatriculación,
+transmisión o inicio de la intervención (también para sus subvenciones);
+0 = sin fecha. Sumando todos los años se obtiene el total vigente.
+
+REFRESCO INCREMENTAL:
+    Triggers por sentencia sobre las tablas de origen anotan en
+    app.estadisticas_pendientes los territorios afectados (un INSERT masivo
+    encola cada territorio una vez). refrescar() los toma por lotes con
+    FOR UPDATE SKIP LOCKED, borra sus filas y las recalcula desde las tablas
+    base; cada lote es una transacción corta. Las lecturas nunca se
+    bloquean y varios procesos pueden refrescar a la vez sin pisarse.
+
+    Los triggers encolan con ON CONFLICT DO UPDATE: un territorio ya
+    pendiente queda bloqueado hasta que el escritor confirma, así que
+    refrescar() no lo toma con una instantánea que no ve sus cambios. Un
+    cambio confirmado durante el recálculo espera al borrado del lote y
+    vuelve a encolar el territorio.
+
+        python -m services.estadisticas               # pendientes
+        python -m services.estadisticas --reconstruir # todo
+
+CONSULTA (drill-down comunidad → provincia → municipio):
+    with manager.session() as session:
+        ccaa = comunidades(session, desde=2015)
+        provincias = desglosar(session, ccaa[0], desde=2015)
+        serie = serie_anual(session, "provincia", provincias[0].id)
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from decimal import Decimal
+from typing import Optional
+
+from sqlalchemy import ARRAY, String, bindparam, func, null, select, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from models.geografia import ComunidadAutonoma, Provincia, Municipio
+from models.resumenes import EstadisticaTerritorial, ResumenRefresco
+from services.resumenes import Frescura, SIN_ASIGNAR
+
+TABLA_ESTADISTICAS = "app.estadisticas_territoriales"
+LOTE = 500
+
+SIN_FECHA = 0
+
+
+@dataclass(frozen=True, slots=True)
+class Nivel:
+    columna: str
+    modelo: type
+    hijo: Optional[str]
+
+
+NIVELES: dict[str, Nivel] = {
+    "comunidad_autonoma": Nivel("comunidad_autonoma_id", ComunidadAutonoma, "provincia"),
+    "provincia": Nivel("provincia_id", Provincia, "municipio"),
+    "municipio": Nivel("municipio_id", Municipio, None),
+}
+
+METRICAS = (
+    "inmuebles", "inmatriculaciones", "transmisiones", "precio_venta",
+    "intervenciones", "presupuesto", "subvenciones", "importe_aplicado",
+)
+
+
+@dataclass(frozen=True, slots=True)
+class FilaEstadistica:
+    nivel: str
+    id: Optional[str]
+    nombre: str
+    anio: Optional[int]  # None = acumulado del rango pedido
+    inmuebles: int
+    inmatriculaciones: int
+    transmisiones: int
+    precio_venta: Decimal
+    intervenciones: int
+    presupuesto: Decimal
+    subvenciones: int
+    importe_aplicado: Decimal
+
+
+# ----------------------------------------------------------------------
+# Refresco
+# ----------------------------------------------------------------------
+
+_TOMAR_LOTE = text("""
+    DELETE FROM app.estadisticas_pendientes
+    WHERE clave IN (
+        SELECT clave FROM app.estadisticas_pendientes
+        ORDER BY clave
+        LIMIT :lote
+        FOR UPDATE SKIP LOCKED
+    )
+    RETURNING clave
+""")
+
+_BORRAR = text(
+    "DELETE FROM app.estadisticas_territoriales WHERE clave = ANY(:claves)"
+).bindparams(bindparam("claves", type_=ARRAY(String)))
+
+# Hechos vivos de los inmuebles vivos de cada territorio, agrupados por año
+_RECALCULAR = text("""
+    WITH vivos AS (
+        SELECT app.territorio_clave(i.comunidad_autonoma_id, i.provincia_id, i.municipio_id) AS clave,
+               i.id, i.comunidad_autonoma_id, i.provincia_id, i.municipio_id, i.created_at
+        FROM app.inmuebles i
+        WHERE app.territorio_clave(i.comunidad_autonoma_id, i.provincia_id, i.municipio_id) = ANY(:claves)
+          AND i.deleted_at IS NULL
+    ),
+    hechos AS (
+        SELECT v.clave, v.comunidad_autonoma_id, v.provincia_id, v.municipio_id, v.created_at AS fecha,
+               1 AS inmuebles, 0 AS inmatriculaciones, 0 AS transmisiones, 0::numeric AS precio_venta,
+               0 AS intervenciones, 0::numeric AS presupuesto, 0 AS subvenciones, 0::numeric AS importe_aplicado
+        FROM vivos v
+        UNION ALL
+        SELECT v.clave, v.comunidad_autonoma_id, v.provincia_id, v.municipio_id, m.fecha_inmatriculacion,
+               0, 1, 0, 0, 0, 0, 0, 0
+        FROM vivos v JOIN app.inmatriculaciones m ON m.inmueble_id = v.id AND m.deleted_at IS NULL
+        UNION ALL
+        SELECT v.clave, v.comunidad_autonoma_id, v.provincia_id, v.municipio_id, t.fecha_transmision,
+               0, 0, 1, coalesce(t.precio_venta, 0), 0, 0, 0, 0
+        FROM vivos v JOIN app.transmisiones t ON t.inmueble_id = v.id AND t.deleted_at IS NULL
+        UNION ALL
+        SELECT v.clave, v.comunidad_autonoma_id, v.provincia_id, v.municipio_id, iv.fecha_inicio,
+               0, 0, 0, 0, 1, coalesce(iv.presupuesto, 0), 0, 0
+        FROM vivos v JOIN app.intervenciones iv ON iv.inmueble_id = v.id AND iv.deleted_at IS NULL
+        UNION ALL
+        SELECT v.clave, v.comunidad_autonoma_id, v.provincia_id, v.municipio_id, iv.fecha_inicio,
+               0, 0, 0, 0, 0, 0, 1, coalesce(s.importe_aplicado, 0)
+        FROM vivos v
+        JOIN app.intervenciones iv ON iv.inmueble_id = v.id AND iv.deleted_at IS NULL
+        JOIN app.intervenciones_subvenciones s ON s.intervencion_id = iv.id AND s.deleted_at IS NULL
+    )
+    INSERT INTO app.estadisticas_territoriales (
+        clave, anio, comunidad_autonoma_id, provincia_id, municipio_id,
+        inmuebles, inmatriculaciones, transmisiones, precio_venta,
+        intervenciones, presupuesto, subvenciones, importe_aplicado, actualizado_en
+    )
+    SELECT clave, coalesce(extract(year FROM fecha)::smallint, 0),
+           comunidad_autonoma_id, provincia_id, municipio_id,
+           sum(inmuebles), sum(inmatriculaciones), sum(transmisiones), sum(precio_venta),
+           sum(intervenciones), sum(presupuesto), sum(subvenciones), sum(importe_aplicado),
+           now() AT TIME ZONE 'utc'
+    FROM hechos
+    GROUP BY clave, coalesce(extract(year FROM fecha)::smallint, 0),
+             comunidad_autonoma_id, provincia_id, municipio_id
+""").bindparams(bindparam("claves", type_=ARRAY(String)))
+
+_ENCOLAR_TODO = text("""
+    INSERT INTO app.estadisticas_pendientes (clave, comunidad_autonoma_id, provincia_id, municipio_id)
+    SELECT DISTINCT app.territorio_clave(comunidad_autonoma_id, provincia_id, municipio_id),
+           comunidad_autonoma_id, provincia_id, municipio_id
+    FROM app.inmuebles
+    WHERE deleted_at IS NULL
+    UNION
+    SELECT clave, comunidad_autonoma_id, provincia_id, municipio_id
+    FROM app.estadisticas_territoriales
+    ON CONFLICT (clave) DO UPDATE SET clave = EXCLUDED.clave
+""")
+
+
+def pendientes(session: Session) -> int:
+    """Territorios a la espera de recálculo"""
+    return session.execute(text("SELECT count(*) FROM app.estadisticas_pendientes")).scalar_one()
+
+
+def refrescar_lote(session: Session, lote: int = LOTE) -> int:
+    """Recalcula (y confirma) un lote de territorios pendientes; devuelve cuántos"""
+    claves = list(session.execute(_TOMAR_LOTE, {"lote": lote}).scalars())
+    if claves:
+        session.execute(_BORRAR, {"claves": claves})
+        session.execute(_RECALCULAR, {"claves": claves})
+    session.commit()
+    return len(claves)
+
+
+def refrescar(session: Session, lote: int = LOTE, maximo: Optional[int] = None) -> Frescura:
+    """
+    Recalcula los territorios pendientes en lotes de `lote` hasta vaciar la
+    cola (o hasta `maximo` territorios) y actualiza el sello de frescura.
+    """
+    inicio = time.monotonic()
+    territorios = 0
+    while maximo is None or territorios < maximo:
+        hechos = refrescar_lote(session, lote if maximo is None else min(lote, maximo - territorios))
+        if not hechos:
+            break
+        territorios += hechos
+
+    filas = session.execute(text(f"SELECT count(*) FROM {TABLA_ESTADISTICAS}")).scalar_one()
+    sello = Frescura(TABLA_ESTADISTICAS, datetime.utcnow(), int((time.monotonic() - inicio) * 1000), filas)
+    stmt = insert(ResumenRefresco).values(
+        vista=TABLA_ESTADISTICAS, refrescado_en=sello.refrescado_en, duracion_ms=sello.duracion_ms, filas=filas,
+    )
+    session.execute(stmt.on_conflict_do_update(
+        index_elements=[ResumenRefresco.vista],
+        set_={"refrescado_en": stmt.excluded.refrescado_en, "duracion_ms": stmt.excluded.duracion_ms,
+              "filas": stmt.excluded.filas},
+    ))
+    session.commit()
+    return sello
+
+
+def reconstruir(session: Session, lote: int = LOTE) -> Frescura:
+    """
+    Encola todos los territorios (también los que ya no tienen inmuebles)
+    y los recalcula. Para cargas hechas con los triggers desactivados.
+    """
+    session.execute(_ENCOLAR_TODO)
+    session.commit()
+    return refrescar(session, lote)
+
+
+# ----------------------------------------------------------------------
+# Consulta
+# ----------------------------------------------------------------------
+
+def _nivel(nombre: str) -> Nivel:
+    try:
+        return NIVELES[nombre]
+    except KeyError:
+        raise ValueError(f"Nivel no válido: {nombre} (opciones: {', '.join(NIVELES)})") from None
+
+
+def _consulta(
+    nivel: str,
+    filtros: dict[str, Optional[str]],
+    anio: Optional[int] = None,
+    desde: Optional[int] = None,
+    hasta: Optional[int] = None,
+    por_anio: bool = False,
+):
+    """
+    Suma de métricas por territorio del nivel (y por año si por_anio).
+    desde/hasta excluyen los hechos sin fecha; anio=SIN_FECHA los pide solos.
+    """
+    niv = _nivel(nivel)
+    e = EstadisticaTerritorial
+    columna = getattr(e, niv.columna)
+    nombre = niv.modelo.nombre_oficial
+    inmuebles = func.sum(e.inmuebles)
+    agrupacion = [columna, nombre] + ([e.anio] if por_anio else [])
+    stmt = (
+        select(
+            columna,
+            nombre,
+            e.anio if por_anio else null(),
+            inmuebles,
+            *(func.sum(getattr(e, metrica)) for metrica in METRICAS[1:]),
+        )
+        .select_from(e)
+        .outerjoin(niv.modelo, niv.modelo.id == columna)
+        .group_by(*agrupacion)
+        .order_by(*([e.anio] if por_anio else [inmuebles.desc()]))
+    )
+    for nombre_nivel, valor in filtros.items():
+        filtro = getattr(e, _nivel(nombre_nivel).columna)
+        stmt = stmt.where(filtro.is_(None) if valor is None else filtro == valor)
+    if anio is not None:
+        stmt = stmt.where(e.anio == anio)
+    if desde is not None:
+        stmt = stmt.where(e.anio >= desde)
+    if hasta is not None:
+        stmt = stmt.where(e.anio.between(SIN_FECHA + 1, hasta))
+    return stmt
+
+
+def _filas(nivel: str, resultado) -> list[FilaEstadistica]:
+    return [
+        FilaEstadistica(
+            nivel=nivel,
+            id=None if id is None else str(id),
+            nombre=nombre or SIN_ASIGNAR,
+            anio=anio,
+            inmuebles=int(inmuebles),
+            inmatriculaciones=int(inmatriculaciones),
+            transmisiones=int(transmisiones),
+            precio_venta=Decimal(precio_venta),
+            intervenciones=int(intervenciones),
+            presupuesto=Decimal(presupuesto),
+            subvenciones=int(subvenciones),
+            importe_aplicado=Decimal(importe_aplicado),
+        )
+        for (id, nombre, anio, inmuebles, inmatriculaciones, transmisiones, precio_venta,
+             intervenciones, presupuesto, subvenciones, importe_aplicado) in resultado
+    ]
+
+
+def estadisticas(
+    session: Session,
+    nivel: str,
+    anio: Optional[int] = None,
+    desde: Optional[int] = None,
+    hasta: Optional[int] = None,
+    **filtros: Optional[str],
+) -> list[FilaEstadistica]:
+    """Estadísticas por territorio del nivel, con filtros por id de otros niveles"""
+    return _filas(nivel, session.execute(_consulta(nivel, filtros, anio, desde, hasta)))
+
+
+async def estadisticas_async(
+    session: AsyncSession,
+    nivel: str,
+    anio: Optional[int] = None,
+    desde: Optional[int] = None,
+    hasta: Optional[int] = None,
+    **filtros: Optional[str],
+) -> list[FilaEstadistica]:
+    """Versión asíncrona de estadisticas()"""
+    return _filas(nivel, await session.execute(_consulta(nivel, filtros, anio, desde, hasta)))
+
+
+def comunidades(session: Session, **rango: Optional[int]) -> list[FilaEstadistica]:
+    return estadisticas(session, "comunidad_autonoma", **rango)
+
+
+def provincias(session: Session, comunidad_autonoma_id: Optional[str] = None, **rango: Optional[int]) -> list[FilaEstadistica]:
+    filtros = {} if comunidad_autonoma_id is None else {"comunidad_autonoma": comunidad_autonoma_id}
+    return estadisticas(session, "provincia", **rango, **filtros)
+
+
+def municipios(session: Session, provincia_id: Optional[str] = None, **rango: Optional[int]) -> list[FilaEstadistica]:
+    filtros = {} if provincia_id is None else {"provincia": provincia_id}
+    return estadisticas(session, "municipio", **rango, **filtros)
+
+
+def desglosar(session: Session, fila: FilaEstadistica, **rango: Optional[int]) -> list[FilaEstadistica]:
+    """Baja un nivel: comunidad → sus provincias → sus municipios"""
+    hijo = _nivel(fila.nivel).hijo
+    if hijo is None:
+        raise ValueError("El municipio es el último nivel de desglose")
+    return estadisticas(session, hijo, **rango, **{fila.nivel: fila.id})
+
+
+def serie_anual(
+    session: Session,
+    nivel: str,
+    id: Optional[str],
+    desde: Optional[int] = None,
+    hasta: Optional[int] = None,
+) -> list[FilaEstadistica]:
+    """Una fila por año para el territorio (anio=0: hechos sin fecha)"""
+    stmt = _consulta(nivel, {nivel: id}, desde=desde, hasta=hasta, por_anio=True)
+    return _filas(nivel, session.execute(stmt))
+
+
+def main(argv=None) -> None:
+    from db.sessions import SyncDatabaseManager
+
+    parser = argparse.ArgumentParser(description="Refresca las estadísticas territoriales")
+    parser.add_argument("--reconstruir", action="store_true", help="Recalcula todos los territorios")
+    parser.add_argument("--lote", type=int, default=LOTE, help="Territorios por transacción")
+    parser.add_argument("--maximo", type=int, help="Detenerse tras N territorios")
+    args = parser.parse_args(argv)
+
+    manager = SyncDatabaseManager()
+    try:
+        with manager.session() as session:
+            if args.reconstruir:
+                sello = reconstruir(session, args.lote)
+            else:
+                sello = refrescar(session, args.lote, args.maximo)
+            restantes = pendientes(session)
+        print(f"{sello.vista}: {sello.filas} filas en {sello.duracion_ms} ms ({restantes} territorios pendientes)")
+    finally:
+        manager.close()
+
+
+if __name__ == "__main__":
+    main()
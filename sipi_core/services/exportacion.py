@@ -0,0 +1,481 @@
+# services/exportacion.py
+"""
+Exportación en streaming del inventario de inmuebles.
+
+Una sola consulta (Inmueble + nombres geográficos, tipología, estado,
+diócesis, figura de protección actual, uso actual y propietario) se lee
+con un cursor de servidor (yield_per en Session, stream() con asyncpg en
+AsyncSession) y se escribe lote a lote, sin cargar objetos ORM. La memoria
+depende del tamaño del lote, no del número de inmuebles.
+
+Formatos:
+    - geojsonl:   una Feature GeoJSON por línea (punto lon/lat).
+    - csv:        cabecera + una fila por inmueble (lon/lat como columnas).
+    - geoparquet: record batches de pyarrow con la geometría en WKB y los
+                  metadatos "geo" de GeoParquet 1.0 (dependencia opcional:
+                  pip install "sipi-core[export]").
+
+PROYECCIÓN Y FILTROS:
+    columnas elige qué columnas de COLUMNAS se exportan (por defecto todas
+    salvo descripcion); solo se hacen los joins que piden esas columnas y
+    los filtros. FiltroExportacion restringe por territorio, tipología,
+    figura de protección actual, estado, bbox o fecha de modificación.
+    Los inmuebles con deleted_at nunca se exportan.
+
+USO:
+    with manager.session() as session:
+        resumen = exportar(session, "inventario.geojsonl", "geojsonl",
+                           columnas=["id", "nombre", "municipio", "figura_proteccion"],
+                           filtro=FiltroExportacion(provincia_ids=["..."]))
+
+    async with manager.session() as session:
+        resumen = await exportar_async(session, "inventario.parquet", "geoparquet")
+
+Medición de filas/s y memoria pico: benchmarks/exportacion.py.
+"""
+
+from __future__ import annotations
+
+import csv
+import json
+import time
+from dataclasses import dataclass
+from datetime import date, datetime
+from pathlib import Path
+from typing import AsyncIterator, Callable, Iterator, Optional, Sequence, Union
+
+from sqlalchemy import Float, Select, String, cast, func, select, true
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, aliased
+
+from models.inmuebles import Inmueble, InmuebleNivelProteccion, InmuebleUso
+from models.geografia import ComunidadAutonoma, Provincia, Municipio
+from models.tipologias import TipoInmueble, TipoEstadoConservacion, TipoUsoInmueble
+from models.entidades_religiosas import Diocesis
+from models.figuras_proteccion import FiguraProteccion
+
+FORMATOS = ("geojsonl", "csv", "geoparquet")
+SRID = 4326
+
+# ----------------------------------------------------------------------
+# Fuentes (joins opcionales)
+# ----------------------------------------------------------------------
+
+_ccaa = aliased(ComunidadAutonoma, name="ccaa")
+_provincia = aliased(Provincia, name="provincia")
+_municipio = aliased(Municipio, name="municipio")
+_tipo = aliased(TipoInmueble, name="tipo_inmueble")
+_estado = aliased(TipoEstadoConservacion, name="estado_conservacion")
+_diocesis = aliased(Diocesis, name="diocesis")
+
+# Figura de protección actual (misma regla que Inmueble.figura_proteccion_actual)
+_figura = (
+    select(
+        FiguraProteccion.id.label("id"),
+        FiguraProteccion.codigo.label("codigo"),
+        FiguraProteccion.denominacion.label("denominacion"),
+        cast(FiguraProteccion.nivel, String).label("nivel"),
+        InmuebleNivelProteccion.fecha_desde.label("fecha_desde"),
+    )
+    .join(FiguraProteccion, FiguraProteccion.id == InmuebleNivelProteccion.figura_proteccion_id)
+    .where(
+        InmuebleNivelProteccion.inmueble_id == Inmueble.id,
+        InmuebleNivelProteccion.fecha_hasta.is_(None),
+        InmuebleNivelProteccion.deleted_at.is_(None),
+    )
+    .order_by(InmuebleNivelProteccion.fecha_desde.desc())
+    .limit(1)
+    .lateral("figura_actual")
+)
+
+# Uso actual (fecha_hasta NULL; si hay varios, el más reciente)
+_uso = (
+    select(
+        TipoUsoInmueble.codigo.label("codigo"),
+        TipoUsoInmueble.nombre.label("nombre"),
+        InmuebleUso.fecha_desde.label("fecha_desde"),
+    )
+    .join(TipoUsoInmueble, TipoUsoInmueble.id == InmuebleUso.tipo_uso_id)
+    .where(
+        InmuebleUso.inmueble_id == Inmueble.id,
+        InmuebleUso.fecha_hasta.is_(None),
+        InmuebleUso.deleted_at.is_(None),
+    )
+    .order_by(InmuebleUso.fecha_desde.desc())
+    .limit(1)
+    .lateral("uso_actual")
+)
+
+_JOINS: dict[str, Callable[[Select], Select]] = {
+    "ccaa": lambda stmt: stmt.outerjoin(_ccaa, _ccaa.id == Inmueble.comunidad_autonoma_id),
+    "provincia": lambda stmt: stmt.outerjoin(_provincia, _provincia.id == Inmueble.provincia_id),
+    "municipio": lambda stmt: stmt.outerjoin(_municipio, _municipio.id == Inmueble.municipio_id),
+    "tipo": lambda stmt: stmt.outerjoin(_tipo, _tipo.id == Inmueble.tipo_inmueble_id),
+    "estado": lambda stmt: stmt.outerjoin(_estado, _estado.id == Inmueble.estado_conservacion_id),
+    "diocesis": lambda stmt: stmt.outerjoin(_diocesis, _diocesis.id == Inmueble.diocesis_id),
+    "figura": lambda stmt: stmt.outerjoin(_figura, true()),
+    "uso": lambda stmt: stmt.outerjoin(_uso, true()),
+}
+
+
+# ----------------------------------------------------------------------
+# Columnas exportables
+# ----------------------------------------------------------------------
+
+@dataclass(frozen=True, slots=True)
+class ColumnaExportacion:
+    """Columna exportable: expresión SQL, joins que necesita y tipo de salida"""
+    expresion: object
+    tipo: str = "texto"  # texto | entero | decimal | booleano | fecha
+    joins: tuple[str, ...] = ()
+
+
+def _float(columna):
+    return cast(columna, Float)
+
+
+COLUMNAS: dict[str, ColumnaExportacion] = {
+    "id": ColumnaExportacion(Inmueble.id),
+    "nombre": ColumnaExportacion(Inmueble.nombre),
+    "descripcion": ColumnaExportacion(Inmueble.descripcion),
+    "direccion": ColumnaExportacion(Inmueble.direccion),
+    "lon": ColumnaExportacion(func.ST_X(Inmueble.coordenadas), "decimal"),
+    "lat": ColumnaExportacion(func.ST_Y(Inmueble.coordenadas), "decimal"),
+    "comunidad_autonoma_id": ColumnaExportacion(Inmueble.comunidad_autonoma_id),
+    "comunidad_autonoma": ColumnaExportacion(_ccaa.nombre_oficial, joins=("ccaa",)),
+    "provincia_id": ColumnaExportacion(Inmueble.provincia_id),
+    "provincia": ColumnaExportacion(_provincia.nombre_oficial, joins=("provincia",)),
+    "municipio_id": ColumnaExportacion(Inmueble.municipio_id),
+    "municipio": ColumnaExportacion(_municipio.nombre_oficial, joins=("municipio",)),
+    "codigo_ine_municipio": ColumnaExportacion(_municipio.codigo_ine, joins=("municipio",)),
+    "tipo_inmueble": ColumnaExportacion(_tipo.nombre, joins=("tipo",)),
+    "estado_conservacion": ColumnaExportacion(_estado.nombre, joins=("estado",)),
+    "diocesis": ColumnaExportacion(_diocesis.nombre, joins=("diocesis",)),
+    "figura_proteccion_codigo": ColumnaExportacion(_figura.c.codigo, joins=("figura",)),
+    "figura_proteccion": ColumnaExportacion(_figura.c.denominacion, joins=("figura",)),
+    "nivel_proteccion": ColumnaExportacion(_figura.c.nivel, joins=("figura",)),
+    "proteccion_desde": ColumnaExportacion(_figura.c.fecha_desde, "fecha", joins=("figura",)),
+    "uso_actual_codigo": ColumnaExportacion(_uso.c.codigo, joins=("uso",)),
+    "uso_actual": ColumnaExportacion(_uso.c.nombre, joins=("uso",)),
+    "uso_desde": ColumnaExportacion(_uso.c.fecha_desde, "fecha", joins=("uso",)),
+    "propietario_tipo_actor": ColumnaExportacion(Inmueble.propietario_tipo_actor),
+    "propietario_actor_id": ColumnaExportacion(Inmueble.propietario_actor_id),
+    "es_visitable": ColumnaExportacion(Inmueble.es_visitable, "booleano"),
+    "en_venta": ColumnaExportacion(Inmueble.en_venta, "booleano"),
+    "activo": ColumnaExportacion(Inmueble.activo, "booleano"),
+    "superficie_construida": ColumnaExportacion(_float(Inmueble.superficie_construida), "decimal"),
+    "superficie_parcela": ColumnaExportacion(_float(Inmueble.superficie_parcela), "decimal"),
+    "num_plantas": ColumnaExportacion(Inmueble.num_plantas, "entero"),
+    "ano_construccion": ColumnaExportacion(Inmueble.ano_construccion, "entero"),
+    "valor_catastral": ColumnaExportacion(_float(Inmueble.valor_catastral), "decimal"),
+    "valor_mercado": ColumnaExportacion(_float(Inmueble.valor_mercado), "decimal"),
+    "created_at": ColumnaExportacion(Inmueble.created_at, "fecha"),
+    "updated_at": ColumnaExportacion(Inmueble.updated_at, "fecha"),
+}
+
+COLUMNAS_POR_DEFECTO: tuple[str, ...] = tuple(nombre for nombre in COLUMNAS if nombre != "descripcion")
+
+# Columnas internas de geometría que se añaden al final de cada fila:
+# "wkb" (geoparquet) o "lonlat" (geojsonl)
+_GEOMETRIA = "geometry"
+GEOMETRIAS = ("wkb", "lonlat")
+
+
+@dataclass(frozen=True, slots=True)
+class FiltroExportacion:
+    """Restricciones de la exportación (None = sin filtro)"""
+    comunidad_autonoma_ids: Optional[Sequence[str]] = None
+    provincia_ids: Optional[Sequence[str]] = None
+    municipio_ids: Optional[Sequence[str]] = None
+    tipo_inmueble_ids: Optional[Sequence[str]] = None
+    estado_conservacion_ids: Optional[Sequence[str]] = None
+    figura_proteccion_ids: Optional[Sequence[str]] = None  # figura actual
+    en_venta: Optional[bool] = None
+    activo: Optional[bool] = None
+    con_coordenadas: bool = False
+    bbox: Optional[tuple[float, float, float, float]] = None  # min_lon, min_lat, max_lon, max_lat
+    modificado_desde: Optional[datetime] = None
+
+
+@dataclass(frozen=True, slots=True)
+class ResumenExportacion:
+    formato: str
+    ruta: str
+    filas: int
+    segundos: float
+
+    @property
+    def filas_por_segundo(self) -> float:
+        return self.filas / self.segundos if self.segundos else 0.0
+
+
+# ----------------------------------------------------------------------
+# Consulta
+# ----------------------------------------------------------------------
+
+def _columnas(columnas: Optional[Sequence[str]]) -> tuple[str, ...]:
+    if columnas is None:
+        return COLUMNAS_POR_DEFECTO
+    seleccion = tuple(dict.fromkeys(columnas))
+    desconocidas = [nombre for nombre in seleccion if nombre not in COLUMNAS]
+    if desconocidas:
+        raise ValueError(f"Columnas de exportación desconocidas: {', '.join(desconocidas)}")
+    return seleccion
+
+
+def _condiciones(filtro: FiltroExportacion) -> tuple[list, set[str]]:
+    condiciones = [Inmueble.deleted_at.is_(None)]
+    joins: set[str] = set()
+    por_lista = (
+        (filtro.comunidad_autonoma_ids, Inmueble.comunidad_autonoma_id),
+        (filtro.provincia_ids, Inmueble.provincia_id),
+        (filtro.municipio_ids, Inmueble.municipio_id),
+        (filtro.tipo_inmueble_ids, Inmueble.tipo_inmueble_id),
+        (filtro.estado_conservacion_ids, Inmueble.estado_conservacion_id),
+    )
+    for valores, columna in por_lista:
+        if valores is not None:
+            condiciones.append(columna.in_(list(valores)))
+    if filtro.figura_proteccion_ids is not None:
+        condiciones.append(_figura.c.id.in_(list(filtro.figura_proteccion_ids)))
+        joins.add("figura")
+    if filtro.en_venta is not None:
+        condiciones.append(Inmueble.en_venta.is_(filtro.en_venta))
+    if filtro.activo is not None:
+        condiciones.append(Inmueble.activo.is_(filtro.activo))
+    if filtro.con_coordenadas:
+        condiciones.append(Inmueble.coordenadas.is_not(None))
+    if filtro.bbox is not None:
+        condiciones.append(Inmueble.coordenadas.op("&&")(func.ST_MakeEnvelope(*filtro.bbox, SRID)))
+    if filtro.modificado_desde is not None:
+        condiciones.append(
+            func.coalesce(Inmueble.updated_at, Inmueble.created_at) >= filtro.modificado_desde
+        )
+    return condiciones, joins
+
+
+def consulta_exportacion(
+    columnas: Optional[Sequence[str]] = None,
+    filtro: Optional[FiltroExportacion] = None,
+    geometria: Optional[str] = None,
+    limite: Optional[int] = None,
+) -> Select:
+    """
+    Select de la exportación, con las columnas en el orden pedido y, al
+    final, la geometría: WKB (geometria="wkb") o lon, lat ("lonlat").
+    """
+    nombres = _columnas(columnas)
+    condiciones, joins = _condiciones(filtro or FiltroExportacion())
+    expresiones = [COLUMNAS[nombre].expresion.label(nombre) for nombre in nombres]
+    if geometria == "wkb":
+        expresiones.append(func.ST_AsBinary(Inmueble.coordenadas).label(_GEOMETRIA))
+    elif geometria == "lonlat":
+        expresiones += [
+            func.ST_X(Inmueble.coordenadas).label("_lon"),
+            func.ST_Y(Inmueble.coordenadas).label("_lat"),
+        ]
+    elif geometria is not None:
+        raise ValueError(f"Geometría no soportada: {geometria} (disponibles: {', '.join(GEOMETRIAS)})")
+    for nombre in nombres:
+        joins.update(COLUMNAS[nombre].joins)
+
+    stmt = select(*expresiones).select_from(Inmueble)
+    for clave, aplicar in _JOINS.items():  # orden fijo
+        if clave in joins:
+            stmt = aplicar(stmt)
+    stmt = stmt.where(*condiciones)
+    return stmt.limit(limite) if limite is not None else stmt
+
+
+def filas(
+    session: Session,
+    columnas: Optional[Sequence[str]] = None,
+    filtro: Optional[FiltroExportacion] = None,
+    lote: int = 5000,
+    geometria: Optional[str] = None,
+    limite: Optional[int] = None,
+) -> Iterator[list[tuple]]:
+    """Lotes de filas (tuplas) leídos con un cursor de servidor"""
+    stmt = consulta_exportacion(columnas, filtro, geometria, limite)
+    resultado = session.execute(stmt.execution_options(yield_per=lote))
+    try:
+        for particion in resultado.partitions():
+            yield [tuple(fila) for fila in particion]
+    finally:
+        resultado.close()
+
+
+async def filas_async(
+    session: AsyncSession,
+    columnas: Optional[Sequence[str]] = None,
+    filtro: Optional[FiltroExportacion] = None,
+    lote: int = 5000,
+    geometria: Optional[str] = None,
+    limite: Optional[int] = None,
+) -> AsyncIterator[list[tuple]]:
+    """Versión asíncrona de filas() (cursor asyncpg vía AsyncSession.stream)"""
+    stmt = consulta_exportacion(columnas, filtro, geometria, limite)
+    resultado = await session.stream(stmt.execution_options(yield_per=lote))
+    try:
+        async for particion in resultado.partitions():
+            yield [tuple(fila) for fila in particion]
+    finally:
+        await resultado.close()
+
+
+# ----------------------------------------------------------------------
+# Escritores
+# ----------------------------------------------------------------------
+
+def _json_default(valor):
+    if isinstance(valor, (datetime, date)):
+        return valor.isoformat()
+    raise TypeError(f"Tipo no serializable en la exportación: {type(valor).__name__}")
+
+
+class _EscritorGeoJSONL:
+    geometria = "lonlat"
+
+    def __init__(self, ruta: Path, columnas: tuple[str, ...]):
+        self.columnas = columnas
+        self._fichero = open(ruta, "w", encoding="utf-8", newline="\n")
+        self._id = columnas.index("id") if "id" in columnas else None
+
+    def escribir(self, lote: list[tuple]) -> None:
+        lineas = []
+        for fila in lote:
+            *valores, lon, lat = fila
+            feature = {"type": "Feature"}
+            if self._id is not None:
+                feature["id"] = valores[self._id]
+            feature["geometry"] = (
+                {"type": "Point", "coordinates": [lon, lat]} if lon is not None else None
+            )
+            feature["properties"] = dict(zip(self.columnas, valores))
+            lineas.append(json.dumps(feature, ensure_ascii=False, default=_json_default))
+        self._fichero.write("\n".join(lineas))
+        self._fichero.write("\n")
+
+    def cerrar(self) -> None:
+        self._fichero.close()
+
+
+class _EscritorCSV:
+    geometria = None
+
+    def __init__(self, ruta: Path, columnas: tuple[str, ...]):
+        self._fichero = open(ruta, "w", encoding="utf-8", newline="")
+        self._csv = csv.writer(self._fichero)
+        self._csv.writerow(columnas)
+        self._fechas = [i for i, nombre in enumerate(columnas) if COLUMNAS[nombre].tipo == "fecha"]
+
+    def escribir(self, lote: list[tuple]) -> None:
+        if self._fechas:
+            lote = [self._formatear(fila) for fila in lote]
+        self._csv.writerows(lote)
+
+    def _formatear(self, fila: tuple) -> list:
+        fila = list(fila)
+        for i in self._fechas:
+            if fila[i] is not None:
+                fila[i] = fila[i].isoformat()
+        return fila
+
+    def cerrar(self) -> None:
+        self._fichero.close()
+
+
+class _EscritorGeoParquet:
+    geometria = "wkb"
+
+    def __init__(self, ruta: Path, columnas: tuple[str, ...]):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as exc:
+            raise ImportError('Exportar a GeoParquet requiere pyarrow: pip install "sipi-core[export]"') from exc
+
+        tipos = {
+            "texto": pa.string(),
+            "entero": pa.int64(),
+            "decimal": pa.float64(),
+            "booleano": pa.bool_(),
+            "fecha": pa.timestamp("us"),
+        }
+        geo = {
+            "version": "1.0.0",
+            "primary_column": _GEOMETRIA,
+            "columns": {_GEOMETRIA: {"encoding": "WKB", "geometry_types": ["Point"]}},  # CRS por defecto: OGC:CRS84
+        }
+        campos = [pa.field(nombre, tipos[COLUMNAS[nombre].tipo]) for nombre in columnas]
+        campos.append(pa.field(_GEOMETRIA, pa.binary()))
+        self._pa = pa
+        self.schema = pa.schema(campos, metadata={b"geo": json.dumps(geo).encode()})
+        self._writer = pq.ParquetWriter(str(ruta), self.schema, compression="zstd")
+
+    def escribir(self, lote: list[tuple]) -> None:
+        columnas = list(zip(*lote))
+        arrays = [self._pa.array(valores, type=campo.type) for valores, campo in zip(columnas, self.schema)]
+        self._writer.write_batch(self._pa.RecordBatch.from_arrays(arrays, schema=self.schema))
+
+    def cerrar(self) -> None:
+        self._writer.close()
+
+
+_ESCRITORES = {
+    "geojsonl": _EscritorGeoJSONL,
+    "csv": _EscritorCSV,
+    "geoparquet": _EscritorGeoParquet,
+}
+
+
+def _preparar(ruta: Union[str, Path], formato: str, columnas: Optional[Sequence[str]]):
+    if formato not in _ESCRITORES:
+        raise ValueError(f"Formato de exportación no soportado: {formato} (disponibles: {', '.join(FORMATOS)})")
+    return Path(ruta), _columnas(columnas), _ESCRITORES[formato]
+
+
+def exportar(
+    session: Session,
+    ruta: Union[str, Path],
+    formato: str = "geojsonl",
+    columnas: Optional[Sequence[str]] = None,
+    filtro: Optional[FiltroExportacion] = None,
+    lote: int = 5000,
+    limite: Optional[int] = None,
+) -> ResumenExportacion:
+    """Exporta el inventario a un fichero, en streaming"""
+    ruta, nombres, clase = _preparar(ruta, formato, columnas)
+    inicio = time.perf_counter()
+    total = 0
+    escritor = clase(ruta, nombres)
+    try:
+        for bloque in filas(session, nombres, filtro, lote, clase.geometria, limite):
+            escritor.escribir(bloque)
+            total += len(bloque)
+    finally:
+        escritor.cerrar()
+    return ResumenExportacion(formato, str(ruta), total, time.perf_counter() - inicio)
+
+
+async def exportar_async(
+    session: AsyncSession,
+    ruta: Union[str, Path],
+    formato: str = "geojsonl",
+    columnas: Optional[Sequence[str]] = None,
+    filtro: Optional[FiltroExportacion] = None,
+    lote: int = 5000,
+    limite: Optional[int] = None,
+) -> ResumenExportacion:
+    """Versión asíncrona de exportar() (la escritura al fichero es síncrona, por lotes)"""
+    ruta, nombres, clase = _preparar(ruta, formato, columnas)
+    inicio = time.perf_counter()
+    total = 0
+    escritor = clase(ruta, nombres)
+    try:
+        async for bloque in filas_async(session, nombres, filtro, lote, clase.geometria, limite):
+            escritor.escribir(bloque)
+            total += len(bloque)
+    finally:
+        escritor.cerrar()
+    return ResumenExportacion(formato, str(ruta), total, time.perf_counter() - inicio)
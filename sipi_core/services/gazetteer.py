@@ -0,0 +1,278 @@
+# services/gazetteer.py
+"""
+Gazetteer geográfico en memoria.
+
+Las tablas de geografía (17 CCAA, 52 provincias, ~8.100 municipios) son
+prácticamente estáticas, así que se cargan una vez en un snapshot inmutable
+indexado por id, codigo_ine y codigo_ine_7. Las búsquedas de padre
+(municipio → provincia → CCAA) y por nombre sin tildes son O(1).
+
+Concurrencia: cada carga construye un snapshot nuevo y lo publica con una
+sola asignación bajo lock; los lectores nunca ven un estado a medias, por
+lo que la instancia se puede compartir entre hilos y tareas asyncio.
+
+USO:
+    with manager.session() as session:
+        GEO_GAZETTEER.load(session)
+
+    municipio = GEO_GAZETTEER.municipio_por_ine("41091")
+    ccaa = GEO_GAZETTEER.comunidad_de_municipio(municipio.id)
+    GEO_GAZETTEER.buscar_municipios("Cordoba")   # encuentra "Córdoba"
+
+    GEO_GAZETTEER.invalidate()   # tras cargar cambios en geografía
+"""
+
+from __future__ import annotations
+
+import threading
+import unicodedata
+from dataclasses import dataclass
+from typing import Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from models.geografia import ComunidadAutonoma, Provincia, Municipio
+
+
+def normalizar_nombre(nombre: str) -> str:
+    """Clave de búsqueda: sin tildes, sin mayúsculas y con espacios simples"""
+    descompuesto = unicodedata.normalize("NFKD", nombre)
+    sin_tildes = "".join(c for c in descompuesto if not unicodedata.combining(c))
+    return " ".join(sin_tildes.casefold().split())
+
+
+@dataclass(frozen=True, slots=True)
+class ComunidadGeo:
+    id: str
+    codigo_ine: str
+    nombre_oficial: str
+    nombre_cooficial: Optional[str] = None
+    nombre_alternativo: Optional[str] = None
+
+
+@dataclass(frozen=True, slots=True)
+class ProvinciaGeo:
+    id: str
+    codigo_ine: str
+    nombre_oficial: str
+    comunidad_autonoma_id: str
+    nombre_cooficial: Optional[str] = None
+    nombre_alternativo: Optional[str] = None
+
+
+@dataclass(frozen=True, slots=True)
+class MunicipioGeo:
+    id: str
+    codigo_ine: str
+    nombre_oficial: str
+    provincia_id: str
+    codigo_ine_7: Optional[str] = None
+    nombre_cooficial: Optional[str] = None
+    nombre_alternativo: Optional[str] = None
+
+
+def _indexar_nombres(entradas) -> dict[str, tuple[str, ...]]:
+    """nombre normalizado → ids (los nombres de municipio se repiten entre provincias)"""
+    indice: dict[str, list[str]] = {}
+    for entrada in entradas:
+        nombres = {entrada.nombre_oficial, entrada.nombre_cooficial, entrada.nombre_alternativo}
+        for nombre in nombres:
+            if nombre:
+                indice.setdefault(normalizar_nombre(nombre), []).append(entrada.id)
+    return {clave: tuple(ids) for clave, ids in indice.items()}
+
+
+@dataclass(frozen=True, slots=True)
+class _Snapshot:
+    """Estado inmutable del gazetteer; se reemplaza completo en cada carga"""
+    version: int
+    comunidades: dict[str, ComunidadGeo]
+    provincias: dict[str, ProvinciaGeo]
+    municipios: dict[str, MunicipioGeo]
+    comunidades_por_ine: dict[str, ComunidadGeo]
+    provincias_por_ine: dict[str, ProvinciaGeo]
+    municipios_por_ine: dict[str, MunicipioGeo]
+    municipios_por_ine_7: dict[str, MunicipioGeo]
+    nombres_comunidad: dict[str, tuple[str, ...]]
+    nombres_provincia: dict[str, tuple[str, ...]]
+    nombres_municipio: dict[str, tuple[str, ...]]
+
+    @classmethod
+    def build(cls, version: int, comunidades, provincias, municipios) -> "_Snapshot":
+        comunidades = [ComunidadGeo(**row._mapping) for row in comunidades]
+        provincias = [ProvinciaGeo(**row._mapping) for row in provincias]
+        municipios = [MunicipioGeo(**row._mapping) for row in municipios]
+        return cls(
+            version=version,
+            comunidades={c.id: c for c in comunidades},
+            provincias={p.id: p for p in provincias},
+            municipios={m.id: m for m in municipios},
+            comunidades_por_ine={c.codigo_ine: c for c in comunidades},
+            provincias_por_ine={p.codigo_ine: p for p in provincias},
+            municipios_por_ine={m.codigo_ine: m for m in municipios},
+            municipios_por_ine_7={m.codigo_ine_7: m for m in municipios if m.codigo_ine_7},
+            nombres_comunidad=_indexar_nombres(comunidades),
+            nombres_provincia=_indexar_nombres(provincias),
+            nombres_municipio=_indexar_nombres(municipios),
+        )
+
+
+def _consultas():
+    """SELECTs de columnas (sin objetos ORM) de las tres tablas, sin eliminados"""
+    return (
+        select(
+            ComunidadAutonoma.id,
+            ComunidadAutonoma.codigo_ine,
+            ComunidadAutonoma.nombre_oficial,
+            ComunidadAutonoma.nombre_cooficial,
+            ComunidadAutonoma.nombre_alternativo,
+        ).where(ComunidadAutonoma.deleted_at.is_(None)),
+        select(
+            Provincia.id,
+            Provincia.codigo_ine,
+            Provincia.nombre_oficial,
+            Provincia.comunidad_autonoma_id,
+            Provincia.nombre_cooficial,
+            Provincia.nombre_alternativo,
+        ).where(Provincia.deleted_at.is_(None)),
+        select(
+            Municipio.id,
+            Municipio.codigo_ine,
+            Municipio.nombre_oficial,
+            Municipio.provincia_id,
+            Municipio.codigo_ine_7,
+            Municipio.nombre_cooficial,
+            Municipio.nombre_alternativo,
+        ).where(Municipio.deleted_at.is_(None)),
+    )
+
+
+class GeoGazetteer:
+    """
+    Caché en proceso de ComunidadAutonoma / Provincia / Municipio.
+
+    Las consultas lanzan RuntimeError si no se ha llamado a load()
+    (o load_async()) o si se ha invalidado desde la última carga.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._snapshot: Optional[_Snapshot] = None
+        self._version = 0
+
+    # ------------------------------------------------------------------
+    # Carga e invalidación
+    # ------------------------------------------------------------------
+
+    def _publish(self, comunidades, provincias, municipios) -> None:
+        with self._lock:
+            self._version += 1
+            self._snapshot = _Snapshot.build(self._version, comunidades, provincias, municipios)
+
+    def load(self, session: Session) -> None:
+        """Carga (o recarga) el gazetteer desde la base de datos"""
+        self._publish(*(session.execute(stmt).all() for stmt in _consultas()))
+
+    async def load_async(self, session: AsyncSession) -> None:
+        """Versión asíncrona de load()"""
+        resultados = [(await session.execute(stmt)).all() for stmt in _consultas()]
+        self._publish(*resultados)
+
+    # Alias explícitos para el hook de refresco
+    refresh = load
+    refresh_async = load_async
+
+    def invalidate(self) -> None:
+        """Descarta el snapshot; la siguiente consulta exige volver a cargar"""
+        with self._lock:
+            self._snapshot = None
+
+    @property
+    def loaded(self) -> bool:
+        return self._snapshot is not None
+
+    @property
+    def version(self) -> int:
+        """Número de cargas realizadas (cambia en cada refresh)"""
+        return self._version
+
+    @property
+    def _data(self) -> _Snapshot:
+        snapshot = self._snapshot
+        if snapshot is None:
+            raise RuntimeError("GeoGazetteer no cargado: llamar a load() o load_async()")
+        return snapshot
+
+    # ------------------------------------------------------------------
+    # Búsquedas por clave
+    # ------------------------------------------------------------------
+
+    def comunidad(self, comunidad_id: str) -> Optional[ComunidadGeo]:
+        return self._data.comunidades.get(comunidad_id)
+
+    def provincia(self, provincia_id: str) -> Optional[ProvinciaGeo]:
+        return self._data.provincias.get(provincia_id)
+
+    def municipio(self, municipio_id: str) -> Optional[MunicipioGeo]:
+        return self._data.municipios.get(municipio_id)
+
+    def comunidad_por_ine(self, codigo_ine: str) -> Optional[ComunidadGeo]:
+        return self._data.comunidades_por_ine.get(codigo_ine)
+
+    def provincia_por_ine(self, codigo_ine: str) -> Optional[ProvinciaGeo]:
+        return self._data.provincias_por_ine.get(codigo_ine)
+
+    def municipio_por_ine(self, codigo_ine: str) -> Optional[MunicipioGeo]:
+        """Acepta el código INE de 5 dígitos o el de 7 (codigo_ine_7)"""
+        data = self._data
+        if len(codigo_ine) == 7:
+            return data.municipios_por_ine_7.get(codigo_ine)
+        return data.municipios_por_ine.get(codigo_ine)
+
+    # ------------------------------------------------------------------
+    # Jerarquía
+    # ------------------------------------------------------------------
+
+    def provincia_de_municipio(self, municipio_id: str) -> Optional[ProvinciaGeo]:
+        data = self._data
+        municipio = data.municipios.get(municipio_id)
+        return data.provincias.get(municipio.provincia_id) if municipio else None
+
+    def comunidad_de_provincia(self, provincia_id: str) -> Optional[ComunidadGeo]:
+        data = self._data
+        provincia = data.provincias.get(provincia_id)
+        return data.comunidades.get(provincia.comunidad_autonoma_id) if provincia else None
+
+    def comunidad_de_municipio(self, municipio_id: str) -> Optional[ComunidadGeo]:
+        data = self._data
+        municipio = data.municipios.get(municipio_id)
+        if municipio is None:
+            return None
+        provincia = data.provincias.get(municipio.provincia_id)
+        return data.comunidades.get(provincia.comunidad_autonoma_id) if provincia else None
+
+    # ------------------------------------------------------------------
+    # Búsquedas por nombre (sin tildes ni mayúsculas)
+    # ------------------------------------------------------------------
+
+    def buscar_comunidades(self, nombre: str) -> list[ComunidadGeo]:
+        data = self._data
+        return [data.comunidades[i] for i in data.nombres_comunidad.get(normalizar_nombre(nombre), ())]
+
+    def buscar_provincias(self, nombre: str) -> list[ProvinciaGeo]:
+        data = self._data
+        return [data.provincias[i] for i in data.nombres_provincia.get(normalizar_nombre(nombre), ())]
+
+    def buscar_municipios(self, nombre: str, provincia_id: Optional[str] = None) -> list[MunicipioGeo]:
+        """Municipios con ese nombre (oficial, cooficial o alternativo), opcionalmente en una provincia"""
+        data = self._data
+        municipios = [data.municipios[i] for i in data.nombres_municipio.get(normalizar_nombre(nombre), ())]
+        if provincia_id is not None:
+            municipios = [m for m in municipios if m.provincia_id == provincia_id]
+        return municipios
+
+
+# Instancia compartida del proceso
+GEO_GAZETTEER = GeoGazetteer()
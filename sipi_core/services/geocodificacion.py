@@ -0,0 +1,373 @@
+# services/geocodificacion.py
+"""
+Geocodificación inversa masiva contra los límites administrativos.
+
+Asigna municipio, provincia y comunidad autónoma a miles de puntos por
+sentencia con un join ST_Contains sobre gis.limites_municipios (índice
+GiST); si un punto no cae en ningún municipio (costa, huecos de la
+cartografía) se prueba con gis.limites_provincias. La provincia y la
+CCAA salen de la jerarquía app.municipios → app.provincias.
+
+Variante aproximada (simplificada=True): usa geom_simplificada con
+ST_Intersects; mucho más rápida, puede fallar a pocos metros de una linde.
+
+FUNCIONES:
+    cargar_limites(_async):   carga/actualiza los multipolígonos de un
+                              nivel a partir de GeoJSON y su código INE.
+    geocodificar(_async):     {clave: Ubicacion} para puntos arbitrarios.
+    asignar(_async):          rellena en bloque las columnas de Inmueble,
+                              OSMPlace o InmuebleRaw, por lotes con keyset.
+
+USO:
+    with manager.session() as session:
+        cargar_limites(session, "municipio", ((f["properties"]["NATCODE"][-5:], f["geometry"]) for f in features))
+        resumen = asignar(session, Inmueble)
+        ubicaciones = geocodificar(session, [("a", -5.99, 37.39), ("b", -3.70, 40.42)])
+"""
+
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass
+from typing import Any, Iterable, Optional
+
+from sqlalchemy import Float, Integer, String, bindparam, text
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from mixins import UUIDType
+from models.geografia import ComunidadAutonoma, Provincia, Municipio
+from models.limites import LimiteComunidad, LimiteProvincia, LimiteMunicipio
+from models.inmuebles import Inmueble
+from models.osm import OSMPlace
+from models.discovery import InmuebleRaw
+
+SRID = 4326
+
+# nivel → (modelo de límite, columna FK, modelo geográfico)
+NIVELES = {
+    "comunidad": (LimiteComunidad, "comunidad_autonoma_id", ComunidadAutonoma),
+    "provincia": (LimiteProvincia, "provincia_id", Provincia),
+    "municipio": (LimiteMunicipio, "municipio_id", Municipio),
+}
+
+# Cota inferior del keyset sobre claves uuid
+UUID_CERO = "00000000-0000-0000-0000-000000000000"
+
+
+@dataclass(frozen=True, slots=True)
+class Ubicacion:
+    """Resultado de geocodificar un punto"""
+    municipio_id: Optional[str]
+    provincia_id: Optional[str]
+    comunidad_autonoma_id: Optional[str]
+    municipio: Optional[str] = None   # nombre oficial
+    provincia: Optional[str] = None   # nombre oficial
+
+
+@dataclass(slots=True)
+class ResumenAsignacion:
+    lotes: int = 0
+    procesados: int = 0
+    actualizados: int = 0
+
+
+@dataclass(frozen=True)
+class _Destino:
+    """Cómo se aplica la asignación a un modelo con geometría"""
+    model: type
+    geom: str
+    columnas: dict[str, str]   # columna destino → campo de la asignación
+    pendiente: str             # columna cuyo NULL marca la fila como pendiente
+    conservar: bool = False    # True: solo rellena columnas vacías (texto del portal)
+
+
+DESTINOS: dict[type, _Destino] = {
+    Inmueble: _Destino(
+        Inmueble, "coordenadas",
+        {"municipio_id": "municipio_id", "provincia_id": "provincia_id", "comunidad_autonoma_id": "comunidad_autonoma_id"},
+        pendiente="municipio_id",
+    ),
+    OSMPlace: _Destino(OSMPlace, "geom", {"municipio_id": "municipio_id"}, pendiente="municipio_id"),
+    InmuebleRaw: _Destino(
+        InmuebleRaw, "geom", {"ciudad": "municipio", "provincia": "provincia"},
+        pendiente="ciudad", conservar=True,
+    ),
+}
+
+
+# ----------------------------------------------------------------------
+# SQL
+# ----------------------------------------------------------------------
+
+def _sql_ubicacion(puntos: str, simplificada: bool) -> str:
+    """
+    SELECT de la ubicación de cada fila de `puntos` (CTE con columnas id, g).
+    """
+    columna = "geom_simplificada" if simplificada else "geom"
+    contiene = "ST_Intersects" if simplificada else "ST_Contains"
+    municipios = Municipio.__table__.fullname
+    provincias = Provincia.__table__.fullname
+    return f"""
+        SELECT pt.id,
+               lm.municipio_id,
+               p.id AS provincia_id,
+               p.comunidad_autonoma_id,
+               m.nombre_oficial AS municipio,
+               p.nombre_oficial AS provincia
+        FROM {puntos} pt
+        LEFT JOIN LATERAL (
+            SELECT l.municipio_id FROM {LimiteMunicipio.__table__.fullname} l
+            WHERE {contiene}(l.{columna}, pt.g)
+            LIMIT 1
+        ) lm ON true
+        LEFT JOIN {municipios} m ON m.id = lm.municipio_id
+        LEFT JOIN LATERAL (
+            SELECT l.provincia_id FROM {LimiteProvincia.__table__.fullname} l
+            WHERE lm.municipio_id IS NULL AND {contiene}(l.{columna}, pt.g)
+            LIMIT 1
+        ) lp ON true
+        LEFT JOIN {provincias} p ON p.id = coalesce(m.provincia_id, lp.provincia_id)
+    """
+
+
+def _stmt_geocodificar(simplificada: bool):
+    sql = f"""
+        WITH puntos AS (
+            SELECT t.id, ST_SetSRID(ST_MakePoint(t.lon, t.lat), {SRID}) AS g
+            FROM unnest(:claves, :lons, :lats) AS t(id, lon, lat)
+        )
+        {_sql_ubicacion("puntos", simplificada)}
+    """
+    return text(sql).bindparams(
+        bindparam("claves", type_=ARRAY(String)),
+        bindparam("lons", type_=ARRAY(Float)),
+        bindparam("lats", type_=ARRAY(Float)),
+    ).columns(
+        id=String,
+        municipio_id=UUIDType,
+        provincia_id=UUIDType,
+        comunidad_autonoma_id=UUIDType,
+        municipio=String,
+        provincia=String,
+    )
+
+
+def _stmt_asignar(destino: _Destino, solo_pendientes: bool, simplificada: bool):
+    tabla = destino.model.__table__.fullname
+    pendientes = f"AND t.{destino.pendiente} IS NULL" if solo_pendientes else ""
+    asignaciones = ",\n                ".join(
+        f"{col} = coalesce(t.{col}, a.{campo})" if destino.conservar else f"{col} = coalesce(a.{campo}, t.{col})"
+        for col, campo in destino.columnas.items()
+    )
+    cambios = " OR ".join(
+        f"(a.{campo} IS NOT NULL AND t.{col} IS NULL)" if destino.conservar
+        else f"(a.{campo} IS NOT NULL AND t.{col} IS DISTINCT FROM a.{campo})"
+        for col, campo in destino.columnas.items()
+    )
+    sql = f"""
+        WITH lote AS (
+            SELECT t.id, t.{destino.geom} AS g
+            FROM {tabla} t
+            WHERE t.{destino.geom} IS NOT NULL AND t.deleted_at IS NULL AND t.id > :ultimo {pendientes}
+            ORDER BY t.id
+            LIMIT CAST(:n AS integer)
+        ),
+        asignacion AS (
+            {_sql_ubicacion("lote", simplificada)}
+        ),
+        actualizados AS (
+            UPDATE {tabla} t SET
+                {asignaciones},
+                updated_at = now() AT TIME ZONE 'utc'
+            FROM asignacion a
+            WHERE t.id = a.id AND ({cambios})
+            RETURNING 1
+        )
+        SELECT (SELECT id FROM lote ORDER BY id DESC LIMIT 1) AS ultimo,
+               (SELECT count(*) FROM lote) AS procesados,
+               (SELECT count(*) FROM actualizados) AS actualizados
+    """
+    tipo_id = destino.model.__table__.c.id.type
+    return text(sql).bindparams(bindparam("ultimo", type_=tipo_id)).columns(
+        ultimo=tipo_id, procesados=Integer, actualizados=Integer,
+    )
+
+
+def _stmt_cargar(nivel: str, srid_origen: int):
+    limite, fk, geografia = NIVELES[nivel]
+    geometria = "ST_SetSRID(ST_GeomFromGeoJSON(CAST(:geometria AS text)), CAST(:srid_origen AS integer))"
+    if srid_origen != SRID:
+        geometria = f"ST_Transform({geometria}, {SRID})"
+    sql = f"""
+        INSERT INTO {limite.__table__.fullname} AS l ({fk}, geom, geom_simplificada, fuente, updated_at)
+        SELECT g.id, g.geom, ST_Multi(ST_SimplifyPreserveTopology(g.geom, CAST(:tolerancia AS float8))), CAST(:fuente AS varchar), now() AT TIME ZONE 'utc'
+        FROM (
+            SELECT z.id, ST_Multi(ST_CollectionExtract(ST_MakeValid({geometria}), 3)) AS geom
+            FROM {geografia.__table__.fullname} z
+            WHERE z.codigo_ine = CAST(:codigo_ine AS varchar)
+        ) g
+        ON CONFLICT ({fk}) DO UPDATE SET
+            geom = EXCLUDED.geom,
+            geom_simplificada = EXCLUDED.geom_simplificada,
+            fuente = EXCLUDED.fuente,
+            updated_at = EXCLUDED.updated_at
+    """
+    return text(sql)
+
+
+def _filas_limites(limites: Iterable[tuple[str, Any]], fuente, tolerancia, srid_origen) -> list[dict]:
+    return [
+        {
+            "codigo_ine": codigo_ine,
+            "geometria": geometria if isinstance(geometria, str) else json.dumps(geometria),
+            "fuente": fuente,
+            "tolerancia": tolerancia,
+            "srid_origen": srid_origen,
+        }
+        for codigo_ine, geometria in limites
+    ]
+
+
+def _parametros_geocodificar(puntos: Iterable[tuple[str, float, float]]) -> dict:
+    claves, lons, lats = [], [], []
+    for clave, lon, lat in puntos:
+        claves.append(str(clave))
+        lons.append(float(lon))
+        lats.append(float(lat))
+    return {"claves": claves, "lons": lons, "lats": lats}
+
+
+def _ubicaciones(filas) -> dict[str, Ubicacion]:
+    return {fila.id: Ubicacion(*fila[1:]) for fila in filas}
+
+
+def _inicio(destino: _Destino):
+    return 0 if destino.model.__table__.c.id.type.python_type is int else UUID_CERO
+
+
+def _destino(model: type) -> _Destino:
+    try:
+        return DESTINOS[model]
+    except KeyError:
+        raise ValueError(f"{model.__name__} no admite asignación de municipio por geometría") from None
+
+
+# ----------------------------------------------------------------------
+# API síncrona
+# ----------------------------------------------------------------------
+
+def cargar_limites(
+    session: Session,
+    nivel: str,
+    limites: Iterable[tuple[str, Any]],
+    fuente: Optional[str] = None,
+    tolerancia: float = 0.001,
+    srid_origen: int = SRID,
+) -> None:
+    """
+    Carga o actualiza límites de un nivel ("comunidad", "provincia",
+    "municipio") a partir de pares (codigo_ine, geometría GeoJSON). Los
+    códigos sin entidad en app se ignoran. `tolerancia` (grados) es la de
+    geom_simplificada; ETRS89 (4258) se puede cargar con srid_origen=4258.
+    """
+    filas = _filas_limites(limites, fuente, tolerancia, srid_origen)
+    if filas:
+        session.execute(_stmt_cargar(nivel, srid_origen), filas)
+
+
+def geocodificar(
+    session: Session,
+    puntos: Iterable[tuple[str, float, float]],
+    simplificada: bool = False,
+) -> dict[str, Ubicacion]:
+    """Ubicación de cada punto (clave, lon, lat) en una sola sentencia"""
+    params = _parametros_geocodificar(puntos)
+    if not params["claves"]:
+        return {}
+    return _ubicaciones(session.execute(_stmt_geocodificar(simplificada), params))
+
+
+def asignar(
+    session: Session,
+    model: type,
+    solo_pendientes: bool = True,
+    simplificada: bool = False,
+    batch_size: int = 5000,
+    commit_each_batch: bool = True,
+) -> ResumenAsignacion:
+    """
+    Rellena por geometría las columnas de ubicación de Inmueble, OSMPlace
+    o InmuebleRaw (ciudad/provincia, sin pisar las del portal), en lotes
+    de `batch_size` filas por sentencia.
+    """
+    destino = _destino(model)
+    stmt = _stmt_asignar(destino, solo_pendientes, simplificada)
+    resumen = ResumenAsignacion()
+    ultimo = _inicio(destino)
+    while True:
+        fila = session.execute(stmt, {"ultimo": ultimo, "n": batch_size}).one()
+        if commit_each_batch:
+            session.commit()
+        if not fila.procesados:
+            return resumen
+        resumen.lotes += 1
+        resumen.procesados += fila.procesados
+        resumen.actualizados += fila.actualizados
+        ultimo = fila.ultimo
+
+
+# ----------------------------------------------------------------------
+# API asíncrona
+# ----------------------------------------------------------------------
+
+async def cargar_limites_async(
+    session: AsyncSession,
+    nivel: str,
+    limites: Iterable[tuple[str, Any]],
+    fuente: Optional[str] = None,
+    tolerancia: float = 0.001,
+    srid_origen: int = SRID,
+) -> None:
+    """Versión asíncrona de cargar_limites()"""
+    filas = _filas_limites(limites, fuente, tolerancia, srid_origen)
+    if filas:
+        await session.execute(_stmt_cargar(nivel, srid_origen), filas)
+
+
+async def geocodificar_async(
+    session: AsyncSession,
+    puntos: Iterable[tuple[str, float, float]],
+    simplificada: bool = False,
+) -> dict[str, Ubicacion]:
+    """Versión asíncrona de geocodificar()"""
+    params = _parametros_geocodificar(puntos)
+    if not params["claves"]:
+        return {}
+    return _ubicaciones(await session.execute(_stmt_geocodificar(simplificada), params))
+
+
+async def asignar_async(
+    session: AsyncSession,
+    model: type,
+    solo_pendientes: bool = True,
+    simplificada: bool = False,
+    batch_size: int = 5000,
+    commit_each_batch: bool = True,
+) -> ResumenAsignacion:
+    """Versión asíncrona de asignar()"""
+    destino = _destino(model)
+    stmt = _stmt_asignar(destino, solo_pendientes, simplificada)
+    resumen = ResumenAsignacion()
+    ultimo = _inicio(destino)
+    while True:
+        fila = (await session.execute(stmt, {"ultimo": ultimo, "n": batch_size})).one()
+        if commit_each_batch:
+            await session.commit()
+        if not fila.procesados:
+            return resumen
+        resumen.lotes += 1
+        resumen.procesados += fila.procesados
+        resumen.actualizados += fila.actualizados
+        ultimo = fila.ultimo
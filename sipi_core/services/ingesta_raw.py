@@ -0,0 +1,236 @@
+# services/ingesta_raw.py
+"""
+Carga masiva de anuncios scrapeados en portals_inmuebles_raw (InmuebleRaw).
+
+En lugar de crear un objeto ORM por anuncio, los anuncios se agrupan en
+lotes que se copian con COPY (asyncpg copy_records_to_table) a una tabla
+temporal, y se fusionan con la tabla real mediante
+INSERT ... ON CONFLICT (portal, id_portal) DO UPDATE.
+
+- geom se calcula en el servidor a partir de lat/lon.
+- Un anuncio que no ha cambiado no se reescribe (ni cambia updated_at),
+  de modo que el pipeline de detección solo ve los cambios reales.
+- Cada lote informa de insertados / actualizados / sin cambios.
+
+USO:
+    async with manager.session() as session:
+        loader = InmuebleRawBulkLoader(session, batch_size=5000)
+        async for lote in loader.stream(anuncios):
+            print(lote)
+        # o bien: resumen = await loader.load(anuncios)
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, AsyncIterable, Iterable, Optional, Union
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models.discovery import InmuebleRaw
+
+TABLA_STAGING = "tmp_portals_inmuebles_raw"
+
+# Columnas que aporta el scraper, en el orden del COPY
+COLUMNAS = (
+    "portal", "id_portal", "url", "titulo", "descripcion", "tipo",
+    "precio", "superficie", "geo_type", "lat", "lon",
+    "direccion", "ciudad", "provincia", "scraped_at", "is_active",
+)
+_NUMERICAS = frozenset({"precio", "superficie", "lat", "lon"})
+
+# Columnas cuyo cambio cuenta como actualización (scraped_at no)
+_COLUMNAS_CONTENIDO = tuple(c for c in COLUMNAS if c not in {"portal", "id_portal", "scraped_at"})
+
+GEO_TYPE_DESCONOCIDO = "unknown"
+
+Anuncios = Union[Iterable[dict], AsyncIterable[dict]]
+
+
+@dataclass(frozen=True, slots=True)
+class LoteResultado:
+    """Resultado de fusionar un lote"""
+    lote: int
+    recibidos: int
+    insertados: int
+    actualizados: int
+    sin_cambios: int
+    duplicados: int = 0  # mismo (portal, id_portal) repetido dentro del lote
+
+
+@dataclass(slots=True)
+class ResumenIngesta:
+    """Totales acumulados de una carga"""
+    lotes: int = 0
+    recibidos: int = 0
+    insertados: int = 0
+    actualizados: int = 0
+    sin_cambios: int = 0
+    duplicados: int = 0
+
+    def add(self, lote: LoteResultado) -> None:
+        self.lotes += 1
+        self.recibidos += lote.recibidos
+        self.insertados += lote.insertados
+        self.actualizados += lote.actualizados
+        self.sin_cambios += lote.sin_cambios
+        self.duplicados += lote.duplicados
+
+
+def _numero(valor: Any) -> Optional[Decimal]:
+    if valor is None or valor == "":
+        return None
+    return valor if isinstance(valor, Decimal) else Decimal(str(valor))
+
+
+def to_record(anuncio: dict) -> tuple:
+    """Convierte el dict de un anuncio en la tupla que espera el COPY"""
+    registro = []
+    for columna in COLUMNAS:
+        valor = anuncio.get(columna)
+        if columna in _NUMERICAS:
+            valor = _numero(valor)
+        elif columna == "geo_type":
+            valor = valor or GEO_TYPE_DESCONOCIDO
+        elif columna == "scraped_at":
+            valor = valor or datetime.utcnow()
+        elif columna == "is_active":
+            valor = True if valor is None else bool(valor)
+        registro.append(valor)
+    return tuple(registro)
+
+
+def _sql_staging() -> str:
+    return f"""
+        CREATE TEMP TABLE IF NOT EXISTS {TABLA_STAGING} (
+            portal varchar(50) NOT NULL,
+            id_portal varchar(100) NOT NULL,
+            url text NOT NULL,
+            titulo text,
+            descripcion text,
+            tipo varchar(100),
+            precio numeric(12, 2),
+            superficie numeric(10, 2),
+            geo_type varchar(20) NOT NULL,
+            lat numeric(10, 7),
+            lon numeric(10, 7),
+            direccion text,
+            ciudad varchar(200),
+            provincia varchar(200),
+            scraped_at timestamp NOT NULL,
+            is_active boolean NOT NULL
+        ) ON COMMIT DELETE ROWS
+    """
+
+
+def _sql_merge() -> str:
+    tabla = InmuebleRaw.__table__.fullname
+    columnas = ", ".join(COLUMNAS)
+    actualizar = ",\n                ".join(
+        f"{c} = EXCLUDED.{c}" for c in (*_COLUMNAS_CONTENIDO, "scraped_at")
+    )
+    distinto = " OR ".join(f"t.{c} IS DISTINCT FROM EXCLUDED.{c}" for c in _COLUMNAS_CONTENIDO)
+    return f"""
+        WITH lote AS (
+            -- Un anuncio repetido en el lote se queda con su versión más reciente
+            SELECT DISTINCT ON (portal, id_portal) *
+            FROM {TABLA_STAGING}
+            ORDER BY portal, id_portal, scraped_at DESC
+        ),
+        fusion AS (
+            INSERT INTO {tabla} AS t ({columnas}, geom, created_at)
+            SELECT {columnas},
+                   CASE WHEN lat IS NOT NULL AND lon IS NOT NULL
+                        THEN ST_SetSRID(ST_MakePoint(lon::float8, lat::float8), 4326)
+                   END,
+                   now() AT TIME ZONE 'utc'
+            FROM lote
+            ON CONFLICT (portal, id_portal) DO UPDATE SET
+                {actualizar},
+                geom = EXCLUDED.geom,
+                updated_at = now() AT TIME ZONE 'utc'
+            WHERE {distinto}
+            RETURNING (t.xmax = 0) AS insertado
+        )
+        SELECT
+            (SELECT count(*) FROM lote) AS distintos,
+            count(*) FILTER (WHERE insertado) AS insertados,
+            count(*) FILTER (WHERE NOT insertado) AS actualizados
+        FROM fusion
+    """
+
+
+async def _iterar(anuncios: Anuncios):
+    if hasattr(anuncios, "__aiter__"):
+        async for anuncio in anuncios:
+            yield anuncio
+    else:
+        for anuncio in anuncios:
+            yield anuncio
+
+
+class InmuebleRawBulkLoader:
+    """
+    Cargador por lotes de InmuebleRaw sobre una AsyncSession (asyncpg).
+
+    Args:
+        session: Sesión asíncrona; el loader usa su conexión.
+        batch_size: Anuncios por lote (COPY + merge).
+        commit_each_batch: Confirma tras cada lote, de modo que una carga
+            interrumpida conserva los lotes ya fusionados.
+    """
+
+    def __init__(self, session: AsyncSession, batch_size: int = 5000, commit_each_batch: bool = True):
+        self.session = session
+        self.batch_size = batch_size
+        self.commit_each_batch = commit_each_batch
+        self._merge = text(_sql_merge())
+
+    async def _driver_connection(self):
+        conexion = await self.session.connection()
+        raw = await conexion.get_raw_connection()
+        return raw.driver_connection
+
+    async def _merge_lote(self, numero: int, registros: list[tuple]) -> LoteResultado:
+        await self.session.execute(text(_sql_staging()))
+        await self.session.execute(text(f"TRUNCATE {TABLA_STAGING}"))
+
+        driver = await self._driver_connection()
+        await driver.copy_records_to_table(TABLA_STAGING, records=registros, columns=list(COLUMNAS))
+
+        distintos, insertados, actualizados = (await self.session.execute(self._merge)).one()
+        if self.commit_each_batch:
+            await self.session.commit()
+
+        return LoteResultado(
+            lote=numero,
+            recibidos=len(registros),
+            insertados=insertados,
+            actualizados=actualizados,
+            sin_cambios=distintos - insertados - actualizados,
+            duplicados=len(registros) - distintos,
+        )
+
+    async def stream(self, anuncios: Anuncios):
+        """Carga los anuncios y produce un LoteResultado por lote"""
+        lote: list[tuple] = []
+        numero = 0
+        async for anuncio in _iterar(anuncios):
+            lote.append(to_record(anuncio))
+            if len(lote) >= self.batch_size:
+                numero += 1
+                yield await self._merge_lote(numero, lote)
+                lote = []
+        if lote:
+            numero += 1
+            yield await self._merge_lote(numero, lote)
+
+    async def load(self, anuncios: Anuncios) -> ResumenIngesta:
+        """Carga todos los anuncios y devuelve los totales"""
+        resumen = ResumenIngesta()
+        async for lote in self.stream(anuncios):
+            resumen.add(lote)
+        return resumen
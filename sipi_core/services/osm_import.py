@@ -0,0 +1,429 @@
+# services/osm_import.py
+"""
+Importador en streaming de lugares OSM (OSMPlace) desde un extracto local.
+
+Formatos:
+    - .osm.pbf (o .osm/.osm.bz2): nodos y vías, leídos con pyosmium
+      (dependencia opcional: pip install "sipi-core[osm]"). La geometría de
+      una vía se pasa como polígono/línea y se reduce a su centroide.
+    - GeoJSONSeq (.geojsonl, .geojsons): una Feature por línea, p. ej. la
+      salida de `osmium export -f geojsonseq`.
+
+El fichero se recorre objeto a objeto, filtrando por tags (FiltroOSM), y
+los lugares se agrupan en lotes que se copian con COPY a una tabla
+temporal y se fusionan con osm_places mediante
+INSERT ... ON CONFLICT (osm_id) DO UPDATE. La memoria no depende del
+tamaño del extracto (salvo la caché de ubicaciones de nodos de pyosmium,
+que puede llevarse a disco con almacen_nodos="dense_file_array,<ruta>").
+
+MUNICIPIO:
+    municipio_id se asigna en el propio merge: por el límite municipal que
+    contiene el punto (gis.limites_municipios) o, si no hay límites
+    cargados, por addr:city, desempatando con el prefijo de provincia de
+    addr:postcode. Sin coincidencia única se conserva el valor anterior.
+
+REANUDACIÓN:
+    Tras cada lote se guarda, en la misma transacción, un punto de control
+    en PipelineWatermark (proceso "osm_import", fuente = nombre del
+    fichero): desplazamiento en bytes para GeoJSONSeq, último
+    tipo/id procesado para PBF (ordenado por tipo e id). Una importación
+    interrumpida continúa desde ahí; al terminar se borra el punto de control.
+
+USO:
+    async with manager.session() as session:
+        importador = OSMPlaceImporter(session)
+        resumen = await importador.importar("spain-latest.osm.pbf")
+"""
+
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Iterator, Optional
+
+from sqlalchemy import delete, select, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models.osm import OSMPlace
+from models.discovery import PipelineWatermark
+from models.geografia import Municipio, Provincia
+from models.limites import LimiteMunicipio
+from services.ingesta_raw import LoteResultado, ResumenIngesta
+
+PROCESO = "osm_import"
+TABLA_STAGING = "tmp_osm_places"
+
+# Columnas de la tabla temporal, en el orden del COPY
+COLUMNAS = (
+    "osm_id", "name", "amenity", "religion", "denomination",
+    "addr_city", "addr_postcode", "geometria", "tags",
+)
+
+_SUFIJOS_GEOJSONSEQ = (".geojsonl", ".geojsons", ".geojsonseq", ".jsonl", ".ndjson")
+_TIPOS_OSM = {"n": "node", "w": "way", "r": "relation"}
+_ORDEN_TIPOS = {"node": 0, "way": 1, "relation": 2}
+
+
+@dataclass(frozen=True)
+class FiltroOSM:
+    """
+    Qué objetos OSM se importan: los que tienen un amenity de `amenities`
+    o, sin amenity, un tag religion (ermitas mapeadas como building=chapel,
+    por ejemplo). Si se indica `religiones`, además su religion debe estar
+    en esa lista.
+    """
+    amenities: frozenset[str] = field(
+        default_factory=lambda: frozenset({"place_of_worship", "monastery"})
+    )
+    religiones: Optional[frozenset[str]] = None
+
+    def acepta(self, tags: dict[str, str]) -> bool:
+        amenity = tags.get("amenity")
+        religion = tags.get("religion")
+        if self.religiones is not None and religion not in self.religiones:
+            return False
+        return amenity in self.amenities or (amenity is None and religion is not None)
+
+
+@dataclass(frozen=True, slots=True)
+class LugarOSM:
+    """Lugar leído del extracto, antes de fusionarlo"""
+    osm_id: str                 # 'node/123', 'way/456'
+    tags: dict[str, str]
+    geometria: dict[str, Any]   # geometría GeoJSON
+    posicion: str               # punto de control tras este lugar
+
+    def to_record(self) -> tuple:
+        tags = self.tags
+        return (
+            self.osm_id,
+            tags.get("name") or "",
+            tags.get("amenity"),
+            tags.get("religion"),
+            tags.get("denomination"),
+            tags.get("addr:city"),
+            tags.get("addr:postcode"),
+            json.dumps(self.geometria),
+            json.dumps(tags, ensure_ascii=False),
+        )
+
+
+# ----------------------------------------------------------------------
+# Lectores
+# ----------------------------------------------------------------------
+
+def _normalizar_osm_id(valor: str, tipo: Optional[str] = None) -> str:
+    """'n123' / 'node/123' / ('123', 'node') → 'node/123'"""
+    valor = str(valor)
+    if "/" in valor:
+        return valor
+    if tipo:
+        return f"{tipo}/{valor}"
+    if valor[:1] in _TIPOS_OSM and valor[1:].isdigit():
+        return f"{_TIPOS_OSM[valor[0]]}/{valor[1:]}"
+    raise ValueError(f"Identificador OSM no reconocido: {valor!r}")
+
+
+def _clave_orden(osm_id: str) -> tuple[int, int]:
+    tipo, numero = osm_id.split("/", 1)
+    return _ORDEN_TIPOS[tipo], int(numero)
+
+
+def leer_geojsonseq(ruta: Path, filtro: FiltroOSM, desde: int = 0) -> Iterator[LugarOSM]:
+    """
+    Features de un GeoJSONSeq a partir del byte `desde`. Acepta tags planos
+    en properties (con @id/@type, como `osmium export`) o anidados en
+    properties["tags"].
+    """
+    with open(ruta, "rb") as f:
+        f.seek(desde)
+        while True:
+            linea = f.readline()
+            if not linea:
+                return
+            linea = linea.strip().lstrip(b"\x1e")
+            if not linea:
+                continue
+            feature = json.loads(linea)
+            propiedades = feature.get("properties") or {}
+            tags = propiedades.get("tags") or {k: v for k, v in propiedades.items() if not k.startswith("@")}
+            if not feature.get("geometry") or not filtro.acepta(tags):
+                continue
+            if "@id" in propiedades:
+                osm_id = _normalizar_osm_id(propiedades["@id"], propiedades.get("@type"))
+            else:
+                osm_id = _normalizar_osm_id(feature.get("id") or propiedades["id"])
+            yield LugarOSM(osm_id, tags, feature["geometry"], str(f.tell()))
+
+
+def leer_pbf(
+    ruta: Path,
+    filtro: FiltroOSM,
+    desde: Optional[str] = None,
+    almacen_nodos: str = "flex_mem",
+) -> Iterator[LugarOSM]:
+    """Nodos y vías de un extracto OSM (PBF/XML), saltando hasta después de `desde`"""
+    try:
+        import osmium
+        import osmium.filter
+    except ImportError as exc:
+        raise ImportError('Leer .osm.pbf requiere pyosmium: pip install "sipi-core[osm]"') from exc
+
+    limite = _clave_orden(desde) if desde else None
+    procesador = (
+        osmium.FileProcessor(str(ruta), osmium.osm.NODE | osmium.osm.WAY)
+        .with_locations(almacen_nodos)
+        .with_filter(osmium.filter.KeyFilter("amenity", "religion"))
+    )
+    for objeto in procesador:
+        tipo = "node" if objeto.is_node() else "way"
+        osm_id = f"{tipo}/{objeto.id}"
+        if limite is not None and _clave_orden(osm_id) <= limite:
+            continue
+        tags = {t.k: t.v for t in objeto.tags}
+        if not filtro.acepta(tags):
+            continue
+        if tipo == "node":
+            if not objeto.location.valid():
+                continue
+            geometria = {"type": "Point", "coordinates": [objeto.location.lon, objeto.location.lat]}
+        else:
+            coords = [[n.lon, n.lat] for n in objeto.nodes if n.location.valid()]
+            if len(coords) < 2:
+                continue
+            if objeto.is_closed() and len(coords) >= 4:
+                geometria = {"type": "Polygon", "coordinates": [coords]}
+            else:
+                geometria = {"type": "LineString", "coordinates": coords}
+        yield LugarOSM(osm_id, tags, geometria, osm_id)
+
+
+def es_geojsonseq(ruta: Path) -> bool:
+    return ruta.name.lower().endswith(_SUFIJOS_GEOJSONSEQ)
+
+
+# ----------------------------------------------------------------------
+# SQL
+# ----------------------------------------------------------------------
+
+def _sql_staging() -> str:
+    # Todo text: un tag demasiado largo no debe hacer fallar el COPY del
+    # lote entero (la reanudación volvería a pararse en él). Se recorta en
+    # el merge a las longitudes de osm_places.
+    return f"""
+        CREATE TEMP TABLE IF NOT EXISTS {TABLA_STAGING} (
+            osm_id text NOT NULL,
+            name text NOT NULL,
+            amenity text,
+            religion text,
+            denomination text,
+            addr_city text,
+            addr_postcode text,
+            geometria text NOT NULL,
+            tags text
+        ) ON COMMIT DELETE ROWS
+    """
+
+
+def _recortadas(columnas: tuple[str, ...]) -> str:
+    """Columnas de texto del lote recortadas a su longitud en osm_places"""
+    return ",\n                   ".join(
+        f"left(l.{c}, {OSMPlace.__table__.c[c].type.length}) AS {c}" for c in columnas
+    )
+
+
+def _sql_merge() -> str:
+    tabla = OSMPlace.__table__.fullname
+    municipios = Municipio.__table__.fullname
+    provincias = Provincia.__table__.fullname
+    limites = LimiteMunicipio.__table__.fullname
+    contenido = ("name", "amenity", "religion", "denomination", "addr_city", "addr_postcode", "geom", "tags")
+    distinto = " OR ".join(
+        [f"t.{c} IS DISTINCT FROM EXCLUDED.{c}" for c in contenido]
+        + ["t.municipio_id IS DISTINCT FROM coalesce(EXCLUDED.municipio_id, t.municipio_id)"]
+    )
+    actualizar = ",\n                ".join(f"{c} = EXCLUDED.{c}" for c in contenido)
+    return f"""
+        WITH lote AS (
+            SELECT DISTINCT ON (osm_id) s.*,
+                   ST_SetSRID(CASE WHEN GeometryType(g.g) = 'POINT' THEN g.g ELSE ST_Centroid(g.g) END, 4326) AS punto
+            FROM {TABLA_STAGING} s
+            CROSS JOIN LATERAL ST_GeomFromGeoJSON(s.geometria) AS g(g)
+            ORDER BY osm_id
+        ),
+        nombres AS (
+            -- Nombres de municipio sin tildes, con el código INE de su provincia
+            SELECT mu.id AS municipio_id, p.codigo_ine AS provincia_ine, lower(unaccent(n.nombre)) AS nombre
+            FROM {municipios} mu
+            JOIN {provincias} p ON p.id = mu.provincia_id
+            CROSS JOIN LATERAL unnest(ARRAY[mu.nombre_oficial, mu.nombre_cooficial, mu.nombre_alternativo]) AS n(nombre)
+            WHERE n.nombre IS NOT NULL AND mu.deleted_at IS NULL
+        ),
+        municipio_por_nombre AS (
+            -- Solo coincidencias únicas; el prefijo del código postal es el código INE de provincia
+            SELECT l.osm_id, (array_agg(n.municipio_id))[1] AS municipio_id
+            FROM lote l
+            JOIN nombres n ON n.nombre = lower(unaccent(l.addr_city))
+                          AND (l.addr_postcode IS NULL OR n.provincia_ine = left(l.addr_postcode, 2))
+            GROUP BY l.osm_id
+            HAVING count(DISTINCT n.municipio_id) = 1
+        ),
+        lugares AS (
+            SELECT l.osm_id, {_recortadas(contenido[:6])}, l.tags::jsonb AS tags,
+                   l.punto AS geom,
+                   coalesce(pip.municipio_id, m.municipio_id) AS municipio_id
+            FROM lote l
+            LEFT JOIN LATERAL (
+                SELECT lm.municipio_id FROM {limites} lm
+                WHERE ST_Contains(lm.geom, l.punto)
+                LIMIT 1
+            ) pip ON true
+            LEFT JOIN municipio_por_nombre m ON m.osm_id = l.osm_id
+        ),
+        fusion AS (
+            INSERT INTO {tabla} AS t
+                (id, osm_id, name, amenity, religion, denomination, addr_city, addr_postcode,
+                 geom, tags, municipio_id, created_at)
+            SELECT app.uuid_generate_v7(), osm_id, name, amenity, religion, denomination,
+                   addr_city, addr_postcode, geom, tags, municipio_id, now() AT TIME ZONE 'utc'
+            FROM lugares
+            ON CONFLICT (osm_id) DO UPDATE SET
+                {actualizar},
+                municipio_id = coalesce(EXCLUDED.municipio_id, t.municipio_id),
+                updated_at = now() AT TIME ZONE 'utc'
+            WHERE {distinto}
+            RETURNING (t.xmax = 0) AS insertado
+        )
+        SELECT
+            (SELECT count(*) FROM lote) AS distintos,
+            count(*) FILTER (WHERE insertado) AS insertados,
+            count(*) FILTER (WHERE NOT insertado) AS actualizados
+        FROM fusion
+    """
+
+
+# ----------------------------------------------------------------------
+# Importador
+# ----------------------------------------------------------------------
+
+class OSMPlaceImporter:
+    """
+    Importa lugares OSM en osm_places por lotes (COPY + merge).
+
+    Args:
+        session: Sesión asíncrona (asyncpg).
+        filtro: Tags que debe tener un objeto para importarse.
+        batch_size: Lugares por lote.
+        almacen_nodos: Almacén de ubicaciones de nodos de pyosmium (solo PBF).
+    """
+
+    def __init__(
+        self,
+        session: AsyncSession,
+        filtro: Optional[FiltroOSM] = None,
+        batch_size: int = 5000,
+        almacen_nodos: str = "flex_mem",
+    ):
+        self.session = session
+        self.filtro = filtro or FiltroOSM()
+        self.batch_size = batch_size
+        self.almacen_nodos = almacen_nodos
+        self._merge = text(_sql_merge())
+
+    # ------------------------------------------------------------------
+    # Punto de control
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _fuente(ruta: Path) -> str:
+        return ruta.name[:100]
+
+    async def punto_de_control(self, ruta: Path) -> Optional[str]:
+        return (await self.session.execute(
+            select(PipelineWatermark.posicion).where(
+                PipelineWatermark.proceso == PROCESO,
+                PipelineWatermark.fuente == self._fuente(ruta),
+            )
+        )).scalar_one_or_none()
+
+    async def _guardar_punto_de_control(self, ruta: Path, posicion: str) -> None:
+        ahora = datetime.utcnow()
+        stmt = pg_insert(PipelineWatermark).values(
+            proceso=PROCESO, fuente=self._fuente(ruta), marca=ahora, posicion=posicion, updated_at=ahora,
+        )
+        await self.session.execute(stmt.on_conflict_do_update(
+            index_elements=[PipelineWatermark.proceso, PipelineWatermark.fuente],
+            set_={"marca": stmt.excluded.marca, "posicion": stmt.excluded.posicion, "updated_at": stmt.excluded.updated_at},
+        ))
+
+    async def _borrar_punto_de_control(self, ruta: Path) -> None:
+        await self.session.execute(delete(PipelineWatermark).where(
+            PipelineWatermark.proceso == PROCESO,
+            PipelineWatermark.fuente == self._fuente(ruta),
+        ))
+        await self.session.commit()
+
+    # ------------------------------------------------------------------
+    # Carga
+    # ------------------------------------------------------------------
+
+    def leer(self, ruta: Path, desde: Optional[str] = None) -> Iterator[LugarOSM]:
+        """Lugares del extracto que pasan el filtro, desde un punto de control"""
+        if es_geojsonseq(ruta):
+            return leer_geojsonseq(ruta, self.filtro, int(desde) if desde else 0)
+        return leer_pbf(ruta, self.filtro, desde, self.almacen_nodos)
+
+    async def _driver_connection(self):
+        conexion = await self.session.connection()
+        raw = await conexion.get_raw_connection()
+        return raw.driver_connection
+
+    async def _merge_lote(self, ruta: Path, numero: int, lote: list[LugarOSM]) -> LoteResultado:
+        await self.session.execute(text(_sql_staging()))
+        await self.session.execute(text(f"TRUNCATE {TABLA_STAGING}"))
+
+        driver = await self._driver_connection()
+        await driver.copy_records_to_table(
+            TABLA_STAGING, records=[lugar.to_record() for lugar in lote], columns=list(COLUMNAS),
+        )
+
+        distintos, insertados, actualizados = (await self.session.execute(self._merge)).one()
+        # El punto de control se confirma junto con el lote
+        await self._guardar_punto_de_control(ruta, lote[-1].posicion)
+        await self.session.commit()
+
+        return LoteResultado(
+            lote=numero,
+            recibidos=len(lote),
+            insertados=insertados,
+            actualizados=actualizados,
+            sin_cambios=distintos - insertados - actualizados,
+            duplicados=len(lote) - distintos,
+        )
+
+    async def stream(self, ruta: str | Path, reanudar: bool = True):
+        """Importa el extracto y produce un LoteResultado por lote"""
+        ruta = Path(ruta)
+        desde = await self.punto_de_control(ruta) if reanudar else None
+        lote: list[LugarOSM] = []
+        numero = 0
+        for lugar in self.leer(ruta, desde):
+            lote.append(lugar)
+            if len(lote) >= self.batch_size:
+                numero += 1
+                yield await self._merge_lote(ruta, numero, lote)
+                lote = []
+        if lote:
+            numero += 1
+            yield await self._merge_lote(ruta, numero, lote)
+        await self._borrar_punto_de_control(ruta)
+
+    async def importar(self, ruta: str | Path, reanudar: bool = True) -> ResumenIngesta:
+        """Importa el extracto completo y devuelve los totales"""
+        resumen = ResumenIngesta()
+        async for lote in self.stream(ruta, reanudar):
+            resumen.add(lote)
+        return resumen
@@ -0,0 +1,220 @@
+# services/resumenes.py
+"""
+Resúmenes materializados para dashboards.
+
+app.mv_resumen_inmuebles (migración a7c3e5f9b2d4) guarda el número de
+inmuebles vivos (y cuántos son visitables y tienen coordenadas) por cada
+combinación de:
+
+    comunidad_autonoma, provincia, municipio, tipo_inmueble,
+    figura_proteccion (actual) y estado_conservacion
+
+Son del orden de decenas de miles de filas frente a todo el inventario,
+así que cualquier conteo por una dimensión, con filtros por otras, es un
+GROUP BY sobre la vista más un join con la tabla de nombres: milisegundos,
+sin tocar inmuebles ni el historial de protección.
+
+FRESCURA:
+    refrescar() hace REFRESH MATERIALIZED VIEW CONCURRENTLY (las lecturas
+    siguen durante el refresco) y anota en app.resumenes_refresco cuándo,
+    cuánto tardó y cuántas filas quedaron. frescura() devuelve esos sellos:
+    los dashboards los muestran y los usan como clave de caché (ver
+    dashboard/datos.py). El refresco se programa fuera (cron):
+
+        python -m services.resumenes
+
+USO:
+    with manager.session() as session:
+        filas = conteos(session, "provincia", comunidad_autonoma=andalucia_id)
+        sello = frescura(session)[VISTA_RESUMEN]
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Optional
+
+from sqlalchemy import BigInteger, Column, MetaData, String, Table, func, select, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from mixins import UUIDType
+from models.geografia import ComunidadAutonoma, Provincia, Municipio
+from models.tipologias import TipoInmueble, TipoEstadoConservacion
+from models.figuras_proteccion import FiguraProteccion
+from models.resumenes import ResumenRefresco
+
+VISTA_RESUMEN = "app.mv_resumen_inmuebles"
+
+# Vista materializada (fuera de Base.metadata: la crea la migración, no autogenerate)
+MV_RESUMEN_INMUEBLES = Table(
+    "mv_resumen_inmuebles",
+    MetaData(schema="app"),
+    Column("clave", String, primary_key=True),
+    Column("comunidad_autonoma_id", UUIDType),
+    Column("provincia_id", UUIDType),
+    Column("municipio_id", UUIDType),
+    Column("tipo_inmueble_id", UUIDType),
+    Column("figura_proteccion_id", UUIDType),
+    Column("estado_conservacion_id", UUIDType),
+    Column("inmuebles", BigInteger),
+    Column("visitables", BigInteger),
+    Column("con_coordenadas", BigInteger),
+)
+
+
+@dataclass(frozen=True, slots=True)
+class Dimension:
+    columna: str
+    modelo: type
+    etiqueta: str
+
+
+DIMENSIONES: dict[str, Dimension] = {
+    "comunidad_autonoma": Dimension("comunidad_autonoma_id", ComunidadAutonoma, "nombre_oficial"),
+    "provincia": Dimension("provincia_id", Provincia, "nombre_oficial"),
+    "municipio": Dimension("municipio_id", Municipio, "nombre_oficial"),
+    "tipo_inmueble": Dimension("tipo_inmueble_id", TipoInmueble, "nombre"),
+    "figura_proteccion": Dimension("figura_proteccion_id", FiguraProteccion, "denominacion"),
+    "estado_conservacion": Dimension("estado_conservacion_id", TipoEstadoConservacion, "nombre"),
+}
+
+SIN_ASIGNAR = "Sin asignar"
+
+
+@dataclass(frozen=True, slots=True)
+class FilaResumen:
+    id: Optional[str]
+    nombre: str
+    inmuebles: int
+    visitables: int
+    con_coordenadas: int
+
+
+@dataclass(frozen=True, slots=True)
+class Frescura:
+    vista: str
+    refrescado_en: datetime
+    duracion_ms: Optional[int]
+    filas: Optional[int]
+
+
+def _dimension(nombre: str) -> Dimension:
+    try:
+        return DIMENSIONES[nombre]
+    except KeyError:
+        raise ValueError(f"Dimensión no válida: {nombre} (opciones: {', '.join(DIMENSIONES)})") from None
+
+
+def _consulta_conteos(dimension: str, filtros: dict[str, Any]):
+    """
+    Conteos por dimension. filtros: dimensión → id (None filtra los
+    inmuebles sin asignar en esa dimensión).
+    """
+    dim = _dimension(dimension)
+    mv = MV_RESUMEN_INMUEBLES.c
+    modelo = dim.modelo
+    columna = mv[dim.columna]
+    inmuebles = func.sum(mv.inmuebles)
+    stmt = (
+        select(
+            columna,
+            getattr(modelo, dim.etiqueta),
+            inmuebles,
+            func.sum(mv.visitables),
+            func.sum(mv.con_coordenadas),
+        )
+        .select_from(MV_RESUMEN_INMUEBLES)
+        .outerjoin(modelo, modelo.id == columna)
+        .group_by(columna, getattr(modelo, dim.etiqueta))
+        .order_by(inmuebles.desc())
+    )
+    for nombre, valor in filtros.items():
+        filtro = mv[_dimension(nombre).columna]
+        stmt = stmt.where(filtro.is_(None) if valor is None else filtro == valor)
+    return stmt
+
+
+def _filas(resultado) -> list[FilaResumen]:
+    return [
+        FilaResumen(
+            id=None if id is None else str(id),
+            nombre=nombre or SIN_ASIGNAR,
+            inmuebles=int(inmuebles),
+            visitables=int(visitables),
+            con_coordenadas=int(con_coordenadas),
+        )
+        for id, nombre, inmuebles, visitables, con_coordenadas in resultado
+    ]
+
+
+def conteos(session: Session, dimension: str, **filtros: Any) -> list[FilaResumen]:
+    """Inmuebles por valor de la dimensión, de más a menos"""
+    return _filas(session.execute(_consulta_conteos(dimension, filtros)))
+
+
+async def conteos_async(session: AsyncSession, dimension: str, **filtros: Any) -> list[FilaResumen]:
+    """Versión asíncrona de conteos()"""
+    return _filas(await session.execute(_consulta_conteos(dimension, filtros)))
+
+
+def total(session: Session, **filtros: Any) -> int:
+    """Total de inmuebles vivos con los filtros dados"""
+    stmt = select(func.coalesce(func.sum(MV_RESUMEN_INMUEBLES.c.inmuebles), 0))
+    for nombre, valor in filtros.items():
+        filtro = MV_RESUMEN_INMUEBLES.c[_dimension(nombre).columna]
+        stmt = stmt.where(filtro.is_(None) if valor is None else filtro == valor)
+    return int(session.execute(stmt).scalar_one())
+
+
+def frescura(session: Session) -> dict[str, Frescura]:
+    """Sello de cada vista de resúmenes"""
+    return {
+        fila.vista: Frescura(fila.vista, fila.refrescado_en, fila.duracion_ms, fila.filas)
+        for fila in session.scalars(select(ResumenRefresco))
+    }
+
+
+def refrescar(session: Session, vista: str = VISTA_RESUMEN, concurrente: bool = True) -> Frescura:
+    """
+    Refresca la vista y actualiza su sello. concurrente=False bloquea las
+    lecturas pero es más rápido (carga inicial o vista vacía).
+    """
+    inicio = time.monotonic()
+    session.execute(text(f"REFRESH MATERIALIZED VIEW {'CONCURRENTLY ' if concurrente else ''}{vista}"))
+    filas = session.execute(text(f"SELECT count(*) FROM {vista}")).scalar_one()
+    sello = Frescura(vista, datetime.utcnow(), int((time.monotonic() - inicio) * 1000), filas)
+    stmt = insert(ResumenRefresco).values(
+        vista=vista, refrescado_en=sello.refrescado_en, duracion_ms=sello.duracion_ms, filas=filas,
+    )
+    session.execute(stmt.on_conflict_do_update(
+        index_elements=[ResumenRefresco.vista],
+        set_={"refrescado_en": stmt.excluded.refrescado_en, "duracion_ms": stmt.excluded.duracion_ms,
+              "filas": stmt.excluded.filas},
+    ))
+    session.commit()
+    return sello
+
+
+def main(argv=None) -> None:
+    from db.sessions import SyncDatabaseManager
+
+    parser = argparse.ArgumentParser(description="Refresca los resúmenes materializados de los dashboards")
+    parser.add_argument("--bloqueante", action="store_true", help="REFRESH sin CONCURRENTLY")
+    args = parser.parse_args(argv)
+
+    manager = SyncDatabaseManager()
+    try:
+        with manager.session() as session:
+            sello = refrescar(session, concurrente=not args.bloqueante)
+        print(f"{sello.vista}: {sello.filas} filas en {sello.duracion_ms} ms")
+    finally:
+        manager.close()
+
+
+if __name__ == "__main__":
+    main()
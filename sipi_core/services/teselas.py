@@ -0,0 +1,487 @@
+# services/teselas.py
+"""
+Teselas vectoriales (Mapbox Vector Tiles) por z/x/y.
+
+Cada capa se genera en PostgreSQL con ST_AsMVT / ST_AsMVTGeom a partir de
+una tabla con geometría POINT (SRID 4326):
+
+    - inmuebles:  Inmueble.coordenadas
+    - osm_places: OSMPlace.geom
+    - anuncios:   InmuebleRaw.geom (solo activos)
+
+El filtro espacial es geom && ST_Transform(ST_TileEnvelope(z, x, y), 4326)
+sobre el índice GiST de la columna; la proyección a 3857 se hace solo
+con las filas de la tesela.
+
+ATRIBUTOS:
+    Cada capa declara los atributos que puede publicar (nombre → expresión
+    SQL). Se piden por nombre; los que no están declarados dan ValueError,
+    así que nunca se interpola texto del cliente en la consulta. Sin
+    selección se usan los atributos por defecto de la capa.
+
+AGRUPACIÓN:
+    Hasta el zoom cluster_hasta_zoom de la capa, los puntos se agrupan en
+    el servidor por celdas de la rejilla de la tesela (ST_SnapToGrid en
+    coordenadas MVT). Cada grupo es un punto en el centroide con los
+    atributos id (el menor del grupo) y total. A partir de ese zoom se
+    publican los puntos individuales con sus atributos.
+
+CACHÉ:
+    Las teselas se guardan en un LRU en memoria y, si se indica un
+    directorio, también en disco (<dir>/<capa>/<marca>/<z>/<x>/<y>-<attrs>.mvt).
+    La versión de datos de la capa parte de una marca leída de la base:
+    max(created_at, updated_at, deleted_at) de la tabla (cada max va por
+    su índice), que se consulta como mucho cada ttl_version segundos.
+
+      - El disco, que comparten los procesos con el mismo TILE_CACHE_DIR,
+        usa solo la marca: todos calculan el mismo directorio para los
+        mismos datos, y el de la marca anterior se borra cuando cambia.
+      - El LRU en memoria añade un contador del proceso que un listener
+        after_flush/after_commit incrementa cuando la sesión toca la tabla
+        (como CATALOG_CACHE); además obliga a releer la marca.
+
+    Un borrado físico no mueve la marca: los que hace el ORM de este
+    proceso borran al confirmar el directorio vigente de la capa; para los
+    hechos fuera del ORM, TILE_SERVICE.invalidate(capa).
+
+USO:
+    with manager.session() as session:
+        mvt = TILE_SERVICE.tile(session, "inmuebles", 12, 2005, 1585, atributos=["nombre", "en_venta"])
+
+    async with manager.session() as session:
+        mvt = await TILE_SERVICE.tile_async(session, "anuncios", z, x, y)
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import shutil
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Iterable, Mapping, Optional
+
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from models.inmuebles import Inmueble
+from models.osm import OSMPlace
+from models.discovery import InmuebleRaw
+
+ZOOM_MAXIMO = 22
+EXTENT = 4096
+BUFFER = 64
+
+_INFO_TABLAS = "teselas_modificadas"
+_INFO_BORRADOS = "teselas_borradas"
+
+
+@dataclass(frozen=True)
+class CapaTeselas:
+    """Definición de una capa publicable"""
+    nombre: str
+    model: type
+    geom: str
+    atributos: Mapping[str, str]
+    por_defecto: tuple[str, ...]
+    filtro: str = "t.deleted_at IS NULL"
+    cluster_hasta_zoom: int = 12
+    celda_cluster: int = 64  # lado de la celda en unidades MVT (de EXTENT)
+
+    @property
+    def tabla(self) -> str:
+        return self.model.__table__.fullname
+
+
+CAPAS: tuple[CapaTeselas, ...] = (
+    CapaTeselas(
+        nombre="inmuebles",
+        model=Inmueble,
+        geom="coordenadas",
+        atributos={
+            "nombre": "t.nombre",
+            "tipo_inmueble_id": "t.tipo_inmueble_id",
+            "estado_conservacion_id": "t.estado_conservacion_id",
+            "municipio_id": "t.municipio_id",
+            "provincia_id": "t.provincia_id",
+            "en_venta": "t.en_venta",
+            "activo": "t.activo",
+        },
+        por_defecto=("nombre", "tipo_inmueble_id", "en_venta"),
+        cluster_hasta_zoom=11,
+    ),
+    CapaTeselas(
+        nombre="osm_places",
+        model=OSMPlace,
+        geom="geom",
+        atributos={
+            "osm_id": "t.osm_id",
+            "name": "t.name",
+            "amenity": "t.amenity",
+            "religion": "t.religion",
+            "denomination": "t.denomination",
+            "municipio_id": "t.municipio_id",
+        },
+        por_defecto=("name", "religion"),
+    ),
+    CapaTeselas(
+        nombre="anuncios",
+        model=InmuebleRaw,
+        geom="geom",
+        atributos={
+            "portal": "t.portal",
+            "titulo": "t.titulo",
+            "tipo": "t.tipo",
+            "precio": "t.precio::float8",
+            "superficie": "t.superficie::float8",
+            "geo_type": "t.geo_type",
+            "url": "t.url",
+            "ciudad": "t.ciudad",
+            "provincia": "t.provincia",
+        },
+        por_defecto=("portal", "titulo", "precio", "geo_type"),
+        filtro="t.is_active AND t.deleted_at IS NULL",
+    ),
+)
+
+
+def _validar_tesela(z: int, x: int, y: int) -> None:
+    if not 0 <= z <= ZOOM_MAXIMO:
+        raise ValueError(f"Zoom fuera de rango: {z}")
+    n = 1 << z
+    if not (0 <= x < n and 0 <= y < n):
+        raise ValueError(f"Tesela fuera de rango: {z}/{x}/{y}")
+
+
+def _sql_tesela(capa: CapaTeselas, atributos: tuple[str, ...], agrupar: bool):
+    """
+    SQL de una tesela. Los nombres de atributo ya están validados contra
+    la capa; las expresiones salen de su definición, no del cliente.
+    """
+    columnas = "".join(f"{capa.atributos[a]} AS {a}, " for a in atributos)
+    puntos = f"""
+        WITH limites AS (
+            SELECT ST_TileEnvelope(CAST(:z AS integer), CAST(:x AS integer), CAST(:y AS integer)) AS g3857
+        ),
+        puntos AS (
+            SELECT t.id AS id, {columnas}
+                   ST_AsMVTGeom(ST_Transform(t.{capa.geom}, 3857), limites.g3857,
+                                CAST(:extent AS integer), CAST(:buffer AS integer), true) AS geom
+            FROM {capa.tabla} t, limites
+            WHERE t.{capa.geom} && ST_Transform(
+                      ST_TileEnvelope(CAST(:z AS integer), CAST(:x AS integer), CAST(:y AS integer),
+                                      margin => CAST(:margen AS float8)),
+                      4326)
+              AND {capa.filtro}
+        )
+    """
+    if agrupar:
+        return text(puntos + """
+        , grupos AS (
+            -- El menor id en el orden del tipo (entero o uuid; min() no admite uuid)
+            SELECT (array_agg(id ORDER BY id))[1]::text AS id,
+                   count(*)::integer AS total,
+                   ST_Centroid(ST_Collect(geom)) AS geom
+            FROM puntos
+            WHERE geom IS NOT NULL
+            GROUP BY ST_SnapToGrid(geom, CAST(:celda AS float8))
+        )
+        SELECT ST_AsMVT(grupos.*, CAST(:capa AS text), CAST(:extent AS integer), 'geom') FROM grupos
+        """)
+    return text(puntos + """
+        SELECT ST_AsMVT(puntos.*, CAST(:capa AS text), CAST(:extent AS integer), 'geom')
+        FROM puntos
+        WHERE geom IS NOT NULL
+    """)
+
+
+def _sql_marca(capa: CapaTeselas):
+    return text(f"""
+        SELECT greatest(max(created_at), max(updated_at), max(deleted_at))::text
+        FROM {capa.tabla}
+    """)
+
+
+@dataclass
+class _Version:
+    marca: Optional[str] = None
+    leida_en: float = 0.0
+    contador: int = 0
+    clave: Optional[str] = None        # LRU en memoria: marca y contador
+    clave_disco: Optional[str] = None  # disco compartido: solo la marca
+
+
+class TileCache:
+    """LRU en memoria con copia opcional en disco"""
+
+    def __init__(self, max_entradas: int = 4096, directorio: Optional[str] = None):
+        self.max_entradas = max_entradas
+        self.directorio = directorio
+        self._lock = threading.Lock()
+        self._lru: OrderedDict[tuple, bytes] = OrderedDict()
+
+    def _ruta(self, clave: tuple) -> Optional[str]:
+        if not self.directorio:
+            return None
+        capa, _, version, z, x, y, atributos = clave
+        return os.path.join(self.directorio, capa, version, str(z), str(x), f"{y}-{atributos}.mvt")
+
+    def get(self, clave: tuple) -> Optional[bytes]:
+        with self._lock:
+            datos = self._lru.get(clave)
+            if datos is not None:
+                self._lru.move_to_end(clave)
+                return datos
+        ruta = self._ruta(clave)
+        if ruta:
+            try:
+                with open(ruta, "rb") as fichero:
+                    datos = fichero.read()
+            except FileNotFoundError:
+                return None
+            self._guardar_memoria(clave, datos)
+            return datos
+        return None
+
+    def put(self, clave: tuple, datos: bytes) -> None:
+        self._guardar_memoria(clave, datos)
+        ruta = self._ruta(clave)
+        if ruta:
+            # El disco se comparte entre procesos y la purga de otro puede
+            # borrar el directorio entre makedirs y open/replace: se reintenta
+            # una vez y, si vuelve a fallar, la tesela queda solo en memoria
+            temporal = f"{ruta}.{os.getpid()}.{threading.get_ident()}.tmp"
+            for _ in range(2):
+                try:
+                    os.makedirs(os.path.dirname(ruta), exist_ok=True)
+                    with open(temporal, "wb") as fichero:
+                        fichero.write(datos)
+                    os.replace(temporal, ruta)
+                    return
+                except FileNotFoundError:
+                    continue
+
+    def _guardar_memoria(self, clave: tuple, datos: bytes) -> None:
+        with self._lock:
+            self._lru[clave] = datos
+            self._lru.move_to_end(clave)
+            while len(self._lru) > self.max_entradas:
+                self._lru.popitem(last=False)
+
+    def purgar_memoria(self, capa: str, vigente: Optional[str] = None) -> None:
+        """Borra del LRU las teselas de una capa salvo las de la versión vigente"""
+        with self._lock:
+            for clave in [c for c in self._lru if c[0] == capa and c[1] != vigente]:
+                del self._lru[clave]
+
+    def purgar_disco(self, capa: str, vigente: Optional[str] = None) -> None:
+        """Borra del disco las teselas de una capa salvo las de la marca vigente"""
+        if self.directorio:
+            base = os.path.join(self.directorio, capa)
+            if os.path.isdir(base):
+                for version in os.listdir(base):
+                    if version != vigente:
+                        shutil.rmtree(os.path.join(base, version), ignore_errors=True)
+
+
+class TileService:
+    """Genera y cachea teselas MVT de las capas registradas"""
+
+    def __init__(
+        self,
+        capas: Iterable[CapaTeselas] = CAPAS,
+        cache: Optional[TileCache] = None,
+        ttl_version: float = 5.0,
+        extent: int = EXTENT,
+        buffer: int = BUFFER,
+    ):
+        self.capas: dict[str, CapaTeselas] = {capa.nombre: capa for capa in capas}
+        self.cache = cache if cache is not None else TileCache()
+        self.ttl_version = ttl_version
+        self.extent = extent
+        self.buffer = buffer
+        self._lock = threading.Lock()
+        self._versiones: dict[str, _Version] = {nombre: _Version() for nombre in self.capas}
+        self._por_tabla: dict[str, list[str]] = {}
+        for capa in self.capas.values():
+            self._por_tabla.setdefault(capa.tabla, []).append(capa.nombre)
+
+    # ------------------------------------------------------------------
+    # Capas y atributos
+    # ------------------------------------------------------------------
+
+    def capa(self, nombre: str) -> CapaTeselas:
+        try:
+            return self.capas[nombre]
+        except KeyError:
+            raise ValueError(f"Capa de teselas desconocida: {nombre}") from None
+
+    def atributos(self, capa: CapaTeselas, atributos: Optional[Iterable[str]]) -> tuple[str, ...]:
+        """Atributos pedidos, validados y sin duplicados (en orden)"""
+        if atributos is None:
+            return capa.por_defecto
+        seleccion = tuple(dict.fromkeys(atributos))
+        desconocidos = [a for a in seleccion if a not in capa.atributos]
+        if desconocidos:
+            raise ValueError(f"Atributos no disponibles en {capa.nombre}: {', '.join(desconocidos)}")
+        return seleccion
+
+    # ------------------------------------------------------------------
+    # Versiones e invalidación
+    # ------------------------------------------------------------------
+
+    def bump(self, nombre: str) -> None:
+        with self._lock:
+            version = self._versiones[nombre]
+            version.contador += 1
+            version.leida_en = 0.0
+
+    def invalidate(self, nombre: Optional[str] = None) -> None:
+        """
+        Fuerza una versión nueva (y relectura de la marca) de una capa, o de
+        todas, y borra su copia en disco: también la de los demás procesos.
+        """
+        nombres = [self.capa(nombre).nombre] if nombre is not None else list(self.capas)
+        for n in nombres:
+            self.bump(n)
+            self.cache.purgar_disco(n)
+
+    def _capas_de(self, objetos: Iterable[object]) -> set[str]:
+        capas = set()
+        for obj in objetos:
+            tabla = getattr(type(obj), "__table__", None)
+            if tabla is not None:
+                capas.update(self._por_tabla.get(tabla.fullname, ()))
+        return capas
+
+    def _after_flush(self, session: Session, flush_context) -> None:
+        capas = self._capas_de((*session.new, *session.dirty, *session.deleted))
+        if capas:
+            session.info.setdefault(_INFO_TABLAS, set()).update(capas)
+            for nombre in capas:
+                self.bump(nombre)
+        # Los borrados físicos no mueven la marca
+        borradas = self._capas_de(session.deleted)
+        if borradas:
+            session.info.setdefault(_INFO_BORRADOS, set()).update(borradas)
+
+    def _after_commit(self, session: Session) -> None:
+        for nombre in session.info.pop(_INFO_TABLAS, ()):
+            self.bump(nombre)
+        for nombre in session.info.pop(_INFO_BORRADOS, ()):
+            self.cache.purgar_disco(nombre)
+
+    def _after_rollback(self, session: Session) -> None:
+        session.info.pop(_INFO_TABLAS, None)
+        session.info.pop(_INFO_BORRADOS, None)
+
+    def listen(self, session_cls: type = Session) -> None:
+        """Engancha los listeners de invalidación a una clase de Session"""
+        event.listen(session_cls, "after_flush", self._after_flush)
+        event.listen(session_cls, "after_commit", self._after_commit)
+        event.listen(session_cls, "after_rollback", self._after_rollback)
+
+    def _marca_caducada(self, nombre: str) -> bool:
+        return time.monotonic() - self._versiones[nombre].leida_en >= self.ttl_version
+
+    def _actualizar_version(
+        self, capa: CapaTeselas, marca: Optional[str] = None, leida: bool = False
+    ) -> tuple[str, str]:
+        """(versión del LRU en memoria, versión en disco) de la capa"""
+        with self._lock:
+            version = self._versiones[capa.nombre]
+            if leida:
+                version.marca = marca
+                version.leida_en = time.monotonic()
+            clave = hashlib.sha1(f"{version.marca}|{version.contador}".encode()).hexdigest()[:12]
+            clave_disco = hashlib.sha1(f"{version.marca}".encode()).hexdigest()[:12]
+            anterior, version.clave = version.clave, clave
+            anterior_disco, version.clave_disco = version.clave_disco, clave_disco
+        if anterior is not None and anterior != clave:
+            self.cache.purgar_memoria(capa.nombre, clave)
+        if anterior_disco is not None and anterior_disco != clave_disco:
+            self.cache.purgar_disco(capa.nombre, clave_disco)
+        return clave, clave_disco
+
+    def _versiones_capa(self, session: Session, capa: CapaTeselas) -> tuple[str, str]:
+        if self._marca_caducada(capa.nombre):
+            return self._actualizar_version(capa, session.execute(_sql_marca(capa)).scalar(), leida=True)
+        return self._actualizar_version(capa)
+
+    async def _versiones_capa_async(self, session: AsyncSession, capa: CapaTeselas) -> tuple[str, str]:
+        if self._marca_caducada(capa.nombre):
+            return self._actualizar_version(capa, (await session.execute(_sql_marca(capa))).scalar(), leida=True)
+        return self._actualizar_version(capa)
+
+    def version(self, session: Session, nombre: str) -> str:
+        """Versión de datos vigente de la capa"""
+        return self._versiones_capa(session, self.capa(nombre))[0]
+
+    async def version_async(self, session: AsyncSession, nombre: str) -> str:
+        """Versión asíncrona de version()"""
+        return (await self._versiones_capa_async(session, self.capa(nombre)))[0]
+
+    # ------------------------------------------------------------------
+    # Teselas
+    # ------------------------------------------------------------------
+
+    def _preparar(self, nombre: str, z: int, x: int, y: int, atributos: Optional[Iterable[str]]):
+        _validar_tesela(z, x, y)
+        capa = self.capa(nombre)
+        agrupar = z <= capa.cluster_hasta_zoom
+        seleccion = () if agrupar else self.atributos(capa, atributos)
+        params = {
+            "z": z, "x": x, "y": y,
+            "extent": self.extent,
+            "buffer": self.buffer,
+            "margen": self.buffer / self.extent,
+            "capa": capa.nombre,
+        }
+        if agrupar:
+            params["celda"] = capa.celda_cluster
+        firma = "cluster" if agrupar else hashlib.sha1(",".join(seleccion).encode()).hexdigest()[:8]
+        return capa, _sql_tesela(capa, seleccion, agrupar), params, firma
+
+    def tile(
+        self,
+        session: Session,
+        nombre: str,
+        z: int,
+        x: int,
+        y: int,
+        atributos: Optional[Iterable[str]] = None,
+    ) -> bytes:
+        """Tesela MVT de una capa (b"" si no tiene objetos)"""
+        capa, stmt, params, firma = self._preparar(nombre, z, x, y, atributos)
+        clave = (capa.nombre, *self._versiones_capa(session, capa), z, x, y, firma)
+        datos = self.cache.get(clave)
+        if datos is None:
+            datos = bytes(session.execute(stmt, params).scalar() or b"")
+            self.cache.put(clave, datos)
+        return datos
+
+    async def tile_async(
+        self,
+        session: AsyncSession,
+        nombre: str,
+        z: int,
+        x: int,
+        y: int,
+        atributos: Optional[Iterable[str]] = None,
+    ) -> bytes:
+        """Versión asíncrona de tile()"""
+        capa, stmt, params, firma = self._preparar(nombre, z, x, y, atributos)
+        clave = (capa.nombre, *(await self._versiones_capa_async(session, capa)), z, x, y, firma)
+        datos = self.cache.get(clave)
+        if datos is None:
+            datos = bytes((await session.execute(stmt, params)).scalar() or b"")
+            self.cache.put(clave, datos)
+        return datos
+
+
+# Instancia compartida del proceso (caché en disco si se define TILE_CACHE_DIR)
+TILE_SERVICE = TileService(cache=TileCache(directorio=os.getenv("TILE_CACHE_DIR") or None))
+TILE_SERVICE.listen()
@@ -0,0 +1,297 @@
+# services/timeline.py
+"""
+Timeline de procesos de inmuebles resuelto en SQL.
+
+Construye en una única consulta UNION ALL las inmatriculaciones,
+transmisiones e intervenciones de uno o varios inmuebles, ordenadas de
+la más reciente a la más antigua (fecha del proceso o, en su defecto,
+created_at). Devuelve dataclasses ligeras en lugar de objetos ORM.
+
+USO:
+    with manager.session() as session:
+        pagina = get_timeline(session, inmueble_id, limit=20)
+        siguiente = get_timeline(session, inmueble_id, after=pagina[-1].cursor, limit=20)
+
+    async with manager.session() as session:
+        por_inmueble = await get_timelines_async(session, ids, limit_por_inmueble=5)
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, asdict
+from datetime import datetime
+from decimal import Decimal
+from typing import Iterable, Optional
+
+from sqlalchemy import (
+    DateTime,
+    Numeric,
+    Select,
+    String,
+    Text,
+    and_,
+    cast,
+    func,
+    literal,
+    null,
+    or_,
+    select,
+    tuple_,
+    union_all,
+)
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from mixins import UUIDType
+from models.inmuebles import Inmatriculacion
+from models.transmisiones import Transmision
+from models.intervenciones import Intervencion
+
+TIPO_INMATRICULACION = "INMATRICULACION"
+TIPO_TRANSMISION = "TRANSMISION"
+TIPO_INTERVENCION = "INTERVENCION"
+
+# Columnas específicas de cada tipo de proceso: (nombre, tipo SQL del NULL de relleno)
+_COLUMNAS_DETALLE = (
+    ("fecha_fin", DateTime()),
+    ("numero_finca", String(50)),
+    ("registro_propiedad_id", UUIDType),
+    ("tipo_certificacion_propiedad_id", UUIDType),
+    ("tipo_transmision_id", UUIDType),
+    ("notaria_id", UUIDType),
+    ("precio_venta", Numeric(15, 2)),
+    ("nombre", String(255)),
+    ("presupuesto", Numeric(15, 2)),
+    ("descripcion", Text()),
+)
+
+# Claves que exponía el antiguo Inmueble.timeline_procesos para cada tipo
+_CLAVES_LEGACY = {
+    TIPO_INMATRICULACION: (
+        "tipo", "fecha", "id", "numero_finca", "registro_propiedad_id",
+        "tipo_certificacion_propiedad_id", "created_at",
+    ),
+    TIPO_TRANSMISION: (
+        "tipo", "fecha", "id", "tipo_transmision_id", "notaria_id",
+        "registro_propiedad_id", "precio_venta", "created_at",
+    ),
+    TIPO_INTERVENCION: (
+        "tipo", "fecha", "fecha_fin", "id", "nombre", "descripcion",
+        "presupuesto", "created_at",
+    ),
+}
+
+
+@dataclass(frozen=True, slots=True)
+class TimelineCursor:
+    """
+    Posición de keyset: último (inmueble_id, fecha_orden, id) devuelto.
+    Sin inmueble_id solo vale para el timeline de un único inmueble.
+    """
+    fecha_orden: datetime
+    id: str
+    inmueble_id: Optional[str] = None
+
+
+@dataclass(frozen=True, slots=True)
+class EventoTimeline:
+    """Entrada del timeline de un inmueble"""
+    tipo: str
+    id: str
+    inmueble_id: str
+    fecha: Optional[datetime]
+    fecha_orden: datetime
+    created_at: datetime
+    fecha_fin: Optional[datetime] = None
+    numero_finca: Optional[str] = None
+    registro_propiedad_id: Optional[str] = None
+    tipo_certificacion_propiedad_id: Optional[str] = None
+    tipo_transmision_id: Optional[str] = None
+    notaria_id: Optional[str] = None
+    precio_venta: Optional[Decimal] = None
+    nombre: Optional[str] = None
+    presupuesto: Optional[Decimal] = None
+    descripcion: Optional[str] = None
+
+    @property
+    def cursor(self) -> TimelineCursor:
+        """Cursor para pedir la página siguiente a partir de este evento"""
+        return TimelineCursor(self.fecha_orden, self.id, self.inmueble_id)
+
+    def as_dict(self) -> dict:
+        """Representación con las claves del antiguo timeline_procesos"""
+        datos = asdict(self)
+        return {clave: datos[clave] for clave in _CLAVES_LEGACY[self.tipo]}
+
+
+def _rama(
+    tipo: str,
+    modelo,
+    fecha,
+    inmueble_ids: list[str],
+    desde: Optional[datetime],
+    hasta: Optional[datetime],
+    after: Optional[TimelineCursor],
+    incluir_descripcion: bool,
+    **detalle,
+) -> Select:
+    """SELECT de un tipo de proceso con las columnas comunes del UNION ALL"""
+    fecha_orden = func.coalesce(fecha, modelo.created_at)
+
+    columnas = [
+        literal(tipo, String(20)).label("tipo"),
+        modelo.id.label("id"),
+        modelo.inmueble_id.label("inmueble_id"),
+        fecha.label("fecha"),
+        fecha_orden.label("fecha_orden"),
+        modelo.created_at.label("created_at"),
+    ]
+    for nombre, tipo_sql in _COLUMNAS_DETALLE:
+        columna = detalle.get(nombre)
+        if nombre == "descripcion" and not incluir_descripcion:
+            columna = None
+        columnas.append(
+            (columna if columna is not None else cast(null(), tipo_sql)).label(nombre)
+        )
+
+    stmt = select(*columnas).where(modelo.inmueble_id.in_(inmueble_ids))
+    if desde is not None:
+        stmt = stmt.where(fecha_orden >= desde)
+    if hasta is not None:
+        stmt = stmt.where(fecha_orden <= hasta)
+    if after is not None:
+        # Se repite en cada rama para que el filtro llegue a los índices.
+        # Orden (inmueble_id ASC, fecha_orden DESC, id DESC): lo que queda
+        # del inmueble del cursor y los inmuebles siguientes.
+        posterior = tuple_(fecha_orden, modelo.id) < tuple_(after.fecha_orden, after.id)
+        if after.inmueble_id is not None:
+            posterior = or_(
+                modelo.inmueble_id > after.inmueble_id,
+                and_(modelo.inmueble_id == after.inmueble_id, posterior),
+            )
+        stmt = stmt.where(posterior)
+    return stmt
+
+
+def timeline_query(
+    inmueble_ids: Iterable[str],
+    *,
+    desde: Optional[datetime] = None,
+    hasta: Optional[datetime] = None,
+    after: Optional[TimelineCursor] = None,
+    limit: Optional[int] = None,
+    limit_por_inmueble: Optional[int] = None,
+    incluir_descripcion: bool = False,
+) -> Select:
+    """
+    Construye la consulta UNION ALL del timeline.
+
+    Args:
+        inmueble_ids: Inmuebles a consultar.
+        desde / hasta: Rango (inclusive) sobre la fecha del proceso.
+        after: Cursor keyset; devuelve solo eventos posteriores en el orden.
+        limit: Máximo de filas totales.
+        limit_por_inmueble: Máximo de filas por inmueble (consultas por lote).
+        incluir_descripcion: Incluye el texto de descripcion de intervenciones.
+    """
+    ids = list(inmueble_ids)
+    if after is not None and after.inmueble_id is None and len(set(ids)) > 1:
+        raise ValueError("Con varios inmuebles el cursor after necesita inmueble_id (EventoTimeline.cursor)")
+    comun = dict(
+        inmueble_ids=ids,
+        desde=desde,
+        hasta=hasta,
+        after=after,
+        incluir_descripcion=incluir_descripcion,
+    )
+
+    eventos = union_all(
+        _rama(
+            TIPO_INMATRICULACION,
+            Inmatriculacion,
+            Inmatriculacion.fecha_inmatriculacion,
+            numero_finca=Inmatriculacion.numero_finca,
+            registro_propiedad_id=Inmatriculacion.registro_propiedad_id,
+            tipo_certificacion_propiedad_id=Inmatriculacion.tipo_certificacion_propiedad_id,
+            **comun,
+        ),
+        _rama(
+            TIPO_TRANSMISION,
+            Transmision,
+            Transmision.fecha_transmision,
+            registro_propiedad_id=Transmision.registro_propiedad_id,
+            tipo_transmision_id=Transmision.tipo_transmision_id,
+            notaria_id=Transmision.notaria_id,
+            precio_venta=Transmision.precio_venta,
+            **comun,
+        ),
+        _rama(
+            TIPO_INTERVENCION,
+            Intervencion,
+            Intervencion.fecha_inicio,
+            fecha_fin=Intervencion.fecha_fin,
+            nombre=Intervencion.nombre,
+            presupuesto=Intervencion.presupuesto,
+            descripcion=Intervencion.descripcion,
+            **comun,
+        ),
+    ).subquery("timeline")
+
+    if limit_por_inmueble is not None:
+        posicion = func.row_number().over(
+            partition_by=eventos.c.inmueble_id,
+            order_by=(eventos.c.fecha_orden.desc(), eventos.c.id.desc()),
+        ).label("posicion")
+        numerados = select(eventos, posicion).subquery("timeline_numerado")
+        stmt = (
+            select(*[numerados.c[c.name] for c in eventos.c])
+            .where(numerados.c.posicion <= limit_por_inmueble)
+            .order_by(
+                numerados.c.inmueble_id,
+                numerados.c.fecha_orden.desc(),
+                numerados.c.id.desc(),
+            )
+        )
+    else:
+        stmt = select(eventos).order_by(
+            eventos.c.inmueble_id,
+            eventos.c.fecha_orden.desc(),
+            eventos.c.id.desc(),
+        )
+
+    if limit is not None:
+        stmt = stmt.limit(limit)
+    return stmt
+
+
+def _to_eventos(result) -> list[EventoTimeline]:
+    return [EventoTimeline(**row._mapping) for row in result]
+
+
+def _agrupar(eventos: list[EventoTimeline], ids: list[str]) -> dict[str, list[EventoTimeline]]:
+    agrupados: dict[str, list[EventoTimeline]] = {inmueble_id: [] for inmueble_id in ids}
+    for evento in eventos:
+        agrupados[evento.inmueble_id].append(evento)
+    return agrupados
+
+
+def get_timeline(session: Session, inmueble_id: str, **kwargs) -> list[EventoTimeline]:
+    """Timeline de un inmueble (admite desde, hasta, after, limit, incluir_descripcion)"""
+    return _to_eventos(session.execute(timeline_query([inmueble_id], **kwargs)))
+
+
+def get_timelines(session: Session, inmueble_ids: Iterable[str], **kwargs) -> dict[str, list[EventoTimeline]]:
+    """Timelines de un lote de inmuebles en una sola consulta, agrupados por inmueble_id"""
+    ids = list(inmueble_ids)
+    return _agrupar(_to_eventos(session.execute(timeline_query(ids, **kwargs))), ids)
+
+
+async def get_timeline_async(session: AsyncSession, inmueble_id: str, **kwargs) -> list[EventoTimeline]:
+    """Versión asíncrona de get_timeline"""
+    return _to_eventos(await session.execute(timeline_query([inmueble_id], **kwargs)))
+
+
+async def get_timelines_async(session: AsyncSession, inmueble_ids: Iterable[str], **kwargs) -> dict[str, list[EventoTimeline]]:
+    """Versión asíncrona de get_timelines"""
+    ids = list(inmueble_ids)
+    return _agrupar(_to_eventos(await session.execute(timeline_query(ids, **kwargs))), ids)
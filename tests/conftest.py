@@ -0,0 +1,45 @@
+# tests/conftest.py
+"""
+Fixtures compartidas.
+
+Los tests marcados con la fixture `postgis` necesitan DATABASE_URL apuntando
+a una base PostgreSQL + PostGIS con las migraciones aplicadas
+(alembic upgrade head); sin ella se saltan. Cada test corre en una
+transacción que se deshace al final.
+"""
+
+import os
+from typing import Iterator
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session
+
+
+@pytest.fixture(scope="session")
+def motor_postgis():
+    if not os.getenv("DATABASE_URL"):
+        pytest.skip("DATABASE_URL no definido")
+    from db.sessions.manager import DatabaseConfig
+
+    motor = create_engine(DatabaseConfig.get_database_url())
+    try:
+        with motor.connect() as conexion:
+            if conexion.execute(text("SELECT to_regproc('public.postgis_version')")).scalar() is None:
+                pytest.skip("La base de DATABASE_URL no tiene PostGIS")
+        yield motor
+    finally:
+        motor.dispose()
+
+
+@pytest.fixture
+def postgis(motor_postgis) -> Iterator[Session]:
+    """Session en una transacción que se deshace al terminar el test"""
+    with motor_postgis.connect() as conexion:
+        transaccion = conexion.begin()
+        session = Session(bind=conexion, join_transaction_mode="create_savepoint")
+        try:
+            yield session
+        finally:
+            session.close()
+            transaccion.rollback()
@@ -0,0 +1,101 @@
+# tests/test_estadisticas.py
+"""
+services.estadisticas contra PostGIS: triggers → app.estadisticas_pendientes
+→ refrescar(), también con un escritor concurrente sin confirmar.
+"""
+
+from datetime import datetime
+
+import pytest
+from sqlalchemy import delete, insert, text, update
+from sqlalchemy.orm import Session
+
+from models.geografia import ComunidadAutonoma
+from models.inmuebles import Inmueble
+from models.resumenes import EstadisticaPendiente, EstadisticaTerritorial
+from services.estadisticas import comunidades, refrescar, refrescar_lote
+
+
+def _clave(session: Session, comunidad_id: str) -> str:
+    return session.execute(
+        text("SELECT app.territorio_clave(CAST(:c AS uuid), NULL, NULL)"), {"c": comunidad_id}
+    ).scalar_one()
+
+
+def _pendiente(session: Session, clave: str) -> bool:
+    return session.get(EstadisticaPendiente, clave, populate_existing=True) is not None
+
+
+def _inmuebles(session: Session, comunidad_id: str) -> int:
+    filas = [fila for fila in comunidades(session) if fila.id == comunidad_id]
+    return filas[0].inmuebles if filas else 0
+
+
+def _comunidad(session: Session, codigo: str) -> str:
+    return session.execute(
+        insert(ComunidadAutonoma).values(codigo_ine=codigo, nombre_oficial=f"Test {codigo}")
+        .returning(ComunidadAutonoma.id)
+    ).scalar_one()
+
+
+def _inmueble(session: Session, comunidad_id: str, nombre: str) -> str:
+    return session.execute(
+        insert(Inmueble).values(nombre=nombre, comunidad_autonoma_id=comunidad_id).returning(Inmueble.id)
+    ).scalar_one()
+
+
+def test_triggers_encolan_y_refrescar_recalcula(postgis):
+    comunidad = _comunidad(postgis, "Z1")
+    clave = _clave(postgis, comunidad)
+
+    inmueble = _inmueble(postgis, comunidad, "Ermita")
+    _inmueble(postgis, comunidad, "Capilla")
+    assert _pendiente(postgis, clave)
+
+    refrescar(postgis)
+    assert not _pendiente(postgis, clave)
+    assert _inmuebles(postgis, comunidad) == 2
+
+    # El borrado lógico vuelve a encolar y descuenta el inmueble
+    postgis.execute(update(Inmueble).where(Inmueble.id == inmueble).values(deleted_at=datetime.utcnow()))
+    assert _pendiente(postgis, clave)
+    refrescar(postgis)
+    assert _inmuebles(postgis, comunidad) == 1
+
+
+def test_refresco_no_pierde_cambios_de_un_escritor_sin_confirmar(motor_postgis):
+    """
+    Con el territorio ya pendiente, un escritor sin confirmar bloquea la
+    fila de la cola: el refresco concurrente la salta y el cambio se
+    recalcula cuando el escritor confirma.
+    """
+    escritor = Session(motor_postgis)
+    refresco = Session(motor_postgis)
+    comunidad = None
+    try:
+        comunidad = _comunidad(escritor, "Z2")
+        clave = _clave(escritor, comunidad)
+        _inmueble(escritor, comunidad, "Ermita")
+        escritor.commit()
+
+        _inmueble(escritor, comunidad, "Capilla")  # sin confirmar; el territorio ya estaba pendiente
+        refrescar_lote(refresco)
+        assert _pendiente(refresco, clave)
+        assert _inmuebles(refresco, comunidad) == 0
+        refresco.commit()
+
+        escritor.commit()
+        refrescar_lote(refresco)
+        assert not _pendiente(refresco, clave)
+        assert _inmuebles(refresco, comunidad) == 2
+    finally:
+        escritor.rollback()
+        refresco.rollback()
+        if comunidad is not None:
+            escritor.execute(delete(Inmueble).where(Inmueble.comunidad_autonoma_id == comunidad))
+            escritor.execute(delete(EstadisticaTerritorial).where(EstadisticaTerritorial.comunidad_autonoma_id == comunidad))
+            escritor.execute(delete(EstadisticaPendiente).where(EstadisticaPendiente.comunidad_autonoma_id == comunidad))
+            escritor.execute(delete(ComunidadAutonoma).where(ComunidadAutonoma.id == comunidad))
+            escritor.commit()
+        escritor.close()
+        refresco.close()
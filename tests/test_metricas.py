@@ -0,0 +1,41 @@
+# tests/test_metricas.py
+"""Huellas de sentencias de db.sessions.metricas"""
+
+import pytest
+
+from db.sessions.metricas import huella, normalizar
+
+
+@pytest.mark.parametrize("sql", [
+    "SELECT a FROM app.t WHERE id IN (%(id_1)s, %(id_2)s)",
+    "SELECT a FROM app.t WHERE id IN (%(id_1)s, %(id_2)s, %(id_3)s)",
+    # casts de bind (uuid nativo en psycopg2 y asyncpg)
+    "SELECT a FROM app.t WHERE id IN (%(id_1)s::UUID, %(id_2)s::UUID)",
+    "SELECT a FROM app.t WHERE id IN (%(id_1)s::UUID, %(id_2)s::UUID, %(id_3)s::UUID)",
+    "SELECT a FROM app.t WHERE id IN ($1::UUID, $2::UUID, $3::UUID, $4::UUID)",
+    "SELECT a FROM app.t WHERE id IN (%(id_1)s::UUID)",
+])
+def test_listas_in_comparten_huella(sql):
+    assert normalizar(sql) == "SELECT a FROM app.t WHERE id IN (?)"
+
+
+def test_cast_de_array_y_tipos_con_parametros():
+    assert normalizar("SELECT a FROM t WHERE id = ANY(%(ids)s::UUID[])") == "SELECT a FROM t WHERE id = ANY(?)"
+    assert normalizar("SELECT a FROM t WHERE c IN ($1::VARCHAR(36), $2::VARCHAR(36))") == "SELECT a FROM t WHERE c IN (?)"
+    assert normalizar(
+        "SELECT a FROM t WHERE f IN ($1::timestamp without time zone, $2::timestamp without time zone)"
+    ) == "SELECT a FROM t WHERE f IN (?)"
+
+
+def test_tamanos_de_lote_misma_huella():
+    huellas = {
+        huella("SELECT * FROM app.inmuebles WHERE app.inmuebles.id IN ("
+               + ", ".join(f"%(id_1_{i})s::UUID" for i in range(n)) + ")")[0]
+        for n in range(1, 50)
+    }
+    assert len(huellas) == 1
+
+
+def test_no_colapsa_llamadas_ni_expresiones():
+    assert normalizar("SELECT f(a, b) FROM t") == "SELECT f(a, b) FROM t"
+    assert "(?)" not in normalizar("SELECT a FROM t WHERE x = ($1::int + $2::int)")
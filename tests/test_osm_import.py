@@ -0,0 +1,27 @@
+# tests/test_osm_import.py
+"""services.osm_import: forma del SQL de staging y merge (sin base de datos)"""
+
+import re
+
+from models.osm import OSMPlace
+from services.osm_import import COLUMNAS, _sql_merge, _sql_staging
+
+
+def test_staging_sin_longitudes():
+    # Un tag largo no puede hacer fallar el COPY del lote
+    definicion = _sql_staging()
+    assert "varchar" not in definicion
+    for columna in COLUMNAS:
+        assert re.search(rf"\b{columna} text\b", definicion)
+
+
+def test_merge_recorta_a_las_longitudes_del_modelo():
+    sql = _sql_merge()
+    for columna in ("name", "amenity", "religion", "denomination", "addr_city", "addr_postcode"):
+        longitud = OSMPlace.__table__.c[columna].type.length
+        assert f"left(l.{columna}, {longitud}) AS {columna}" in sql
+
+
+def test_merge_actualiza_si_cambia_el_municipio():
+    guarda = _sql_merge().split("WHERE t.")[1]
+    assert "t.municipio_id IS DISTINCT FROM coalesce(EXCLUDED.municipio_id, t.municipio_id)" in guarda
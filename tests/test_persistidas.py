@@ -0,0 +1,70 @@
+# tests/test_persistidas.py
+"""api.persistidas y los errores de documento de api.cache_respuestas"""
+
+import asyncio
+
+import pytest
+import strawberry
+
+from api.cache_respuestas import CacheRespuestas
+from api.persistidas import NO_ENCONTRADA, ErrorConsultaPersistida, RegistroConsultas, hash_documento
+
+
+@strawberry.type
+class Query:
+    @strawberry.field
+    def uno(self) -> int:
+        return 1
+
+
+SCHEMA = strawberry.Schema(Query)
+
+
+def _apq(documento: str) -> dict:
+    return {"query": documento, "extensions": {"persistedQuery": {"version": 1, "sha256Hash": hash_documento(documento)}}}
+
+
+def test_consultas_sin_hash_no_se_registran():
+    registro = RegistroConsultas()
+    for i in range(10):
+        assert registro.resolver({"query": "{ uno }" + " " * i}).arbol is not None
+    assert len(registro) == 0
+
+
+def test_apq_limitado_lru():
+    registro = RegistroConsultas(max_apq=2)
+    documentos = ["{ uno }", "{ uno }\n", "{ uno }\n\n"]
+    registro.resolver(_apq(documentos[0]))
+    registro.resolver(_apq(documentos[1]))
+    registro.obtener(hash_documento(documentos[0]))  # el primero pasa a ser el más reciente
+    registro.resolver(_apq(documentos[2]))
+
+    assert len(registro) == 2
+    assert hash_documento(documentos[0]) in registro
+    assert hash_documento(documentos[1]) not in registro
+    with pytest.raises(ErrorConsultaPersistida) as error:
+        registro.resolver({"extensions": {"persistedQuery": {"sha256Hash": hash_documento(documentos[1])}}})
+    assert error.value.codigo == NO_ENCONTRADA
+
+
+def test_registradas_no_caducan():
+    registro = RegistroConsultas(max_apq=1)
+    fija = registro.registrar("{ uno }")
+    registro.resolver(_apq("{ uno }\n"))
+    registro.resolver(_apq("{ uno }\n\n"))
+    assert registro.obtener(fija.hash) is fija
+    assert len(registro) == 2
+
+
+def test_documento_mal_formado_devuelve_errors():
+    cache = CacheRespuestas(registro=RegistroConsultas())
+    respuesta = asyncio.run(cache.ejecutar(SCHEMA, {"query": "{ uno "}))
+    assert "data" not in respuesta
+    assert respuesta["errors"][0]["message"].startswith("Syntax Error")
+
+
+def test_cache_usa_el_registro_recibido_aunque_este_vacio():
+    registro = RegistroConsultas()
+    cache = CacheRespuestas(registro=registro)
+    assert asyncio.run(cache.ejecutar(SCHEMA, _apq("{ uno }"))) == {"data": {"uno": 1}}
+    assert hash_documento("{ uno }") in registro
@@ -0,0 +1,50 @@
+# tests/test_teselas.py
+"""services.teselas: claves de la caché en disco compartida (sin base de datos)"""
+
+import os
+
+from services.teselas import TileCache, TileService
+
+
+def _servicio(directorio) -> TileService:
+    return TileService(cache=TileCache(directorio=str(directorio)))
+
+
+def test_procesos_con_los_mismos_datos_comparten_directorio(tmp_path):
+    uno, otro = _servicio(tmp_path), _servicio(tmp_path)
+    capa = uno.capa("inmuebles")
+    uno.bump("inmuebles")  # escrituras propias: solo cambian el LRU en memoria
+
+    memoria_uno, disco_uno = uno._actualizar_version(capa, "2026-10-17 10:00:00", leida=True)
+    memoria_otro, disco_otro = otro._actualizar_version(capa, "2026-10-17 10:00:00", leida=True)
+    assert disco_uno == disco_otro
+    assert memoria_uno != memoria_otro
+
+    clave = ("inmuebles", memoria_uno, disco_uno, 10, 1, 2, "cluster")
+    uno.cache.put(clave, b"mvt")
+    assert otro.cache.get(("inmuebles", memoria_otro, disco_otro, 10, 1, 2, "cluster")) == b"mvt"
+
+
+def test_contador_propio_no_purga_el_disco(tmp_path):
+    uno, otro = _servicio(tmp_path), _servicio(tmp_path)
+    capa = uno.capa("inmuebles")
+    memoria, disco = otro._actualizar_version(capa, "m1", leida=True)
+    otro.cache.put(("inmuebles", memoria, disco, 10, 1, 2, "cluster"), b"mvt")
+
+    uno._actualizar_version(capa, "m1", leida=True)
+    uno.bump("inmuebles")
+    uno._actualizar_version(capa, "m1", leida=True)
+    assert os.listdir(tmp_path / "inmuebles") == [disco]
+
+    # Una marca nueva sí retira el directorio anterior
+    _, nuevo = uno._actualizar_version(capa, "m2", leida=True)
+    assert nuevo != disco
+    assert not (tmp_path / "inmuebles" / disco).exists()
+
+
+def test_bump_obliga_a_releer_la_marca(tmp_path):
+    servicio = _servicio(tmp_path)
+    servicio._actualizar_version(servicio.capa("inmuebles"), "m1", leida=True)
+    assert not servicio._marca_caducada("inmuebles")
+    servicio.bump("inmuebles")
+    assert servicio._marca_caducada("inmuebles")